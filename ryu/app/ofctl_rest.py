@@ -23,6 +23,7 @@ import urllib
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller import dpset
+from ryu.controller.handler import DEAD_DISPATCHER
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.exception import RyuException
@@ -31,6 +32,8 @@ from ryu.ofproto import ofproto_v1_2
 from ryu.ofproto import ofproto_v1_3
 from ryu.ofproto import ofproto_v1_4
 from ryu.ofproto import ofproto_v1_5
+from ryu.lib import flow_stats
+from ryu.lib import ofctl_utils
 from ryu.lib import ofctl_v1_0
 from ryu.lib import ofctl_v1_2
 from ryu.lib import ofctl_v1_3
@@ -47,6 +50,10 @@ from pprint import pprint
 
 LOG = logging.getLogger('ryu.app.ofctl_rest')
 
+# The number of the filters of which samples of the flow stats are kept
+# for GET /stats/flowdelta/<dpid>
+FLOW_MONITORS_SIZE = 64
+
 # supported ofctl versions in this restful app
 supported_ofctl = {
     ofproto_v1_0.OFP_VERSION: ofctl_v1_0,
@@ -64,6 +71,9 @@ supported_ofctl = {
 # get the list of all switches
 # GET /stats/switches
 #
+# get the latency metrics of the stats requests to the switches
+# GET /stats/latency
+#
 # get the desc stats of the switch
 # GET /stats/desc/<dpid>
 #
@@ -79,6 +89,22 @@ supported_ofctl = {
 # get flows stats of the switch filtered by the fields
 # POST /stats/flow/<dpid>
 #
+# get flows stats of the switch without buffering the whole result
+# GET /stats/flow/<dpid>?stream=json
+# GET /stats/flow/<dpid>?stream=ndjson (one flow entry per line)
+# If some replies did not arrive, the json document has "incomplete": true
+# and the ndjson ends with a line of {"error": ..., "incomplete": true}.
+#
+# get the difference of flows stats of the switch from the previous
+# request with the same filter: added, removed and changed flow entries,
+# and top-K heavy hitters
+# GET /stats/flowdelta/<dpid>
+#
+# get the difference of flows stats of the switch filtered by the tables
+# and the cookie, e.g. {"table_id": [0, 1], "cookie": 1,
+# "cookie_mask": 255, "top": 10}
+# POST /stats/flowdelta/<dpid>
+#
 # get aggregate flows stats of the switch
 # GET /stats/aggregateflow/<dpid>
 #
@@ -304,6 +330,8 @@ def stats_method(method):
         # Invoke StatsController method
         try:
             ret = method(self, req, dp, ofctl, *args, **kwargs)
+            if isinstance(ret, Response):
+                return ret
             return Response(content_type='application/json',
                             body=json.dumps(ret))
         except ValueError:
@@ -317,6 +345,37 @@ def stats_method(method):
     return wrapper
 
 
+def _stream_json(dpid, replies):
+    # Same document as json.dumps(wrap_dpid_dict()) but written out
+    # per multipart reply.  If some replies did not arrive, the document
+    # has "incomplete": true, since the status has already been sent.
+    yield ('{"%s": [' % dpid).encode('utf-8')
+    sep = ''
+    try:
+        for flows in replies:
+            for flow in flows:
+                yield (sep + json.dumps(flow)).encode('utf-8')
+                sep = ', '
+    except ofctl_utils.StatsRequestIncomplete as e:
+        LOG.error('%s', e)
+        yield b'], "incomplete": true}'
+        return
+    yield b']}'
+
+
+def _stream_ndjson(replies):
+    # If some replies did not arrive, ends with an error line.
+    try:
+        for flows in replies:
+            if flows:
+                yield ''.join(
+                    json.dumps(flow) + '\n' for flow in flows).encode('utf-8')
+    except ofctl_utils.StatsRequestIncomplete as e:
+        LOG.error('%s', e)
+        yield (json.dumps({'error': str(e), 'incomplete': True}) +
+               '\n').encode('utf-8')
+
+
 def command_method(method):
     def wrapper(self, req, *args, **kwargs):
         # Parse request json body
@@ -381,11 +440,26 @@ def command_method(method):
     return wrapper
 
 
+def _flow_stats_monitor(flow):
+    tables = flow.get('table_id')
+    if tables is not None:
+        if not isinstance(tables, list):
+            tables = [tables]
+        tables = [ofctl_utils.str_to_int(t) for t in tables]
+    cookies = None
+    if 'cookie' in flow:
+        cookies = [(ofctl_utils.str_to_int(flow['cookie']),
+                    ofctl_utils.str_to_int(flow.get('cookie_mask', 0)))]
+    top_k = ofctl_utils.str_to_int(flow.get('top', flow_stats.DEFAULT_TOP_K))
+    return flow_stats.FlowStatsMonitor(tables, cookies, top_k)
+
+
 class StatsController(ControllerBase):
     def __init__(self, req, link, data, **config):
         super(StatsController, self).__init__(req, link, data, **config)
         self.dpset = data['dpset']
         self.waiters = data['waiters']
+        self.flow_monitors = data['flow_monitors']
         self.topology_api_app = data['topology_api_app']
     
     def to_dict(self, link):
@@ -397,6 +471,10 @@ class StatsController(ControllerBase):
         body = json.dumps(dps)
         return Response(content_type='application/json', body=body)
 
+    def get_stats_latency(self, req, **_kwargs):
+        body = json.dumps(ofctl_utils.get_stats_latency())
+        return Response(content_type='application/json', body=body)
+
     def get_topology(self, req, **kwargs):
         time.sleep(1)
         links_list = get_link(self.topology_api_app, None)
@@ -419,7 +497,30 @@ class StatsController(ControllerBase):
     @stats_method
     def get_flow_stats(self, req, dp, ofctl, **kwargs):
         flow = req.json if req.body else {}
-        return ofctl.get_flow_stats(dp, self.waiters, flow)
+        stream = req.GET.get('stream')
+        if not stream:
+            return ofctl.get_flow_stats(dp, self.waiters, flow)
+
+        if stream not in ('json', 'ndjson'):
+            raise ValueError('Invalid stream format: %s' % stream)
+        replies = ofctl.iter_flow_stats(dp, self.waiters, flow)
+        if stream == 'json':
+            return Response(content_type='application/json',
+                            app_iter=_stream_json(dp.id, replies))
+        return Response(content_type='application/x-ndjson',
+                        app_iter=_stream_ndjson(replies))
+
+    @stats_method
+    def get_flow_stats_delta(self, req, dp, ofctl, **kwargs):
+        flow = req.json if req.body else {}
+        key = ofctl_utils.to_cache_key(flow)
+        if key is None:
+            raise ValueError('Invalid filter: %s' % flow)
+        monitor = self.flow_monitors.get(key)
+        if monitor is None:
+            monitor = _flow_stats_monitor(flow)
+            self.flow_monitors[key] = monitor
+        return ofctl.get_flow_stats_delta(dp, self.waiters, monitor)
 
     @stats_method
     def get_aggregate_flow_stats(self, req, dp, ofctl, **kwargs):
@@ -622,6 +723,7 @@ class RestStatsApi(app_manager.RyuApp):
         self.data = {}
         self.data['dpset'] = self.dpset
         self.data['waiters'] = self.waiters
+        self.data['flow_monitors'] = ofctl_utils.LRUCache(FLOW_MONITORS_SIZE)
         self.data['topology_api_app'] = self
         mapper = wsgi.mapper
 
@@ -643,6 +745,12 @@ class RestStatsApi(app_manager.RyuApp):
                        controller=StatsController, action='get_dpids',
                        conditions=dict(method=['GET']))
 
+        uri = path + '/latency'
+        mapper.connect('stats', uri,
+                       controller=StatsController,
+                       action='get_stats_latency',
+                       conditions=dict(method=['GET']))
+
         uri = path + '/desc/{dpid}'
         mapper.connect('stats', uri,
                        controller=StatsController, action='get_desc_stats',
@@ -658,6 +766,12 @@ class RestStatsApi(app_manager.RyuApp):
                        controller=StatsController, action='get_flow_stats',
                        conditions=dict(method=['GET', 'POST']))
 
+        uri = path + '/flowdelta/{dpid}'
+        mapper.connect('stats', uri,
+                       controller=StatsController,
+                       action='get_flow_stats_delta',
+                       conditions=dict(method=['GET', 'POST']))
+
         uri = path + '/aggregateflow/{dpid}'
         mapper.connect('stats', uri,
                        controller=StatsController,
@@ -878,6 +992,7 @@ class RestStatsApi(app_manager.RyuApp):
     @set_ev_cls([ofp_event.EventOFPSwitchFeatures,
                  ofp_event.EventOFPQueueGetConfigReply,
                  ofp_event.EventOFPRoleReply,
+                 ofp_event.EventOFPBarrierReply,
                  ], MAIN_DISPATCHER)
     def features_reply_handler(self, ev):
         msg = ev.msg
@@ -892,3 +1007,11 @@ class RestStatsApi(app_manager.RyuApp):
 
         del self.waiters[dp.id][msg.xid]
         lock.set()
+
+    @set_ev_cls(ofp_event.EventOFPStateChange, DEAD_DISPATCHER)
+    def state_change_handler(self, ev):
+        dp = ev.datapath
+        if dp.id is None:
+            return
+        # Not to wait for the replies from the disconnected switch.
+        ofctl_utils.cancel_stats_requests(self.waiters, dp)
@@ -23,13 +23,16 @@ from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller import dpset
+from ryu.controller import flow_mirror
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.exception import OFPUnknownVersion
 from ryu.lib import mac
 from ryu.lib import dpid as dpid_lib
+from ryu.lib import fanout
 from ryu.lib import ofctl_v1_0
 from ryu.lib import ofctl_v1_2
+from ryu.lib import ofctl_utils
 from ryu.lib import ofctl_v1_3
 from ryu.lib.packet import packet
 from ryu.ofproto import ether
@@ -125,6 +128,22 @@ from ryu.ofproto import ofproto_v1_3_parser
 #         "ALLOW" is set to "actions".
 #
 #
+# set rules to the firewall switches at once
+# * for no vlan
+# POST /firewall/rules/{switch-id}/bulk
+#
+# * for specific vlan group
+# POST /firewall/rules/{switch-id}/{vlan-id}/bulk
+#
+#  request body format:
+#   [{"<field1>":"<value1>", "<field2>":"<value2>",...}, ...]
+#
+#   Note: the fields of each rule are the same as the above.
+#         No rule is set if any rule is invalid.
+#         The result of each rule is replied after the switch has
+#         processed all the rules.
+#
+#
 # delete a rule of the firewall switches from ruleID
 # * for no vlan
 # DELETE /firewall/rules/{switch-id}
@@ -193,6 +212,10 @@ VLANID_MIN = 2
 VLANID_MAX = 4094
 COOKIE_SHIFT_VLANID = 32
 
+# The priorities of the flow entries other than the rules
+FIXED_FLOW_PRIORITIES = (STATUS_FLOW_PRIORITY, ARP_FLOW_PRIORITY,
+                         LOG_FLOW_PRIORITY)
+
 
 class RestFirewallAPI(app_manager.RyuApp):
 
@@ -201,6 +224,7 @@ class RestFirewallAPI(app_manager.RyuApp):
                     ofproto_v1_3.OFP_VERSION]
 
     _CONTEXTS = {'dpset': dpset.DPSet,
+                 'flow_mirror': flow_mirror.FlowMirror,
                  'wsgi': WSGIApplication}
 
     def __init__(self, *args, **kwargs):
@@ -210,6 +234,7 @@ class RestFirewallAPI(app_manager.RyuApp):
         FirewallController.set_logger(self.logger)
 
         self.dpset = kwargs['dpset']
+        self.flow_mirror = kwargs['flow_mirror']
         wsgi = kwargs['wsgi']
         self.waiters = {}
         self.data = {}
@@ -275,6 +300,11 @@ class RestFirewallAPI(app_manager.RyuApp):
                        conditions=dict(method=['DELETE']),
                        requirements=requirements)
 
+        mapper.connect('firewall', uri + '/bulk',
+                       controller=FirewallController, action='set_rules',
+                       conditions=dict(method=['POST']),
+                       requirements=requirements)
+
         # for VLAN data
         uri += '/{vlanid}'
         mapper.connect('firewall', uri, controller=FirewallController,
@@ -292,6 +322,12 @@ class RestFirewallAPI(app_manager.RyuApp):
                        conditions=dict(method=['DELETE']),
                        requirements=requirements)
 
+        mapper.connect('firewall', uri + '/bulk',
+                       controller=FirewallController,
+                       action='set_vlan_rules',
+                       conditions=dict(method=['POST']),
+                       requirements=requirements)
+
     def stats_reply_handler(self, ev):
         msg = ev.msg
         dp = msg.datapath
@@ -318,7 +354,7 @@ class RestFirewallAPI(app_manager.RyuApp):
     @set_ev_cls(dpset.EventDP, dpset.DPSET_EV_DISPATCHER)
     def handler_datapath(self, ev):
         if ev.enter:
-            FirewallController.regist_ofs(ev.dp)
+            FirewallController.regist_ofs(ev.dp, self.flow_mirror)
         else:
             FirewallController.unregist_ofs(ev.dp)
 
@@ -332,6 +368,33 @@ class RestFirewallAPI(app_manager.RyuApp):
     def stats_reply_handler_v1_2(self, ev):
         self.stats_reply_handler(ev)
 
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def barrier_reply_handler(self, ev):
+        msg = ev.msg
+        dp = msg.datapath
+
+        if dp.id not in self.waiters:
+            return
+        if msg.xid not in self.waiters[dp.id]:
+            return
+        lock, msgs = self.waiters[dp.id].pop(msg.xid)
+        msgs.append(msg)
+        lock.set()
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
+    def error_msg_handler(self, ev):
+        msg = ev.msg
+        dp = msg.datapath
+
+        if dp.id not in self.waiters:
+            return
+        if msg.xid not in self.waiters[dp.id]:
+            return
+        lock, msgs = self.waiters[dp.id][msg.xid]
+        if lock is None:
+            # Sent by ofctl_utils.send_msgs_with_barrier()
+            msgs.append(msg)
+
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def packet_in_handler(self, ev):
         FirewallController.packet_in_handler(ev.msg)
@@ -383,10 +446,10 @@ class FirewallController(ControllerBase):
         cls._LOGGER.addHandler(hdlr)
 
     @staticmethod
-    def regist_ofs(dp):
+    def regist_ofs(dp, flow_mirror):
         dpid_str = dpid_lib.dpid_to_str(dp.id)
         try:
-            f_ofs = Firewall(dp)
+            f_ofs = Firewall(dp, flow_mirror)
         except OFPUnknownVersion as message:
             FirewallController._LOGGER.info('dpid=%s: %s',
                                             dpid_str, message)
@@ -441,15 +504,33 @@ class FirewallController(ControllerBase):
         except ValueError as message:
             return Response(status=400, body=str(message))
 
-        msgs = []
-        for f_ofs in dps.values():
-            function = getattr(f_ofs, func)
-            msg = function() if waiters is None else function(waiters)
-            msgs.append(msg)
+        msgs = self._fan_out(
+            dps, lambda f_ofs: (getattr(f_ofs, func)() if waiters is None
+                                else getattr(f_ofs, func)(waiters)))
 
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
 
+    @staticmethod
+    def _fan_out(dps, func):
+        # Calls func(f_ofs) for the switches concurrently and returns
+        # the results.  The error is raised only if func failed on all
+        # the switches, otherwise reported per switch, since the others
+        # may have been updated.
+        results = fanout.fan_out(func, dps.values())
+        fanout.raise_if_all_failed(results)
+        msgs = []
+        for result in results:
+            if result.error is not None:
+                switch_id = dpid_lib.dpid_to_str(result.item.dp.id)
+                msgs.append({REST_SWITCHID: switch_id,
+                             REST_COMMAND_RESULT: {
+                                 'result': 'failure',
+                                 'details': str(result.error)}})
+            else:
+                msgs.append(result.value)
+        return msgs
+
     # GET /firewall/rules/{switchid}
     def get_rules(self, req, switchid, **_kwargs):
         return self._get_rules(switchid)
@@ -466,6 +547,14 @@ class FirewallController(ControllerBase):
     def set_vlan_rule(self, req, switchid, vlanid, **_kwargs):
         return self._set_rule(req, switchid, vlan_id=vlanid)
 
+    # POST /firewall/rules/{switchid}/bulk
+    def set_rules(self, req, switchid, **_kwargs):
+        return self._set_rules(req, switchid)
+
+    # POST /firewall/rules/{switchid}/{vlanid}/bulk
+    def set_vlan_rules(self, req, switchid, vlanid, **_kwargs):
+        return self._set_rules(req, switchid, vlan_id=vlanid)
+
     # DELETE /firewall/rules/{switchid}
     def delete_rule(self, req, switchid, **_kwargs):
         return self._delete_rule(req, switchid)
@@ -481,10 +570,8 @@ class FirewallController(ControllerBase):
         except ValueError as message:
             return Response(status=400, body=str(message))
 
-        msgs = []
-        for f_ofs in dps.values():
-            rules = f_ofs.get_rules(self.waiters, vid)
-            msgs.append(rules)
+        msgs = self._fan_out(
+            dps, lambda f_ofs: f_ofs.get_rules(self.waiters, vid))
 
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
@@ -502,13 +589,35 @@ class FirewallController(ControllerBase):
         except ValueError as message:
             return Response(status=400, body=str(message))
 
-        msgs = []
-        for f_ofs in dps.values():
-            try:
-                msg = f_ofs.set_rule(rule, self.waiters, vid)
-                msgs.append(msg)
-            except ValueError as message:
-                return Response(status=400, body=str(message))
+        try:
+            msgs = self._fan_out(
+                dps, lambda f_ofs: f_ofs.set_rule(rule, self.waiters, vid))
+        except ValueError as message:
+            return Response(status=400, body=str(message))
+
+        body = json.dumps(msgs)
+        return Response(content_type='application/json', body=body)
+
+    def _set_rules(self, req, switchid, vlan_id=VLANID_NONE):
+        try:
+            rules = req.json if req.body else []
+        except ValueError:
+            FirewallController._LOGGER.debug('invalid syntax %s', req.body)
+            return Response(status=400)
+        if not isinstance(rules, list):
+            return Response(status=400, body='Rules must be a list.')
+
+        try:
+            dps = self._OFS_LIST.get_ofs(switchid)
+            vid = FirewallController._conv_toint_vlanid(vlan_id)
+        except ValueError as message:
+            return Response(status=400, body=str(message))
+
+        try:
+            msgs = self._fan_out(
+                dps, lambda f_ofs: f_ofs.set_rules(rules, self.waiters, vid))
+        except ValueError as message:
+            return Response(status=400, body=str(message))
 
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
@@ -526,13 +635,12 @@ class FirewallController(ControllerBase):
         except ValueError as message:
             return Response(status=400, body=str(message))
 
-        msgs = []
-        for f_ofs in dps.values():
-            try:
-                msg = f_ofs.delete_rule(ruleid, self.waiters, vid)
-                msgs.append(msg)
-            except ValueError as message:
-                return Response(status=400, body=str(message))
+        try:
+            msgs = self._fan_out(
+                dps,
+                lambda f_ofs: f_ofs.delete_rule(ruleid, self.waiters, vid))
+        except ValueError as message:
+            return Response(status=400, body=str(message))
 
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
@@ -562,11 +670,12 @@ class Firewall(object):
               ofproto_v1_2.OFP_VERSION: ofctl_v1_2,
               ofproto_v1_3.OFP_VERSION: ofctl_v1_3}
 
-    def __init__(self, dp):
+    def __init__(self, dp, flow_mirror):
         super(Firewall, self).__init__()
         self.vlan_list = {}
         self.vlan_list[VLANID_NONE] = 0  # for VLAN=None
         self.dp = dp
+        self.flow_mirror = flow_mirror
         version = dp.ofproto.OFP_VERSION
 
         if version not in self._OFCTL:
@@ -600,6 +709,39 @@ class Firewall(object):
     def _cookie_to_ruleid(cookie):
         return cookie & ofproto_v1_3_parser.UINT32_MAX
 
+    @staticmethod
+    def _to_cookie_mask(vlan_id, rule_id=REST_ALL):
+        # Returns the cookie and the cookie mask of the rules of vlan_id
+        # and rule_id, either of which may be REST_ALL.
+        cookie = cookie_mask = 0
+        if vlan_id != REST_ALL:
+            cookie |= vlan_id << COOKIE_SHIFT_VLANID
+            cookie_mask |= (ofproto_v1_3_parser.UINT32_MAX <<
+                            COOKIE_SHIFT_VLANID)
+        if rule_id != REST_ALL:
+            cookie |= rule_id
+            cookie_mask |= ofproto_v1_3_parser.UINT32_MAX
+        return cookie, cookie_mask
+
+    def _get_flow_entries(self, cookie=0, cookie_mask=0,
+                          excludes=FIXED_FLOW_PRIORITIES):
+        # Looks up the flow entries in the mirror instead of the switch.
+        return [entry for entry in self.flow_mirror.get_flows(
+                self.dp, cookie=cookie, cookie_mask=cookie_mask)
+                if entry.priority not in excludes]
+
+    def _to_flow_stat(self, entry):
+        # Converts entry in the same way as ofctl.get_flow_stats().
+        return {REST_PRIORITY: entry.priority,
+                REST_COOKIE: entry.cookie,
+                REST_MATCH: self.ofctl.match_to_str(entry.match),
+                REST_ACTION: self.ofctl.actions_to_str(entry.instructions)}
+
+    def _get_flow_stats(self, cookie=0, cookie_mask=0,
+                        excludes=FIXED_FLOW_PRIORITIES):
+        return [self._to_flow_stat(entry) for entry in
+                self._get_flow_entries(cookie, cookie_mask, excludes)]
+
     # REST command template
     def rest_command(func):
         def _rest_command(*args, **kwargs):
@@ -611,14 +753,10 @@ class Firewall(object):
 
     @rest_command
     def get_status(self, waiters):
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
         status = REST_STATUS_ENABLE
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                if flow_stat['priority'] == STATUS_FLOW_PRIORITY:
-                    status = REST_STATUS_DISABLE
+        if self.flow_mirror.get_flows(self.dp,
+                                      priority=STATUS_FLOW_PRIORITY):
+            status = REST_STATUS_DISABLE
 
         return REST_STATUS, status
 
@@ -632,7 +770,8 @@ class Firewall(object):
                                 match=match, actions=actions)
 
         cmd = self.dp.ofproto.OFPFC_ADD
-        self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+        self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                  self.flow_mirror)
 
         msg = {'result': 'success',
                'details': 'firewall stopped.'}
@@ -648,7 +787,8 @@ class Firewall(object):
                                 match=match, actions=actions)
 
         cmd = self.dp.ofproto.OFPFC_DELETE_STRICT
-        self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+        self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                  self.flow_mirror)
 
         msg = {'result': 'success',
                'details': 'firewall running.'}
@@ -656,15 +796,11 @@ class Firewall(object):
 
     @rest_command
     def get_log_status(self, waiters):
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
         status = REST_STATUS_DISABLE
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                if flow_stat['priority'] == LOG_FLOW_PRIORITY:
-                    if flow_stat['actions']:
-                        status = REST_STATUS_ENABLE
+        for entry in self.flow_mirror.get_flows(self.dp,
+                                                priority=LOG_FLOW_PRIORITY):
+            if self.ofctl.actions_to_str(entry.instructions):
+                status = REST_STATUS_ENABLE
 
         return REST_LOG_STATUS, status
 
@@ -687,29 +823,25 @@ class Firewall(object):
         cmd = self.dp.ofproto.OFPFC_ADD
 
         if waiters:
-            msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
-            if str(self.dp.id) in msgs:
-                flow_stats = msgs[str(self.dp.id)]
-                for flow_stat in flow_stats:
-                    priority = flow_stat[REST_PRIORITY]
-                    if (priority == STATUS_FLOW_PRIORITY
-                            or priority == ARP_FLOW_PRIORITY):
-                        continue
-                    action = flow_stat[REST_ACTION]
-                    if action == ['OUTPUT:%d' % self.dp.ofproto.OFPP_NORMAL]:
-                        continue
-
-                    cookie = flow_stat[REST_COOKIE]
-                    match = Match.to_mod_openflow(flow_stat[REST_MATCH])
-                    flow = self._to_of_flow(cookie=cookie, priority=priority,
-                                            match=match, actions=actions)
-                    self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+            for flow_stat in self._get_flow_stats(
+                    excludes=(STATUS_FLOW_PRIORITY, ARP_FLOW_PRIORITY)):
+                priority = flow_stat[REST_PRIORITY]
+                action = flow_stat[REST_ACTION]
+                if action == ['OUTPUT:%d' % self.dp.ofproto.OFPP_NORMAL]:
+                    continue
+
+                cookie = flow_stat[REST_COOKIE]
+                match = Match.to_mod_openflow(flow_stat[REST_MATCH])
+                flow = self._to_of_flow(cookie=cookie, priority=priority,
+                                        match=match, actions=actions)
+                self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                          self.flow_mirror)
         else:
             # Initialize.
             flow = self._to_of_flow(cookie=0, priority=LOG_FLOW_PRIORITY,
                                     match={}, actions=actions)
-            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+            self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                      self.flow_mirror)
 
         msg = {'result': 'success',
                'details': details}
@@ -725,7 +857,8 @@ class Firewall(object):
                                 match=match, actions=actions)
 
         cmd = self.dp.ofproto.OFPFC_ADD
-        self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+        self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                  self.flow_mirror)
 
     @rest_command
     def set_rule(self, rest, waiters, vlan_id):
@@ -737,6 +870,18 @@ class Firewall(object):
         return REST_COMMAND_RESULT, msgs
 
     def _set_rule(self, cookie, rest, waiters, vlan_id):
+        flow = self._to_rule_flow(cookie, rest, waiters, vlan_id)
+
+        cmd = self.dp.ofproto.OFPFC_ADD
+        try:
+            self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                      self.flow_mirror)
+        except:
+            raise ValueError('Invalid rule parameter.')
+
+        return self._to_rule_result(cookie, vlan_id)
+
+    def _to_rule_flow(self, cookie, rest, waiters, vlan_id):
         priority = int(rest.get(REST_PRIORITY, ACL_FLOW_PRIORITY_MIN))
 
         if (priority < ACL_FLOW_PRIORITY_MIN
@@ -753,40 +898,74 @@ class Firewall(object):
             if result[REST_LOG_STATUS] == REST_STATUS_ENABLE:
                 rest[REST_ACTION] = REST_ACTION_PACKETIN
         actions = Action.to_openflow(rest)
-        flow = self._to_of_flow(cookie=cookie, priority=priority,
+        return self._to_of_flow(cookie=cookie, priority=priority,
                                 match=match, actions=actions)
 
-        cmd = self.dp.ofproto.OFPFC_ADD
-        try:
-            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
-        except:
-            raise ValueError('Invalid rule parameter.')
-
+    @staticmethod
+    def _to_rule_result(cookie, vlan_id, error=None):
         rule_id = Firewall._cookie_to_ruleid(cookie)
-        msg = {'result': 'success',
-               'details': 'Rule added. : rule_id=%d' % rule_id}
+        if error is None:
+            msg = {'result': 'success',
+                   'details': 'Rule added. : rule_id=%d' % rule_id}
+        else:
+            msg = {'result': 'failure',
+                   'details': '%s : rule_id=%d' % (error, rule_id)}
 
         if vlan_id != VLANID_NONE:
             msg.setdefault(REST_VLANID, vlan_id)
         return msg
 
+    @rest_command
+    def set_rules(self, rests, waiters, vlan_id):
+        # All the rules are converted before sending any of them.
+        cmd = self.dp.ofproto.OFPFC_ADD
+        flow_mods = []
+        rules = []
+        for i, rest in enumerate(rests):
+            if not isinstance(rest, dict):
+                raise ValueError('Invalid rule. : rules[%d]' % i)
+            for cookie, vid in self._get_cookie(vlan_id):
+                try:
+                    flow = self._to_rule_flow(cookie, rest, waiters, vid)
+                except ValueError as message:
+                    raise ValueError('%s : rules[%d]' % (message, i))
+                try:
+                    flow_mod = self.ofctl.to_flow_mod(self.dp, flow, cmd)
+                except:
+                    raise ValueError('Invalid rule parameter. : rules[%d]'
+                                     % i)
+                flow_mods.append(flow_mod)
+                rules.append((cookie, vid))
+
+        errors = ofctl_utils.send_msgs_with_barrier(self.dp, flow_mods,
+                                                    waiters)
+        if errors is None:
+            # Which rules the switch has processed is unknown.
+            self.flow_mirror.invalidate(self.dp)
+
+        msgs = []
+        for j, (cookie, vid) in enumerate(rules):
+            if errors is None:
+                error = 'No barrier reply from switch.'
+            elif errors[j] is not None:
+                error = 'Rule rejected by switch (type=%d, code=%d).' % (
+                    errors[j].type, errors[j].code)
+            else:
+                self.flow_mirror.record(flow_mods[j])
+                error = None
+            msgs.append(self._to_rule_result(cookie, vid, error))
+        return REST_COMMAND_RESULT, msgs
+
     @rest_command
     def get_rules(self, waiters, vlan_id):
         rules = {}
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                priority = flow_stat[REST_PRIORITY]
-                if (priority != STATUS_FLOW_PRIORITY
-                        and priority != ARP_FLOW_PRIORITY
-                        and priority != LOG_FLOW_PRIORITY):
-                    vid = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
-                    if vlan_id == REST_ALL or vlan_id == vid:
-                        rule = self._to_rest_rule(flow_stat)
-                        rules.setdefault(vid, [])
-                        rules[vid].append(rule)
+        cookie, cookie_mask = self._to_cookie_mask(vlan_id)
+        for flow_stat in self._get_flow_stats(cookie, cookie_mask):
+            vid = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
+            if vlan_id == REST_ALL or vlan_id == vid:
+                rule = self._to_rest_rule(flow_stat)
+                rules.setdefault(vid, [])
+                rules[vid].append(rule)
 
         get_data = []
         for vid, rule in rules.items():
@@ -811,25 +990,21 @@ class Firewall(object):
         vlan_list = []
         delete_list = []
 
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                cookie = flow_stat[REST_COOKIE]
-                ruleid = Firewall._cookie_to_ruleid(cookie)
-                priority = flow_stat[REST_PRIORITY]
-                dl_vlan = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
-
-                if (priority != STATUS_FLOW_PRIORITY
-                        and priority != ARP_FLOW_PRIORITY
-                        and priority != LOG_FLOW_PRIORITY):
-                    if ((rule_id == REST_ALL or rule_id == ruleid) and
-                            (vlan_id == dl_vlan or vlan_id == REST_ALL)):
-                        match = Match.to_mod_openflow(flow_stat[REST_MATCH])
-                        delete_list.append([cookie, priority, match])
-                    else:
-                        if dl_vlan not in vlan_list:
-                            vlan_list.append(dl_vlan)
+        cookie, cookie_mask = self._to_cookie_mask(vlan_id, rule_id)
+        for entry in self._get_flow_entries():
+            # Only the rules to delete are converted.
+            if entry.cookie & cookie_mask == cookie:
+                flow_stat = self._to_flow_stat(entry)
+                dl_vlan = flow_stat[REST_MATCH].get(REST_DL_VLAN,
+                                                    VLANID_NONE)
+                if vlan_id == dl_vlan or vlan_id == REST_ALL:
+                    match = Match.to_mod_openflow(flow_stat[REST_MATCH])
+                    delete_list.append([entry.cookie, entry.priority,
+                                        match])
+                    continue
+            vid = entry.cookie >> COOKIE_SHIFT_VLANID
+            if vid not in vlan_list:
+                vlan_list.append(vid)
 
         self._update_vlan_list(vlan_list)
 
@@ -846,7 +1021,8 @@ class Firewall(object):
             for cookie, priority, match in delete_list:
                 flow = self._to_of_flow(cookie=cookie, priority=priority,
                                         match=match, actions=actions)
-                self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+                self.ofctl.mod_flow_entry(self.dp, flow, cmd,
+                                          self.flow_mirror)
 
                 vid = match.get(REST_DL_VLAN, VLANID_NONE)
                 rule_id = Firewall._cookie_to_ruleid(cookie)
@@ -17,6 +17,7 @@
 import logging
 import json
 import re
+import time
 
 from ryu.app import conf_switch_key as cs_key
 from ryu.app.wsgi import ControllerBase
@@ -31,7 +32,9 @@ from ryu.controller.handler import set_ev_cls
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.exception import OFPUnknownVersion
 from ryu.lib import dpid as dpid_lib
+from ryu.lib import fanout
 from ryu.lib import mac
+from ryu.lib import ofctl_utils
 from ryu.lib import ofctl_v1_0
 from ryu.lib import ofctl_v1_2
 from ryu.lib import ofctl_v1_3
@@ -147,6 +150,49 @@ from ryu.ofproto import inet
 #   Note: When "actions" has not been set up,
 #         "queue: 0" is set to "actions".
 #
+# set qos rules at once
+# * for no vlan
+# POST /qos/rules/{switch-id}/bulk
+#
+# * for specific vlan group
+# POST /qos/rules/{switch-id}/{vlan-id}/bulk
+#
+#  request body format:
+#   [{"priority": "<value>",
+#     "match": {"<field1>": "<value1>", ...},
+#     "actions": {"<action1>": "<value1>", ...}}, ...]
+#
+#   Note: No rule is set if any rule is invalid.
+#         The result of each rule is replied after the switch has
+#         processed all the rules.
+#
+# apply a qos policy to the switches concurrently
+# * for no vlan
+# POST /qos/policy/{switch-id}
+#
+# * for specific vlan group
+# POST /qos/policy/{switch-id}/{vlan-id}
+#
+#  request body format:
+#   {"queue": {<same as POST /qos/queue>},
+#    "meters": [{<same as POST /qos/meter>}, ...],
+#    "rules": [{<same as POST /qos/rules>}, ...]}
+#
+#   Note: Each of "queue", "meters" and "rules" is optional.
+#         The queues of each switch are set in a single OVSDB
+#         transaction, and the meters and the rules are sent at once
+#         followed by a barrier request.
+#         The response contains the results of each switch and the
+#         elapsed time in seconds, e.g.
+#          {"qos": [{"switch_id": ..., "command_result": {
+#                     "queue": ..., "meters": [...], "rules": [...],
+#                     "timing": {"ovsdb": ..., "openflow": ...,
+#                                "total": ...}}}, ...],
+#           "timing": {"switches": <number of switches>,
+#                      "elapsed": <elapsed time of the request>,
+#                      "max": <longest time of a switch>,
+#                      "sum": <total time of the switches>}}
+#
 # delete a qos rules
 # * for no vlan
 # DELETE /qos/rule/{switch-id}
@@ -238,6 +284,11 @@ REST_METER_BANDS = 'bands'
 REST_METER_ACTION_DROP = 'drop'
 REST_METER_ACTION_REMARK = 'remark'
 
+REST_POLICY_QUEUE = 'queue'
+REST_POLICY_METERS = 'meters'
+REST_POLICY_RULES = 'rules'
+REST_POLICY_TIMING = 'timing'
+
 DEFAULT_FLOW_PRIORITY = 0
 QOS_PRIORITY_MAX = ofproto_v1_3_parser.UINT16_MAX - 1
 QOS_PRIORITY_MIN = 1
@@ -344,6 +395,33 @@ class RestQoSAPI(app_manager.RyuApp):
     def meter_stats_reply_handler_v1_2(self, ev):
         self.stats_reply_handler(ev)
 
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def barrier_reply_handler(self, ev):
+        msg = ev.msg
+        dp = msg.datapath
+
+        if dp.id not in self.waiters:
+            return
+        if msg.xid not in self.waiters[dp.id]:
+            return
+        lock, msgs = self.waiters[dp.id].pop(msg.xid)
+        msgs.append(msg)
+        lock.set()
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
+    def error_msg_handler(self, ev):
+        msg = ev.msg
+        dp = msg.datapath
+
+        if dp.id not in self.waiters:
+            return
+        if msg.xid not in self.waiters[dp.id]:
+            return
+        lock, msgs = self.waiters[dp.id][msg.xid]
+        if lock is None:
+            # Sent by ofctl_utils.send_msgs_with_barrier()
+            msgs.append(msg)
+
 
 class QoSOfsList(dict):
 
@@ -475,6 +553,18 @@ class QoSController(ControllerBase):
         return self._access_switch(req, switchid, vlanid,
                                    'set_qos', self.waiters)
 
+    @route('qos_switch', BASE_URL + '/rules/{switchid}/bulk',
+           methods=['POST'], requirements=REQUIREMENTS)
+    def set_qos_rules(self, req, switchid, **_kwargs):
+        return self._access_switch(req, switchid, VLANID_NONE,
+                                   'set_qos_rules', self.waiters)
+
+    @route('qos_switch', BASE_URL + '/rules/{switchid}/{vlanid}/bulk',
+           methods=['POST'], requirements=REQUIREMENTS)
+    def set_vlan_qos_rules(self, req, switchid, vlanid, **_kwargs):
+        return self._access_switch(req, switchid, vlanid,
+                                   'set_qos_rules', self.waiters)
+
     @route('qos_switch', BASE_URL + '/rules/{switchid}',
            methods=['DELETE'], requirements=REQUIREMENTS)
     def delete_qos(self, req, switchid, **_kwargs):
@@ -505,6 +595,61 @@ class QoSController(ControllerBase):
         return self._access_switch(req, switchid, VLANID_NONE,
                                    'delete_meter', self.waiters)
 
+    @route('qos_switch', BASE_URL + '/policy/{switchid}',
+           methods=['POST'], requirements=REQUIREMENTS)
+    def set_policy(self, req, switchid, **_kwargs):
+        return self._set_policy(req, switchid, VLANID_NONE)
+
+    @route('qos_switch', BASE_URL + '/policy/{switchid}/{vlanid}',
+           methods=['POST'], requirements=REQUIREMENTS)
+    def set_vlan_policy(self, req, switchid, vlanid, **_kwargs):
+        return self._set_policy(req, switchid, vlanid)
+
+    def _set_policy(self, req, switchid, vlan_id):
+        try:
+            rest = req.json if req.body else {}
+        except ValueError:
+            QoSController._LOGGER.debug('invalid syntax %s', req.body)
+            return Response(status=400)
+
+        # The policy is converted for all the switches before applying
+        # it to any of them.
+        try:
+            dps = self._OFS_LIST.get_ofs(switchid)
+            vid = QoSController._conv_toint_vlanid(vlan_id)
+            policies = [(f_ofs, f_ofs.to_policy(rest, vid))
+                        for f_ofs in dps.values()]
+        except ValueError as message:
+            return Response(status=400, body=str(message))
+
+        start = time.time()
+        # The switches are provisioned concurrently.
+        results = fanout.fan_out(
+            lambda item: item[0].apply_policy(item[1], self.waiters),
+            policies)
+
+        msgs = []
+        for result in results:
+            if result.error is None:
+                msgs.append(result.value)
+                continue
+            switch_id = dpid_lib.dpid_to_str(result.item[0].dp.id)
+            QoSController._LOGGER.error('dpid=%s: failed to apply policy: %s',
+                                        switch_id, result.error)
+            msgs.append({REST_SWITCHID: switch_id,
+                         REST_COMMAND_RESULT: {
+                             'result': 'failure',
+                             'details': str(result.error)}})
+        switch_times = [
+            msg[REST_COMMAND_RESULT].get(REST_POLICY_TIMING, {}).get(
+                'total', 0) for msg in msgs]
+        timing = {'switches': len(msgs),
+                  'elapsed': time.time() - start,
+                  'max': max(switch_times) if switch_times else 0,
+                  'sum': sum(switch_times)}
+        body = json.dumps({REST_QOS: msgs, REST_POLICY_TIMING: timing})
+        return Response(content_type='application/json', body=body)
+
     def _access_switch(self, req, switchid, vlan_id, func, waiters):
         try:
             rest = req.json if req.body else {}
@@ -666,9 +811,14 @@ class QoS(object):
             return REST_COMMAND_RESULT, msg
 
         self.queue_list.clear()
+        queue = self._to_queue_config(rest)
+        return REST_COMMAND_RESULT, self._set_queue_config(queue)
+
+    def _to_queue_config(self, rest):
         queue_type = rest.get(REST_QUEUE_TYPE, 'linux-htb')
         parent_max_rate = rest.get(REST_QUEUE_MAX_RATE, None)
         queues = rest.get(REST_QUEUES, [])
+        queue_list = {}
         queue_id = 0
         queue_config = []
         for queue in queues:
@@ -683,10 +833,18 @@ class QoS(object):
                 config['min-rate'] = min_rate
             if len(config):
                 queue_config.append(config)
-            self.queue_list[queue_id] = {'config': config}
+            queue_list[queue_id] = {'config': config}
             queue_id += 1
 
         port_name = rest.get(REST_PORT_NAME, None)
+        return (port_name, queue_type, parent_max_rate, queue_config,
+                queue_list)
+
+    def _set_queue_config(self, queue):
+        port_name, queue_type, parent_max_rate, queue_config, queue_list = \
+            queue
+        self.queue_list.clear()
+        self.queue_list.update(queue_list)
         vif_ports = self.ovs_bridge.get_port_name_list()
 
         if port_name is not None:
@@ -694,18 +852,18 @@ class QoS(object):
                 raise ValueError('%s port is not exists' % port_name)
             vif_ports = [port_name]
 
-        for port_name in vif_ports:
-            try:
-                self.ovs_bridge.set_qos(port_name, type=queue_type,
-                                        max_rate=parent_max_rate,
-                                        queues=queue_config)
-            except Exception as msg:
-                raise ValueError(msg)
+        # All the ports are configured in a single transaction.
+        try:
+            self.ovs_bridge.set_qos_ports(vif_ports, type=queue_type,
+                                          max_rate=parent_max_rate,
+                                          queues=queue_config)
+        except Exception as msg:
+            raise ValueError(msg)
 
         msg = {'result': 'success',
                'details': self.queue_list}
 
-        return REST_COMMAND_RESULT, msg
+        return msg
 
     def _delete_queue(self):
         if self.ovs_bridge is None:
@@ -736,6 +894,17 @@ class QoS(object):
         return REST_COMMAND_RESULT, msgs
 
     def _set_qos(self, cookie, rest, waiters, vlan_id):
+        flow = self._to_qos_flow(cookie, rest, vlan_id)
+
+        cmd = self.dp.ofproto.OFPFC_ADD
+        try:
+            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+        except:
+            raise ValueError('Invalid rule parameter.')
+
+        return self._to_qos_result(cookie, vlan_id)
+
+    def _to_qos_flow(self, cookie, rest, vlan_id):
         match_value = rest[REST_MATCH]
         if vlan_id:
             match_value[REST_DL_VLAN] = vlan_id
@@ -766,23 +935,158 @@ class QoS(object):
 
         actions.append({'type': 'GOTO_TABLE',
                         'table_id': QOS_TABLE_ID + 1})
-        flow = self._to_of_flow(cookie=cookie, priority=priority,
+        return self._to_of_flow(cookie=cookie, priority=priority,
                                 match=match, actions=actions)
 
-        cmd = self.dp.ofproto.OFPFC_ADD
-        try:
-            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
-        except:
-            raise ValueError('Invalid rule parameter.')
-
+    @staticmethod
+    def _to_qos_result(cookie, vlan_id, error=None):
         qos_id = QoS._cookie_to_qosid(cookie)
-        msg = {'result': 'success',
-               'details': 'QoS added. : qos_id=%d' % qos_id}
+        if error is None:
+            msg = {'result': 'success',
+                   'details': 'QoS added. : qos_id=%d' % qos_id}
+        else:
+            msg = {'result': 'failure',
+                   'details': '%s : qos_id=%d' % (error, qos_id)}
 
         if vlan_id != VLANID_NONE:
             msg.setdefault(REST_VLANID, vlan_id)
         return msg
 
+    @rest_command
+    def set_qos_rules(self, rests, vlan_id, waiters):
+        # All the rules are converted before sending any of them.
+        flow_mods, rules = self._to_qos_flow_mods(rests, vlan_id)
+
+        errors = ofctl_utils.send_msgs_with_barrier(self.dp, flow_mods,
+                                                    waiters)
+        msgs = []
+        for j, (cookie, vid) in enumerate(rules):
+            error = QoS._to_barrier_error(errors, j)
+            msgs.append(self._to_qos_result(cookie, vid, error))
+        return REST_COMMAND_RESULT, msgs
+
+    def _to_qos_flow_mods(self, rests, vlan_id):
+        if not isinstance(rests, list):
+            raise ValueError('Rules must be a list.')
+
+        cmd = self.dp.ofproto.OFPFC_ADD
+        flow_mods = []
+        rules = []
+        for i, rest in enumerate(rests):
+            for cookie, vid in self._get_cookie(vlan_id):
+                try:
+                    flow = self._to_qos_flow(cookie, rest, vid)
+                except (KeyError, TypeError):
+                    raise ValueError('Invalid rule. : rules[%d]' % i)
+                except ValueError as message:
+                    raise ValueError('%s : rules[%d]' % (message, i))
+                try:
+                    flow_mod = self.ofctl.to_flow_mod(self.dp, flow, cmd)
+                except:
+                    raise ValueError('Invalid rule parameter. : rules[%d]'
+                                     % i)
+                flow_mods.append(flow_mod)
+                rules.append((cookie, vid))
+        return flow_mods, rules
+
+    @staticmethod
+    def _to_barrier_error(errors, i, name='Rule'):
+        # errors is the return value of send_msgs_with_barrier().
+        if errors is None:
+            return 'No barrier reply from switch.'
+        elif errors[i] is not None:
+            return '%s rejected by switch (type=%d, code=%d).' % (
+                name, errors[i].type, errors[i].code)
+        return None
+
+    def to_policy(self, rest, vlan_id):
+        """
+        Converts a QoS policy of the REST API into the OVSDB and the
+        OpenFlow messages applied by apply_policy().
+        """
+        if not isinstance(rest, dict):
+            raise ValueError('Invalid policy.')
+
+        queue = rest.get(REST_POLICY_QUEUE)
+        if queue is not None:
+            queue = self._to_queue_config(queue)
+
+        meters = rest.get(REST_POLICY_METERS, [])
+        if not isinstance(meters, list):
+            raise ValueError('Meters must be a list.')
+        if meters and (self.version == ofproto_v1_0.OFP_VERSION or
+                       self.version == ofproto_v1_2.OFP_VERSION):
+            raise ValueError('set_meter operation is not supported')
+        meter_mods = []
+        for i, meter in enumerate(meters):
+            try:
+                meter_mods.append(self.ofctl.to_meter_mod(
+                    self.dp, meter, self.dp.ofproto.OFPMC_ADD))
+            except:
+                raise ValueError('Invalid meter parameter. : meters[%d]'
+                                 % i)
+
+        flow_mods, rules = self._to_qos_flow_mods(
+            rest.get(REST_POLICY_RULES, []), vlan_id)
+        return queue, meters, meter_mods, flow_mods, rules
+
+    @rest_command
+    def apply_policy(self, policy, waiters):
+        queue, meters, meter_mods, flow_mods, rules = policy
+        msg = {}
+        timing = {}
+        start = time.time()
+
+        if queue is not None:
+            if self.ovs_bridge is None:
+                msg[REST_POLICY_QUEUE] = {
+                    'result': 'failure',
+                    'details': 'ovs_bridge is not exists'}
+            else:
+                try:
+                    msg[REST_POLICY_QUEUE] = self._set_queue_config(queue)
+                except ValueError as message:
+                    msg[REST_POLICY_QUEUE] = {'result': 'failure',
+                                              'details': str(message)}
+            timing['ovsdb'] = time.time() - start
+
+        if meter_mods or flow_mods:
+            # The switch may reorder the messages between barriers, so
+            # the meters are sent with their own barrier before the
+            # rules referring to them.
+            of_start = time.time()
+            meter_errors = []
+            if meter_mods:
+                meter_errors = ofctl_utils.send_msgs_with_barrier(
+                    self.dp, meter_mods, waiters)
+            errors = []
+            if flow_mods:
+                errors = ofctl_utils.send_msgs_with_barrier(
+                    self.dp, flow_mods, waiters)
+            meter_msgs = []
+            for i, meter in enumerate(meters):
+                error = QoS._to_barrier_error(meter_errors, i, 'Meter')
+                meter_id = meter.get(REST_METER_ID)
+                if error is None:
+                    meter_msgs.append(
+                        {'result': 'success',
+                         'details': 'Meter added. : Meter ID=%s' % meter_id})
+                else:
+                    meter_msgs.append(
+                        {'result': 'failure',
+                         'details': '%s : Meter ID=%s' % (error, meter_id)})
+            rule_msgs = []
+            for j, (cookie, vid) in enumerate(rules):
+                error = QoS._to_barrier_error(errors, j)
+                rule_msgs.append(self._to_qos_result(cookie, vid, error))
+            msg[REST_POLICY_METERS] = meter_msgs
+            msg[REST_POLICY_RULES] = rule_msgs
+            timing['openflow'] = time.time() - of_start
+
+        timing['total'] = time.time() - start
+        msg[REST_POLICY_TIMING] = timing
+        return REST_COMMAND_RESULT, msg
+
     @rest_command
     def get_qos(self, rest, vlan_id, waiters):
         rules = {}
@@ -14,10 +14,12 @@
 # limitations under the License.
 
 
+import collections
 import logging
 import numbers
 import socket
 import struct
+import time
 
 import json
 
@@ -26,15 +28,18 @@ from ryu.app.wsgi import Response
 from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.controller import dpset
+from ryu.controller import flow_mirror
 from ryu.controller import ofp_event
 from ryu.controller.handler import set_ev_cls
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.exception import OFPUnknownVersion
 from ryu.exception import RyuException
 from ryu.lib import dpid as dpid_lib
+from ryu.lib import fanout
 from ryu.lib import hub
 from ryu.lib import mac as mac_lib
 from ryu.lib import addrconv
+from ryu.lib.radix import RadixTree
 from ryu.lib.packet import arp
 from ryu.lib.packet import ethernet
 from ryu.lib.packet import icmp
@@ -113,7 +118,8 @@ ICMP = icmp.icmp.__name__
 TCP = tcp.tcp.__name__
 UDP = udp.udp.__name__
 
-MAX_SUSPENDPACKETS = 50  # Threshold of the packet suspends thread count.
+MAX_SUSPENDPACKETS = 50  # Threshold of the suspended packet count.
+MAX_SUSPENDPACKETS_PER_DST = 8  # Suspended packets per destination.
 
 ARP_REPLY_TIMER = 2  # sec
 OFP_REPLY_TIMER = 1.0  # sec
@@ -213,6 +219,7 @@ class RestRouterAPI(app_manager.RyuApp):
                     ofproto_v1_3.OFP_VERSION]
 
     _CONTEXTS = {'dpset': dpset.DPSet,
+                 'flow_mirror': flow_mirror.FlowMirror,
                  'wsgi': WSGIApplication}
 
     def __init__(self, *args, **kwargs):
@@ -221,6 +228,7 @@ class RestRouterAPI(app_manager.RyuApp):
         # logger configure
         RouterController.set_logger(self.logger)
 
+        self.flow_mirror = kwargs['flow_mirror']
         wsgi = kwargs['wsgi']
         self.waiters = {}
         self.data = {'waiters': self.waiters}
@@ -262,7 +270,7 @@ class RestRouterAPI(app_manager.RyuApp):
     @set_ev_cls(dpset.EventDP, dpset.DPSET_EV_DISPATCHER)
     def datapath_handler(self, ev):
         if ev.enter:
-            RouterController.register_router(ev.dp)
+            RouterController.register_router(ev.dp, self.flow_mirror)
         else:
             RouterController.unregister_router(ev.dp)
 
@@ -347,10 +355,10 @@ class RouterController(ControllerBase):
         cls._LOGGER.addHandler(hdlr)
 
     @classmethod
-    def register_router(cls, dp):
+    def register_router(cls, dp, flow_mirror):
         dpid = {'sw_id': dpid_lib.dpid_to_str(dp.id)}
         try:
-            router = Router(dp, cls._LOGGER)
+            router = Router(dp, cls._LOGGER, flow_mirror)
         except OFPUnknownVersion as message:
             cls._LOGGER.error(str(message), extra=dpid)
             return
@@ -416,10 +424,22 @@ class RouterController(ControllerBase):
             param = req.json if req.body else {}
         except ValueError:
             raise SyntaxError('invalid syntax %s', req.body)
-        for router in routers.values():
-            function = getattr(router, func)
-            data = function(vlan_id, param, self.waiters)
-            rest_message.append(data)
+
+        # The routers are accessed concurrently.
+        results = fanout.fan_out(
+            lambda router: getattr(router, func)(vlan_id, param,
+                                                 self.waiters),
+            routers.values())
+        # Invalid parameters are rejected as a whole only if no router
+        # accepted them.
+        fanout.raise_if_all_failed(results)
+        for result in results:
+            if result.error is not None:
+                rest_message.append({REST_SWITCHID: result.item.dpid_str,
+                                     REST_RESULT: REST_NG,
+                                     REST_DETAILS: str(result.error)})
+            else:
+                rest_message.append(result.value)
 
         return rest_message
 
@@ -440,16 +460,17 @@ class RouterController(ControllerBase):
 
 
 class Router(dict):
-    def __init__(self, dp, logger):
+    def __init__(self, dp, logger, flow_mirror):
         super(Router, self).__init__()
         self.dp = dp
         self.dpid_str = dpid_lib.dpid_to_str(dp.id)
         self.sw_id = {'sw_id': self.dpid_str}
         self.logger = logger
+        self.flow_mirror = flow_mirror
 
         self.port_data = PortData(dp.ports)
 
-        ofctl = OfCtl.factory(dp, logger)
+        ofctl = OfCtl.factory(dp, logger, flow_mirror)
         cookie = COOKIE_DEFAULT_ID
 
         # Set SW config: TTL error packet in (for OFPv1.2/1.3)
@@ -468,7 +489,8 @@ class Router(dict):
                          cookie, extra=self.sw_id)
 
         # Set VlanRouter for vid=None.
-        vlan_router = VlanRouter(VLANID_NONE, dp, self.port_data, logger)
+        vlan_router = VlanRouter(VLANID_NONE, dp, self.port_data, logger,
+                                 flow_mirror)
         self[VLANID_NONE] = vlan_router
 
         # Start cyclic routing table check.
@@ -502,7 +524,7 @@ class Router(dict):
         vlan_id = int(vlan_id)
         if vlan_id not in self:
             vlan_router = VlanRouter(vlan_id, self.dp, self.port_data,
-                                     self.logger)
+                                     self.logger, self.flow_mirror)
             self[vlan_id] = vlan_router
         return self[vlan_id]
 
@@ -596,33 +618,37 @@ class Router(dict):
 
 
 class VlanRouter(object):
-    def __init__(self, vlan_id, dp, port_data, logger):
+    def __init__(self, vlan_id, dp, port_data, logger, flow_mirror):
         super(VlanRouter, self).__init__()
         self.vlan_id = vlan_id
         self.dp = dp
         self.sw_id = {'sw_id': dpid_lib.dpid_to_str(dp.id)}
         self.logger = logger
+        self.flow_mirror = flow_mirror
 
         self.port_data = port_data
         self.address_data = AddressData()
         self.routing_tbl = RoutingTable()
         self.packet_buffer = SuspendPacketList(self.send_icmp_unreach_error)
-        self.ofctl = OfCtl.factory(dp, logger)
+        self.ofctl = OfCtl.factory(dp, logger, flow_mirror)
 
         # Set flow: default route (drop)
         self._set_defaultroute_drop()
 
     def delete(self, waiters):
         # Delete flow.
-        msgs = self.ofctl.get_all_flow(waiters)
-        for msg in msgs:
-            for stats in msg.body:
-                vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
-                if vlan_id == self.vlan_id:
-                    self.ofctl.delete_flow(stats)
+        for stats in self._get_all_flow():
+            self.ofctl.delete_flow(stats)
 
         assert len(self.packet_buffer) == 0
 
+    def _get_all_flow(self):
+        # Flow entries of this VLAN in the flow mirror.
+        cookie = self._id_to_cookie(REST_VLANID, self.vlan_id)
+        cookie_mask = UINT32_MAX << COOKIE_SHIFT_VLANID
+        return self.flow_mirror.get_flows(self.dp, cookie=cookie,
+                                          cookie_mask=cookie_mask)
+
     @staticmethod
     def _cookie_to_id(id_type, cookie):
         if id_type == REST_VLANID:
@@ -820,23 +846,17 @@ class VlanRouter(object):
 
         # Get all flow.
         delete_list = []
-        msgs = self.ofctl.get_all_flow(waiters)
         max_id = UINT16_MAX
-        for msg in msgs:
-            for stats in msg.body:
-                vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
-                if vlan_id != self.vlan_id:
+        for stats in self._get_all_flow():
+            addr_id = VlanRouter._cookie_to_id(REST_ADDRESSID, stats.cookie)
+            if addr_id in skip_ids:
+                continue
+            elif address_id == REST_ALL:
+                if addr_id <= COOKIE_DEFAULT_ID or max_id < addr_id:
                     continue
-                addr_id = VlanRouter._cookie_to_id(REST_ADDRESSID,
-                                                   stats.cookie)
-                if addr_id in skip_ids:
-                    continue
-                elif address_id == REST_ALL:
-                    if addr_id <= COOKIE_DEFAULT_ID or max_id < addr_id:
-                        continue
-                elif address_id != addr_id:
-                    continue
-                delete_list.append(stats)
+            elif address_id != addr_id:
+                continue
+            delete_list.append(stats)
 
         delete_ids = []
         for flow_stats in delete_list:
@@ -847,7 +867,7 @@ class VlanRouter(object):
 
             del_address = self.address_data.get_data(addr_id=address_id)
             if del_address is not None:
-                # Clean up suspend packet threads.
+                # Clean up suspend packets.
                 self.packet_buffer.delete(del_addr=del_address)
 
                 # Delete data.
@@ -881,21 +901,15 @@ class VlanRouter(object):
                 raise ValueError(err_msg % (REST_ROUTEID, e.message))
 
         # Get all flow.
-        msgs = self.ofctl.get_all_flow(waiters)
-
         delete_list = []
-        for msg in msgs:
-            for stats in msg.body:
-                vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
-                if vlan_id != self.vlan_id:
-                    continue
-                rt_id = VlanRouter._cookie_to_id(REST_ROUTEID, stats.cookie)
-                if route_id == REST_ALL:
-                    if rt_id == COOKIE_DEFAULT_ID:
-                        continue
-                elif route_id != rt_id:
+        for stats in self._get_all_flow():
+            rt_id = VlanRouter._cookie_to_id(REST_ROUTEID, stats.cookie)
+            if route_id == REST_ALL:
+                if rt_id == COOKIE_DEFAULT_ID:
                     continue
-                delete_list.append(stats)
+            elif route_id != rt_id:
+                continue
+            delete_list.append(stats)
 
         # Delete flow.
         delete_ids = []
@@ -1030,12 +1044,8 @@ class VlanRouter(object):
                 log_msg = 'Receive ARP reply from [%s] to router port [%s].'
                 self.logger.info(log_msg, srcip, dstip, extra=self.sw_id)
 
-                packet_list = self.packet_buffer.get_data(src_ip)
+                packet_list = self.packet_buffer.pop(src_ip)
                 if packet_list:
-                    # stop ARP reply wait thread.
-                    for suspend_packet in packet_list:
-                        self.packet_buffer.delete(pkt=suspend_packet)
-
                     # send suspend packet.
                     output = self.ofctl.dp.ofproto.OFPP_TABLE
                     for suspend_packet in packet_list:
@@ -1169,12 +1179,12 @@ class VlanRouter(object):
         src_ip = header_list[ARP].src_ip
 
         gateway_flg = False
-        for key, value in self.routing_tbl.items():
+        for value in list(self.routing_tbl.values()):
             if value.gateway_ip == src_ip:
                 gateway_flg = True
                 if value.gateway_mac == src_mac:
                     continue
-                self.routing_tbl[key].gateway_mac = src_mac
+                self.routing_tbl.set_gateway_mac(value, src_mac)
 
                 cookie = self._id_to_cookie(REST_ROUTEID, value.route_id)
                 priority, log_msg = self._get_priority(PRIORITY_TYPE_ROUTE,
@@ -1257,25 +1267,31 @@ class AddressData(dict):
     def __init__(self):
         super(AddressData, self).__init__()
         self.address_id = 1
+        # Indexes of the addresses by network address and by address_id.
+        self._tree = RadixTree(32)
+        self._ids = {}
 
     def add(self, address):
         err_msg = 'Invalid [%s] value.' % REST_ADDRESS
         nw_addr, mask, default_gw = nw_addr_aton(address, err_msg=err_msg)
 
-        # Check overlaps
-        for other in self.values():
-            other_mask = mask_ntob(other.netmask)
-            add_mask = mask_ntob(mask, err_msg=err_msg)
-            if (other.nw_addr == ipv4_apply_mask(default_gw, other.netmask) or
-                    nw_addr == ipv4_apply_mask(other.default_gw, mask,
-                                               err_msg)):
-                msg = 'Address overlaps [address_id=%d]' % other.address_id
-                raise CommandFailure(msg=msg)
+        # Check overlaps: the other address covering the default gateway,
+        # or the addresses covered by the new one.
+        nw_addr_int = ipv4_text_to_int(nw_addr)
+        match = self._tree.longest_match(ipv4_text_to_int(default_gw))
+        others = [match[2]] if match else []
+        others.extend(value for _, _, value
+                      in self._tree.subtree(nw_addr_int, mask))
+        if others:
+            msg = 'Address overlaps [address_id=%d]' % others[0].address_id
+            raise CommandFailure(msg=msg)
 
         address = Address(self.address_id, nw_addr, mask, default_gw)
         ip_str = ip_addr_ntoa(nw_addr)
         key = '%s/%d' % (ip_str, mask)
         self[key] = address
+        self._tree.insert(nw_addr_int, mask, address)
+        self._ids[address.address_id] = key
 
         self.address_id += 1
         self.address_id &= UINT32_MAX
@@ -1285,24 +1301,23 @@ class AddressData(dict):
         return address
 
     def delete(self, address_id):
-        for key, value in self.items():
-            if value.address_id == address_id:
-                del self[key]
-                return
+        key = self._ids.pop(address_id, None)
+        if key is not None:
+            address = self.pop(key)
+            self._tree.delete(ipv4_text_to_int(address.nw_addr),
+                              address.netmask)
 
     def get_default_gw(self):
         return [address.default_gw for address in self.values()]
 
     def get_data(self, addr_id=None, ip=None):
-        for address in self.values():
-            if addr_id is not None:
-                if addr_id == address.address_id:
-                    return address
-            else:
-                assert ip is not None
-                if ipv4_apply_mask(ip, address.netmask) == address.nw_addr:
-                    return address
-        return None
+        if addr_id is not None:
+            key = self._ids.get(addr_id)
+            return None if key is None else self[key]
+        assert ip is not None
+        # The addresses never overlap, the longest match is the only one.
+        match = self._tree.longest_match(ipv4_text_to_int(ip))
+        return None if match is None else match[2]
 
 
 class Address(object):
@@ -1321,6 +1336,11 @@ class RoutingTable(dict):
     def __init__(self):
         super(RoutingTable, self).__init__()
         self.route_id = 1
+        # Indexes of the routes by destination, by route_id and by the MAC
+        # address of the gateway.
+        self._tree = RadixTree(32)
+        self._ids = {}
+        self._gw_macs = {}
 
     def add(self, dst_nw_addr, gateway_ip):
         err_msg = 'Invalid [%s] value.'
@@ -1350,6 +1370,8 @@ class RoutingTable(dict):
         ip_str = ip_addr_ntoa(dst_ip)
         key = '%s/%d' % (ip_str, netmask)
         self[key] = routing_data
+        self._tree.insert(ipv4_text_to_int(dst_ip), netmask, routing_data)
+        self._ids[routing_data.route_id] = key
 
         self.route_id += 1
         self.route_id &= UINT32_MAX
@@ -1359,34 +1381,37 @@ class RoutingTable(dict):
         return routing_data
 
     def delete(self, route_id):
-        for key, value in self.items():
-            if value.route_id == route_id:
-                del self[key]
-                return
+        key = self._ids.pop(route_id, None)
+        if key is not None:
+            route = self.pop(key)
+            self._tree.delete(ipv4_text_to_int(route.dst_ip), route.netmask)
+            self._unindex_gateway_mac(route)
+
+    def set_gateway_mac(self, route, gateway_mac):
+        self._unindex_gateway_mac(route)
+        route.gateway_mac = gateway_mac
+        if gateway_mac is not None:
+            self._gw_macs.setdefault(gateway_mac, []).append(route)
+
+    def _unindex_gateway_mac(self, route):
+        routes = self._gw_macs.get(route.gateway_mac)
+        if routes is not None:
+            routes.remove(route)
+            if not routes:
+                del self._gw_macs[route.gateway_mac]
 
     def get_gateways(self):
         return [routing_data.gateway_ip for routing_data in self.values()]
 
     def get_data(self, gw_mac=None, dst_ip=None):
         if gw_mac is not None:
-            for route in self.values():
-                if gw_mac == route.gateway_mac:
-                    return route
-            return None
+            routes = self._gw_macs.get(gw_mac)
+            return routes[0] if routes else None
 
         elif dst_ip is not None:
-            get_route = None
-            mask = 0
-            for route in self.values():
-                if ipv4_apply_mask(dst_ip, route.netmask) == route.dst_ip:
-                    # For longest match
-                    if mask < route.netmask:
-                        get_route = route
-                        mask = route.netmask
-
-            if get_route is None:
-                get_route = self.get(DEFAULT_ROUTE, None)
-            return get_route
+            # The default route is matched if no other route is.
+            match = self._tree.longest_match(ipv4_text_to_int(dst_ip))
+            return None if match is None else match[2]
         else:
             return None
 
@@ -1401,47 +1426,96 @@ class Route(object):
         self.gateway_mac = None
 
 
-class SuspendPacketList(list):
+class SuspendPacketList(object):
+    """Packets waiting for the ARP reply of their destination.
+
+    The packets are kept per destination IP address, at most
+    MAX_SUSPENDPACKETS_PER_DST of them, the oldest being dropped first.
+    A single timer thread, running while there are suspended packets,
+    passes the packets not released within ARP_REPLY_TIMER seconds to
+    timeout_function.
+    """
+
     def __init__(self, timeout_function):
         super(SuspendPacketList, self).__init__()
         self.timeout_function = timeout_function
+        self._pending = {}
+        # Suspended packets in the order of their deadline, including the
+        # deleted ones until they expire.
+        self._queue = collections.deque()
+        self._len = 0
+        self._timer = None
+
+    def __len__(self):
+        return self._len
 
     def add(self, in_port, header_list, data):
         suspend_pkt = SuspendPacket(in_port, header_list, data,
-                                    self.wait_arp_reply_timer)
-        self.append(suspend_pkt)
+                                    time.time() + ARP_REPLY_TIMER)
+        packets = self._pending.setdefault(suspend_pkt.dst_ip,
+                                           collections.deque())
+        if len(packets) >= MAX_SUSPENDPACKETS_PER_DST:
+            self.delete(pkt=packets[0])
+        packets.append(suspend_pkt)
+        self._queue.append(suspend_pkt)
+        self._len += 1
+        if self._timer is None:
+            self._timer = hub.spawn(self.wait_arp_reply_timer)
+        return suspend_pkt
 
     def delete(self, pkt=None, del_addr=None):
         if pkt is not None:
-            del_list = [pkt]
+            if pkt.deleted:
+                return
+            packets = self._pending[pkt.dst_ip]
+            packets.remove(pkt)
+            if not packets:
+                del self._pending[pkt.dst_ip]
+            pkt.deleted = True
+            self._len -= 1
         else:
             assert del_addr is not None
-            del_list = [pkt for pkt in self if pkt.dst_ip in del_addr]
+            for dst_ip in [ip for ip in self._pending if ip in del_addr]:
+                self.pop(dst_ip)
 
-        for pkt in del_list:
-            self.remove(pkt)
-            hub.kill(pkt.wait_thread)
-            pkt.wait_thread.wait()
+    def pop(self, dst_ip):
+        """Removes and returns the suspended packets of dst_ip."""
+        packets = list(self._pending.pop(dst_ip, []))
+        for pkt in packets:
+            pkt.deleted = True
+        self._len -= len(packets)
+        return packets
 
     def get_data(self, dst_ip):
-        return [pkt for pkt in self if pkt.dst_ip == dst_ip]
+        return list(self._pending.get(dst_ip, []))
 
-    def wait_arp_reply_timer(self, suspend_pkt):
-        hub.sleep(ARP_REPLY_TIMER)
-        if suspend_pkt in self:
-            self.timeout_function(suspend_pkt)
-            self.delete(pkt=suspend_pkt)
+    def wait_arp_reply_timer(self):
+        try:
+            while self._queue:
+                suspend_pkt = self._queue[0]
+                if suspend_pkt.deleted:
+                    self._queue.popleft()
+                    continue
+                timeout = suspend_pkt.deadline - time.time()
+                if timeout > 0:
+                    hub.sleep(timeout)
+                    continue
+                self._queue.popleft()
+                self.delete(pkt=suspend_pkt)
+                self.timeout_function(suspend_pkt)
+        finally:
+            self._timer = None
 
 
 class SuspendPacket(object):
-    def __init__(self, in_port, header_list, data, timer):
+    def __init__(self, in_port, header_list, data, deadline):
         super(SuspendPacket, self).__init__()
         self.in_port = in_port
         self.dst_ip = header_list[IPV4].dst
         self.header_list = header_list
         self.data = data
-        # Start ARP reply wait timer.
-        self.wait_thread = hub.spawn(timer, self)
+        self.deadline = deadline
+        self.deleted = False
 
 
 class OfCtl(object):
@@ -1455,20 +1529,22 @@ class OfCtl(object):
         return _register_of_version
 
     @staticmethod
-    def factory(dp, logger):
+    def factory(dp, logger, flow_mirror):
         of_version = dp.ofproto.OFP_VERSION
         if of_version in OfCtl._OF_VERSIONS:
-            ofctl = OfCtl._OF_VERSIONS[of_version](dp, logger)
+            ofctl = OfCtl._OF_VERSIONS[of_version](dp, logger, flow_mirror)
         else:
             raise OFPUnknownVersion(version=of_version)
 
         return ofctl
 
-    def __init__(self, dp, logger):
+    def __init__(self, dp, logger, flow_mirror):
         super(OfCtl, self).__init__()
         self.dp = dp
         self.sw_id = {'sw_id': dpid_lib.dpid_to_str(dp.id)}
         self.logger = logger
+        # Flow mods are sent via the flow mirror to keep it updated.
+        self.flow_mirror = flow_mirror
 
     def set_sw_config_for_ttl(self):
         # OpenFlow v1_2/1_3.
@@ -1625,8 +1701,8 @@ class OfCtl(object):
 @OfCtl.register_of_version(ofproto_v1_0.OFP_VERSION)
 class OfCtl_v1_0(OfCtl):
 
-    def __init__(self, dp, logger):
-        super(OfCtl_v1_0, self).__init__(dp, logger)
+    def __init__(self, dp, logger, flow_mirror):
+        super(OfCtl_v1_0, self).__init__(dp, logger, flow_mirror)
 
     def get_packetin_inport(self, msg):
         return msg.in_port
@@ -1674,10 +1750,14 @@ class OfCtl_v1_0(OfCtl):
                                     nw_src, nw_dst, 0, 0)
         actions = actions or []
 
+        # Notified of the expired flows to remove them from the mirror.
+        flags = ofp.OFPFF_SEND_FLOW_REM if idle_timeout else 0
+
         m = ofp_parser.OFPFlowMod(self.dp, match, cookie, cmd,
                                   idle_timeout=idle_timeout,
-                                  priority=priority, actions=actions)
-        self.dp.send_msg(m)
+                                  priority=priority, flags=flags,
+                                  actions=actions)
+        self.flow_mirror.send_flow_mod(m)
 
     def set_routing_flow(self, cookie, priority, outport, dl_vlan=0,
                          nw_src=0, src_mask=32, nw_dst=0, dst_mask=32,
@@ -1711,14 +1791,14 @@ class OfCtl_v1_0(OfCtl):
 
         flow_mod = self.dp.ofproto_parser.OFPFlowMod(
             self.dp, match, cookie, cmd, priority=priority, actions=actions)
-        self.dp.send_msg(flow_mod)
+        self.flow_mirror.send_flow_mod(flow_mod)
         self.logger.info('Delete flow [cookie=0x%x]', cookie, extra=self.sw_id)
 
 
 class OfCtl_after_v1_2(OfCtl):
 
-    def __init__(self, dp, logger):
-        super(OfCtl_after_v1_2, self).__init__(dp, logger)
+    def __init__(self, dp, logger, flow_mirror):
+        super(OfCtl_after_v1_2, self).__init__(dp, logger, flow_mirror)
 
     def set_sw_config_for_ttl(self):
         pass
@@ -1766,10 +1846,13 @@ class OfCtl_after_v1_2(OfCtl):
         inst = [ofp_parser.OFPInstructionActions(ofp.OFPIT_APPLY_ACTIONS,
                                                  actions)]
 
+        # Notified of the expired flows to remove them from the mirror.
+        flags = ofp.OFPFF_SEND_FLOW_REM if idle_timeout else 0
+
         m = ofp_parser.OFPFlowMod(self.dp, cookie, 0, 0, cmd, idle_timeout,
                                   0, priority, UINT32_MAX, ofp.OFPP_ANY,
-                                  ofp.OFPG_ANY, 0, match, inst)
-        self.dp.send_msg(m)
+                                  ofp.OFPG_ANY, flags, match, inst)
+        self.flow_mirror.send_flow_mod(m)
 
     def set_routing_flow(self, cookie, priority, outport, dl_vlan=0,
                          nw_src=0, src_mask=32, nw_dst=0, dst_mask=32,
@@ -1807,15 +1890,15 @@ class OfCtl_after_v1_2(OfCtl):
         flow_mod = ofp_parser.OFPFlowMod(self.dp, cookie, cookie_mask, 0, cmd,
                                          0, 0, 0, UINT32_MAX, ofp.OFPP_ANY,
                                          ofp.OFPG_ANY, 0, match, inst)
-        self.dp.send_msg(flow_mod)
+        self.flow_mirror.send_flow_mod(flow_mod)
         self.logger.info('Delete flow [cookie=0x%x]', cookie, extra=self.sw_id)
 
 
 @OfCtl.register_of_version(ofproto_v1_2.OFP_VERSION)
 class OfCtl_v1_2(OfCtl_after_v1_2):
 
-    def __init__(self, dp, logger):
-        super(OfCtl_v1_2, self).__init__(dp, logger)
+    def __init__(self, dp, logger, flow_mirror):
+        super(OfCtl_v1_2, self).__init__(dp, logger, flow_mirror)
 
     def set_sw_config_for_ttl(self):
         flags = self.dp.ofproto.OFPC_INVALID_TTL_TO_CONTROLLER
@@ -1839,8 +1922,8 @@ class OfCtl_v1_2(OfCtl_after_v1_2):
 @OfCtl.register_of_version(ofproto_v1_3.OFP_VERSION)
 class OfCtl_v1_3(OfCtl_after_v1_2):
 
-    def __init__(self, dp, logger):
-        super(OfCtl_v1_3, self).__init__(dp, logger)
+    def __init__(self, dp, logger, flow_mirror):
+        super(OfCtl_v1_3, self).__init__(dp, logger, flow_mirror)
 
     def set_sw_config_for_ttl(self):
         packet_in_mask = (1 << self.dp.ofproto.OFPR_ACTION |
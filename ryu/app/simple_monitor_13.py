@@ -19,6 +19,7 @@ from ryu.app import simple_switch_13
 from ryu.controller import ofp_event
 from ryu.controller.handler import MAIN_DISPATCHER, DEAD_DISPATCHER
 from ryu.controller.handler import set_ev_cls
+from ryu.lib import flow_stats
 from ryu.lib import hub
 
 
@@ -27,6 +28,8 @@ class SimpleMonitor13(simple_switch_13.SimpleSwitch13):
     def __init__(self, *args, **kwargs):
         super(SimpleMonitor13, self).__init__(*args, **kwargs)
         self.datapaths = {}
+        # The flow entries learned by SimpleSwitch13 are in table 0.
+        self.flow_monitor = flow_stats.FlowStatsMonitor(tables=[0])
         self.monitor_thread = hub.spawn(self._monitor)
 
     @set_ev_cls(ofp_event.EventOFPStateChange,
@@ -41,6 +44,7 @@ class SimpleMonitor13(simple_switch_13.SimpleSwitch13):
             if datapath.id in self.datapaths:
                 self.logger.debug('unregister datapath: %016x', datapath.id)
                 del self.datapaths[datapath.id]
+                self.flow_monitor.forget(datapath.id)
 
     def _monitor(self):
         while True:
@@ -53,30 +57,38 @@ class SimpleMonitor13(simple_switch_13.SimpleSwitch13):
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
 
-        req = parser.OFPFlowStatsRequest(datapath)
-        datapath.send_msg(req)
+        for req in self.flow_monitor.stats_requests(datapath):
+            datapath.send_msg(req)
 
         req = parser.OFPPortStatsRequest(datapath, 0, ofproto.OFPP_ANY)
         datapath.send_msg(req)
 
     @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
     def _flow_stats_reply_handler(self, ev):
-        body = ev.msg.body
+        delta = self.flow_monitor.reply(ev.msg)
+        if delta is None:
+            # Waiting for the rest of the replies
+            return
 
+        self.logger.info('datapath %016x: %d added, %d removed, '
+                         '%d changed flows', ev.msg.datapath.id,
+                         len(delta.added), len(delta.removed),
+                         len(delta.changed))
+        # The counters are the increase since the previous stats.
         self.logger.info('datapath         '
                          'in-port  eth-dst           '
                          'out-port packets  bytes')
         self.logger.info('---------------- '
                          '-------- ----------------- '
                          '-------- -------- --------')
-        for stat in sorted([flow for flow in body if flow.priority == 1],
-                           key=lambda flow: (flow.match['in_port'],
-                                             flow.match['eth_dst'])):
+        for stat, packet_count, byte_count in delta.top:
+            if stat.priority != 1:
+                continue
             self.logger.info('%016x %8x %17s %8x %8d %8d',
                              ev.msg.datapath.id,
                              stat.match['in_port'], stat.match['eth_dst'],
                              stat.instructions[0].actions[0].port,
-                             stat.packet_count, stat.byte_count)
+                             packet_count, byte_count)
 
     @set_ev_cls(ofp_event.EventOFPPortStatsReply, MAIN_DISPATCHER)
     def _port_stats_reply_handler(self, ev):
@@ -348,6 +348,21 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         # LOG.debug('send_msg %s', msg)
         return self.send(msg.buf)
 
+    def send_msgs(self, msgs):
+        """Serializes msgs into a single buffer and sends it.
+
+        Used to send a large number of messages at once, e.g. flow mods,
+        without queueing each of them separately.
+        """
+        buf = bytearray()
+        for msg in msgs:
+            assert isinstance(msg, self.ofproto_parser.MsgBase)
+            if msg.xid is None:
+                self.set_xid(msg)
+            msg.serialize()
+            buf += msg.buf
+        return self.send(bytes(buf))
+
     def _echo_request_loop(self):
         if not self.max_unreplied_echo_requests:
             return
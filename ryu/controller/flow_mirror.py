@@ -0,0 +1,464 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Controller-side mirror of the flow tables of the switches.
+
+The applications send their flow mods through FlowMirror, which keeps
+the flow entries installed by the controller indexed by cookie, by
+priority and by match, so that the entries can be looked up without
+dumping the flow table of the switch.
+
+The mirror is reconciled with the flow table of the switch when the
+switch connects, every RECONCILE_INTERVAL seconds, and as soon as
+possible after a flow mod whose effect cannot be computed locally,
+e.g. a non-strict delete with a non-empty match.  OFPFlowRemoved
+messages, sent for the entries with OFPFF_SEND_FLOW_REM flag, are
+applied as soon as received.  The entries expired by their timeouts
+without the flag stay in the mirror until the next reconciliation.
+
+Usage::
+
+    class MyApp(app_manager.RyuApp):
+        _CONTEXTS = {'flow_mirror': flow_mirror.FlowMirror}
+
+        def __init__(self, *args, **kwargs):
+            super(MyApp, self).__init__(*args, **kwargs)
+            self.flow_mirror = kwargs['flow_mirror']
+
+        def delete_rules(self, dp, cookie):
+            for entry in self.flow_mirror.get_flows(
+                    dp, cookie=cookie, cookie_mask=0xffffffffffffffff):
+                ...
+"""
+
+import logging
+import time
+
+from ryu.base import app_manager
+from ryu.controller import ofp_event
+from ryu.controller.handler import DEAD_DISPATCHER
+from ryu.controller.handler import MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_0
+
+
+LOG = logging.getLogger('ryu.controller.flow_mirror')
+
+RECONCILE_INTERVAL = 60  # sec
+REPLY_TIMEOUT = 5.0  # sec
+
+UINT64_MAX = 0xffffffffffffffff
+
+
+def match_key(match):
+    """Returns a hashable key of match, which does not depend on the
+    order of the match fields.
+
+    A match composed with the old API of OpenFlow 1.2 or later has no
+    fields until serialized, i.e. until its message is sent.
+    """
+    jsondict = match.to_jsondict()
+    body = list(jsondict.values())[0]
+    if 'oxm_fields' not in body:
+        # OpenFlow 1.0
+        return tuple(sorted(body.items()))
+    fields = [list(f.values())[0] for f in body['oxm_fields']]
+    return tuple(sorted((f['field'], str(f['value']), str(f['mask']))
+                        for f in fields))
+
+
+def _is_empty_match(match):
+    if hasattr(match, 'items'):
+        return not match.items() and not match._composed_with_old_api()
+    # OpenFlow 1.0
+    return (match.wildcards & ofproto_v1_0.OFPFW_ALL ==
+            ofproto_v1_0.OFPFW_ALL)
+
+
+class FlowEntry(object):
+    """
+    A flow entry of the mirror.
+
+    The attributes are named after OFPFlowStats; ``instructions`` is the
+    list of the actions in OpenFlow 1.0, which is also available as
+    ``actions``.
+    """
+
+    def __init__(self, table_id, priority, match, cookie, instructions,
+                 idle_timeout=0, hard_timeout=0, flags=0):
+        super(FlowEntry, self).__init__()
+        self.table_id = table_id
+        self.priority = priority
+        self.match = match
+        self.cookie = cookie
+        self.instructions = instructions
+        self.idle_timeout = idle_timeout
+        self.hard_timeout = hard_timeout
+        self.flags = flags
+        self.key = (table_id, priority, match_key(match))
+
+    @property
+    def actions(self):
+        return self.instructions
+
+    @classmethod
+    def from_flow_mod(cls, flow_mod):
+        if flow_mod.datapath.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            return cls(0, flow_mod.priority, flow_mod.match,
+                       flow_mod.cookie, flow_mod.actions,
+                       flow_mod.idle_timeout, flow_mod.hard_timeout,
+                       flow_mod.flags)
+        return cls(flow_mod.table_id, flow_mod.priority, flow_mod.match,
+                   flow_mod.cookie, flow_mod.instructions,
+                   flow_mod.idle_timeout, flow_mod.hard_timeout,
+                   flow_mod.flags)
+
+    @classmethod
+    def from_stats(cls, stats):
+        if hasattr(stats, 'instructions'):
+            return cls(stats.table_id, stats.priority, stats.match,
+                       stats.cookie, stats.instructions,
+                       stats.idle_timeout, stats.hard_timeout,
+                       getattr(stats, 'flags', 0))
+        # OpenFlow 1.0, of which flow mods do not specify the table.
+        return cls(0, stats.priority, stats.match, stats.cookie,
+                   stats.actions, stats.idle_timeout, stats.hard_timeout)
+
+
+class FlowTable(object):
+    """
+    The flow entries of a switch installed by the controller.
+
+    While the mirror is being reconciled, the entries changed locally
+    are kept aside, so that the flow mods sent after the flow stats
+    request are not undone by the reply.
+    """
+
+    def __init__(self, dp):
+        super(FlowTable, self).__init__()
+        self.dp = dp
+        self.entries = {}  # key => FlowEntry
+        # Indexes of the keys of the entries, dicts are used as ordered
+        # sets.
+        self._cookies = {}
+        self._priorities = {}
+        self.dirty = True
+        self.synced_at = 0
+        self._touched = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, entry):
+        self.entries[entry.key] = entry
+        self._cookies.setdefault(entry.cookie, {})[entry.key] = None
+        self._priorities.setdefault(entry.priority, {})[entry.key] = None
+
+    def _unindex(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        for index, value in ((self._cookies, entry.cookie),
+                             (self._priorities, entry.priority)):
+            keys = index[value]
+            del keys[key]
+            if not keys:
+                del index[value]
+        return entry
+
+    def add(self, entry):
+        self._unindex(entry.key)
+        self._index(entry)
+        if self._touched is not None:
+            self._touched[entry.key] = entry
+
+    def remove(self, key):
+        entry = self._unindex(key)
+        if self._touched is not None:
+            self._touched[key] = None
+        return entry
+
+    def get(self, table_id, priority, match):
+        return self.entries.get((table_id, priority, match_key(match)))
+
+    def get_flows(self, cookie=0, cookie_mask=0, priority=None,
+                  table_id=None):
+        """Returns the entries of which cookie matches cookie under
+        cookie_mask, as in OpenFlow, and of the given priority and
+        table_id if not None."""
+        if cookie_mask == UINT64_MAX:
+            keys = self._cookies.get(cookie, {})
+        elif cookie_mask:
+            keys = [key for c, cookie_keys in self._cookies.items()
+                    if c & cookie_mask == cookie & cookie_mask
+                    for key in cookie_keys]
+        elif priority is not None:
+            keys = self._priorities.get(priority, {})
+        else:
+            keys = self.entries
+
+        entries = [self.entries[key] for key in keys]
+        if priority is not None:
+            entries = [e for e in entries if e.priority == priority]
+        if table_id is not None:
+            entries = [e for e in entries if e.table_id == table_id]
+        return entries
+
+    def apply(self, flow_mod):
+        """Applies flow_mod sent to the switch."""
+        ofp = self.dp.ofproto
+        command = flow_mod.command
+        entry = FlowEntry.from_flow_mod(flow_mod)
+
+        if command == ofp.OFPFC_ADD:
+            self.add(entry)
+            return
+
+        strict = command in (ofp.OFPFC_MODIFY_STRICT,
+                             ofp.OFPFC_DELETE_STRICT)
+        if strict:
+            old = self.entries.get(entry.key)
+            targets = [old] if old is not None else []
+        elif _is_empty_match(flow_mod.match):
+            targets = self.get_flows(
+                flow_mod.cookie, getattr(flow_mod, 'cookie_mask', 0))
+        else:
+            # Which entries the match covers is left to the switch.
+            self.invalidate()
+            return
+
+        if ofp.OFP_VERSION != ofproto_v1_0.OFP_VERSION and \
+                entry.table_id != ofp.OFPTT_ALL:
+            targets = [e for e in targets if e.table_id == entry.table_id]
+        if strict and targets and \
+                ofp.OFP_VERSION != ofproto_v1_0.OFP_VERSION:
+            mask = flow_mod.cookie_mask
+            targets = [e for e in targets
+                       if e.cookie & mask == flow_mod.cookie & mask]
+
+        if command in (ofp.OFPFC_DELETE, ofp.OFPFC_DELETE_STRICT):
+            for target in targets:
+                self.remove(target.key)
+        elif targets:
+            for target in targets:
+                self.add(FlowEntry(target.table_id, target.priority,
+                                   target.match, target.cookie,
+                                   entry.instructions, target.idle_timeout,
+                                   target.hard_timeout, target.flags))
+        else:
+            # Added by the switch, or not, depending on the version.
+            self.invalidate()
+
+    def invalidate(self):
+        """Schedules reconciliation, discarding the one in progress."""
+        self.dirty = True
+        self._touched = None
+
+    def begin_sync(self):
+        self._touched = {}
+
+    def end_sync(self, entries):
+        """Replaces the entries with the entries of the switch, except
+        for the ones changed since begin_sync().  Returns False if
+        invalidated meanwhile."""
+        touched, self._touched = self._touched, None
+        if touched is None:
+            return False
+        self.entries = {}
+        self._cookies = {}
+        self._priorities = {}
+        for entry in entries:
+            self._index(entry)
+        for key, entry in touched.items():
+            self._unindex(key)
+            if entry is not None:
+                self._index(entry)
+        self.dirty = False
+        self.synced_at = time.time()
+        return True
+
+    def abort_sync(self):
+        self._touched = None
+
+
+class FlowMirror(app_manager.RyuApp):
+    """
+    FlowMirror application keeps the mirrors of the flow tables of the
+    switches connected to this controller.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FlowMirror, self).__init__(*args, **kwargs)
+        self.name = 'flow_mirror'
+        self.interval = RECONCILE_INTERVAL
+        self.tables = {}  # datapath_id => FlowTable
+        self.waiters = {}
+        self._sync_event = hub.Event()
+
+    def start(self):
+        super(FlowMirror, self).start()
+        self.threads.append(hub.spawn(self._reconcile_loop))
+
+    def stop(self):
+        self.is_active = False
+        self._sync_event.set()
+        super(FlowMirror, self).stop()
+
+    def get_table(self, dp):
+        table = self.tables.get(dp.id)
+        if table is None or table.dp is not dp:
+            table = FlowTable(dp)
+            self.tables[dp.id] = table
+            self._sync_event.set()
+        return table
+
+    def send_flow_mod(self, flow_mod):
+        """Sends flow_mod to its datapath and applies it to the mirror."""
+        dp = flow_mod.datapath
+        dp.send_msg(flow_mod)
+        self.record(flow_mod)
+
+    def record(self, flow_mod):
+        """Applies flow_mod, which has been sent, to the mirror."""
+        table = self.get_table(flow_mod.datapath)
+        table.apply(flow_mod)
+        if table.dirty:
+            self._sync_event.set()
+
+    def invalidate(self, dp):
+        """Schedules reconciliation of dp, e.g. when the result of flow
+        mods sent to dp is unknown."""
+        self.get_table(dp).invalidate()
+        self._sync_event.set()
+
+    def get_flows(self, dp, cookie=0, cookie_mask=0, priority=None,
+                  table_id=None):
+        """Returns the list of FlowEntry of dp.
+
+        See FlowTable.get_flows() for the arguments.
+        """
+        return self.get_table(dp).get_flows(cookie, cookie_mask, priority,
+                                            table_id)
+
+    def get_flow(self, dp, table_id, priority, match):
+        """Returns FlowEntry of the given priority and match, or None."""
+        return self.get_table(dp).get(table_id, priority, match)
+
+    def _flow_stats_request(self, dp):
+        ofp = dp.ofproto
+        parser = dp.ofproto_parser
+        if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            match = parser.OFPMatch(ofp.OFPFW_ALL, 0, 0, 0,
+                                    0, 0, 0, 0, 0, 0, 0, 0, 0)
+            return parser.OFPFlowStatsRequest(dp, 0, match, 0xff,
+                                              ofp.OFPP_NONE)
+        return parser.OFPFlowStatsRequest(dp, match=parser.OFPMatch())
+
+    def reconcile(self, dp):
+        """Replaces the mirror of dp with the flow table of the switch.
+        Returns False if the flow table could not be retrieved."""
+        table = self.get_table(dp)
+        stats = self._flow_stats_request(dp)
+        dp.set_xid(stats)
+        event = hub.Event()
+        msgs = []
+        waiters_per_dp = self.waiters.setdefault(dp.id, {})
+        waiters_per_dp[stats.xid] = (event, msgs)
+
+        table.begin_sync()
+        dp.send_msg(stats)
+        if not event.wait(timeout=REPLY_TIMEOUT):
+            waiters_per_dp.pop(stats.xid, None)
+            table.abort_sync()
+            LOG.warning('Failed to retrieve flow table of %016x', dp.id)
+            return False
+
+        entries = [FlowEntry.from_stats(s) for msg in msgs
+                   for s in msg.body]
+        if not table.end_sync(entries):
+            return False
+        LOG.debug('Reconciled %d flow entries of %016x',
+                  len(table), dp.id)
+        return True
+
+    def _reconcile_loop(self):
+        while self.is_active:
+            self._sync_event.wait(timeout=self.interval)
+            self._sync_event.clear()
+            now = time.time()
+            for table in list(self.tables.values()):
+                if not self.is_active:
+                    break
+                if table.dirty or now - table.synced_at >= self.interval:
+                    # Not to stop reconciling the other switches.
+                    try:
+                        self.reconcile(table.dp)
+                    except Exception:
+                        table.abort_sync()
+                        LOG.exception('Failed to reconcile flow table of '
+                                      '%016x', table.dp.id)
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [MAIN_DISPATCHER, DEAD_DISPATCHER])
+    def state_change_handler(self, ev):
+        dp = ev.datapath
+        if ev.state == MAIN_DISPATCHER:
+            self.get_table(dp)
+        elif dp.id is not None:
+            table = self.tables.get(dp.id)
+            if table is not None and table.dp is dp:
+                del self.tables[dp.id]
+            self.waiters.pop(dp.id, None)
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, MAIN_DISPATCHER)
+    def flow_removed_handler(self, ev):
+        msg = ev.msg
+        table = self.tables.get(msg.datapath.id)
+        if table is None:
+            return
+        table_id = getattr(msg, 'table_id', 0)
+        if msg.datapath.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            table_id = 0
+        table.remove((table_id, msg.priority, match_key(msg.match)))
+
+    def _stats_reply_handler(self, ev):
+        msg = ev.msg
+        dp = msg.datapath
+        waiters_per_dp = self.waiters.get(dp.id, {})
+        if msg.xid not in waiters_per_dp:
+            return
+        event, msgs = waiters_per_dp[msg.xid]
+        msgs.append(msg)
+
+        ofp = dp.ofproto
+        more = getattr(ofp, 'OFPMPF_REPLY_MORE', None)
+        if more is None:
+            more = ofp.OFPSF_REPLY_MORE
+        if msg.flags & more:
+            return
+        del waiters_per_dp[msg.xid]
+        event.set()
+
+    # for OpenFlow version1.0 and 1.3 or later
+    @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
+    def flow_stats_reply_handler(self, ev):
+        self._stats_reply_handler(ev)
+
+    # for OpenFlow version1.2
+    @set_ev_cls(ofp_event.EventOFPStatsReply, MAIN_DISPATCHER)
+    def stats_reply_handler(self, ev):
+        self._stats_reply_handler(ev)
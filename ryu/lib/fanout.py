@@ -0,0 +1,139 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent execution of an operation on many switches.
+
+fan_out() calls a function for each item, e.g. the per-switch object of
+a REST application, on hub threads, so that a request to all the
+switches takes about as long as the slowest switch rather than the sum
+of them.
+
+Usage::
+
+    results = fanout.fan_out(lambda ofs: ofs.get_rules(waiters),
+                             list(dps.values()))
+    fanout.raise_if_all_failed(results)
+    for result in results:
+        if result.error is not None:
+            ...
+        msgs.append(result.value)
+"""
+
+import collections
+import logging
+import time
+
+from ryu.exception import RyuException
+from ryu.lib import hub
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 32  # max number of the items processed at once
+DEFAULT_TIMEOUT = 30.0  # sec, per item
+
+# item: the item passed to the function
+# value: the return value of the function, None on error
+# error: the exception raised by the function, FanOutTimeout if timed out,
+#        or None
+FanOutResult = collections.namedtuple('FanOutResult',
+                                      ['item', 'value', 'error'])
+
+
+class FanOutTimeout(RyuException):
+    message = 'Timed out after %(timeout)s sec.'
+
+
+def fan_out(func, items, concurrency=None, timeout=None):
+    """
+    Calls func(item) for each item in items concurrently and returns
+    the list of FanOutResult in the order of items.
+
+    At most concurrency (DEFAULT_CONCURRENCY if None) calls run at once.
+    A call which does not return in timeout (DEFAULT_TIMEOUT if None)
+    seconds is reported with FanOutTimeout as the error.  It is not
+    killed, since killing it in the middle could leave the messages to
+    the switch and the state of the caller half updated, but abandoned:
+    it runs to completion in the background and its result is discarded.
+    The exceptions raised by func are returned as the errors, not raised.
+
+    A single item is processed in the calling thread without timeout.
+    """
+    concurrency = concurrency or DEFAULT_CONCURRENCY
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    items = list(items)
+    if len(items) == 1:
+        try:
+            return [FanOutResult(items[0], func(items[0]), None)]
+        except Exception as e:
+            return [FanOutResult(items[0], None, e)]
+
+    results = [None] * len(items)
+    done = hub.Queue()
+
+    def _call(i):
+        try:
+            done.put((i, func(items[i]), None))
+        except Exception as e:
+            done.put((i, None, e))
+
+    pending = collections.deque(range(len(items)))
+    # index of item => deadline
+    running = {}
+    while pending or running:
+        while pending and len(running) < concurrency:
+            i = pending.popleft()
+            hub.spawn(_call, i)
+            running[i] = time.time() + timeout
+
+        wait = min(running.values())
+        try:
+            i, value, error = done.get(
+                timeout=max(wait - time.time(), 0))
+        except hub.QueueEmpty:
+            now = time.time()
+            for i, deadline in list(running.items()):
+                if deadline <= now:
+                    # Abandoned.  The slot is released for the other
+                    # items although the thread is still running.
+                    del running[i]
+                    results[i] = FanOutResult(
+                        items[i], None, FanOutTimeout(timeout=timeout))
+            continue
+        if i not in running:
+            # Finished just after timed out
+            continue
+        del running[i]
+        results[i] = FanOutResult(items[i], value, error)
+
+    return results
+
+
+def raise_if_all_failed(results):
+    """
+    Raises the error of the first result of fan_out() if all the calls
+    raised errors other than FanOutTimeout, e.g. because of invalid
+    parameters.
+
+    Otherwise the operation may have been done on some of the items,
+    so the caller is expected to report the errors per item instead of
+    failing the whole request.
+    """
+    errors = [result.error for result in results]
+    if errors and all(error is not None and
+                      not isinstance(error, FanOutTimeout)
+                      for error in errors):
+        raise errors[0]
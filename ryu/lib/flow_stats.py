@@ -0,0 +1,224 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental flow stats collection.
+
+FlowStatsMonitor requests the flow stats of only the tables and the
+cookies of interest, instead of dumping all the flow entries of the
+switch, and compares each sample with the previous one.  The previous
+sample is kept per switch as an array of counters indexed by
+(table_id, priority, hash of match), and only the differences are
+reported: the added and the removed flow entries, the entries whose
+counters changed, and the top-K heavy hitters of the interval.
+
+OpenFlow 1.2 or later is supported.
+
+Usage::
+
+    monitor = flow_stats.FlowStatsMonitor(tables=[0], top_k=10)
+
+    # Sends the requests, e.g. every interval.
+    for req in monitor.stats_requests(datapath):
+        datapath.send_msg(req)
+
+    # In the handler of EventOFPFlowStatsReply
+    delta = monitor.reply(ev.msg)
+    if delta is not None:
+        # All the replies to the requests have been received.
+        for stats, packets, bytes_ in delta.top:
+            ...
+"""
+
+import array
+import collections
+import heapq
+import logging
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+
+# stats: OFPFlowStats, packet_count and byte_count: the increase of the
+# counters since the previous sample
+FlowCounters = collections.namedtuple(
+    'FlowCounters', ['stats', 'packet_count', 'byte_count'])
+
+
+def flow_key(stats):
+    """
+    Returns the key of the flow entry of OFPFlowStats in the samples.
+    """
+    return (stats.table_id, stats.priority, hash(tuple(stats.match.items())))
+
+
+class FlowStatsDelta(object):
+    """
+    Difference between two samples of the flow stats of a switch.
+
+    ========== ===========================================================
+    Attribute  Description
+    ========== ===========================================================
+    added      List of OFPFlowStats of the new flow entries
+    removed    List of the keys (table_id, priority, hash of match) of the
+               flow entries which have disappeared
+    changed    List of FlowCounters of the existing flow entries whose
+               counters increased
+    top        List of FlowCounters of the flow entries which forwarded
+               the most bytes in the interval, in descending order
+    ========== ===========================================================
+    """
+
+    def __init__(self, added, removed, changed, top):
+        super(FlowStatsDelta, self).__init__()
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.top = top
+
+
+class _Sample(object):
+    # The counters of the flow entry of index i are
+    # counts[2 * i] (packets) and counts[2 * i + 1] (bytes).
+    __slots__ = ('index', 'counts')
+
+    def __init__(self):
+        self.index = {}
+        self.counts = array.array('Q')
+
+
+class FlowStatsMonitor(object):
+    """
+    Collects the flow stats incrementally.
+
+    ========== ===========================================================
+    Argument   Description
+    ========== ===========================================================
+    tables     List of the table ids to request, or None for all tables
+    cookies    List of (cookie, cookie_mask) to request, or None for all
+               the flow entries
+    top_k      Number of the heavy hitters reported in FlowStatsDelta.top
+    ========== ===========================================================
+    """
+
+    def __init__(self, tables=None, cookies=None, top_k=DEFAULT_TOP_K):
+        super(FlowStatsMonitor, self).__init__()
+        self.tables = tables
+        self.cookies = cookies
+        self.top_k = top_k
+        # datapath id => _Sample
+        self._samples = {}
+        # datapath id => (xids of the requests waiting for the replies,
+        #                 received OFPFlowStats)
+        self._pending = {}
+
+    def stats_requests(self, dp):
+        """
+        Returns the list of OFPFlowStatsRequest to send to the switch
+        to take a sample.
+        """
+        ofp = dp.ofproto
+        parser = dp.ofproto_parser
+        tables = self.tables if self.tables is not None else [ofp.OFPTT_ALL]
+        cookies = self.cookies if self.cookies is not None else [(0, 0)]
+
+        reqs = []
+        for table_id in tables:
+            for cookie, cookie_mask in cookies:
+                req = parser.OFPFlowStatsRequest(
+                    dp, table_id=table_id, cookie=cookie,
+                    cookie_mask=cookie_mask, match=parser.OFPMatch())
+                dp.set_xid(req)
+                reqs.append(req)
+        # The replies to the previous requests, if any, are discarded.
+        self._pending[dp.id] = (set(req.xid for req in reqs), [])
+        return reqs
+
+    def reply(self, msg):
+        """
+        Processes OFPFlowStatsReply to the requests returned by
+        stats_requests().
+
+        Returns FlowStatsDelta when all the replies have been received,
+        otherwise None.
+        """
+        dp = msg.datapath
+        pending = self._pending.get(dp.id)
+        if pending is None or msg.xid not in pending[0]:
+            return None
+        xids, body = pending
+        body.extend(msg.body)
+        # OFPSF_REPLY_MORE in OpenFlow 1.2
+        reply_more = getattr(dp.ofproto, 'OFPMPF_REPLY_MORE',
+                             getattr(dp.ofproto, 'OFPSF_REPLY_MORE', 0))
+        if msg.flags & reply_more:
+            return None
+        xids.discard(msg.xid)
+        if xids:
+            return None
+        return self.update(dp.id, body)
+
+    def update(self, dp_id, body):
+        """
+        Replaces the sample of the switch with body, the list of
+        OFPFlowStats, and returns FlowStatsDelta from the previous one.
+        """
+        self._pending.pop(dp_id, None)
+        prev = self._samples.get(dp_id, _Sample())
+        sample = _Sample()
+        added = []
+        changed = []
+        counters = []
+        for stats in body:
+            key = flow_key(stats)
+            if key in sample.index:
+                # Replied to more than one request
+                continue
+            sample.index[key] = len(sample.index)
+            sample.counts.append(stats.packet_count)
+            sample.counts.append(stats.byte_count)
+
+            i = prev.index.get(key)
+            if i is None:
+                added.append(stats)
+                packet_count = stats.packet_count
+                byte_count = stats.byte_count
+            else:
+                packet_count = stats.packet_count - prev.counts[2 * i]
+                byte_count = stats.byte_count - prev.counts[2 * i + 1]
+                if packet_count < 0 or byte_count < 0:
+                    # The flow entry has been replaced in the interval.
+                    packet_count = stats.packet_count
+                    byte_count = stats.byte_count
+                if packet_count or byte_count:
+                    changed.append(
+                        FlowCounters(stats, packet_count, byte_count))
+            if packet_count or byte_count:
+                counters.append(FlowCounters(stats, packet_count, byte_count))
+
+        removed = [key for key in prev.index if key not in sample.index]
+        top = heapq.nlargest(
+            self.top_k, counters,
+            key=lambda c: (c.byte_count, c.packet_count))
+        self._samples[dp_id] = sample
+        return FlowStatsDelta(added, removed, changed, top)
+
+    def forget(self, dp_id):
+        """
+        Discards the sample of the switch, e.g. when it disconnects.
+        """
+        self._samples.pop(dp_id, None)
+        self._pending.pop(dp_id, None)
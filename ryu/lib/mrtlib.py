@@ -19,7 +19,9 @@ Information Export Format [RFC6396].
 """
 
 import abc
+import io
 import logging
+import mmap
 import struct
 import time
 
@@ -86,22 +88,20 @@ class MrtRecord(stringify.StringifyMixin, type_desc.TypeDisp):
         return [], buf
 
     @classmethod
-    def parse_pre(cls, buf):
-        buf = six.binary_type(buf)  # for convenience
+    def parse_pre(cls, buf, offset=0):
+        (_, type_, _, length) = struct.unpack_from(
+            cls._HEADER_FMT, buf, offset)
 
-        header_fields, _ = cls.parse_common_header(buf)
-        # timestamp = header_fields[0]
-        type_ = header_fields[1]
-        # subtype = header_fields[2]
-        length = header_fields[3]
+        return cls._required_len(type_, length)
+
+    @classmethod
+    def _required_len(cls, type_, length):
         if type_ in cls._EXT_TS_TYPES:
             header_cls = ExtendedTimestampMrtRecord
         else:
             header_cls = MrtCommonRecord
 
-        required_len = header_cls.HEADER_SIZE + length
-
-        return required_len
+        return header_cls.HEADER_SIZE + length
 
     @classmethod
     def parse(cls, buf):
@@ -735,7 +735,10 @@ class TableDump2RibGenericMrtMessage(TableDump2MrtMessage):
         (seq_num, afi, safi) = struct.unpack_from(cls._HEADER_FMT, buf)
         rest = buf[cls.HEADER_SIZE:]
 
-        nlri, rest = bgp.BGPNLRI.parser(rest)
+        # NLRI of the known AFI/SAFI, e.g. VPNv4, is parsed with its own
+        # class, otherwise as a plain IPv4 prefix.
+        nlri_cls = bgp._ADDR_CLASSES.get((afi, safi), bgp.BGPNLRI)
+        nlri, rest = nlri_cls.parser(rest)
 
         entry_count, rib_entries, _ = cls.parse_rib_entries(rest)
 
@@ -1116,6 +1119,94 @@ class Bgp4MpMessageAs4LocalMrtMessage(Bgp4MpMessageAs4MrtMessage):
 # class Ospf3MrtMessage(MrtMessage):
 
 
+def _read_record(f):
+    # Returns the type and the binary of the next record in f, or
+    # (None, None) at the end of the file.
+    header_buf = f.read(MrtRecord.HEADER_SIZE)
+    if len(header_buf) < MrtRecord.HEADER_SIZE:
+        return None, None
+
+    (_, type_, _, length) = struct.unpack_from(
+        MrtRecord._HEADER_FMT, header_buf)
+    required_len = MrtRecord._required_len(type_, length)
+    body_buf = f.read(required_len - MrtRecord.HEADER_SIZE)
+    if len(body_buf) < required_len - MrtRecord.HEADER_SIZE:
+        LOG.warning('Truncated MRT record at the end of the file')
+        return None, None
+
+    return type_, header_buf + body_buf
+
+
+def _mmap(f):
+    # Only the plain files can be mapped, the file objects of compressed
+    # files like bz2.BZ2File also have fileno() of the compressed data.
+    if not isinstance(f, (io.BufferedReader, io.FileIO)):
+        return None
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, EnvironmentError):
+        # e.g. empty files or pipes
+        return None
+
+
+def iter_records(f, types=None):
+    """
+    Generator which yields MRT records in the file object f one by one.
+
+    ========= ================================================
+    Argument  Description
+    ========= ================================================
+    f         File object which reading MRT format file
+              in binary mode.
+    types     Container of the MRT types to be parsed. If
+              specified, the records of the other types are
+              skipped without being parsed.
+    ========= ================================================
+
+    Plain files are mapped into memory with mmap and the records are
+    sliced out of the mapping, other file objects, e.g. bz2.BZ2File or
+    pipes, are read sequentially.  In both cases, only a record at a
+    time is kept in memory.
+
+    Example of Usage::
+
+        import bz2
+        from ryu.lib import mrtlib
+
+        for record in mrtlib.iter_records(
+                bz2.BZ2File('rib.YYYYMMDD.hhmm.bz2', 'rb'),
+                types=[mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2]):
+            print(record)
+    """
+    buf = _mmap(f)
+    if buf is None:
+        while True:
+            type_, record_buf = _read_record(f)
+            if record_buf is None:
+                return
+            if types is None or type_ in types:
+                record, _ = MrtRecord.parse(record_buf)
+                yield record
+
+    try:
+        offset = f.tell()
+        size = len(buf)
+        while offset + MrtRecord.HEADER_SIZE <= size:
+            (_, type_, _, length) = struct.unpack_from(
+                MrtRecord._HEADER_FMT, buf, offset)
+            end = offset + MrtRecord._required_len(type_, length)
+            if end > size:
+                LOG.warning('Truncated MRT record at the end of the file')
+                break
+            if types is None or type_ in types:
+                record, _ = MrtRecord.parse(buf[offset:end])
+                yield record
+            offset = end
+        f.seek(offset)
+    finally:
+        buf.close()
+
+
 class Reader(object):
     """
     MRT format file reader.
@@ -1137,6 +1228,9 @@ class Reader(object):
                 bz2.BZ2File('rib.YYYYMMDD.hhmm.bz2', 'rb')):
             print("%d, %s" % (count, record))
             count += 1
+
+    The records are read sequentially, so that f needs not to be
+    seekable.  See also iter_records().
     """
 
     def __init__(self, f):
@@ -1146,14 +1240,10 @@ class Reader(object):
         return self
 
     def next(self):
-        header_buf = self._f.read(MrtRecord.HEADER_SIZE)
-        if len(header_buf) < MrtRecord.HEADER_SIZE:
+        _, buf = _read_record(self._f)
+        if buf is None:
             raise StopIteration()
 
-        # Hack to avoid eating memory up
-        self._f.seek(-MrtRecord.HEADER_SIZE, 1)
-        required_len = MrtRecord.parse_pre(header_buf)
-        buf = self._f.read(required_len)
         record, _ = MrtRecord.parse(buf)
 
         return record
@@ -14,11 +14,15 @@
 # limitations under the License.
 
 import base64
+import collections
 import logging
+import time
+import weakref
 
 import netaddr
 import six
 
+from ryu.exception import RyuException
 from ryu.lib import dpid
 from ryu.lib import hub
 from ryu.ofproto import ofproto_v1_2
@@ -26,6 +30,8 @@ from ryu.ofproto import ofproto_v1_2
 
 LOG = logging.getLogger(__name__)
 DEFAULT_TIMEOUT = 1.0
+STATS_REQUEST_TIMEOUT = 30.0  # sec, the deadline of a stats request
+BARRIER_TIMEOUT_PER_MSG = 0.001  # added to DEFAULT_TIMEOUT per message
 
 # NOTE(jkoelker) Constants for converting actions
 OUTPUT = 'OUTPUT'
@@ -242,30 +248,350 @@ def send_msg(dp, msg, logger=None):
     dp.send_msg(msg)
 
 
-def send_stats_request(dp, stats, waiters, msgs, logger=None):
+class StatsRequestIncomplete(RyuException):
+    message = 'Stats request to datapath %(dpid)s did not complete.'
+
+
+class StatsLatency(object):
+    """
+    Latency metrics of the stats requests to a switch.
+
+    The latency is from sending a request until its last reply, or
+    until the request gives up.  The metrics are discarded when the
+    requests to the switch are cancelled, e.g. on disconnection.
+    """
+
+    def __init__(self):
+        super(StatsLatency, self).__init__()
+        self.requests = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, latency, completed):
+        self.requests += 1
+        if not completed:
+            self.timeouts += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        self.last = latency
+
+    def to_jsondict(self):
+        return {'requests': self.requests,
+                'timeouts': self.timeouts,
+                'avg': self.total / self.requests if self.requests else 0,
+                'max': self.max,
+                'last': self.last}
+
+
+# The states of the switches are keyed by the Datapath instances, so that
+# they are discarded together with the disconnected Datapath instances
+# whether or not the application cancels the requests.
+
+# Datapath => StatsLatency
+_stats_latency = weakref.WeakKeyDictionary()
+
+# The switches of which stats replies are completed by barrier, since
+# their replies to a request did not complete.
+# Discarded when a request completes without the barrier or when the
+# switch disconnects.
+_barrier_dps = weakref.WeakSet()
+
+
+class _StatsRequestEvent(hub.Event):
+    # Set on the last reply or the barrier reply, or on cancellation.
+
+    def __init__(self):
+        super(_StatsRequestEvent, self).__init__()
+        self.cancelled = False
+
+
+def get_stats_latency(dp_id=None):
+    """
+    Returns the latency metrics of the stats requests, as a dict of
+    datapath id and the metrics.
+    """
+    return dict((dp.id, latency.to_jsondict())
+                for dp, latency in list(_stats_latency.items())
+                if dp_id is None or dp.id == dp_id)
+
+
+def cancel_stats_requests(waiters, dp):
+    """
+    Cancels the requests to the switch waiting for the replies, e.g.
+    when the switch disconnects.  The requests return the replies
+    received so far as incomplete.
+
+    The latency metrics of the switch and whether its replies are
+    completed by barrier are also discarded, since the switch may
+    behave differently after reconnecting.
+    """
+    waiters_per_dp = waiters.get(dp.id, {})
+    locks = [lock for lock, _msgs in waiters_per_dp.values()
+             if lock is not None]
+    waiters_per_dp.clear()
+    for lock in locks:
+        if isinstance(lock, _StatsRequestEvent):
+            lock.cancelled = True
+        lock.set()
+    _barrier_dps.discard(dp)
+    _stats_latency.pop(dp, None)
+
+
+def _send_stats_request(dp, stats, waiters, msgs, barrier_msgs, logger):
+    # Returns the lock and the list of the xids waited for.
     dp.set_xid(stats)
     waiters_per_dp = waiters.setdefault(dp.id, {})
-    lock = hub.Event()
-    previous_msg_len = len(msgs)
+    lock = _StatsRequestEvent()
     waiters_per_dp[stats.xid] = (lock, msgs)
+    xids = [stats.xid]
     send_msg(dp, stats, logger)
 
-    lock.wait(timeout=DEFAULT_TIMEOUT)
-    current_msg_len = len(msgs)
+    if dp in _barrier_dps:
+        # The barrier reply sets the lock after all the replies to the
+        # request, including errors, have been sent by the switch.
+        barrier = dp.ofproto_parser.OFPBarrierRequest(dp)
+        dp.set_xid(barrier)
+        waiters_per_dp[barrier.xid] = (lock, barrier_msgs)
+        xids.append(barrier.xid)
+        send_msg(dp, barrier, logger)
+    return lock, xids
+
+
+def _finish_stats_request(dp, waiters, xids, start, lock, completed,
+                          barrier_replied):
+    # Returns True if all the replies have been received.
+    waiters_per_dp = waiters.get(dp.id, {})
+    for xid in xids:
+        waiters_per_dp.pop(xid, None)
+    if lock.cancelled:
+        return False
+
+    latency = _stats_latency.setdefault(dp, StatsLatency())
+    latency.record(time.time() - start, completed)
+    if not completed:
+        _barrier_dps.add(dp)
+    elif not barrier_replied:
+        # Completed by the last reply, without the barrier if any.
+        _barrier_dps.discard(dp)
+    return completed
+
+
+def send_stats_request(dp, stats, waiters, msgs, logger=None,
+                       timeout=STATS_REQUEST_TIMEOUT):
+    """
+    Sends the stats request and waits for the replies, which the reply
+    handler of the caller appends to msgs.
+
+    Returns as soon as the last reply arrives, or gives up when no reply
+    arrives in DEFAULT_TIMEOUT or when timeout seconds pass.
+
+    Returns True if all the replies have been received, or False if
+    timed out or cancelled, in which case msgs may be incomplete.
+    """
+    start = time.time()
+    deadline = start + timeout
+    barrier_msgs = []
+    lock, xids = _send_stats_request(dp, stats, waiters, msgs, barrier_msgs,
+                                     logger)
+    completed = False
+    try:
+        msg_len = len(msgs)
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            if lock.wait(timeout=min(DEFAULT_TIMEOUT, remaining)):
+                completed = True
+                break
+            if len(msgs) == msg_len:
+                # No reply in DEFAULT_TIMEOUT
+                break
+            msg_len = len(msgs)
+    finally:
+        completed = _finish_stats_request(dp, waiters, xids, start, lock,
+                                          completed, bool(barrier_msgs))
+    return completed
+
+
+def send_msgs_with_barrier(dp, msgs, waiters, logger=None):
+    """
+    Sends msgs in a single buffer followed by a barrier request, and
+    waits for the barrier reply.
+
+    Returns the list of the error messages replied to msgs, None for
+    the messages without error, in the order of msgs, or None if the
+    barrier reply did not arrive in time.
+
+    The xids of msgs are registered in waiters with None instead of
+    the lock; the error message handler of the caller is expected to
+    append the error messages to the list of such xids, and the barrier
+    reply handler to process the barrier reply in the same way as the
+    stats replies.
+    """
+    barrier = dp.ofproto_parser.OFPBarrierRequest(dp)
+    waiters_per_dp = waiters.setdefault(dp.id, {})
+    lock = hub.Event()
+    errors = {}
+    for msg in msgs:
+        dp.set_xid(msg)
+        waiters_per_dp[msg.xid] = (None, errors.setdefault(msg.xid, []))
+    dp.set_xid(barrier)
+    waiters_per_dp[barrier.xid] = (lock, [])
 
-    while current_msg_len > previous_msg_len:
-        previous_msg_len = current_msg_len
-        lock.wait(timeout=DEFAULT_TIMEOUT)
-        current_msg_len = len(msgs)
+    log = get_logger(logger)
+    log.debug('Sending %d messages with barrier xid(%x) to '
+              'datapath(' + dpid._DPID_FMT + ')',
+              len(msgs), barrier.xid, dp.id)
+    dp.send_msgs(list(msgs) + [barrier])
 
+    # The switch replies the errors before the barrier reply.
+    lock.wait(timeout=DEFAULT_TIMEOUT + len(msgs) * BARRIER_TIMEOUT_PER_MSG)
+    for msg in msgs:
+        waiters_per_dp.pop(msg.xid, None)
     if not lock.is_set():
-        del waiters_per_dp[stats.xid]
+        waiters_per_dp.pop(barrier.xid, None)
+        return None
+
+    return [(errors[msg.xid] or [None])[0] for msg in msgs]
+
+
+class _ReplyQueue(object):
+    # Used in place of the list of the replies in waiters.
+    # The reply handlers only call append().
+
+    def __init__(self):
+        self._queue = hub.Queue()
+
+    def append(self, msg):
+        self._queue.put(msg)
+
+    def get(self, timeout):
+        return self._queue.get(timeout=timeout)
+
+    def empty(self):
+        return self._queue.empty()
+
+
+def send_stats_request_iter(dp, stats, waiters, logger=None,
+                            timeout=STATS_REQUEST_TIMEOUT):
+    """
+    Generator version of send_stats_request().
+
+    Sends the stats request and yields each reply message as soon as it
+    arrives, so that the caller can process multipart replies one by one
+    without keeping all of them in memory.
+
+    Raises StatsRequestIncomplete after the replies received so far if
+    timed out or cancelled.
+    """
+    start = time.time()
+    deadline = start + timeout
+    msgs = _ReplyQueue()
+    # The barrier reply is also put into msgs to wake up the loop.
+    lock, xids = _send_stats_request(dp, stats, waiters, msgs, msgs,
+                                     logger)
+    completed = False
+    barrier_replied = False
+    try:
+        while True:
+            if lock.is_set() and msgs.empty():
+                completed = True
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                msg = msgs.get(timeout=min(DEFAULT_TIMEOUT, remaining))
+            except hub.QueueEmpty:
+                # No reply in DEFAULT_TIMEOUT
+                completed = lock.is_set()
+                break
+            if msg.cls_msg_type == dp.ofproto.OFPT_BARRIER_REPLY:
+                barrier_replied = True
+                continue
+            yield msg
+    finally:
+        completed = _finish_stats_request(dp, waiters, xids, start, lock,
+                                          completed, barrier_replied)
+    if not completed:
+        raise StatsRequestIncomplete(dpid=dpid.dpid_to_str(dp.id))
 
 
 def str_to_int(str_num):
     return int(str(str_num), 0)
 
 
+def to_cache_key(obj):
+    """
+    Returns a hashable key of obj composed of dicts, lists and hashable
+    values, e.g. a flow entry of the REST API, or None if obj contains
+    an unhashable value.
+    """
+    # Tagged with the types, e.g. not to mix up 1 and '1', 1.0 or True.
+    if isinstance(obj, dict):
+        items = []
+        for key, value in obj.items():
+            value = to_cache_key(value)
+            if value is None:
+                return None
+            items.append((key, value))
+        return (dict, tuple(sorted(items, key=lambda item: str(item[0]))))
+    if isinstance(obj, (list, tuple)):
+        items = []
+        for value in obj:
+            value = to_cache_key(value)
+            if value is None:
+                return None
+            items.append(value)
+        return (list, tuple(items))
+    try:
+        hash(obj)
+    except TypeError:
+        return None
+    return (type(obj), obj)
+
+
+class LRUCache(object):
+    """
+    A mapping of bounded size, which discards the least recently used
+    entry when full.
+    """
+
+    def __init__(self, maxsize):
+        super(LRUCache, self).__init__()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key, default=None):
+        try:
+            value = self._cache.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        # Moves to the most recently used end.
+        self._cache[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._cache.pop(key, None)
+        self._cache[key] = value
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 def get_role(dp, waiters, to_user):
     stats = dp.ofproto_parser.OFPRoleRequest(
         dp, dp.ofproto.OFPCR_ROLE_NOCHANGE, generation_id=0)
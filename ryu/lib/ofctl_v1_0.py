@@ -494,7 +494,7 @@ def get_port_desc(dp, waiters):
     return {str(dp.id): descs}
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     priority = str_to_int(
         flow.get('priority', dp.ofproto.OFP_DEFAULT_PRIORITY))
@@ -516,7 +516,14 @@ def mod_flow_entry(dp, flow, cmd):
         flags=flags,
         actions=actions)
 
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd, flow_mirror=None):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
+    if flow_mirror is not None:
+        flow_mirror.record(flow_mod)
 
 
 def delete_flow_entry(dp):
@@ -767,7 +767,7 @@ def get_role(dp, waiters, to_user=True):
     return ofctl_utils.get_role(dp, waiters, to_user)
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     cookie_mask = str_to_int(flow.get('cookie_mask', 0))
     table_id = UTIL.ofp_table_from_user(flow.get('table_id', 0))
@@ -789,7 +789,14 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, match, inst)
 
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd, flow_mirror=None):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
+    if flow_mirror is not None:
+        flow_mirror.record(flow_mod)
 
 
 def mod_group_entry(dp, group, cmd):
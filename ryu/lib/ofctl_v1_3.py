@@ -32,6 +32,13 @@ DEFAULT_TIMEOUT = 1.0
 UTIL = ofctl_utils.OFCtlUtil(ofproto_v1_3)
 str_to_int = ofctl_utils.str_to_int
 
+# The number of the match and actions of flow entries kept converted, so
+# that the repeated ones skip parsing of the fields and the actions.
+MATCH_CACHE_SIZE = 4096
+ACTIONS_CACHE_SIZE = 4096
+_match_cache = ofctl_utils.LRUCache(MATCH_CACHE_SIZE)
+_actions_cache = ofctl_utils.LRUCache(ACTIONS_CACHE_SIZE)
+
 
 def to_action(dp, dic):
     ofp = dp.ofproto
@@ -41,6 +48,24 @@ def to_action(dp, dic):
 
 
 def to_actions(dp, acts):
+    """
+    Converts acts to the list of the instructions.
+
+    The instructions are cached and shared between the calls with the
+    same acts; they must not be modified.
+    """
+    key = ofctl_utils.to_cache_key(acts)
+    if key is None:
+        return _to_actions(dp, acts)
+    key = (dp.ofproto_parser, key)
+    inst = _actions_cache.get(key)
+    if inst is None:
+        inst = _to_actions(dp, acts)
+        _actions_cache[key] = inst
+    return list(inst)
+
+
+def _to_actions(dp, acts):
     inst = []
     actions = []
     ofp = dp.ofproto
@@ -192,6 +217,31 @@ def actions_to_str(instructions):
 
 
 def to_match(dp, attrs):
+    if attrs.get('dl_type') == ether.ETH_TYPE_ARP or \
+            attrs.get('eth_type') == ether.ETH_TYPE_ARP:
+        if 'nw_src' in attrs and 'arp_spa' not in attrs:
+            attrs['arp_spa'] = attrs['nw_src']
+            del attrs['nw_src']
+        if 'nw_dst' in attrs and 'arp_tpa' not in attrs:
+            attrs['arp_tpa'] = attrs['nw_dst']
+            del attrs['nw_dst']
+
+    parser = dp.ofproto_parser
+    key = ofctl_utils.to_cache_key(attrs)
+    if key is None:
+        return parser.OFPMatch(**_to_match_fields(attrs))
+    key = (parser, key)
+    fields = _match_cache.get(key)
+    if fields is None:
+        fields = parser.OFPMatch(**_to_match_fields(attrs)).items()
+        _match_cache[key] = fields
+    # A new OFPMatch is made of the cached fields, which are already
+    # normalized, every time, since OFPMatch can be modified by the
+    # caller.
+    return parser.OFPMatch(_ordered_fields=list(fields))
+
+
+def _to_match_fields(attrs):
     convert = {'in_port': UTIL.ofp_port_from_user,
                'in_phy_port': str_to_int,
                'metadata': ofctl_utils.to_match_masked_int,
@@ -250,15 +300,6 @@ def to_match(dp, attrs):
             'nw_dst': 'ipv4_dst',
             'nw_proto': 'ip_proto'}
 
-    if attrs.get('dl_type') == ether.ETH_TYPE_ARP or \
-            attrs.get('eth_type') == ether.ETH_TYPE_ARP:
-        if 'nw_src' in attrs and 'arp_spa' not in attrs:
-            attrs['arp_spa'] = attrs['nw_src']
-            del attrs['nw_src']
-        if 'nw_dst' in attrs and 'arp_tpa' not in attrs:
-            attrs['arp_tpa'] = attrs['nw_dst']
-            del attrs['nw_dst']
-
     kwargs = {}
     for key, value in attrs.items():
         if key in keys:
@@ -281,7 +322,7 @@ def to_match(dp, attrs):
         else:
             LOG.error('Unknown match field: %s', key)
 
-    return dp.ofproto_parser.OFPMatch(**kwargs)
+    return kwargs
 
 
 def to_match_vid(value):
@@ -437,7 +478,7 @@ def get_queue_config(dp, waiters, port=None, to_user=True):
     return wrap_dpid_dict(dp, configs, to_user)
 
 
-def get_flow_stats(dp, waiters, flow=None, to_user=True):
+def _flow_stats_request(dp, flow):
     flow = flow if flow else {}
     table_id = UTIL.ofp_table_from_user(
         flow.get('table_id', dp.ofproto.OFPTT_ALL))
@@ -457,40 +498,123 @@ def get_flow_stats(dp, waiters, flow=None, to_user=True):
         dp, flags, table_id, out_port, out_group, cookie, cookie_mask,
         match)
 
+    return stats, priority
+
+
+def _flow_stats_entry_to_dict(stats, to_user):
+    s = {'priority': stats.priority,
+         'cookie': stats.cookie,
+         'idle_timeout': stats.idle_timeout,
+         'hard_timeout': stats.hard_timeout,
+         'byte_count': stats.byte_count,
+         'duration_sec': stats.duration_sec,
+         'duration_nsec': stats.duration_nsec,
+         'packet_count': stats.packet_count,
+         'length': stats.length,
+         'flags': stats.flags}
+
+    if to_user:
+        s['actions'] = actions_to_str(stats.instructions)
+        s['match'] = match_to_str(stats.match)
+        s['table_id'] = UTIL.ofp_table_to_user(stats.table_id)
+
+    else:
+        s['actions'] = stats.instructions
+        s['instructions'] = stats.instructions
+        s['match'] = stats.match
+        s['table_id'] = stats.table_id
+
+    return s
+
+
+def _flow_stats_to_dict(msg, priority, to_user):
+    flows = []
+    for stats in msg.body:
+        if 0 <= priority != stats.priority:
+            continue
+
+        flows.append(_flow_stats_entry_to_dict(stats, to_user))
+
+    return flows
+
+
+def get_flow_stats(dp, waiters, flow=None, to_user=True):
+    stats, priority = _flow_stats_request(dp, flow)
+
     msgs = []
     ofctl_utils.send_stats_request(dp, stats, waiters, msgs, LOG)
 
     flows = []
     for msg in msgs:
-        for stats in msg.body:
-            if 0 <= priority != stats.priority:
-                continue
+        flows.extend(_flow_stats_to_dict(msg, priority, to_user))
 
-            s = {'priority': stats.priority,
-                 'cookie': stats.cookie,
-                 'idle_timeout': stats.idle_timeout,
-                 'hard_timeout': stats.hard_timeout,
-                 'byte_count': stats.byte_count,
-                 'duration_sec': stats.duration_sec,
-                 'duration_nsec': stats.duration_nsec,
-                 'packet_count': stats.packet_count,
-                 'length': stats.length,
-                 'flags': stats.flags}
+    return wrap_dpid_dict(dp, flows, to_user)
 
-            if to_user:
-                s['actions'] = actions_to_str(stats.instructions)
-                s['match'] = match_to_str(stats.match)
-                s['table_id'] = UTIL.ofp_table_to_user(stats.table_id)
 
-            else:
-                s['actions'] = stats.instructions
-                s['instructions'] = stats.instructions
-                s['match'] = stats.match
-                s['table_id'] = stats.table_id
+def iter_flow_stats(dp, waiters, flow=None, to_user=True):
+    """
+    Streaming version of get_flow_stats().
+
+    Returns an iterator which yields the list of the flow entries in each
+    multipart reply as soon as the reply arrives, and raises
+    ofctl_utils.StatsRequestIncomplete at the end if any of the replies
+    did not arrive.
+    The request is validated before this function returns, the request
+    is sent when the iteration starts.
+    """
+    stats, priority = _flow_stats_request(dp, flow)
+
+    def _iter():
+        for msg in ofctl_utils.send_stats_request_iter(dp, stats, waiters,
+                                                       LOG):
+            yield _flow_stats_to_dict(msg, priority, to_user)
+
+    return _iter()
+
+
+def get_flow_stats_delta(dp, waiters, monitor, to_user=True):
+    """
+    Takes a sample of the flow stats with monitor, an instance of
+    ryu.lib.flow_stats.FlowStatsMonitor, and returns the difference from
+    the previous sample.
+
+    If any of the replies does not arrive, the previous sample is kept
+    and an empty difference with "incomplete" is returned, not to report
+    the missing flow entries as removed.
+    """
+    body = []
+    for stats in monitor.stats_requests(dp):
+        msgs = []
+        if not ofctl_utils.send_stats_request(dp, stats, waiters, msgs,
+                                              LOG):
+            value = {'added': [], 'removed': [], 'changed': [], 'top': [],
+                     'incomplete': True}
+            return wrap_dpid_dict(dp, value, to_user)
+        for msg in msgs:
+            body.extend(msg.body)
+    delta = monitor.update(dp.id, body)
+
+    def _counters_to_dict(counters):
+        s = _flow_stats_entry_to_dict(counters.stats, to_user)
+        s['packet_count_delta'] = counters.packet_count
+        s['byte_count_delta'] = counters.byte_count
+        return s
+
+    removed = []
+    for table_id, priority, match_hash in delta.removed:
+        if to_user:
+            table_id = UTIL.ofp_table_to_user(table_id)
+        removed.append({'table_id': table_id,
+                        'priority': priority,
+                        'match_hash': match_hash})
 
-            flows.append(s)
+    value = {'added': [_flow_stats_entry_to_dict(stats, to_user)
+                       for stats in delta.added],
+             'removed': removed,
+             'changed': [_counters_to_dict(c) for c in delta.changed],
+             'top': [_counters_to_dict(c) for c in delta.top]}
 
-    return wrap_dpid_dict(dp, flows, to_user)
+    return wrap_dpid_dict(dp, value, to_user)
 
 
 def get_aggregate_flow_stats(dp, waiters, flow=None, to_user=True):
@@ -1046,7 +1170,7 @@ def get_role(dp, waiters, to_user=True):
     return ofctl_utils.get_role(dp, waiters, to_user)
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     cookie_mask = str_to_int(flow.get('cookie_mask', 0))
     table_id = UTIL.ofp_table_from_user(flow.get('table_id', 0))
@@ -1068,10 +1192,17 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, match, inst)
 
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd, flow_mirror=None):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
+    if flow_mirror is not None:
+        flow_mirror.record(flow_mod)
 
 
-def mod_meter_entry(dp, meter, cmd):
+def to_meter_mod(dp, meter, cmd):
 
     flags_convert = {'KBPS': dp.ofproto.OFPMF_KBPS,
                      'PKTPS': dp.ofproto.OFPMF_PKTPS,
@@ -1115,6 +1246,11 @@ def mod_meter_entry(dp, meter, cmd):
     meter_mod = dp.ofproto_parser.OFPMeterMod(
         dp, cmd, flags, meter_id, bands)
 
+    return meter_mod
+
+
+def mod_meter_entry(dp, meter, cmd):
+    meter_mod = to_meter_mod(dp, meter, cmd)
     ofctl_utils.send_msg(dp, meter_mod, LOG)
 
 
@@ -821,7 +821,7 @@ def get_role(dp, waiters, to_user=True):
     return ofctl_utils.get_role(dp, waiters, to_user)
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = str_to_int(flow.get('cookie', 0))
     cookie_mask = str_to_int(flow.get('cookie_mask', 0))
     table_id = UTIL.ofp_table_from_user(flow.get('table_id', 0))
@@ -844,10 +844,17 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, importance, match, inst)
 
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd, flow_mirror=None):
+    flow_mod = to_flow_mod(dp, flow, cmd)
     ofctl_utils.send_msg(dp, flow_mod, LOG)
+    if flow_mirror is not None:
+        flow_mirror.record(flow_mod)
 
 
-def mod_meter_entry(dp, meter, cmd):
+def to_meter_mod(dp, meter, cmd):
     flags = 0
     if 'flags' in meter:
         meter_flags = meter['flags']
@@ -887,6 +894,11 @@ def mod_meter_entry(dp, meter, cmd):
     meter_mod = dp.ofproto_parser.OFPMeterMod(
         dp, cmd, flags, meter_id, bands)
 
+    return meter_mod
+
+
+def mod_meter_entry(dp, meter, cmd):
+    meter_mod = to_meter_mod(dp, meter, cmd)
     ofctl_utils.send_msg(dp, meter_mod, LOG)
 
 
@@ -92,10 +92,10 @@ class TunnelPort(object):
 class OVSBridge(object):
 
     def __init__(self, CONF, datapath_id, ovsdb_addr, timeout=None,
-                 exception=None):
+                 exception=None, persistent=False):
         super(OVSBridge, self).__init__()
         self.datapath_id = datapath_id
-        self.vsctl = ovs_vsctl.VSCtl(ovsdb_addr)
+        self.vsctl = ovs_vsctl.VSCtl(ovsdb_addr, persistent=persistent)
         self.timeout = timeout or CONF.ovsdb_timeout
         self.exception = exception
 
@@ -403,6 +403,34 @@ class OVSBridge(object):
             return command_qos.result + command_queue.result
         return None
 
+    def set_qos_ports(self, port_names, type='linux-htb', max_rate=None,
+                      queues=None):
+        """
+        Same as set_qos() but sets the QoS of all the ports in port_names
+        in a single transaction.
+
+        Returns the dict of port name and the result of set_qos().
+        """
+        queues = queues if queues else []
+        commands = {}
+        for port_name in port_names:
+            commands[port_name] = (
+                ovs_vsctl.VSCtlCommand('set-qos',
+                                       [port_name, type, max_rate]),
+                ovs_vsctl.VSCtlCommand('set-queue', [port_name, queues]))
+        if not commands:
+            return {}
+        self.run_command([command for pair in commands.values()
+                          for command in pair])
+
+        results = {}
+        for port_name, (command_qos, command_queue) in commands.items():
+            if command_qos.result and command_queue.result:
+                results[port_name] = command_qos.result + command_queue.result
+            else:
+                results[port_name] = None
+        return results
+
     def del_qos(self, port_name):
         command = ovs_vsctl.VSCtlCommand(
             'del-qos',
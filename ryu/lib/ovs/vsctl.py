@@ -940,7 +940,76 @@ class VSCtlCommand(StringifyMixin):
         return option in self.options
 
 
+class _IdlSession(object):
+    """
+    Long-lived IDL connection to the OVSDB server of a remote, whose
+    replica of the whole database is updated incrementally.
+    """
+
+    def __init__(self, remote):
+        super(_IdlSession, self).__init__()
+        self.remote = remote
+        # Serializes the commands on the replica
+        self.lock = hub.Semaphore()
+        self.schema_json = None
+        self.schema = None
+        self.idl = None
+        # seqno of the JSON-RPC session when the replica was fetched
+        self.seqno = None
+
+    def open(self):
+        schema_helper = idl.SchemaHelper(None, self.schema_json)
+        schema_helper.register_all()
+        self.idl = idl.Idl(self.remote, schema_helper)
+        return self.idl
+
+    def fetched(self):
+        self.seqno = self.idl._session.get_seqno()
+
+    def is_connected(self):
+        """
+        Returns True if the connection has not been dropped since the
+        replica was fetched.
+        """
+        self.idl.run()
+        return self.idl._session.get_seqno() == self.seqno
+
+    def close(self):
+        if self.idl is not None:
+            self.idl.close()
+        self.idl = None
+        self.seqno = None
+        # The schema may have been changed while disconnected.
+        self.schema_json = None
+        self.schema = None
+
+
+# remote => _IdlSession
+_sessions = {}
+
+
+def close_sessions():
+    """
+    Closes the persistent IDL sessions of all the remotes.
+    """
+    while _sessions:
+        _remote, session = _sessions.popitem()
+        with session.lock:
+            session.close()
+
+
 class VSCtl(object):
+    """
+    Runs ovs-vsctl like commands on the OVSDB server at remote.
+
+    By default, every run_command() connects to the server, fetches the
+    replica of the database it needs and closes the connection.
+    If persistent is True, the connection and the replica of the whole
+    database are kept and updated incrementally, and shared by all the
+    VSCtl instances of the same remote, so that successive commands run
+    without waiting for the replica.  The schema is fetched again only
+    when the connection has been dropped.
+    """
 
     def _reset(self):
         self.schema_helper = None
@@ -949,9 +1018,10 @@ class VSCtl(object):
         self.wait_for_reload = True
         self.dry_run = False
 
-    def __init__(self, remote):
+    def __init__(self, remote, persistent=False):
         super(VSCtl, self).__init__()
         self.remote = remote
+        self.persistent = persistent
 
         self.schema_json = None
         self.schema = None
@@ -1089,16 +1159,7 @@ class VSCtl(object):
 
         return True
 
-    def _do_main(self, commands):
-        """
-        :type commands: list of VSCtlCommand
-        """
-        self._reset()
-        self._init_schema_helper()
-        self._run_prerequisites(commands)
-
-        idl_ = idl.Idl(self.remote, self.schema_helper)
-        seqno = idl_.change_seqno
+    def _do_transaction(self, idl_, commands, seqno):
         while True:
             self._idl_wait(idl_, seqno)
 
@@ -1112,8 +1173,62 @@ class VSCtl(object):
             # TODO:XXX
             # ovsdb_symbol_table_destroy(symtab)
 
+    def _do_main_persistent(self, session, commands):
+        if session.idl is not None and not session.is_connected():
+            LOG.debug('reconnecting to %s', self.remote)
+            session.close()
+
+        self._reset()
+        self.schema_json = session.schema_json
+        self.schema = session.schema
+        self._init_schema_helper()
+        session.schema_json = self.schema_json
+        session.schema = self.schema
+        # Only to check the commands.  All the columns are replicated.
+        self._run_prerequisites(commands)
+
+        if session.idl is None:
+            idl_ = session.open()
+            self._do_transaction(idl_, commands, idl_.change_seqno)
+            session.fetched()
+        else:
+            # The replica has been updated by is_connected().
+            self._do_transaction(session.idl, commands, None)
+
+    def _do_main(self, commands):
+        """
+        :type commands: list of VSCtlCommand
+        """
+        if self.persistent:
+            session = _sessions.get(self.remote)
+            if session is None:
+                session = _sessions[self.remote] = _IdlSession(self.remote)
+            with session.lock:
+                try:
+                    self._do_main_persistent(session, commands)
+                except BaseException:
+                    # e.g. timed out in the middle of the transaction
+                    session.close()
+                    raise
+            return
+
+        self._reset()
+        self._init_schema_helper()
+        self._run_prerequisites(commands)
+
+        idl_ = idl.Idl(self.remote, self.schema_helper)
+        self._do_transaction(idl_, commands, idl_.change_seqno)
         idl_.close()
 
+    def close(self):
+        """
+        Closes the persistent IDL session of the remote, if any.
+        """
+        session = _sessions.pop(self.remote, None)
+        if session is not None:
+            with session.lock:
+                session.close()
+
     def _run_command(self, commands):
         """
         :type commands: list of VSCtlCommand
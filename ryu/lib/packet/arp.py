@@ -59,6 +59,8 @@ class arp(packet_base.PacketBase):
             'src_mac', 'src_ip', 'dst_mac', 'dst_ip'
         ]
     }
+    __slots__ = ('hwtype', 'proto', 'hlen', 'plen', 'opcode',
+                 'src_mac', 'src_ip', 'dst_mac', 'dst_ip')
 
     def __init__(self, hwtype=ARP_HW_TYPE_ETHERNET, proto=ether.ETH_TYPE_IP,
                  hlen=6, plen=4, opcode=ARP_REQUEST,
@@ -873,6 +873,8 @@ class _UnlabelledAddrPrefix(_AddrPrefix):
 
 
 class _IPAddrPrefix(_AddrPrefix):
+    _ADDR_WIDTH = 32
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -884,6 +886,8 @@ class _IPAddrPrefix(_AddrPrefix):
 
 
 class _IP6AddrPrefix(_AddrPrefix):
+    _ADDR_WIDTH = 128
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -930,7 +934,35 @@ class _VPNAddrPrefix(_AddrPrefix):
         return (rd,) + super(_VPNAddrPrefix, cls)._prefix_from_bin(binrest)
 
 
-class IPAddrPrefix(_UnlabelledAddrPrefix, _IPAddrPrefix):
+class _PrefixKeyMixin(object):
+    """Provides the compact key of IP and VPN prefixes.
+
+    The key is (address as int, prefix length), preceded by the serialized
+    route distinguisher for VPN prefixes.  It identifies the prefix as
+    formatted_nlri_str does, but it is built only once per prefix and is
+    cheaper to hash and compare, so that it is used as the key of the
+    tables of the BGP speaker.
+    """
+
+    @property
+    def key(self):
+        key = self.__dict__.get('_key')
+        if key is None:
+            key = self._key = self._make_key()
+        return key
+
+    def _make_key(self):
+        addr, length = self.prefix.split('/')
+        length = int(length)
+        host_len = self._ADDR_WIDTH - length
+        # Clears the host bits as serialize() does.
+        key = (ip.text_to_int(addr) >> host_len << host_len, length)
+        if isinstance(self, _VPNAddrPrefix):
+            key = (self.addr[-2].serialize(),) + key
+        return key
+
+
+class IPAddrPrefix(_PrefixKeyMixin, _UnlabelledAddrPrefix, _IPAddrPrefix):
     ROUTE_FAMILY = RF_IPv4_UC
     _TYPE = {
         'ascii': [
@@ -947,7 +979,7 @@ class IPAddrPrefix(_UnlabelledAddrPrefix, _IPAddrPrefix):
         return self.prefix
 
 
-class IP6AddrPrefix(_UnlabelledAddrPrefix, _IP6AddrPrefix):
+class IP6AddrPrefix(_PrefixKeyMixin, _UnlabelledAddrPrefix, _IP6AddrPrefix):
     ROUTE_FAMILY = RF_IPv6_UC
     _TYPE = {
         'ascii': [
@@ -972,8 +1004,8 @@ class LabelledIP6AddrPrefix(_LabelledAddrPrefix, _IP6AddrPrefix):
     ROUTE_FAMILY = RF_IPv6_MPLS
 
 
-class LabelledVPNIPAddrPrefix(_LabelledAddrPrefix, _VPNAddrPrefix,
-                              _IPAddrPrefix):
+class LabelledVPNIPAddrPrefix(_PrefixKeyMixin, _LabelledAddrPrefix,
+                              _VPNAddrPrefix, _IPAddrPrefix):
     ROUTE_FAMILY = RF_IPv4_VPN
 
     @property
@@ -995,8 +1027,8 @@ class LabelledVPNIPAddrPrefix(_LabelledAddrPrefix, _VPNAddrPrefix,
         return "%s:%s" % (self.route_dist, self.prefix)
 
 
-class LabelledVPNIP6AddrPrefix(_LabelledAddrPrefix, _VPNAddrPrefix,
-                               _IP6AddrPrefix):
+class LabelledVPNIP6AddrPrefix(_PrefixKeyMixin, _LabelledAddrPrefix,
+                               _VPNAddrPrefix, _IP6AddrPrefix):
     ROUTE_FAMILY = RF_IPv6_VPN
 
     @property
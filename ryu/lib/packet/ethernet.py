@@ -46,6 +46,7 @@ class ethernet(packet_base.PacketBase):
             'src', 'dst'
         ]
     }
+    __slots__ = ('dst', 'src', 'ethertype')
 
     def __init__(self, dst='ff:ff:ff:ff:ff:ff', src='00:00:00:00:00:00',
                  ethertype=ether.ETH_TYPE_IP):
@@ -21,6 +21,7 @@ from ryu.lib import stringify
 @six.add_metaclass(abc.ABCMeta)
 class PacketBase(stringify.StringifyMixin):
     """A base class for a protocol (ethernet, ipv4, ...) header."""
+    __slots__ = ()
     _TYPES = {}
 
     @classmethod
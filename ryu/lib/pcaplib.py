@@ -35,8 +35,17 @@ Reference source: http://wiki.wireshark.org/Development/LibpcapFileFormat
                 +---------------------+
                 |          ...        |
                 +---------------------+
+
+The nanosecond resolution variant of the libpcap format is supported
+as well. MmapReader also reads the PCAP Next Generation (pcapng) format
+and PcapngWriter writes it.
+Reference source: https://github.com/pcapng/pcapng
 """
 
+from __future__ import division
+
+import mmap
+import os
 import struct
 import sys
 import time
@@ -82,6 +91,9 @@ class PcapFileHdr(object):
     # the byte ordering.
     MAGIC_NUMBER_IDENTICAL = b'\xa1\xb2\xc3\xd4'  # Big Endian
     MAGIC_NUMBER_SWAPPED = b'\xd4\xc3\xb2\xa1'    # Little Endian
+    # Timestamps are in seconds and nanoseconds.
+    MAGIC_NUMBER_NSEC_IDENTICAL = b'\xa1\xb2\x3c\x4d'  # Big Endian
+    MAGIC_NUMBER_NSEC_SWAPPED = b'\x4d\x3c\xb2\xa1'    # Little Endian
 
     def __init__(self, magic=MAGIC_NUMBER_SWAPPED, version_major=2,
                  version_minor=4, thiszone=0, sigfigs=0, snaplen=0,
@@ -96,12 +108,14 @@ class PcapFileHdr(object):
 
     @classmethod
     def parser(cls, buf):
-        magic_buf = buf[:4]
-        if magic_buf == cls.MAGIC_NUMBER_IDENTICAL:
+        magic_buf = bytes(buf[:4])
+        if magic_buf in (cls.MAGIC_NUMBER_IDENTICAL,
+                         cls.MAGIC_NUMBER_NSEC_IDENTICAL):
             # Big Endian
             fmt = cls._FILE_HDR_FMT_BIG_ENDIAN
             byteorder = 'big'
-        elif magic_buf == cls.MAGIC_NUMBER_SWAPPED:
+        elif magic_buf in (cls.MAGIC_NUMBER_SWAPPED,
+                           cls.MAGIC_NUMBER_NSEC_SWAPPED):
             # Little Endian
             fmt = cls._FILE_HDR_FMT_LITTLE_ENDIAN
             byteorder = 'little'
@@ -110,15 +124,23 @@ class PcapFileHdr(object):
 
         return cls(*struct.unpack_from(fmt, buf)), byteorder
 
+    @property
+    def nanosecond(self):
+        return self.magic in (self.MAGIC_NUMBER_NSEC_IDENTICAL,
+                              self.MAGIC_NUMBER_NSEC_SWAPPED)
+
     def serialize(self):
+        nanosecond = self.nanosecond
         if sys.byteorder == 'big':
             # Big Endian
             fmt = self._FILE_HDR_FMT_BIG_ENDIAN
-            self.magic = self.MAGIC_NUMBER_IDENTICAL
+            self.magic = (self.MAGIC_NUMBER_NSEC_IDENTICAL if nanosecond
+                          else self.MAGIC_NUMBER_IDENTICAL)
         else:
             # Little Endian
             fmt = self._FILE_HDR_FMT_LITTLE_ENDIAN
-            self.magic = self.MAGIC_NUMBER_SWAPPED
+            self.magic = (self.MAGIC_NUMBER_NSEC_SWAPPED if nanosecond
+                          else self.MAGIC_NUMBER_SWAPPED)
 
         return struct.pack(fmt, self.magic, self.version_major,
                            self.version_minor, self.thiszone,
@@ -130,7 +152,9 @@ class PcapPktHdr(object):
     Record (Packet) Header
     typedef struct pcaprec_hdr_s {
             guint32 ts_sec;       /* timestamp seconds */
-            guint32 ts_usec;      /* timestamp microseconds */
+            guint32 ts_usec;      /* timestamp microseconds
+                                     (nanoseconds in the nanosecond
+                                     resolution format) */
             guint32 incl_len;     /* number of octets of packet
                                      saved in file */
             guint32 orig_len;     /* actual length of packet */
@@ -190,6 +214,12 @@ class PcapPktHdr(object):
                            self.incl_len, self.orig_len)
 
 
+def _pkt_hdr_fmt(byteorder):
+    if byteorder == 'big':
+        return PcapPktHdr._PKT_HDR_FMT_BIG_ENDIAN
+    return PcapPktHdr._PKT_HDR_FMT_LITTLE_ENDIAN
+
+
 class Reader(object):
     """
     PCAP file reader
@@ -224,25 +254,194 @@ class Reader(object):
         self._pcap_body = self._fp.read()
         self._fp.close()
         self._next_pos = 0
+        self._fmt = _pkt_hdr_fmt(self._file_byteorder)
+        self._ts_div = 1e9 if self.pcap_header.nanosecond else 1e6
 
     def __iter__(self):
         return self
 
     def next(self):
-        try:
-            pkt_hdr, pkt_data = PcapPktHdr.parser(
-                self._pcap_body[self._next_pos:], self._file_byteorder)
-            self._next_pos += pkt_hdr.incl_len + PcapPktHdr.PKT_HDR_SIZE
-
-        except IndexError:
+        # Parse the record header in place instead of PcapPktHdr.parser()
+        # not to copy the rest of the pcap data for every packet.
+        pos = self._next_pos
+        if pos + PcapPktHdr.PKT_HDR_SIZE > len(self._pcap_body):
             raise StopIteration()
 
-        return pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6), pkt_data
+        ts_sec, ts_frac, incl_len, _orig_len = struct.unpack_from(
+            self._fmt, self._pcap_body, pos)
+        pos += PcapPktHdr.PKT_HDR_SIZE
+        self._next_pos = pos + incl_len
+
+        return (ts_sec + (ts_frac / self._ts_div),
+                self._pcap_body[pos:pos + incl_len])
 
     # for Python 3 compatible
     __next__ = next
 
 
+# pcapng block types
+PCAPNG_BT_SHB = 0x0A0D0D0A  # Section Header Block
+PCAPNG_BT_IDB = 0x00000001  # Interface Description Block
+PCAPNG_BT_SPB = 0x00000003  # Simple Packet Block
+PCAPNG_BT_EPB = 0x00000006  # Enhanced Packet Block
+
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+# pcapng option codes
+PCAPNG_OPT_ENDOFOPT = 0
+PCAPNG_OPT_IF_TSRESOL = 9
+
+
+def _pcapng_tsresol(value):
+    # if_tsresol: the most significant bit tells the base (10 or 2)
+    # of the negative power of the timestamp resolution.
+    if value & 0x80:
+        return 2 ** (value & 0x7f)
+    return 10 ** value
+
+
+class MmapReader(object):
+    """
+    Memory-mapped PCAP and pcapng file reader
+
+    Unlike Reader, the file is not read into memory and the packet data
+    is returned as memoryview slices of the mapped file without copying.
+    The slices are valid until close() is called and all of them must
+    be released (or converted with bytes()) before it.
+
+    ================ ===================================
+    Argument         Description
+    ================ ===================================
+    file_obj         File object which reading PCAP or
+                     pcapng file in binary mode
+    ================ ===================================
+
+    Example of usage::
+
+        from ryu.lib import pcaplib
+
+        with pcaplib.MmapReader(open('test.pcap', 'rb')) as reader:
+            for records in reader.batches(1024):
+                for ts, buf in records:
+                    ...
+    """
+
+    def __init__(self, file_obj):
+        self._fp = file_obj
+        if os.fstat(file_obj.fileno()).st_size:
+            self._mm = mmap.mmap(file_obj.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+            self._buf = memoryview(self._mm)
+        else:
+            # An empty file cannot be mapped.
+            self._mm = None
+            self._buf = memoryview(b'')
+
+        # The block type of Section Header Block is a palindrome.
+        self.pcapng = bytes(self._buf[:4]) == b'\x0a\x0d\x0d\x0a'
+        self.pcap_header = None
+        if not self.pcapng:
+            self.pcap_header, self._file_byteorder = PcapFileHdr.parser(
+                self._buf[:PcapFileHdr.FILE_HDR_SIZE])
+
+    def __iter__(self):
+        if self.pcapng:
+            return self._iter_pcapng()
+        return self._iter_pcap()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def batches(self, count):
+        """
+        Yields lists of up to count (timestamp, packet_data) tuples.
+        """
+        batch = []
+        for record in self:
+            batch.append(record)
+            if len(batch) >= count:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        self._buf.release()
+        if self._mm is not None:
+            self._mm.close()
+        self._fp.close()
+
+    def _iter_pcap(self):
+        buf = self._buf
+        buf_len = len(buf)
+        fmt = _pkt_hdr_fmt(self._file_byteorder)
+        ts_div = 1e9 if self.pcap_header.nanosecond else 1e6
+        hdr_size = PcapPktHdr.PKT_HDR_SIZE
+        pos = PcapFileHdr.FILE_HDR_SIZE
+        while pos + hdr_size <= buf_len:
+            ts_sec, ts_frac, incl_len, _orig_len = struct.unpack_from(
+                fmt, buf, pos)
+            pos += hdr_size
+            yield ts_sec + (ts_frac / ts_div), buf[pos:pos + incl_len]
+            pos += incl_len
+
+    def _iter_pcapng(self):
+        buf = self._buf
+        buf_len = len(buf)
+        order = '<'
+        # list of (snaplen, timestamp units per second) per interface
+        interfaces = []
+        pos = 0
+        while pos + 12 <= buf_len:
+            block_type, = struct.unpack_from(order + 'I', buf, pos)
+            if block_type == PCAPNG_BT_SHB:
+                # The byte order of a section is given by its SHB.
+                bom, = struct.unpack_from('<I', buf, pos + 8)
+                order = '<' if bom == PCAPNG_BYTE_ORDER_MAGIC else '>'
+                interfaces = []
+            block_len, = struct.unpack_from(order + 'I', buf, pos + 4)
+            if block_len < 12 or pos + block_len > buf_len:
+                break
+            body = pos + 8
+
+            if block_type == PCAPNG_BT_IDB:
+                _linktype, _reserved, snaplen = struct.unpack_from(
+                    order + 'HHI', buf, body)
+                units = 10 ** 6
+                opt = body + 8
+                end = pos + block_len - 4
+                while opt + 4 <= end:
+                    code, length = struct.unpack_from(order + 'HH', buf, opt)
+                    if code == PCAPNG_OPT_ENDOFOPT:
+                        break
+                    if code == PCAPNG_OPT_IF_TSRESOL and length == 1:
+                        units = _pcapng_tsresol(
+                            struct.unpack_from('B', buf, opt + 4)[0])
+                    opt += 4 + ((length + 3) & ~3)
+                interfaces.append((snaplen, units))
+
+            elif block_type == PCAPNG_BT_EPB:
+                if_id, ts_high, ts_low, cap_len, _orig_len = \
+                    struct.unpack_from(order + 'IIIII', buf, body)
+                units = interfaces[if_id][1]
+                data = body + 20
+                yield (((ts_high << 32) | ts_low) / units,
+                       buf[data:data + cap_len])
+
+            elif block_type == PCAPNG_BT_SPB:
+                orig_len, = struct.unpack_from(order + 'I', buf, body)
+                snaplen = interfaces[0][0]
+                cap_len = min(orig_len, snaplen) if snaplen else orig_len
+                data = body + 4
+                # Simple Packet Block has no timestamp.
+                yield 0, buf[data:data + cap_len]
+
+            pos += block_len
+
+
 class Writer(object):
     """
     PCAP file writer
@@ -254,8 +453,15 @@ class Writer(object):
     snaplen    Max length of captured packets (in octets)
     network    Data link type. (e.g. 1 for Ethernet,
                see `tcpdump.org`_ for details)
+    nanosecond Write timestamps in nanosecond resolution
+    buf_size   If not 0, the data is buffered and written to the
+               file object when it exceeds buf_size octets, or
+               flush() or close() is called
     ========== ==================================================
 
+    If buf_size is set, flush() or close() must be called before the
+    file object is closed, otherwise the buffered records are lost.
+
     .. _tcpdump.org: http://www.tcpdump.org/linktypes.html
 
     Example of usage::
@@ -285,25 +491,69 @@ class Writer(object):
                 ...
     """
 
-    def __init__(self, file_obj, snaplen=65535, network=1):
+    def __init__(self, file_obj, snaplen=65535, network=1,
+                 nanosecond=False, buf_size=0):
         self._f = file_obj
         self.snaplen = snaplen
         self.network = network
+        self.nanosecond = nanosecond
+        self.buf_size = buf_size
+        self._buf = []
+        self._buf_len = 0
         self._write_pcap_file_hdr()
 
+    def _write(self, buf):
+        if not self.buf_size:
+            self._f.write(buf)
+            return
+
+        self._buf.append(buf)
+        self._buf_len += len(buf)
+
+    def _end_record(self):
+        # Flush only at the record boundary.
+        if self._buf_len >= self.buf_size > 0:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered data to the file object.
+        """
+        if self._buf:
+            self._f.write(b''.join(self._buf))
+            self._buf = []
+            self._buf_len = 0
+        if hasattr(self._f, 'flush'):
+            self._f.flush()
+
+    def close(self):
+        """
+        Writes the buffered data and closes the file object.
+        """
+        if self._f is None:
+            return
+        self.flush()
+        self._f.close()
+        self._f = None
+
     def _write_pcap_file_hdr(self):
-        pcap_file_hdr = PcapFileHdr(snaplen=self.snaplen,
+        magic = (PcapFileHdr.MAGIC_NUMBER_NSEC_SWAPPED if self.nanosecond
+                 else PcapFileHdr.MAGIC_NUMBER_SWAPPED)
+        pcap_file_hdr = PcapFileHdr(magic=magic, snaplen=self.snaplen,
                                     network=self.network)
-        self._f.write(pcap_file_hdr.serialize())
+        self._write(pcap_file_hdr.serialize())
 
     def _write_pkt_hdr(self, ts, buf_len):
         sec = int(ts)
-        usec = int(round(ts % 1, 6) * 1e6) if sec != 0 else 0
+        if self.nanosecond:
+            frac = int(round((ts - sec) * 1e9)) if sec != 0 else 0
+        else:
+            frac = int(round(ts % 1, 6) * 1e6) if sec != 0 else 0
 
-        pc_pkt_hdr = PcapPktHdr(ts_sec=sec, ts_usec=usec,
+        pc_pkt_hdr = PcapPktHdr(ts_sec=sec, ts_usec=frac,
                                 incl_len=buf_len, orig_len=buf_len)
 
-        self._f.write(pc_pkt_hdr.serialize())
+        self._write(pc_pkt_hdr.serialize())
 
     def write_pkt(self, buf, ts=None):
         ts = time.time() if ts is None else ts
@@ -316,7 +566,58 @@ class Writer(object):
 
         self._write_pkt_hdr(ts, buf_len)
 
-        self._f.write(buf)
+        self._write(buf)
+        self._end_record()
 
     def __del__(self):
-        self._f.close()
+        # The file object is owned by the caller and may have been closed
+        # already, e.g. by a with statement.  Writes the buffered data
+        # only if it is still open, and never closes it here.
+        if (self._f is not None and self._buf and
+                not getattr(self._f, 'closed', False)):
+            self.flush()
+
+
+class PcapngWriter(Writer):
+    """
+    pcapng file writer
+
+    Writes a section with one interface and an Enhanced Packet Block per
+    packet. The arguments are the same as Writer.
+    """
+
+    def _fmt(self):
+        return '>' if sys.byteorder == 'big' else '<'
+
+    def _write_pcap_file_hdr(self):
+        fmt = self._fmt()
+        # Section Header Block, the section length is not specified.
+        self._write(struct.pack(fmt + 'IIIHHqI', PCAPNG_BT_SHB, 28,
+                                PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1, 28))
+        # Interface Description Block with if_tsresol option
+        tsresol = 9 if self.nanosecond else 6
+        self._write(struct.pack(fmt + 'IIHHIHHB3xHHI', PCAPNG_BT_IDB, 32,
+                                self.network, 0, self.snaplen,
+                                PCAPNG_OPT_IF_TSRESOL, 1, tsresol,
+                                PCAPNG_OPT_ENDOFOPT, 0, 32))
+
+    def write_pkt(self, buf, ts=None):
+        ts = time.time() if ts is None else ts
+        units = 10 ** 9 if self.nanosecond else 10 ** 6
+        sec = int(ts)
+        ts = sec * units + int(round((ts - sec) * units))
+
+        orig_len = len(buf)
+        if orig_len > self.snaplen:
+            buf = buf[:self.snaplen]
+        cap_len = len(buf)
+        pad_len = -cap_len & 3
+        block_len = 32 + cap_len + pad_len
+
+        fmt = self._fmt()
+        self._write(struct.pack(fmt + 'IIIIIII', PCAPNG_BT_EPB, block_len,
+                                0, ts >> 32, ts & 0xffffffff,
+                                cap_len, orig_len))
+        self._write(buf)
+        self._write(b'\x00' * pad_len + struct.pack(fmt + 'I', block_len))
+        self._end_record()
@@ -0,0 +1,232 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Radix tree (path compressed binary trie) of IP prefixes.
+
+Prefixes are given as pairs of an integer address and a prefix length,
+e.g. (0x0a000000, 8) for 10.0.0.0/8, so that the tree can be used for
+any address family with a fixed width::
+
+    >>> from ryu.lib import ip
+    >>> tree = RadixTree(32)
+    >>> tree.insert(ip.ipv4_to_int('10.0.0.0'), 8, 'a')
+    >>> tree.insert(ip.ipv4_to_int('10.1.0.0'), 16, 'b')
+    >>> tree.longest_match(ip.ipv4_to_int('10.1.2.3'))
+    (167837696, 16, 'b')
+    >>> prefix = ip.ipv4_to_int('10.0.0.0')
+    >>> [value for _, _, value in tree.subtree(prefix, 8)]
+    ['a', 'b']
+
+Lookups cost O(width) regardless of the number of prefixes.
+"""
+
+_EMPTY = object()
+
+
+class _Node(object):
+    __slots__ = ('prefix', 'length', 'value', 'children')
+
+    def __init__(self, prefix, length, value=_EMPTY):
+        self.prefix = prefix
+        self.length = length
+        self.value = value
+        self.children = [None, None]
+
+
+class RadixTree(object):
+    """
+    Radix tree mapping prefixes of ``width`` bits to values.
+
+    Bits of an address beyond its prefix length are ignored.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self._root = None
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for prefix, length, _ in self.items():
+            yield prefix, length
+
+    def __contains__(self, key):
+        return self.get(*key, default=_EMPTY) is not _EMPTY
+
+    def _mask(self, length):
+        return ((1 << length) - 1) << (self.width - length)
+
+    def _bit(self, prefix, index):
+        return (prefix >> (self.width - 1 - index)) & 1
+
+    def _common_length(self, prefix1, length1, prefix2, length2):
+        length = min(length1, length2)
+        diff = prefix1 ^ prefix2
+        if diff:
+            length = min(length, self.width - diff.bit_length())
+        return length
+
+    def _check(self, prefix, length):
+        if not 0 <= length <= self.width:
+            raise ValueError('Invalid prefix length: %s' % length)
+        return prefix & self._mask(length)
+
+    def _find(self, prefix, length):
+        # Returns the node of the given prefix and its ancestors.
+        path = []
+        node = self._root
+        while node is not None and node.length <= length:
+            if self._common_length(prefix, length,
+                                   node.prefix, node.length) < node.length:
+                break
+            if node.length == length:
+                return node, path
+            path.append(node)
+            node = node.children[self._bit(prefix, node.length)]
+        return None, path
+
+    def insert(self, prefix, length, value):
+        """Adds the prefix or replaces its value."""
+        prefix = self._check(prefix, length)
+        parent = None
+        node = self._root
+        while node is not None:
+            common = self._common_length(prefix, length,
+                                         node.prefix, node.length)
+            if common == node.length == length:
+                if node.value is _EMPTY:
+                    self._len += 1
+                node.value = value
+                return
+            if common == node.length:
+                parent = node
+                node = node.children[self._bit(prefix, node.length)]
+                continue
+
+            new = _Node(prefix, length, value)
+            if common == length:
+                # The new prefix covers the node.
+                new.children[self._bit(node.prefix, length)] = node
+            else:
+                # The new prefix and the node branch off at a glue node.
+                glue = _Node(prefix & self._mask(common), common)
+                glue.children[self._bit(prefix, common)] = new
+                glue.children[self._bit(node.prefix, common)] = node
+                new = glue
+            self._replace(parent, node, new)
+            self._len += 1
+            return
+
+        self._replace(parent, None, _Node(prefix, length, value),
+                      self._bit(prefix, parent.length) if parent else 0)
+        self._len += 1
+
+    def _replace(self, parent, old, new, bit=None):
+        if parent is None:
+            self._root = new
+        elif bit is not None:
+            parent.children[bit] = new
+        else:
+            parent.children[parent.children.index(old)] = new
+
+    def get(self, prefix, length, default=None):
+        """Returns the value of the prefix, or default if not found."""
+        node, _ = self._find(self._check(prefix, length), length)
+        if node is None or node.value is _EMPTY:
+            return default
+        return node.value
+
+    def delete(self, prefix, length):
+        """Removes the prefix and returns its value.
+
+        Raises KeyError if the prefix is not found.
+        """
+        prefix = self._check(prefix, length)
+        node, path = self._find(prefix, length)
+        if node is None or node.value is _EMPTY:
+            raise KeyError((prefix, length))
+        value = node.value
+        node.value = _EMPTY
+        self._len -= 1
+
+        # Removes the nodes which no longer branch off.
+        while node is not None and node.value is _EMPTY:
+            parent = path.pop() if path else None
+            children = [c for c in node.children if c is not None]
+            if len(children) == 2:
+                break
+            self._replace(parent, node, children[0] if children else None)
+            if children:
+                break
+            node = parent
+        return value
+
+    def longest_match(self, prefix, length=None):
+        """Returns (prefix, length, value) of the longest prefix covering
+        the given prefix, which is a host address by default, or None if
+        no prefix covers it.
+        """
+        if length is None:
+            length = self.width
+        prefix = self._check(prefix, length)
+        match = None
+        node = self._root
+        while node is not None and node.length <= length:
+            if self._common_length(prefix, length,
+                                   node.prefix, node.length) < node.length:
+                break
+            if node.value is not _EMPTY:
+                match = node
+            if node.length == length:
+                break
+            node = node.children[self._bit(prefix, node.length)]
+        if match is None:
+            return None
+        return match.prefix, match.length, match.value
+
+    def subtree(self, prefix, length):
+        """Iterates (prefix, length, value) of the prefixes covered by the
+        given prefix, including itself, in the order of the addresses.
+        """
+        prefix = self._check(prefix, length)
+        node = self._root
+        while node is not None and node.length < length:
+            if self._common_length(prefix, length,
+                                   node.prefix, node.length) < node.length:
+                return
+            node = node.children[self._bit(prefix, node.length)]
+        if node is None or node.prefix & self._mask(length) != prefix:
+            return
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.value is not _EMPTY:
+                yield node.prefix, node.length, node.value
+            if node.children[1] is not None:
+                stack.append(node.children[1])
+            if node.children[0] is not None:
+                stack.append(node.children[0])
+
+    def items(self):
+        """Iterates (prefix, length, value) of all the prefixes."""
+        return self.subtree(0, 0)
+
+    def values(self):
+        for _, _, value in self.items():
+            yield value
@@ -17,7 +17,6 @@
 from __future__ import print_function
 
 import base64
-import inspect
 
 import six
 
@@ -38,7 +37,7 @@ import six
 # 'len', 'property', 'set', 'type'
 # A bit more generic way is adopted
 
-_RESERVED_KEYWORD = dir(six.moves.builtins)
+_RESERVED_KEYWORD = frozenset(dir(six.moves.builtins))
 
 _mapdict = lambda f, d: dict([(k, f(v)) for k, v in d.items()])
 _mapdict_key = lambda f, d: dict([(f(k), v) for k, v in d.items()])
@@ -114,6 +113,13 @@ _types = {
 
 class StringifyMixin(object):
 
+    # Subclasses which are instantiated in large numbers (e.g. packet
+    # headers or OpenFlow messages on the packet-in path) can declare
+    # __slots__ in order to drop the per-instance __dict__.
+    # Slot attributes are handled like instance attributes in the str
+    # and json representations.
+    __slots__ = ()
+
     _TYPE = {}
     """_TYPE class attribute is used to annotate types of attributes.
 
@@ -174,7 +180,7 @@ class StringifyMixin(object):
         assert isinstance(dict_, dict)
         if len(dict_) != 1:
             return False
-        k = list(dict_.keys())[0]
+        k = next(iter(dict_))
         if not isinstance(k, (bytes, six.text_type)):
             return False
         for p in cls._class_prefixes:
@@ -185,13 +191,25 @@ class StringifyMixin(object):
                 return True
         return False
 
+    @classmethod
+    def _get_types(cls):
+        # returns a dict which maps an attribute name to its TypeDescr.
+        # the dict is built once per class.  _TYPE can be changed at
+        # runtime (e.g. NXActionRegLoad2), then the dict is rebuilt.
+        key = tuple((t, tuple(attrs)) for t, attrs in cls._TYPE.items())
+        cached = cls.__dict__.get('_types_cache')
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        types = {}
+        for t, attrs in cls._TYPE.items():
+            for k in attrs:
+                types.setdefault(k, _types[t])
+        cls._types_cache = (key, types)
+        return types
+
     @classmethod
     def _get_type(cls, k):
-        if hasattr(cls, '_TYPE'):
-            for t, attrs in cls._TYPE.items():
-                if k in attrs:
-                    return _types[t]
-        return None
+        return cls._get_types().get(k)
 
     @classmethod
     def _get_encoder(cls, k, encode_string):
@@ -206,6 +224,12 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_default_encoder(cls, encode_string):
+        # the encoder for the last used encode_string is cached per class
+        # in order to avoid creating a closure for each attribute.
+        cached = cls.__dict__.get('_default_encoder_cache')
+        if cached is not None and cached[0] is encode_string:
+            return cached[1]
+
         def _encode(v):
             if isinstance(v, (bytes, six.text_type)):
                 if isinstance(v, six.text_type):
@@ -227,6 +251,7 @@ class StringifyMixin(object):
                 except Exception:
                     json_value = v
             return json_value
+        cls._default_encoder_cache = (encode_string, _encode)
         return _encode
 
     def to_jsondict(self, encode_string=base64.b64encode):
@@ -259,9 +284,11 @@ class StringifyMixin(object):
         =============  =====================================================
         """
         dict_ = {}
-        encode = lambda key, val: self._encode_value(key, val, encode_string)
+        types = self._get_types()
+        default_encoder = self._get_default_encoder(encode_string)
         for k, v in obj_attrs(self):
-            dict_[k] = encode(k, v)
+            t = types.get(k)
+            dict_[k] = t.encode(v) if t else default_encoder(v)
         return {self.__class__.__name__: dict_}
 
     @classmethod
@@ -294,6 +321,11 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_default_decoder(cls, decode_string):
+        # see _get_default_encoder
+        cached = cls.__dict__.get('_default_decoder_cache')
+        if cached is not None and cached[0] is decode_string:
+            return cached[1]
+
         def _decode(json_value, **additional_args):
             if isinstance(json_value, (bytes, six.text_type)):
                 v = decode_string(json_value)
@@ -314,6 +346,7 @@ class StringifyMixin(object):
             else:
                 v = json_value
             return v
+        cls._default_decoder_cache = (decode_string, _decode)
         return _decode
 
     @staticmethod
@@ -378,20 +411,50 @@ def obj_python_attrs(msg_):
         return
     base = getattr(msg_, '_base_attributes', [])
     opt = getattr(msg_, '_opt_attributes', [])
-    for k, v in inspect.getmembers(msg_):
+    cls = msg_.__class__
+    slots = _class_slots(cls)
+    # only instance attributes (incl. slots) and optional attributes
+    # can be yielded.  it's much cheaper than inspecting dir(msg_).
+    names = set(getattr(msg_, '__dict__', ()))
+    names.update(slots)
+    names.update(opt)
+    for k in sorted(names):
         if k in opt:
             pass
         elif k.startswith('_'):
             continue
-        elif callable(v):
-            continue
         elif k in base:
             continue
-        elif hasattr(msg_.__class__, k):
+        elif k not in slots and hasattr(cls, k):
+            continue
+        try:
+            v = getattr(msg_, k)
+        except AttributeError:
+            continue
+        if k not in opt and callable(v):
             continue
         yield (k, v)
 
 
+_slots_cache = {}
+
+
+def _class_slots(cls):
+    """returns the names of the slots declared by cls and its bases
+    """
+
+    slots = _slots_cache.get(cls)
+    if slots is None:
+        slots = set()
+        for c in cls.__mro__:
+            s = c.__dict__.get('__slots__', ())
+            if isinstance(s, six.string_types):
+                s = (s,)
+            slots.update(s)
+        slots = _slots_cache[cls] = frozenset(slots)
+    return slots
+
+
 def obj_attrs(msg_):
     """similar to obj_python_attrs() but deals with python reserved keywords
     """
@@ -465,7 +465,8 @@ def generate(ofp_name, ofpp_name):
                 value = self.value
             else:
                 value = (self.value, self.mask)
-                self._TYPE['ascii'].append('mask')
+                if 'mask' not in self._TYPE['ascii']:
+                    self._TYPE['ascii'].append('mask')
 
             n, value, mask = ofp.oxm_from_user(self.dst, value)
             len_ = ofp.oxm_serialize(n, value, mask, data, 0)
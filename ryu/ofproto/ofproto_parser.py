@@ -87,7 +87,11 @@ def create_list_of_base_attributes(f):
         # hasattr(cls, '_base_attributes') doesn't work because super class
         # may already have the attribute.
         if '_base_attributes' not in cls.__dict__:
-            cls._base_attributes = set(dir(self))
+            # dir() also lists the slots of a subclass which are not
+            # assigned yet.  skip them.
+            slots = stringify._class_slots(cls)
+            cls._base_attributes = set(k for k in dir(self)
+                                       if k not in slots or hasattr(self, k))
         return ret
     return wrapper
 
@@ -178,6 +182,7 @@ def ofp_instruction_from_jsondict(dp, jsonlist, encap=True):
 
 
 class StringifyMixin(stringify.StringifyMixin):
+    __slots__ = ()
     _class_prefixes = ["OFP", "ONF", "MT", "NX"]
 
     @classmethod
@@ -203,6 +208,7 @@ class MsgBase(StringifyMixin):
     buf       Raw data
     ========= ==============================
     """
+    __slots__ = ('datapath', 'version', 'msg_type', 'msg_len', 'xid', 'buf')
 
     @create_list_of_base_attributes
     def __init__(self, datapath):
@@ -820,6 +820,8 @@ class OFPMatch(StringifyMixin):
                 VLAN-tagged(vlan_id=5)   x
                 ====================== =====
     """
+    __slots__ = ('_wc', '_flow', 'fields', 'type', 'length', '_fields2',
+                 '_serialized')
 
     def __init__(self, type_=None, length=None, _ordered_fields=None,
                  **kwargs):
@@ -2260,6 +2262,9 @@ class OFPPacketIn(MsgBase):
                               msg.table_id, msg.cookie, msg.match,
                               utils.hex_array(msg.data))
     """
+    __slots__ = ('buffer_id', 'total_len', 'reason', 'table_id', 'cookie',
+                 'match', 'data')
+
     def __init__(self, datapath, buffer_id=None, total_len=None, reason=None,
                  table_id=None, cookie=None, match=None, data=None):
         super(OFPPacketIn, self).__init__(datapath)
@@ -2926,6 +2931,8 @@ class OFPInstructionMeter(OFPInstruction):
 
 
 class OFPActionHeader(StringifyMixin):
+    __slots__ = ('type', 'len')
+
     def __init__(self, type_, len_):
         self.type = type_
         self.len = len_
@@ -2936,6 +2943,7 @@ class OFPActionHeader(StringifyMixin):
 
 
 class OFPAction(OFPActionHeader):
+    __slots__ = ()
     _ACTION_TYPES = {}
 
     @staticmethod
@@ -2976,6 +2984,8 @@ class OFPActionOutput(OFPAction):
     max_len          Max length to send to controller
     ================ ======================================================
     """
+    __slots__ = ('port', 'max_len')
+
     def __init__(self, port, max_len=ofproto.OFPCML_MAX,
                  type_=None, len_=None):
         super(OFPActionOutput, self).__init__()
@@ -302,6 +302,29 @@ def bmp_stop(host, port):
     return core.stop_bmp(host, port)
 
 
+@register(name='bmp.stats')
+def bmp_stats(host, port):
+    core = CORE_MANAGER.get_core_service()
+    return core.get_bmp_stats(host, port)
+
+
+# =============================================================================
+# RIB snapshot related APIs
+# =============================================================================
+
+
+@register(name='rib.dump')
+def rib_dump(filename):
+    core = CORE_MANAGER.get_core_service()
+    return core.dump_rib(filename)
+
+
+@register(name='rib.load')
+def rib_load(filename, **kwargs):
+    core = CORE_MANAGER.get_core_service()
+    return core.load_rib(filename, **kwargs)
+
+
 # =============================================================================
 # BGP Flow Specification Routes related APIs
 # =============================================================================
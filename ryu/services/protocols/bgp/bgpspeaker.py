@@ -125,6 +125,8 @@ from ryu.services.protocols.bgp.rtconf.neighbors import LOCAL_ADDRESS
 from ryu.services.protocols.bgp.rtconf.neighbors import LOCAL_PORT
 from ryu.services.protocols.bgp.rtconf.vrfs import SUPPORTED_VRF_RF
 from ryu.services.protocols.bgp.info_base.base import Filter
+from ryu.services.protocols.bgp.mrt import (
+    DEFAULT_STALE_TIME as DEFAULT_RIB_LOAD_STALE_TIME)
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
 from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
@@ -1075,7 +1077,8 @@ class BGPSpeaker(object):
 
         return call('operator.show', **show)
 
-    def rib_get(self, family='all', format='json'):
+    def rib_get(self, family='all', format='json', prefix=None,
+                longer_prefixes=False):
         """ This method returns the BGP routing information in a json
         format. This will be improved soon.
 
@@ -1086,9 +1089,24 @@ class BGPSpeaker(object):
 
         - 'json' (default)
         - 'cli'
+
+        ``prefix`` specifies an address or a prefix (e.g. '10.0.0.0/24')
+        to look up in the RIB of the given family, which must be one of
+        'ipv4', 'ipv6', 'vpnv4' and 'vpnv6'. Only the route of the longest
+        prefix matching it is returned, for each route distinguisher in
+        case of VPN families.
+
+        ``longer_prefixes`` specifies whether to return the routes of
+        ``prefix`` and of all the more specific prefixes instead of the
+        longest match.
         """
+        params = ['rib', family]
+        if prefix is not None:
+            params.append(prefix)
+            if longer_prefixes:
+                params.append('longer-prefixes')
         show = {
-            'params': ['rib', family],
+            'params': params,
             'format': format
         }
 
@@ -1184,6 +1202,10 @@ class BGPSpeaker(object):
         .. Note::
 
             out-filter evaluates paths in the order of Filter in the pList.
+
+        The paths already sent to the neighbor are evaluated against the
+        new filters, and only the paths newly blocked or permitted are
+        withdrawn or advertised again.
         """
 
         self._set_filter('out', address, filters)
@@ -1233,7 +1255,14 @@ class BGPSpeaker(object):
     def bmp_server_add(self, address, port):
         """This method registers a new BMP (BGP monitoring Protocol)
         server. The BGP speaker starts to send BMP messages to the
-        server. Currently, only one BMP server can be registered.
+        server. Several BMP servers can be registered, each of which has
+        its own queue of the messages, so that a slow server delays
+        neither the BGP speaker nor the other servers.
+
+        While the queue of a server is full, the route changes to be
+        sent to the server are dropped. Queued changes of the same prefix
+        from the same peer are coalesced into the latest one. See
+        bmp_server_stats_get() for the counters of them.
 
         ``address`` specifies the IP address of a BMP server.
 
@@ -1264,6 +1293,88 @@ class BGPSpeaker(object):
 
         call(func_name, **param)
 
+    def bmp_server_stats_get(self, address, port):
+        """This method returns the counters of the registered BMP server.
+
+        ``address`` specifies the IP address of a BMP server.
+
+        ``port`` specifies the listen port number of a BMP server.
+
+        Returns a dict object containing the following items, or None if
+        the BMP server is not registered.
+
+        ================ =============================================
+        Key              Description
+        ================ =============================================
+        queued           Number of route changes queued
+        coalesced        Number of route changes replacing a queued
+                         change of the same prefix
+        dropped          Number of route changes dropped while the
+                         queue is full
+        dropped_by_peer  dict of the number of dropped route changes
+                         per peer address
+        sent             Number of messages sent
+        writes           Number of socket writes
+        queue_len        Number of messages currently queued
+        ================ =============================================
+        """
+
+        func_name = 'bmp.stats'
+        param = {
+            'host': address,
+            'port': port,
+        }
+
+        return call(func_name, **param)
+
+    def rib_dump(self, filename):
+        """This method dumps the RIB into the file in MRT TABLE_DUMP_V2
+        format [RFC6396], which is compressed if ``filename`` ends with
+        ".bz2" or ".gz".
+
+        The IPv4, IPv6, VPNv4 and VPNv6 global tables are dumped into the
+        default view, and the VRF tables into the views named after their
+        route distinguishers.  The BGP speaker keeps running while the RIB
+        is dumped.
+
+        ``filename`` specifies the file to dump. The file is replaced
+        when the dump completes.
+
+        Returns the number of the dumped RIB entries.
+        """
+
+        func_name = 'rib.dump'
+        param = {
+            'filename': filename,
+        }
+
+        return call(func_name, **param)
+
+    def rib_load(self, filename, stale_time=DEFAULT_RIB_LOAD_STALE_TIME):
+        """This method loads the RIB from the file dumped by rib_dump() or
+        the other MRT TABLE_DUMP_V2 dumps, in order to warm-start the BGP
+        speaker before the neighbors are established.
+
+        The paths in the default view are loaded into the global tables as
+        if they were received from the neighbors of the same address,
+        which must have been added beforehand. The paths of the other
+        neighbors and the local paths are skipped.
+
+        ``filename`` specifies the file to load.
+
+        ``stale_time`` specifies the seconds until the loaded paths which
+        are not advertised again by their neighbor are removed. 0 keeps
+        them until the neighbor goes down.
+        """
+
+        func_name = 'rib.load'
+        param = {
+            'filename': filename,
+            'stale_time': stale_time,
+        }
+
+        call(func_name, **param)
+
     def attribute_map_set(self, address, attribute_maps,
                           route_dist=None, route_family=RF_VPN_V4):
         """This method sets attribute mapping to a neighbor.
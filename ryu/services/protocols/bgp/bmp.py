@@ -20,6 +20,7 @@ from ryu.lib.packet import bgp
 import socket
 import logging
 from calendar import timegm
+from collections import OrderedDict
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.lib.packet.bgp import BGPUpdate
@@ -27,6 +28,20 @@ from ryu.lib.packet.bgp import BGPPathAttributeMpUnreachNLRI
 
 LOG = logging.getLogger('bgpspeaker.bmp')
 
+# Maximum number of Route Monitoring messages queued per BMP server.
+# Further route changes are dropped while the queue is full.
+BMP_QUEUE_SIZE = 10000
+
+# Maximum number of messages sent by a single socket write.
+BMP_BATCH_SIZE = 256
+
+# Counters of BMPClient
+BMP_QUEUED = 'queued'          # route changes queued
+BMP_COALESCED = 'coalesced'    # route changes replacing a queued one
+BMP_DROPPED = 'dropped'        # route changes dropped by the full queue
+BMP_SENT = 'sent'              # messages sent
+BMP_WRITES = 'writes'          # socket writes
+
 
 class BMPClient(Activity):
     """A BMP client.
@@ -37,7 +52,8 @@ class BMPClient(Activity):
 
     """
 
-    def __init__(self, core_service, host, port):
+    def __init__(self, core_service, host, port,
+                 queue_size=BMP_QUEUE_SIZE, batch_size=BMP_BATCH_SIZE):
         super(BMPClient, self).__init__(name='BMPClient(%s:%s)' % (host, port))
         self._core_service = core_service
         self._core_service.signal_bus.register_listener(
@@ -56,12 +72,35 @@ class BMPClient(Activity):
         self.server_address = (host, port)
         self._connect_retry_event = hub.Event()
         self._connect_retry_time = 5
+        # True while stop() is closing the session, not to reconnect
+        self._stopping = False
+
+        # Messages waiting to be sent by the sender thread, so that a slow
+        # BMP server never blocks the BGP core.  Route changes are keyed by
+        # the peer and the prefix, a newer change of the prefix replaces
+        # the queued one, and their Route Monitoring messages are built on
+        # sending.  The other messages separate the
+        # generations of the keys so that the messages are never reordered
+        # across them.
+        self._queue = OrderedDict()
+        self._queue_size = queue_size
+        self._queue_event = hub.Event()
+        self._generation = 0
+        self._batch_size = batch_size
+        self._sender = None
+        self.counters = dict.fromkeys(
+            [BMP_QUEUED, BMP_COALESCED, BMP_DROPPED, BMP_SENT, BMP_WRITES], 0)
+        # Dropped route changes per peer address
+        self.dropped_by_peer = {}
 
     def _run(self):
+        self._stopping = False
         self._connect_retry_event.set()
 
         while True:
             self._connect_retry_event.wait()
+            if self._stopping:
+                break
 
             try:
                 self._connect_retry_event.clear()
@@ -75,27 +114,76 @@ class BMPClient(Activity):
 
             self.pause(self._connect_retry_time)
 
-    def _send(self, msg):
+    def stop(self):
+        self._stopping = True
+        super(BMPClient, self).stop()
+        # Wakes up _run() to let it return.
+        self._connect_retry_event.set()
+
+    def _send(self, msgs):
+        """Sends msgs by a socket write."""
+        assert all(isinstance(msg, bmp.BMPMessage) for msg in msgs)
+        self._socket.sendall(b''.join(
+            bytes(msg.serialize()) for msg in msgs))
+        self.counters[BMP_SENT] += len(msgs)
+        self.counters[BMP_WRITES] += 1
+
+    def _enqueue(self, msg):
         if not self._socket:
             return
-        assert isinstance(msg, bmp.BMPMessage)
-        self._socket.send(msg.serialize())
+        self._generation += 1
+        self._queue[self._generation] = msg
+        self._queue_event.set()
+
+    def _enqueue_route(self, peer, route):
+        if not self._socket:
+            return
+        key = (self._generation, peer.ip_address,
+               route.path.nlri.formatted_nlri_str)
+        if key in self._queue:
+            self.counters[BMP_COALESCED] += 1
+        elif len(self._queue) >= self._queue_size:
+            self.counters[BMP_DROPPED] += 1
+            dropped = self.dropped_by_peer.get(peer.ip_address, 0)
+            if not dropped:
+                LOG.warning('BMP queue to %s is full, dropping route changes'
+                            ' of peer %s', self.server_address,
+                            peer.ip_address)
+            self.dropped_by_peer[peer.ip_address] = dropped + 1
+            return
+        self.counters[BMP_QUEUED] += 1
+        self._queue[key] = (peer, route)
+        self._queue_event.set()
+
+    def _dequeue(self):
+        msgs = []
+        while self._queue and len(msgs) < self._batch_size:
+            key, msg = self._queue.popitem(last=False)
+            if isinstance(key, tuple):
+                msg = self._construct_route_monitoring(*msg)
+            msgs.append(msg)
+        return msgs
+
+    def get_stats(self):
+        stats = dict(self.counters)
+        stats['queue_len'] = len(self._queue)
+        stats['dropped_by_peer'] = dict(self.dropped_by_peer)
+        return stats
 
     def on_adj_rib_in_changed(self, data):
         peer = data['peer']
-        path = data['received_route']
-        msg = self._construct_route_monitoring(peer, path)
-        self._send(msg)
+        route = data['received_route']
+        self._enqueue_route(peer, route)
 
     def on_adj_up(self, data):
         peer = data['peer']
         msg = self._construct_peer_up_notification(peer)
-        self._send(msg)
+        self._enqueue(msg)
 
     def on_adj_down(self, data):
         peer = data['peer']
         msg = self._construct_peer_down_notification(peer)
-        self._send(msg)
+        self._enqueue(msg)
 
     def _construct_peer_up_notification(self, peer):
         if peer.is_mpbgp_cap_valid(bgp.RF_IPv4_VPN) or \
@@ -199,36 +287,71 @@ class BMPClient(Activity):
 
         return msg
 
-    def _handle_bmp_session(self, socket):
-
-        self._socket = socket
+    def _send_initial_msgs(self):
         # send init message
         init_info = {'type': bmp.BMP_INIT_TYPE_STRING,
                      'value': u'This is Ryu BGP BMP message'}
-        init_msg = bmp.BMPInitiation([init_info])
-        self._send(init_msg)
+        msgs = [bmp.BMPInitiation([init_info])]
 
         # send peer-up message for each peers
         peer_manager = self._core_service.peer_manager
 
         for peer in (p for p in peer_manager.iterpeers if p.in_established()):
-            msg = self._construct_peer_up_notification(peer)
-            self._send(msg)
+            msgs.append(self._construct_peer_up_notification(peer))
+
+            for path in list(peer._adj_rib_in.values()):
+                msgs.append(self._construct_route_monitoring(peer, path))
+                if len(msgs) >= self._batch_size:
+                    self._send(msgs)
+                    msgs = []
+
+        if msgs:
+            self._send(msgs)
+
+    def _send_loop(self):
+        try:
+            # The changes during the initial messages are queued and sent
+            # after them.
+            self._send_initial_msgs()
+            while True:
+                self._queue_event.wait()
+                self._queue_event.clear()
+                while self._queue:
+                    self._send(self._dequeue())
+        except socket.error as e:
+            # The session thread detects the closed socket.
+            LOG.debug('Failed to send BMP messages to %s: %s',
+                      self.server_address, e)
 
-            for path in peer._adj_rib_in.values():
-                msg = self._construct_route_monitoring(peer, path)
-                self._send(msg)
+    def _handle_bmp_session(self, socket):
 
-        # TODO periodically send stats to bmpstation
+        self._queue.clear()
+        self._socket = socket
+        self._sender = self._spawn('bmp_sender', self._send_loop)
 
-        while True:
-            # bmpstation shouldn't send any packet to bmpclient.
-            # this recv() is only meant to detect socket closed
-            ret = self._socket.recv(1)
-            if len(ret) == 0:
-                LOG.debug('BMP socket is closed. retry connecting..')
-                self._socket = None
-                self._connect_retry_event.set()
-                break
+        # TODO periodically send stats to bmpstation
 
-            # silently ignore packets from the bmpstation
+        try:
+            while True:
+                # bmpstation shouldn't send any packet to bmpclient.
+                # this recv() is only meant to detect socket closed
+                try:
+                    ret = self._socket.recv(1)
+                except (EOFError, IOError) as e:
+                    if self._stopping:
+                        # The socket has been closed by stop().
+                        break
+                    # e.g. the connection has been reset by the bmpstation
+                    LOG.debug('BMP socket error: %s', e)
+                    ret = b''
+                if len(ret) == 0:
+                    LOG.debug('BMP socket is closed. retry connecting..')
+                    self._connect_retry_event.set()
+                    break
+
+                # silently ignore packets from the bmpstation
+        finally:
+            self._socket = None
+            hub.kill(self._sender)
+            self._sender = None
+            self._queue.clear()
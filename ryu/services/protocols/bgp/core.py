@@ -43,6 +43,7 @@ from ryu.services.protocols.bgp.utils.rtfilter import RouteTargetManager
 from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE_ACTIVE
 from ryu.services.protocols.bgp.utils import stats
 from ryu.services.protocols.bgp.bmp import BMPClient
+from ryu.services.protocols.bgp import mrt
 from ryu.lib import sockopt
 
 
@@ -487,3 +488,29 @@ class CoreService(Factory, Activity):
 
         bmpclient = self.bmpclients[(host, port)]
         bmpclient.stop()
+
+    def get_bmp_stats(self, host, port):
+        if (host, port) not in self.bmpclients:
+            LOG.warning("no bmpclient is running for %s:%s", host, port)
+            return None
+
+        return self.bmpclients[(host, port)].get_stats()
+
+    def dump_rib(self, filename):
+        return mrt.dump_rib(self, filename)
+
+    def load_rib(self, filename, stale_time=mrt.DEFAULT_STALE_TIME):
+        f = mrt.open_file(filename, 'rb')
+        try:
+            peers = mrt.load_rib(self, f)
+        finally:
+            f.close()
+
+        if stale_time:
+            # Removes the loaded paths which are not advertised again.
+            for peer in peers:
+                self._spawn_after('rib-load-stale-timer-%s' % peer.ip_address,
+                                  stale_time,
+                                  self._table_manager.clean_stale_routes,
+                                  peer)
+        return True
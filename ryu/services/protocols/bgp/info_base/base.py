@@ -24,14 +24,17 @@ from abc import abstractmethod
 from copy import copy
 import logging
 import functools
+import weakref
 import netaddr
 import six
 
+from ryu.lib import ip
 from ryu.lib.packet.bgp import RF_IPv4_UC
 from ryu.lib.packet.bgp import RouteTargetMembershipNLRI
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_EXTENDED_COMMUNITIES
 from ryu.lib.packet.bgp import BGPPathAttributeLocalPref
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_AS_PATH
+from ryu.lib.radix import RadixTree
 
 from ryu.services.protocols.bgp.base import OrderedDict
 from ryu.services.protocols.bgp.constants import VPN_TABLE
@@ -54,8 +57,15 @@ class Table(object):
     """
     ROUTE_FAMILY = RF_IPv4_UC
 
+    # Address width in bits of the prefixes of this table, which are also
+    # indexed in radix trees for longest prefix match and more specific
+    # lookups.  None if the destinations are not indexed.
+    PREFIX_INDEX_WIDTH = None
+
     def __init__(self, scope_id, core_service, signal_bus):
         self._destinations = dict()
+        # Radix trees of the destinations per route distinguisher.
+        self._prefix_index = {}
         # Scope in which this table exists.
         # If this table represents the VRF, then this could be a VPN ID.
         # For global/VPN tables this should be None
@@ -165,11 +175,93 @@ class Table(object):
         self._validate_nlri(nlri)
         dest = self._get_dest(nlri)
         if dest:
-            self._destinations.pop(dest)
+            self.delete_dest(dest)
         return dest
 
     def delete_dest(self, dest):
         del self._destinations[self._table_key(dest.nlri)]
+        self._unindex_dest(dest)
+
+    def _prefix_index_scope(self, nlri):
+        """Returns the scope, i.e. route distinguisher, of the radix tree
+        indexing *nlri*.
+        """
+        return None
+
+    def _parse_prefix(self, prefix):
+        addr, _, length = prefix.partition('/')
+        if (':' in addr) != (self.PREFIX_INDEX_WIDTH == 128):
+            raise ValueError('Invalid prefix for %s: %s' %
+                             (self.route_family, prefix))
+        try:
+            return (ip.text_to_int(addr),
+                    int(length) if length else self.PREFIX_INDEX_WIDTH)
+        except Exception:
+            raise ValueError('Invalid prefix: %s' % prefix)
+
+    def _index_dest(self, dest):
+        if self.PREFIX_INDEX_WIDTH is None:
+            return
+        scope = self._prefix_index_scope(dest.nlri)
+        tree = self._prefix_index.get(scope)
+        if tree is None:
+            tree = self._prefix_index[scope] = RadixTree(
+                self.PREFIX_INDEX_WIDTH)
+        # The last two items of the key are the address and the length.
+        tree.insert(*dest.nlri.key[-2:], value=dest)
+
+    def _unindex_dest(self, dest):
+        if self.PREFIX_INDEX_WIDTH is None:
+            return
+        scope = self._prefix_index_scope(dest.nlri)
+        tree = self._prefix_index.get(scope)
+        if tree is None:
+            return
+        try:
+            tree.delete(*dest.nlri.key[-2:])
+        except KeyError:
+            return
+        if not tree:
+            del self._prefix_index[scope]
+
+    def _prefix_index_trees(self, route_dist):
+        if self.PREFIX_INDEX_WIDTH is None:
+            raise ValueError('Prefix lookup is not supported for %s' %
+                             self.route_family)
+        if route_dist is not None:
+            tree = self._prefix_index.get(route_dist)
+            return [tree] if tree is not None else []
+        return [self._prefix_index[scope]
+                for scope in sorted(self._prefix_index, key=str)]
+
+    def longest_match(self, prefix, route_dist=None):
+        """Returns the destinations of the longest prefix covering *prefix*.
+
+        *prefix* is an address or a prefix in "address/length" format.
+        Returns the longest match of every route distinguisher unless
+        *route_dist* is given, so at most one destination for the tables
+        of the route families without route distinguisher.
+        Raises ValueError if this table does not support prefix lookups.
+        """
+        addr, length = self._parse_prefix(prefix)
+        dests = []
+        for tree in self._prefix_index_trees(route_dist):
+            match = tree.longest_match(addr, length)
+            if match is not None:
+                dests.append(match[2])
+        return dests
+
+    def more_specifics(self, prefix, route_dist=None):
+        """Returns the destinations of *prefix* and of all the prefixes it
+        covers, sorted by prefix per route distinguisher.
+
+        Raises ValueError if this table does not support prefix lookups.
+        """
+        addr, length = self._parse_prefix(prefix)
+        dests = []
+        for tree in self._prefix_index_trees(route_dist):
+            dests.extend(dest for _, _, dest in tree.subtree(addr, length))
+        return dests
 
     def _validate_nlri(self, nlri):
         """Validated *nlri* is the type that this table stores/supports.
@@ -193,6 +285,7 @@ class Table(object):
         if dest is None:
             dest = self._create_dest(nlri)
             self._destinations[table_key] = dest
+            self._index_dest(dest)
         return dest
 
     def _get_dest(self, nlri):
@@ -600,22 +693,9 @@ class Destination(object):
             raise BgpProcessorError(desc='Need at-least one known path to'
                                     ' compute best path')
 
-        # We pick the first path as current best path. This helps in breaking
-        # tie between two new paths learned in one cycle for which best-path
-        # calculation steps lead to tie.
-        current_best_path = self._known_path_list[0]
-        best_path_reason = BPR_ONLY_PATH
-        for next_path in self._known_path_list[1:]:
-            from ryu.services.protocols.bgp.processor import compute_best_path
-            # Compare next path with current best path.
-            new_best_path, reason = \
-                compute_best_path(self._core_service.asn, current_best_path,
-                                  next_path)
-            best_path_reason = reason
-            if new_best_path is not None:
-                current_best_path = new_best_path
-
-        return current_best_path, best_path_reason
+        from ryu.services.protocols.bgp.processor import select_best_path
+        return select_best_path(self._core_service.asn,
+                                self._known_path_list)
 
     def withdraw_uninteresting_paths(self, interested_rts):
         """Withdraws paths that are no longer interesting.
@@ -688,6 +768,102 @@ class Destination(object):
         return str(self) >= str(other)
 
 
+class PathAttrs(OrderedDict):
+    """Read-only set of path attributes shared by paths.
+
+    Instances are created by `PathAttrCache.intern()` and must not be
+    modified, since the same instance is referenced by every path which
+    has identical path attributes.  Copying returns a mutable OrderedDict.
+
+    `best_path_key` caches the part of the best path selection key which
+    depends on the path attributes only.
+    """
+    __slots__ = ('best_path_key',)
+
+    def __init__(self):
+        super(PathAttrs, self).__init__()
+        self.best_path_key = None
+
+    @classmethod
+    def create(cls, items):
+        pattrs = cls()
+        for pattr_type, pattr in items:
+            OrderedDict.__setitem__(pattrs, pattr_type, pattr)
+        return pattrs
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('%s is read-only' % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = move_to_end = _read_only
+
+    def __copy__(self):
+        return OrderedDict(self)
+
+    def __reduce__(self):
+        return OrderedDict, (list(self.items()),)
+
+
+class PathAttrCache(object):
+    """Interns sets of path attributes.
+
+    Identical path attributes, and identical sets of them, are stored
+    once, so that the paths of a full routing table learned from a peer
+    share a small number of `PathAttrs` instances which can be compared
+    by identity.  The cache is keyed by the serialized form of the path
+    attributes and holds weak references only; an entry is dropped when
+    the last path referring to it is gone.
+    """
+
+    def __init__(self):
+        self._pattrs = weakref.WeakValueDictionary()
+        self._pattrs_sets = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._pattrs_sets)
+
+    def intern(self, pattrs):
+        """Returns the shared `PathAttrs` equal to the given *pattrs*."""
+        if isinstance(pattrs, PathAttrs):
+            return pattrs
+
+        try:
+            # serialize() updates flags and length of the path attribute,
+            # which must be left as they are.
+            bufs = tuple((pattr_type, bytes(copy(pattr).serialize()))
+                         for pattr_type, pattr in pattrs.items())
+        except Exception as e:
+            # Path attributes which cannot be serialized are not shared.
+            LOG.debug('Cannot intern path attributes %s: %s', pattrs, e)
+            return PathAttrs.create(pattrs.items())
+
+        interned = self._pattrs_sets.get(bufs)
+        if interned is None:
+            interned = PathAttrs.create(
+                (pattr_type, self._pattrs.setdefault(buf, pattr))
+                for (pattr_type, buf), pattr in zip(bufs, pattrs.values()))
+            self._pattrs_sets[bufs] = interned
+        return interned
+
+
+# Cache of path attributes shared by all paths.
+_PATH_ATTR_CACHE = PathAttrCache()
+
+# Path attributes of withdrawals.
+_EMPTY_PATH_ATTRS = PathAttrs()
+
+
+def intern_pathattrs(pattrs):
+    """Returns the shared, read-only instance of the given path attributes.
+
+    Passing the result to the constructor of `Path` for several NLRIs
+    avoids looking up the cache for every path.
+    """
+    if not pattrs:
+        return _EMPTY_PATH_ATTRS
+    return _PATH_ATTR_CACHE.intern(pattrs)
+
+
 @six.add_metaclass(ABCMeta)
 class Path(object):
     """Represents a way of reaching an IP destination.
@@ -711,7 +887,8 @@ class Path(object):
             - `nlri`: (Vpnv4) Nlri instance for Vpnv4 route family.
             - `src_ver_num`: (int) version number of *source* when this path
             was learned.
-            - `pattrs`: (OrderedDict) various path attributes for this path.
+            - `pattrs`: (OrderedDict) various path attributes for this path,
+            which are interned and shared with other paths.
             - `nexthop`: (str) nexthop advertised for this path.
             - `is_withdraw`: (bool) True if this represents a withdrawal.
         """
@@ -741,10 +918,7 @@ class Path(object):
         self._source = source
 
         # Path attribute of this path.
-        if pattrs:
-            self._path_attr_map = copy(pattrs)
-        else:
-            self._path_attr_map = OrderedDict()
+        self._path_attr_map = intern_pathattrs(pattrs)
 
         # NLRI that this path represents.
         self._nlri = nlri
@@ -791,7 +965,14 @@ class Path(object):
 
     @property
     def pathattr_map(self):
-        return copy(self._path_attr_map)
+        return OrderedDict(self._path_attr_map)
+
+    @property
+    def pathattr_set(self):
+        """Read-only path attributes shared with the paths which have
+        identical path attributes.
+        """
+        return self._path_attr_map
 
     @property
     def nexthop(self):
@@ -807,7 +988,7 @@ class Path(object):
     def clone(self, for_withdrawal=False):
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self._path_attr_map
         clone = self.__class__(
             self.source,
             self.nlri,
@@ -1119,7 +1300,7 @@ class ASPathFilter(Filter):
         ``path`` specifies the path.
         """
 
-        path_aspath = path.pathattr_map.get(BGP_ATTR_TYPE_AS_PATH)
+        path_aspath = path.get_pattr(BGP_ATTR_TYPE_AS_PATH)
         path_seg_list = path_aspath.path_seg_list
         if path_seg_list:
             path_seg = path_seg_list[0]
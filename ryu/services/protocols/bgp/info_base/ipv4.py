@@ -54,6 +54,7 @@ class Ipv4Table(Table):
     paths.
     """
     ROUTE_FAMILY = RF_IPv4_UC
+    PREFIX_INDEX_WIDTH = 32
     VPN_DEST_CLASS = IPv4Dest
 
     def __init__(self, core_service, signal_bus):
@@ -63,7 +64,7 @@ class Ipv4Table(Table):
         """Return a key that will uniquely identify this NLRI inside
         this table.
         """
-        return nlri.prefix
+        return nlri.key
 
     def _create_dest(self, nlri):
         return self.VPN_DEST_CLASS(self, nlri)
@@ -54,6 +54,7 @@ class Ipv6Table(Table):
     paths.
     """
     ROUTE_FAMILY = RF_IPv6_UC
+    PREFIX_INDEX_WIDTH = 128
     VPN_DEST_CLASS = IPv6Dest
 
     def __init__(self, core_service, signal_bus):
@@ -63,7 +64,7 @@ class Ipv6Table(Table):
         """Return a key that will uniquely identify this NLRI inside
         this table.
         """
-        return nlri.prefix
+        return nlri.key
 
     def _create_dest(self, nlri):
         return self.VPN_DEST_CLASS(self, nlri)
@@ -48,6 +48,9 @@ class VpnTable(Table):
         """
         return vpn_nlri.route_dist + ':' + vpn_nlri.prefix
 
+    def _prefix_index_scope(self, vpn_nlri):
+        return vpn_nlri.route_dist
+
     def _create_dest(self, nlri):
         return self.VPN_DEST_CLASS(self, nlri)
 
@@ -73,7 +76,7 @@ class VpnPath(Path):
 
         pathattrs = None
         if not is_withdraw:
-            pathattrs = self.pathattr_map
+            pathattrs = self.pathattr_set
 
         vrf_path = self.VRF_PATH_CLASS(
             puid=self.VRF_PATH_CLASS.create_puid(
@@ -44,8 +44,15 @@ class Vpnv4Table(VpnTable):
     paths.
     """
     ROUTE_FAMILY = RF_IPv4_VPN
+    PREFIX_INDEX_WIDTH = 32
     VPN_DEST_CLASS = Vpnv4Dest
 
+    def _table_key(self, nlri):
+        """Return a key that will uniquely identify this NLRI inside
+        this table.
+        """
+        return nlri.key
+
 
 class Vpnv4Path(VpnPath):
     """Represents a way of reaching an VPNv4 destination."""
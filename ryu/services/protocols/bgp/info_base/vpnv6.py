@@ -44,8 +44,15 @@ class Vpnv6Table(VpnTable):
     paths.
     """
     ROUTE_FAMILY = RF_IPv6_VPN
+    PREFIX_INDEX_WIDTH = 128
     VPN_DEST_CLASS = Vpnv6Dest
 
+    def _table_key(self, nlri):
+        """Return a key that will uniquely identify this NLRI inside
+        this table.
+        """
+        return nlri.key
+
 
 class Vpnv6Path(VpnPath):
     """Represents a way of reaching an VPNv4 destination."""
@@ -185,7 +185,7 @@ class VrfTable(Table):
             source=source,
             nlri=vrf_nlri,
             src_ver_num=vpn_path.source_version_num,
-            pattrs=vpn_path.pathattr_map,
+            pattrs=vpn_path.pathattr_set,
             nexthop=vpn_path.nexthop,
             is_withdraw=vpn_path.is_withdraw,
             label_list=getattr(vpn_path.nlri, 'label_list', None),
@@ -567,7 +567,7 @@ class VrfPath(Path):
     def clone(self, for_withdrawal=False):
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self.pathattr_set
 
         clone = self.__class__(
             self.puid,
@@ -600,7 +600,7 @@ class VrfPath(Path):
 
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self.pathattr_set
 
         vpnv_path = self.VPN_PATH_CLASS(
             source=self.source,
@@ -623,7 +623,8 @@ class VrfPath(Path):
             return False
         if not self.nexthop == b_path.nexthop:
             return False
-        if not self.pathattr_map == b_path.pathattr_map:
+        if not (self.pathattr_set is b_path.pathattr_set or
+                self.pathattr_map == b_path.pathattr_map):
             return False
 
         return True
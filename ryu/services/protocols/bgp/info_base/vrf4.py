@@ -49,11 +49,18 @@ class Vrf4Dest(VrfDest):
 class Vrf4Table(VrfTable):
     """Virtual Routing and Forwarding information base for IPv4."""
     ROUTE_FAMILY = RF_IPv4_UC
+    PREFIX_INDEX_WIDTH = 32
     VPN_ROUTE_FAMILY = RF_IPv4_VPN
     NLRI_CLASS = IPAddrPrefix
     VRF_PATH_CLASS = Vrf4Path
     VRF_DEST_CLASS = Vrf4Dest
 
+    def _table_key(self, nlri):
+        """Return a key that will uniquely identify this NLRI inside
+        this table.
+        """
+        return nlri.key
+
 
 class Vrf4NlriImportMap(VrfNlriImportMap):
     VRF_PATH_CLASS = Vrf4Path
@@ -50,11 +50,18 @@ class Vrf6Dest(VrfDest):
 class Vrf6Table(VrfTable):
     """Virtual Routing and Forwarding information base for IPv6."""
     ROUTE_FAMILY = RF_IPv6_UC
+    PREFIX_INDEX_WIDTH = 128
     VPN_ROUTE_FAMILY = RF_IPv6_VPN
     NLRI_CLASS = IP6AddrPrefix
     VRF_PATH_CLASS = Vrf6Path
     VRF_DEST_CLASS = Vrf6Dest
 
+    def _table_key(self, nlri):
+        """Return a key that will uniquely identify this NLRI inside
+        this table.
+        """
+        return nlri.key
+
 
 class Vrf6NlriImportMap(VrfNlriImportMap):
     VRF_PATH_CLASS = Vrf6Path
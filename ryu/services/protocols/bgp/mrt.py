@@ -0,0 +1,297 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Snapshots of the RIB in MRT TABLE_DUMP_V2 format.
+
+ The global tables are dumped into the default view, and each VRF table
+ into the view named after its route distinguisher.  All the known paths
+ of a destination are dumped, not only the best path, so that the RIB
+ can be restored from the snapshot by load_rib() when the speaker is
+ restarted.
+"""
+import bz2
+from collections import OrderedDict
+import gzip
+import logging
+import os
+import time
+
+from ryu.lib import hub
+from ryu.lib import mrtlib
+from ryu.lib.packet.bgp import (
+    RF_IPv4_UC,
+    RF_IPv6_UC,
+    RF_IPv4_VPN,
+    RF_IPv6_VPN,
+    BGP_ATTR_TYPE_AS_PATH,
+    BGP_ATTR_TYPE_NEXT_HOP,
+    BGP_ATTR_TYPE_MP_REACH_NLRI,
+    BGP_ATTR_TYPE_MP_UNREACH_NLRI,
+    BGPPathAttributeAsPath,
+    BGPPathAttributeNextHop,
+    BGPPathAttributeMpReachNLRI,
+)
+from ryu.services.protocols.bgp.utils import bgp as bgp_utils
+
+LOG = logging.getLogger('bgpspeaker.mrt')
+
+# Number of destinations processed before yielding to the other threads,
+# e.g. the processor, while dumping or loading the RIB.
+DEST_PER_CHUNK = 1000
+
+# Seconds until the loaded paths which are not advertised again by their
+# peer are removed.
+DEFAULT_STALE_TIME = 120
+
+# Route families of the global tables which are dumped.  IPv4/IPv6
+# unicast are dumped into RIB_IPV4_UNICAST/RIB_IPV6_UNICAST records, and
+# VPNv4/VPNv6 into RIB_GENERIC records.
+DUMPED_ROUTE_FAMILIES = (RF_IPv4_UC, RF_IPv6_UC, RF_IPv4_VPN, RF_IPv6_VPN)
+
+# Peer index of the paths originated by this speaker.
+LOCAL_PEER_INDEX = 0
+
+
+def open_file(filename, mode='rb'):
+    """Opens filename, which is compressed if ending with .bz2 or .gz."""
+    if filename.endswith('.bz2'):
+        return bz2.BZ2File(filename, mode)
+    elif filename.endswith('.gz'):
+        return gzip.open(filename, mode)
+    return open(filename, mode)
+
+
+def _rib_message(route_family, seq_num, nlri, rib_entries):
+    if route_family == RF_IPv4_UC:
+        return mrtlib.TableDump2RibIPv4UnicastMrtMessage(
+            seq_num, nlri, rib_entries)
+    elif route_family == RF_IPv6_UC:
+        return mrtlib.TableDump2RibIPv6UnicastMrtMessage(
+            seq_num, nlri, rib_entries)
+    return mrtlib.TableDump2RibGenericMrtMessage(
+        seq_num, route_family.afi, route_family.safi, nlri, rib_entries)
+
+
+def _rib_attributes(path):
+    # The NLRI of MP_REACH_NLRI is in the RIB record, only its next hop is
+    # kept in the RIB entry.
+    attrs = []
+    for attr in path.pathattr_set.values():
+        if attr.type in (BGP_ATTR_TYPE_NEXT_HOP,
+                         BGP_ATTR_TYPE_MP_REACH_NLRI,
+                         BGP_ATTR_TYPE_MP_UNREACH_NLRI):
+            continue
+        if attr.type == BGP_ATTR_TYPE_AS_PATH and attr._AS_PACK_STR != '!I':
+            # AS_PATH is always encoded with four-octet AS numbers in
+            # TABLE_DUMP_V2.
+            attr = BGPPathAttributeAsPath(attr.value, as_pack_str='!I')
+        attrs.append(attr)
+
+    route_family = path.route_family
+    if route_family == RF_IPv4_UC:
+        attrs.append(BGPPathAttributeNextHop(path.nexthop or '0.0.0.0'))
+    else:
+        default = '0.0.0.0' if route_family == RF_IPv4_VPN else '::'
+        attrs.append(BGPPathAttributeMpReachNLRI(
+            route_family.afi, route_family.safi,
+            path.nexthop or default, []))
+    return attrs
+
+
+class RibDumper(object):
+    """Writes the RIB of core_service into the file object f.
+
+    The destinations are dumped DEST_PER_CHUNK at a time, between which
+    the other threads are allowed to run, so that the processor and the
+    peers keep working while the RIB is dumped.  Hence the snapshot is
+    not atomic, but each record is consistent with its destination at
+    the time it is written.
+    """
+
+    def __init__(self, core_service, f):
+        self._core_service = core_service
+        self._f = f
+        self._peer_index = {}
+        self._timestamp = None
+        self.records = 0
+        self.entries = 0
+
+    def _write(self, message):
+        # mrtlib.Writer is not used, which closes f when deleted.
+        self._f.write(
+            mrtlib.TableDump2MrtRecord(message, self._timestamp).serialize())
+        self.records += 1
+
+    def _write_peer_index_table(self, view_name=''):
+        core_service = self._core_service
+        peer_entries = [mrtlib.MrtPeer(core_service.router_id, '0.0.0.0',
+                                       core_service.asn)]
+        self._peer_index = {}
+        for peer in core_service.peer_manager.iterpeers:
+            bgp_id = '0.0.0.0'
+            if peer.in_established() and peer.protocol.recv_open_msg:
+                bgp_id = peer.protocol.recv_open_msg.bgp_identifier
+            self._peer_index[peer] = len(peer_entries)
+            peer_entries.append(
+                mrtlib.MrtPeer(bgp_id, peer.ip_address, peer.remote_as))
+
+        self._write(mrtlib.TableDump2PeerIndexTableMrtMessage(
+            core_service.router_id, peer_entries, view_name))
+
+    def _rib_entry(self, path):
+        source = path.source
+        if path.is_local() or not hasattr(source, 'version_num'):
+            # Locally originated or imported from the VPN table.
+            peer_index = LOCAL_PEER_INDEX
+        else:
+            peer_index = self._peer_index.get(source)
+            if peer_index is None:
+                # The peer was added after the peer index table.
+                return None
+        return mrtlib.MrtRibEntry(peer_index, self._timestamp,
+                                  _rib_attributes(path))
+
+    def _dump_table(self, table, route_family, seq_num):
+        # Takes a copy of the destinations, the table may change while
+        # the other threads run.
+        dests = list(table.values())
+        for i, dest in enumerate(dests):
+            if i and i % DEST_PER_CHUNK == 0:
+                hub.sleep(0)
+            rib_entries = []
+            for path in dest.known_path_list:
+                rib_entry = self._rib_entry(path)
+                if rib_entry is not None:
+                    rib_entries.append(rib_entry)
+            if not rib_entries:
+                continue
+            self._write(_rib_message(
+                route_family, seq_num, dest.nlri, rib_entries))
+            seq_num += 1
+            self.entries += len(rib_entries)
+        return seq_num
+
+    def dump(self):
+        """Dumps the global tables and then the VRF tables."""
+        self._timestamp = int(time.time())
+        tm = self._core_service.table_manager
+
+        self._write_peer_index_table()
+        seq_num = 0
+        for route_family in DUMPED_ROUTE_FAMILIES:
+            table = tm.get_global_table_by_route_family(route_family)
+            seq_num = self._dump_table(table, route_family, seq_num)
+
+        vrf_tables = sorted(tm.get_vrf_tables().items(),
+                            key=lambda item: (item[0][0], str(item[0][1])))
+        for (route_dist, _), table in vrf_tables:
+            self._write_peer_index_table(view_name=route_dist)
+            self._dump_table(table, table.ROUTE_FAMILY, 0)
+
+        LOG.info('Dumped %d RIB entries in %d MRT records',
+                 self.entries, self.records)
+        return self.entries
+
+
+def dump_rib(core_service, filename):
+    """Dumps the RIB of core_service into filename.
+
+    The snapshot is written into a temporary file which is renamed to
+    filename when completed.  Returns the number of dumped RIB entries.
+    """
+    tmp_filename = filename + '.tmp'
+    f = open_file(tmp_filename, 'wb')
+    try:
+        entries = RibDumper(core_service, f).dump()
+    finally:
+        f.close()
+    os.rename(tmp_filename, filename)
+    return entries
+
+
+def _rib_pattrs(rib_entry):
+    pattrs = OrderedDict()
+    nexthop = None
+    for attr in rib_entry.bgp_attributes:
+        pattrs[attr.type] = attr
+        if attr.type == BGP_ATTR_TYPE_NEXT_HOP:
+            nexthop = attr.value
+        elif attr.type == BGP_ATTR_TYPE_MP_REACH_NLRI:
+            nexthop = attr.next_hop
+    return pattrs, nexthop
+
+
+def load_rib(core_service, f):
+    """Loads the paths in the MRT file object f into the global tables.
+
+    Only the default view is loaded; the VRF tables are populated by
+    importing the loaded VPN paths.  The paths are owned by the
+    configured peers of the same address in the peer index table, the
+    RIB entries of the other peers and of this speaker are skipped.
+
+    The loaded paths have a version number older than their peer, so
+    that they are removed by TableCoreManager.clean_stale_routes() unless
+    the peer advertises them again.  Returns the set of such peers.
+    """
+    tm = core_service.table_manager
+    peer_manager = core_service.peer_manager
+    peers = None
+    loaded_peers = set()
+    loaded = skipped = 0
+
+    records = mrtlib.iter_records(
+        f, types=[mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2])
+    for i, record in enumerate(records):
+        if i and i % DEST_PER_CHUNK == 0:
+            hub.sleep(0)
+        message = record.message
+        if isinstance(message, mrtlib.TableDump2PeerIndexTableMrtMessage):
+            if message.view_name:
+                # VRF views are not loaded.
+                peers = None
+            else:
+                peers = [peer_manager.get_by_addr(p.ip_addr)
+                         for p in message.peer_entries]
+            continue
+        if peers is None:
+            continue
+
+        if isinstance(message, mrtlib.TableDump2RibGenericMrtMessage):
+            nlri = message.nlri
+        else:
+            nlri = message.prefix
+        route_family = getattr(nlri, 'ROUTE_FAMILY', None)
+        if route_family not in DUMPED_ROUTE_FAMILIES:
+            skipped += len(message.rib_entries)
+            continue
+
+        for rib_entry in message.rib_entries:
+            peer = None
+            if rib_entry.peer_index < len(peers):
+                peer = peers[rib_entry.peer_index]
+            if peer is None:
+                skipped += 1
+                continue
+            pattrs, nexthop = _rib_pattrs(rib_entry)
+            path = bgp_utils.create_path(
+                peer, nlri, src_ver_num=peer.version_num - 1,
+                pattrs=pattrs, nexthop=nexthop)
+            tm.learn_path(path)
+            loaded_peers.add(peer)
+            loaded += 1
+
+    LOG.info('Loaded %d RIB entries, skipped %d', loaded, skipped)
+    return loaded_peers
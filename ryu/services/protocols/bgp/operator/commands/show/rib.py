@@ -27,8 +27,10 @@ class RibBase(Command, RouteFormatterMixin):
 
 
 class Rib(RibBase):
-    help_msg = 'show all routes for address family'
-    param_help_msg = '<address-family>'
+    help_msg = ('show all routes for address family, the longest prefix '
+                'matching <prefix>, or the routes of <prefix> and its more '
+                'specifics')
+    param_help_msg = '<address-family> [<prefix> [longer-prefixes]]'
     command = 'rib'
 
     def __init__(self, *args, **kwargs):
@@ -37,14 +39,19 @@ class Rib(RibBase):
             'all': self.All}
 
     def action(self, params):
-        if len(params) != 1 or params[0] not in self.supported_families:
+        if (not 1 <= len(params) <= 3
+                or params[0] not in self.supported_families
+                or params[2:] not in ([], ['longer-prefixes'])):
             return WrongParamResp()
         from ryu.services.protocols.bgp.operator.internal_api \
             import WrongParamError
         try:
             return CommandsResponse(
                 STATUS_OK,
-                self.api.get_single_rib_routes(params[0])
+                self.api.get_single_rib_routes(
+                    params[0],
+                    prefix=params[1] if len(params) > 1 else None,
+                    longer_prefixes=len(params) > 2)
             )
         except WrongParamError as e:
             return WrongParamResp(e)
@@ -82,7 +82,8 @@ class InternalApi(object):
     def _get_vrf_tables(self):
         return CORE_MANAGER.get_core_service().table_manager.get_vrf_tables()
 
-    def get_single_rib_routes(self, addr_family):
+    def get_single_rib_routes(self, addr_family, prefix=None,
+                              longer_prefixes=False):
         rfs = {
             'ipv4': RF_IPv4_UC,
             'ipv6': RF_IPv6_UC,
@@ -103,11 +104,20 @@ class InternalApi(object):
         rf = rfs.get(addr_family)
         table_manager = self.get_core_service().table_manager
         gtable = table_manager.get_global_table_by_route_family(rf)
-        if gtable is not None:
+        if gtable is None:
+            return []
+        if prefix is None:
             return [self._dst_to_dict(dst)
                     for dst in sorted(gtable.values())]
-        else:
-            return []
+
+        try:
+            if longer_prefixes:
+                dsts = gtable.more_specifics(prefix)
+            else:
+                dsts = gtable.longest_match(prefix)
+        except ValueError as e:
+            raise WrongParamError(str(e))
+        return [self._dst_to_dict(dst) for dst in dsts]
 
     def _dst_to_dict(self, dst):
         ret = {'paths': [],
@@ -16,6 +16,8 @@
  BGP peer related classes and utils.
 """
 from collections import namedtuple
+from collections import OrderedDict
+import copy
 import logging
 import socket
 import time
@@ -32,12 +34,14 @@ from ryu.services.protocols.bgp.model import OutgoingRoute
 from ryu.services.protocols.bgp.model import SentRoute
 from ryu.services.protocols.bgp.info_base.base import PrefixFilter
 from ryu.services.protocols.bgp.info_base.base import AttributeMap
+from ryu.services.protocols.bgp.info_base.base import intern_pathattrs
 from ryu.services.protocols.bgp.model import ReceivedRoute
 from ryu.services.protocols.bgp.net_ctrl import NET_CONTROLLER
 from ryu.services.protocols.bgp.rtconf.neighbors import NeighborConfListener
 from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE_PASSIVE
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.speaker import BgpProtocol
+from ryu.services.protocols.bgp.speaker import BGP_MAX_MSG_LEN
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
 from ryu.services.protocols.bgp.info_base.vpnv6 import Vpnv6Path
@@ -106,6 +110,26 @@ from ryu.lib.packet import safi as subaddr_family
 
 LOG = logging.getLogger('bgpspeaker.peer')
 
+# Max. number of queued OutgoingRoutes packed into Update messages at once.
+MAX_ROUTES_PER_PACKING = 1000
+
+# Number of Adj-RIB-out entries evaluated against a new policy before
+# relinquishing the hub to the other threads.
+ADJ_RIB_OUT_DIFF_BATCH = 1000
+
+
+def adj_rib_key(nlri):
+    """Returns the key of `nlri` in Adj-RIB-in/out of a peer.
+
+    Adj-RIBs hold the prefixes of all the route families, so the compact
+    key of IP and VPN prefixes is qualified by the route family.  The other
+    NLRIs are keyed by their formatted string.
+    """
+    key = getattr(nlri, 'key', None)
+    if key is None:
+        return nlri.formatted_nlri_str
+    return nlri.ROUTE_FAMILY, key
+
 
 def is_valid_state(state):
     """Returns True if given state is a valid bgp finite state machine state.
@@ -113,6 +137,98 @@ def is_valid_state(state):
     return state in const.BGP_FSM_VALID_STATES
 
 
+def pack_updates(updates, max_msg_len=BGP_MAX_MSG_LEN):
+    """Packs the given Update messages into as few messages as possible.
+
+    Each message in `updates` is expected to advertise or withdraw one
+    prefix, as constructed by `Peer._construct_update`. Prefixes which
+    share the same path attributes (and the same AFI/SAFI and next hop for
+    MP_REACH_NLRI) are advertised by the same message, withdrawn prefixes
+    are grouped per AFI/SAFI. No returned message is longer than
+    `max_msg_len`.
+    """
+    if len(updates) <= 1:
+        return list(updates)
+
+    # key -> (first update of the group, MP attribute or None,
+    #         list of (nlri, nlri length))
+    groups = OrderedDict()
+    for update in updates:
+        mp_attr = None
+        attrs_bin = bytearray()
+        for attr in update.path_attributes:
+            if attr.type in (BGP_ATTR_TYPE_MP_REACH_NLRI,
+                             BGP_ATTR_TYPE_MP_UNREACH_NLRI):
+                mp_attr = attr
+            else:
+                attrs_bin += attr.serialize()
+
+        if update.withdrawn_routes:
+            key = ('withdraw',)
+            nlri_list = update.withdrawn_routes
+        elif mp_attr is None:
+            key = ('nlri', bytes(attrs_bin))
+            nlri_list = update.nlri
+        elif mp_attr.type == BGP_ATTR_TYPE_MP_UNREACH_NLRI:
+            key = ('mp_unreach', mp_attr.afi, mp_attr.safi)
+            nlri_list = mp_attr.withdrawn_routes
+        else:
+            key = ('mp_reach', mp_attr.afi, mp_attr.safi,
+                   bytes(mp_attr.serialize_next_hop()), bytes(attrs_bin))
+            nlri_list = mp_attr.nlri
+
+        if not nlri_list or (mp_attr is not None and update.nlri):
+            # e.g.) End-of-RIB marker, sent as it is.
+            groups[('raw', id(update))] = (update, mp_attr, [])
+            continue
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = (update, mp_attr, [])
+        group[2].extend((n, len(n.serialize())) for n in nlri_list)
+
+    packed = []
+    for update, mp_attr, nlri_list in groups.values():
+        if not nlri_list:
+            packed.append(update)
+            continue
+
+        # Length of the message without NLRIs; one more octet is reserved
+        # for the extended length of MP_(UN)REACH_NLRI attribute.
+        first_len = nlri_list[0][1]
+        overhead = len(update.serialize()) - first_len + 1
+
+        chunks = []
+        chunk = []
+        chunk_len = overhead
+        for nlri, nlri_len in nlri_list:
+            if chunk and chunk_len + nlri_len > max_msg_len:
+                chunks.append(chunk)
+                chunk = []
+                chunk_len = overhead
+            chunk.append(nlri)
+            chunk_len += nlri_len
+        chunks.append(chunk)
+
+        for chunk in chunks:
+            if update.withdrawn_routes:
+                packed.append(BGPUpdate(withdrawn_routes=chunk))
+            elif mp_attr is None:
+                packed.append(BGPUpdate(
+                    path_attributes=update.path_attributes, nlri=chunk))
+            else:
+                new_mp_attr = copy.copy(mp_attr)
+                if mp_attr.type == BGP_ATTR_TYPE_MP_UNREACH_NLRI:
+                    new_mp_attr.withdrawn_routes = chunk
+                else:
+                    new_mp_attr.nlri = chunk
+                packed.append(BGPUpdate(path_attributes=[
+                    new_mp_attr if attr is mp_attr else attr
+                    for attr in update.path_attributes]))
+
+    return packed
+
+
 class PeerRf(object):
     """State maintained per-RouteFamily for a Peer."""
 
@@ -436,11 +552,15 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
     @property
     def adj_rib_in(self):
-        return self._adj_rib_in
+        """Adj-RIB-in keyed by the formatted NLRI, for display."""
+        return dict((r.path.nlri.formatted_nlri_str, r)
+                    for r in self._adj_rib_in.values())
 
     @property
     def adj_rib_out(self):
-        return self._adj_rib_out
+        """Adj-RIB-out keyed by the formatted NLRI, for display."""
+        return dict((r.path.nlri.formatted_nlri_str, r)
+                    for r in self._adj_rib_out.values())
 
     @property
     def is_route_server_client(self):
@@ -481,8 +601,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             # preserve original order of attribute_maps
             _attr_maps[const.ATTR_MAPS_ORG_KEY].append(cloned)
 
+        old_attribute_maps = dict(self._attribute_maps)
         self._attribute_maps[key] = _attr_maps
-        self.on_update_attribute_maps()
+        self.on_update_attribute_maps(old_attribute_maps)
 
     def is_mpbgp_cap_valid(self, route_family):
         if not self.in_established:
@@ -619,7 +740,6 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         for received_path in self._adj_rib_in.values():
             LOG.debug('received_path: %s', received_path)
             path = received_path.path
-            nlri_str = path.nlri.formatted_nlri_str
             block, blocked_reason = self._apply_in_filter(path)
             if block == received_path.filtered:
                 LOG.debug('block situation not changed: %s', block)
@@ -627,46 +747,74 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             elif block:
                 # path wasn't blocked, but must be blocked by this update
                 path = path.clone(for_withdrawal=True)
-                LOG.debug('withdraw %s because of in filter update', nlri_str)
+                LOG.debug('withdraw %s because of in filter update',
+                          path.nlri)
             else:
                 # path was blocked, but mustn't be blocked by this update
                 LOG.debug('learn blocked %s because of in filter update',
-                          nlri_str)
+                          path.nlri)
             received_path.filtered = block
             tm = self._core_service.table_manager
             tm.learn_path(path)
 
     def on_update_out_filter(self):
         LOG.debug('on_update_out_filter fired')
-        for sent_path in self._adj_rib_out.values():
-            LOG.debug('sent_path: %s', sent_path)
-            path = sent_path.path
-            nlri_str = path.nlri.formatted_nlri_str
-            block, blocked_reason = self._apply_out_filter(path)
-            if block == sent_path.filtered:
-                LOG.debug('block situation not changed: %s', block)
-                continue
-            elif block:
-                # path wasn't blocked, but must be blocked by this update
-                withdraw_clone = path.clone(for_withdrawal=True)
-                outgoing_route = OutgoingRoute(withdraw_clone)
-                LOG.debug('send withdraw %s because of out filter update',
-                          nlri_str)
-            else:
-                # path was blocked, but mustn't be blocked by this update
-                outgoing_route = OutgoingRoute(path)
-                LOG.debug('send blocked %s because of out filter update',
-                          nlri_str)
-            sent_path.filtered = block
-            self.enque_outgoing_msg(outgoing_route)
+        self._diff_adj_rib_out()
 
-    def on_update_attribute_maps(self):
-        # resend sent_route in case of filter matching
+    def on_update_attribute_maps(self, old_attribute_maps=None):
         LOG.debug('on_update_attribute_maps fired')
-        for sent_path in self._adj_rib_out.values():
-            LOG.debug('resend path: %s', sent_path)
-            path = sent_path.path
+        self._diff_adj_rib_out(old_attribute_maps or {})
+
+    def _uses_local_pref(self):
+        # LOCAL_PREF, hence the attribute maps, applies only to the paths
+        # sent by _construct_update() to plain iBGP peers.
+        return not (self.is_route_server_client or
+                    self.is_route_reflector_client or
+                    self.is_ebgp_peer())
+
+    def _diff_adj_rib_out(self, old_attribute_maps=None):
+        """Re-evaluates Adj-RIB-out against the current policy and enqueues
+        only the routes whose post-policy view has changed.
+
+        A route is enqueued again when the out-filter now blocks a route
+        advertised to the peer, or permits a blocked one, or if
+        `old_attribute_maps` is given, when the attribute maps change the
+        LOCAL_PREF sent with an advertised route.  _send_outgoing_routes()
+        then sends the announcement or the withdrawal.  Withdrawn routes are
+        never sent again.
+
+        The entries are evaluated ADJ_RIB_OUT_DIFF_BATCH at a time, between
+        which the other threads are allowed to run.
+        """
+        compare_local_pref = (old_attribute_maps is not None and
+                              self._uses_local_pref())
+        sent_routes = list(self._adj_rib_out.items())
+        changed = 0
+        for i, (key, sent_route) in enumerate(sent_routes):
+            if i and i % ADJ_RIB_OUT_DIFF_BATCH == 0:
+                self.pause(0)
+            if self._adj_rib_out.get(key) is not sent_route:
+                # Sent again while the other threads ran.
+                continue
+            path = sent_route.path
+            if path.is_withdraw:
+                continue
+
+            block, _ = self._apply_out_filter(path)
+            if block == bool(sent_route.filtered):
+                if block or not compare_local_pref:
+                    continue
+                old = self._local_pref_attr(path, old_attribute_maps)
+                new = self._local_pref_attr(path)
+                if old.value == new.value:
+                    continue
+            LOG.debug('resend %s because of policy update', path.nlri)
             self.enque_outgoing_msg(OutgoingRoute(path))
+            changed += 1
+
+        LOG.debug('Policy update of %s changed %d of %d routes in '
+                  'Adj-RIB-out', self, changed, len(sent_routes))
+        return changed
 
     def __str__(self):
         return 'Peer(ip: %s, asn: %s)' % (self._neigh_conf.ip_address,
@@ -713,33 +861,57 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         Also, checks if any policies prevent sending this message.
         Populates Adj-RIB-out with corresponding `SentRoute`.
         """
+        self._send_outgoing_routes([outgoing_route])
 
-        path = outgoing_route.path
-        block, blocked_cause = self._apply_out_filter(path)
+    def _send_outgoing_routes(self, outgoing_routes):
+        """Constructs `Update` messages from given `outgoing_routes` and
+        sends them to peer packing several prefixes per message.
 
-        nlri_str = outgoing_route.path.nlri.formatted_nlri_str
-        sent_route = SentRoute(outgoing_route.path, self, block)
-        self._adj_rib_out[nlri_str] = sent_route
-        self._signal_bus.adj_rib_out_changed(self, sent_route)
+        Also, checks if any policies prevent sending these routes.
+        Populates Adj-RIB-out with corresponding `SentRoute`s.
+        """
+        # Only the last update per prefix needs to be sent.
+        updates = OrderedDict()
+        for outgoing_route in outgoing_routes:
+            path = outgoing_route.path
+            block, blocked_cause = self._apply_out_filter(path)
+
+            key = adj_rib_key(path.nlri)
+            prev_route = self._adj_rib_out.get(key)
+            sent_route = SentRoute(path, self, block)
+            self._adj_rib_out[key] = sent_route
+            self._signal_bus.adj_rib_out_changed(self, sent_route)
 
-        # TODO(PH): optimized by sending several prefixes per update.
-        # Construct and send update message.
-        if not block:
-            update_msg = self._construct_update(outgoing_route)
+            if not block:
+                updates[key] = \
+                    self._construct_update(outgoing_route)
+            elif (prev_route is not None and not prev_route.filtered and
+                    not prev_route.path.is_withdraw):
+                # The prefix was advertised before the out-filter blocked
+                # it, so the peer must forget it.
+                if not path.is_withdraw:
+                    path = path.clone(for_withdrawal=True)
+                updates[key] = \
+                    self._construct_update(OutgoingRoute(path))
+                LOG.debug('prefix : %s is withdrawn by filter : %s',
+                          path.nlri, blocked_cause)
+            else:
+                LOG.debug('prefix : %s is not sent by filter : %s',
+                          path.nlri, blocked_cause)
+
+            # We have to create sent_route for every OutgoingRoute which is
+            # not a withdraw or was for route-refresh msg.
+            if (not path.is_withdraw and
+                    not outgoing_route.for_route_refresh):
+                # Update the destination with new sent route.
+                tm = self._core_service.table_manager
+                tm.remember_sent_route(sent_route)
+
+        # Construct and send update messages.
+        for update_msg in pack_updates(list(updates.values())):
             self._protocol.send(update_msg)
             # Collect update statistics.
             self.state.incr(PeerCounterNames.SENT_UPDATES)
-        else:
-            LOG.debug('prefix : %s is not sent by filter : %s',
-                      path.nlri, blocked_cause)
-
-        # We have to create sent_route for every OutgoingRoute which is
-        # not a withdraw or was for route-refresh msg.
-        if (not outgoing_route.path.is_withdraw and
-                not outgoing_route.for_route_refresh):
-            # Update the destination with new sent route.
-            tm = self._core_service.table_manager
-            tm.remember_sent_route(sent_route)
 
     def _process_outgoing_msg_list(self):
         while True:
@@ -766,7 +938,15 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if isinstance(outgoing_msg, BGPRouteRefresh):
                 self._send_outgoing_route_refresh_msg(outgoing_msg)
             elif isinstance(outgoing_msg, OutgoingRoute):
-                self._send_outgoing_route(outgoing_msg)
+                # Pack the following OutgoingRoutes too, but do not
+                # reorder them with other kind of messages.
+                outgoing_routes = [outgoing_msg]
+                while (len(outgoing_routes) < MAX_ROUTES_PER_PACKING and
+                       isinstance(self.outgoing_msg_list.peek_first(),
+                                  OutgoingRoute)):
+                    outgoing_routes.append(
+                        self.outgoing_msg_list.pop_first())
+                self._send_outgoing_routes(outgoing_routes)
 
             # EOR are enqueued as plain Update messages.
             elif isinstance(outgoing_msg, BGPUpdate):
@@ -1164,21 +1344,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 # attribute_maps and set local-pref value.
                 # If the path doesn't match, we set default local-pref given
                 # from the user. The default value is 100.
-                localpref_attr = BGPPathAttributeLocalPref(
-                    self._common_conf.local_pref)
-                key = const.ATTR_MAPS_LABEL_DEFAULT
-
-                if isinstance(path, (Vpnv4Path, Vpnv6Path)):
-                    nlri = nlri_list[0]
-                    rf = VRF_RF_IPV4 if isinstance(path, Vpnv4Path)\
-                        else VRF_RF_IPV6
-                    key = ':'.join([nlri.route_dist, rf])
-
-                attr_type = AttributeMap.ATTR_LOCAL_PREF
-                at_maps = self._attribute_maps.get(key, {})
-                result = self._lookup_attribute_map(at_maps, attr_type, path)
-                if result:
-                    localpref_attr = result
+                localpref_attr = self._local_pref_attr(path)
 
             # COMMUNITY Attribute.
             community_attr = pathattr_map.get(BGP_ATTR_TYPE_COMMUNITIES)
@@ -1191,7 +1357,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if path_extcomm_attr:
                 # SOO list can be configured per VRF and/or per Neighbor.
                 # NeighborConf has this setting we add this to existing list.
-                communities = path_extcomm_attr.communities
+                # The attribute is shared with the other paths, so the list
+                # is copied before appending.
+                communities = list(path_extcomm_attr.communities)
                 if self._neigh_conf.soo_list:
                     # construct extended community
                     soo_list = self._neigh_conf.soo_list
@@ -1720,6 +1888,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             LOG.debug('Update message did not have any new MP_REACH_NLRIs.')
             return
 
+        # The paths of all the NLRIs share the same path attributes.
+        umsg_pattrs = intern_pathattrs(umsg_pattrs)
+
         # Create path instances for each NLRI from the update message.
         for msg_nlri in msg_nlri_list:
             LOG.debug('NLRI: %s', msg_nlri)
@@ -1733,9 +1904,8 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
             block, blocked_cause = self._apply_in_filter(new_path)
 
-            nlri_str = new_path.nlri.formatted_nlri_str
             received_route = ReceivedRoute(new_path, self, block)
-            self._adj_rib_in[nlri_str] = received_route
+            self._adj_rib_in[adj_rib_key(msg_nlri)] = received_route
             self._signal_bus.adj_rib_in_changed(self, received_route)
 
             if not block:
@@ -1785,10 +1955,10 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             block, blocked_cause = self._apply_in_filter(w_path)
 
             received_route = ReceivedRoute(w_path, self, block)
-            nlri_str = w_nlri.formatted_nlri_str
+            key = adj_rib_key(w_nlri)
 
-            if nlri_str in self._adj_rib_in:
-                del self._adj_rib_in[nlri_str]
+            if key in self._adj_rib_in:
+                del self._adj_rib_in[key]
                 self._signal_bus.adj_rib_in_changed(self, received_route)
 
             if not block:
@@ -1797,7 +1967,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 tm.learn_path(w_path)
             else:
                 LOG.debug('prefix : %s is blocked by in-bound filter: %s',
-                          nlri_str, blocked_cause)
+                          w_nlri, blocked_cause)
 
     def _extract_and_handle_mpbgp_new_paths(self, update_msg):
         """Extracts new paths advertised in the given update message's
@@ -1860,6 +2030,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             LOG.debug('Update message did not have any new MP_REACH_NLRIs.')
             return
 
+        # The paths of all the NLRIs share the same path attributes.
+        umsg_pattrs = intern_pathattrs(umsg_pattrs)
+
         # Create path instances for each NLRI from the update message.
         for msg_nlri in msg_nlri_list:
             new_path = bgp_utils.create_path(
@@ -1873,8 +2046,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             block, blocked_cause = self._apply_in_filter(new_path)
 
             received_route = ReceivedRoute(new_path, self, block)
-            nlri_str = msg_nlri.formatted_nlri_str
-            self._adj_rib_in[nlri_str] = received_route
+            self._adj_rib_in[adj_rib_key(msg_nlri)] = received_route
             self._signal_bus.adj_rib_in_changed(self, received_route)
 
             if not block:
@@ -1935,10 +2107,10 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             block, blocked_cause = self._apply_in_filter(w_path)
 
             received_route = ReceivedRoute(w_path, self, block)
-            nlri_str = w_nlri.formatted_nlri_str
+            key = adj_rib_key(w_nlri)
 
-            if nlri_str in self._adj_rib_in:
-                del self._adj_rib_in[nlri_str]
+            if key in self._adj_rib_in:
+                del self._adj_rib_in[key]
                 self._signal_bus.adj_rib_in_changed(self, received_route)
 
             if not block:
@@ -2345,6 +2517,26 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 if not self._connect_retry_event.is_set():
                     self._connect_retry_event.set()
 
+    def _local_pref_attr(self, path, attribute_maps=None):
+        """Returns LOCAL_PREF attribute sent with `path` to this iBGP peer.
+
+        The attribute maps, the current ones by default, may override the
+        configured default local-pref.
+        """
+        if attribute_maps is None:
+            attribute_maps = self._attribute_maps
+        key = const.ATTR_MAPS_LABEL_DEFAULT
+        if isinstance(path, (Vpnv4Path, Vpnv6Path)):
+            rf = VRF_RF_IPV4 if isinstance(path, Vpnv4Path) else VRF_RF_IPV6
+            key = ':'.join([path.nlri.route_dist, rf])
+
+        at_maps = attribute_maps.get(key, {})
+        result = self._lookup_attribute_map(
+            at_maps, AttributeMap.ATTR_LOCAL_PREF, path)
+        if result:
+            return result
+        return BGPPathAttributeLocalPref(self._common_conf.local_pref)
+
     @staticmethod
     def _lookup_attribute_map(attribute_map, attr_type, path):
         result_attr = None
@@ -17,6 +17,7 @@
 """
 
 import logging
+import time
 
 from ryu.services.protocols.bgp.base import Activity
 from ryu.services.protocols.bgp.base import add_bgp_error_metadata
@@ -60,9 +61,16 @@ class BgpProcessor(Activity):
     works to achieve the desired work flow.
     """
 
-    # Max. number of destinations processed per cycle.
+    # Number of destinations processed in the first cycle.
     MAX_DEST_PROCESSED_PER_CYCLE = 100
 
+    # Bounds of the number of destinations processed per cycle, which is
+    # adjusted so that a cycle takes about DEST_PROCESSING_TIME_PER_CYCLE
+    # seconds unless work_units_per_cycle is given.
+    MIN_DEST_PROCESSED_PER_CYCLE = 10
+    MAX_DEST_PROCESSED_PER_CYCLE_ADAPTIVE = 10000
+    DEST_PROCESSING_TIME_PER_CYCLE = 0.02
+
     #
     # DestQueue
     #
@@ -81,6 +89,7 @@ class BgpProcessor(Activity):
         self._dest_queue = BgpProcessor._DestQueue()
         self._rtdest_queue = BgpProcessor._DestQueue()
         self.dest_que_evt = EventletIOFactory.create_custom_event()
+        self._adaptive_cycle = work_units_per_cycle is None
         self.work_units_per_cycle =\
             work_units_per_cycle or BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE
 
@@ -108,6 +117,7 @@ class BgpProcessor(Activity):
     def _process_dest(self):
         dest_processed = 0
         LOG.debug('Processing destination...')
+        start = time.time()
         while (dest_processed < self.work_units_per_cycle and
                not self._dest_queue.is_empty()):
             # We process the first destination in the queue.
@@ -116,6 +126,25 @@ class BgpProcessor(Activity):
                 next_dest.process()
                 dest_processed += 1
 
+        if self._adaptive_cycle and dest_processed:
+            self._adjust_work_units(dest_processed, time.time() - start)
+
+    def _adjust_work_units(self, dest_processed, elapsed):
+        """Sizes the next cycle from the time spent per destination in
+        the last cycle, so that other greenthreads get a chance to run at
+        regular intervals whatever the cost of the destinations is.
+        """
+        if elapsed > 0:
+            target = int(self.DEST_PROCESSING_TIME_PER_CYCLE *
+                         dest_processed / elapsed)
+        else:
+            target = self.MAX_DEST_PROCESSED_PER_CYCLE_ADAPTIVE
+        # Move half way to the target to smooth out noisy cycles.
+        work_units = (self.work_units_per_cycle + target) // 2
+        self.work_units_per_cycle = max(
+            self.MIN_DEST_PROCESSED_PER_CYCLE,
+            min(work_units, self.MAX_DEST_PROCESSED_PER_CYCLE_ADAPTIVE))
+
     def _process_rtdest(self):
         LOG.debug('Processing RT NLRI destination...')
         if self._rtdest_queue.is_empty():
@@ -225,6 +254,10 @@ def compute_best_path(local_asn, path1, path2):
     best_path = None
     best_path_reason = BPR_UNKNOWN
 
+    # Paths sharing the same interned path attributes cannot be told apart
+    # by the steps which only look at the path attributes.
+    same_pattrs = path1.pathattr_set is path2.pathattr_set
+
     # Follow best path calculation algorithm steps.
     if best_path is None:
         best_path = _cmp_by_reachable_nh(path1, path2)
@@ -232,19 +265,19 @@ def compute_best_path(local_asn, path1, path2):
     if best_path is None:
         best_path = _cmp_by_highest_wg(path1, path2)
         best_path_reason = BPR_HIGHEST_WEIGHT
-    if best_path is None:
+    if best_path is None and not same_pattrs:
         best_path = _cmp_by_local_pref(path1, path2)
         best_path_reason = BPR_LOCAL_PREF
     if best_path is None:
         best_path = _cmp_by_local_origin(path1, path2)
         best_path_reason = BPR_LOCAL_ORIGIN
-    if best_path is None:
+    if best_path is None and not same_pattrs:
         best_path = _cmp_by_aspath(path1, path2)
         best_path_reason = BPR_ASPATH
-    if best_path is None:
+    if best_path is None and not same_pattrs:
         best_path = _cmp_by_origin(path1, path2)
         best_path_reason = BPR_ORIGIN
-    if best_path is None:
+    if best_path is None and not same_pattrs:
         best_path = _cmp_by_med(path1, path2)
         best_path_reason = BPR_MED
     if best_path is None:
@@ -265,6 +298,144 @@ def compute_best_path(local_asn, path1, path2):
     return best_path, best_path_reason
 
 
+# Reasons of the best path selection corresponding to the elements of
+# the keys returned by _best_path_key().
+_BEST_PATH_KEY_REASONS = (
+    BPR_LOCAL_PREF,
+    BPR_LOCAL_ORIGIN,
+    BPR_ASPATH,
+    BPR_ORIGIN,
+    BPR_MED,
+    BPR_ASN,
+    BPR_ROUTER_ID,
+    BPR_CLUSTER_LIST,
+)
+
+_ORIGIN_PREF = {
+    BGP_ATTR_ORIGIN_IGP: 3,
+    BGP_ATTR_ORIGIN_EGP: 2,
+    BGP_ATTR_ORIGIN_INCOMPLETE: 1,
+}
+
+
+def _pattrs_best_path_key(path):
+    """Returns the part of the best path selection key of *path* given by
+    its path attributes.
+
+    The key is cached in the shared path attributes of the path.
+    """
+    pattrs = path.pathattr_set
+    key = getattr(pattrs, 'best_path_key', None)
+    if key is not None:
+        return key
+
+    local_pref = pattrs.get(BGP_ATTR_TYPE_LOCAL_PREF)
+    as_path = pattrs[BGP_ATTR_TYPE_AS_PATH]
+    origin = pattrs[BGP_ATTR_TYPE_ORIGIN]
+    med = pattrs.get(BGP_ATTR_TYPE_MULTI_EXIT_DISC)
+    originator_id = pattrs.get(BGP_ATTR_TYPE_ORIGINATOR_ID)
+    cluster_list = pattrs.get(BGP_ATTR_TYPE_CLUSTER_LIST)
+    key = (
+        local_pref.value if local_pref else None,
+        as_path.get_as_path_len(),
+        -_ORIGIN_PREF.get(origin.value, 0),
+        med.value if med else 0,
+        originator_id.value if originator_id else None,
+        len(cluster_list.value) if cluster_list is not None else 0,
+    )
+    if hasattr(pattrs, 'best_path_key'):
+        pattrs.best_path_key = key
+    return key
+
+
+def _best_path_key(local_asn, path):
+    """Returns a tuple of which the lowest value is the best path.
+
+    Comparing the keys of two paths gives the same result as
+    compute_best_path(), given that either all or none of the compared
+    paths have LOCAL_PREF.
+    """
+    (local_pref, as_path_len, origin, med, originator_id,
+     cluster_list_len) = _pattrs_best_path_key(path)
+
+    source = path.source
+    if source is None:
+        # Locally originated paths are preferred at _cmp_by_local_origin()
+        # and all have the same router id.
+        is_ibgp = 1
+        router_id = 0
+    else:
+        is_ibgp = int(source.remote_as == local_asn)
+        router_id = 0
+        if is_ibgp:
+            from ryu.services.protocols.bgp.utils.bgp import from_inet_ptoi
+            router_id = from_inet_ptoi(
+                originator_id or
+                source.protocol.recv_open_msg.bgp_identifier)
+            if router_id is None:
+                raise ValueError('Invalid router id of %s' % source)
+
+    return (-local_pref if local_pref is not None else 0,
+            int(source is not None), as_path_len, origin, med,
+            is_ibgp, router_id, cluster_list_len)
+
+
+def select_best_path(local_asn, paths):
+    """Returns the best path among *paths* and the reason of the selection.
+
+    Same as folding *paths* with compute_best_path(), in which ties are
+    broken by keeping the earlier path, but each path is evaluated only
+    once into a key tuple and the best path is the lowest key.  Falls back
+    to compute_best_path() if the paths cannot be compared by keys, e.g.
+    only some of them have LOCAL_PREF.
+    """
+    if len(paths) == 1:
+        return paths[0], BPR_ONLY_PATH
+
+    try:
+        has_local_pref = [_pattrs_best_path_key(path)[0] is not None
+                          for path in paths]
+        if any(has_local_pref) and not all(has_local_pref):
+            raise ValueError('LOCAL_PREF is not comparable')
+        keys = [_best_path_key(local_asn, path) for path in paths]
+    except Exception as e:
+        LOG.debug('Falling back to pairwise best path computation: %s', e)
+        return _select_best_path_pairwise(local_asn, paths)
+
+    # min() returns the first one of the lowest keys.
+    best_index = min(range(len(paths)), key=keys.__getitem__)
+
+    # The reason is given by the last comparison of the pairwise
+    # computation, i.e. between the best of the former paths and the last
+    # path.
+    last_key = keys[-1]
+    former_best_key = min(keys[:-1])
+    reason = BPR_UNKNOWN
+    for index, former in enumerate(former_best_key):
+        if former != last_key[index]:
+            reason = _BEST_PATH_KEY_REASONS[index]
+            break
+
+    return paths[best_index], reason
+
+
+def _select_best_path_pairwise(local_asn, paths):
+    # We pick the first path as current best path. This helps in breaking
+    # tie between two new paths learned in one cycle for which best-path
+    # calculation steps lead to tie.
+    current_best_path = paths[0]
+    best_path_reason = BPR_ONLY_PATH
+    for next_path in paths[1:]:
+        # Compare next path with current best path.
+        new_best_path, reason = \
+            compute_best_path(local_asn, current_best_path, next_path)
+        best_path_reason = reason
+        if new_best_path is not None:
+            current_best_path = new_best_path
+
+    return current_best_path, best_path_reason
+
+
 def _cmp_by_reachable_nh(path1, path2):
     """Compares given paths and selects best path based on reachable next-hop.
 
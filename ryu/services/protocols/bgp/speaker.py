@@ -58,6 +58,9 @@ LOG = logging.getLogger('bgpspeaker.speaker')
 BGP_MIN_MSG_LEN = 19
 BGP_MAX_MSG_LEN = 4096
 
+# Size of the buffer the socket is read into at once.
+BGP_RECV_BUFF_SIZE = 65536
+
 # Keep-alive singleton.
 _KEEP_ALIVE = BGPKeepAlive()
 
@@ -102,7 +105,7 @@ class BgpProtocol(Protocol, Activity):
         Activity.__init__(self, name=activity_name)
         # Initialize instance variables.
         self._peer = None
-        self._recv_buff = b''
+        self._recv_buff = bytearray()
         self._socket = socket
         self._socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
         self._sendlock = semaphore.Semaphore()
@@ -290,12 +293,12 @@ class BgpProtocol(Protocol, Activity):
             raise exc
 
     @staticmethod
-    def parse_msg_header(buff):
+    def parse_msg_header(buff, offset=0):
         """Parses given `buff` into bgp message header format.
 
         Returns a tuple of marker, length, type of bgp message.
         """
-        return struct.unpack('!16sHB', buff)
+        return struct.unpack_from('!16sHB', buff, offset)
 
     def _data_received(self, next_bytes):
         """Maintains buffer of bytes received from peer and extracts bgp
@@ -308,17 +311,27 @@ class BgpProtocol(Protocol, Activity):
             - `next_bytes`: next set of bytes received from peer.
         """
         # Append buffer with received bytes.
-        self._recv_buff += next_bytes
-
+        buff = self._recv_buff
+        buff += next_bytes
+
+        # Messages are parsed at the offset `pos` and the parsed bytes are
+        # removed from the buffer at once when we return, so that every
+        # message does not cost a copy of the rest of the buffer.
+        pos = self._parse_msgs(buff)
+        if pos:
+            del buff[:pos]
+
+    def _parse_msgs(self, buff):
+        pos = 0
+        buff_len = len(buff)
         while True:
             # If current buffer size is less then minimum bgp message size, we
             # return as we do not have a complete bgp message to work with.
-            if len(self._recv_buff) < BGP_MIN_MSG_LEN:
-                return
+            if buff_len - pos < BGP_MIN_MSG_LEN:
+                return pos
 
             # Parse message header into elements.
-            auth, length, ptype = BgpProtocol.parse_msg_header(
-                self._recv_buff[:BGP_MIN_MSG_LEN])
+            auth, length, ptype = BgpProtocol.parse_msg_header(buff, pos)
 
             # Check if we have valid bgp message marker.
             # We should get default marker since we are not supporting any
@@ -348,10 +361,10 @@ class BgpProtocol(Protocol, Activity):
                 raise bgp.BadLen(ptype, length)
 
             # If we have partial message we wait for rest of the message.
-            if len(self._recv_buff) < length:
-                return
-            msg, _, rest = BGPMessage.parser(self._recv_buff)
-            self._recv_buff = rest
+            if buff_len - pos < length:
+                return pos
+            msg, _, _ = BGPMessage.parser(bytes(buff[pos:pos + length]))
+            pos += length
 
             # If we have a valid bgp message we call message handler.
             self._handle_msg(msg)
@@ -551,15 +564,16 @@ class BgpProtocol(Protocol, Activity):
         """Sits in tight loop collecting data received from peer and
         processing it.
         """
-        required_len = BGP_MIN_MSG_LEN
+        buff = bytearray(BGP_RECV_BUFF_SIZE)
+        view = memoryview(buff)
         conn_lost_reason = "Connection lost as protocol is no longer active"
         try:
             while True:
-                next_bytes = self._socket.recv(required_len)
-                if len(next_bytes) == 0:
+                recv_len = self._socket.recv_into(buff)
+                if recv_len == 0:
                     conn_lost_reason = 'Peer closed connection'
                     break
-                self.data_received(next_bytes)
+                self.data_received(view[:recv_len])
         except socket.error as err:
             conn_lost_reason = 'Connection to peer lost: %s.' % err
         except bgp.BgpExc as ex:
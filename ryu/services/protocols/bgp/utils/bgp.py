@@ -82,11 +82,13 @@ _ROUTE_FAMILY_TO_PATH_MAP = {RF_IPv4_UC: Ipv4Path,
                              RF_RTC_UC: RtcPath}
 
 
-def create_path(src_peer, nlri, **kwargs):
+def create_path(src_peer, nlri, src_ver_num=None, **kwargs):
     route_family = nlri.ROUTE_FAMILY
     assert route_family in _ROUTE_FAMILY_TO_PATH_MAP.keys()
     path_cls = _ROUTE_FAMILY_TO_PATH_MAP.get(route_family)
-    return path_cls(src_peer, nlri, src_peer.version_num, **kwargs)
+    if src_ver_num is None:
+        src_ver_num = src_peer.version_num
+    return path_cls(src_peer, nlri, src_ver_num, **kwargs)
 
 
 def clone_path_and_update_med_for_target_neighbor(path, med):
@@ -119,7 +121,7 @@ def clone_rtcpath_update_rt_as(path, new_rt_as):
     old_nlri = path.nlri
     new_rt_nlri = RouteTargetMembershipNLRI(new_rt_as, old_nlri.route_target)
     return RtcPath(path.source, new_rt_nlri, path.source_version_num,
-                   pattrs=path.pathattr_map, nexthop=path.nexthop,
+                   pattrs=path.pathattr_set, nexthop=path.nexthop,
                    is_withdraw=path.is_withdraw)
 
 
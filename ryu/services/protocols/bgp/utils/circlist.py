@@ -132,6 +132,14 @@ class CircularListType(object):
             self.remove(node)
             return node
 
+        def peek_first(self):
+            """Return the first item in the list without removing it."""
+            node = self.list_type.node_next(self.head)
+            if(node is self.head):
+                return None
+
+            return node
+
         def generator(self):
             """Enables iteration over the list.
 
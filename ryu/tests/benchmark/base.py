@@ -0,0 +1,94 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers shared by the offline benchmarks in this package.
+
+Every benchmark is a plain script which can be run with e.g.::
+
+    $ python -m ryu.tests.benchmark.bench_memory
+
+and prints its results as one JSON object per line, so that the numbers
+can be collected and compared between revisions.
+"""
+
+from __future__ import division
+
+import json
+import struct
+import sys
+import time
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+def report(name, results, out=None):
+    """Print the results of a benchmark as a JSON line."""
+    out = out or sys.stdout
+    d = {'benchmark': name}
+    d.update(results)
+    out.write(json.dumps(d, sort_keys=True) + '\n')
+    out.flush()
+
+
+def percentile(values, pct):
+    """Returns the pct-th percentile of values (nearest rank)."""
+    if not values:
+        return 0
+    values = sorted(values)
+    idx = int(round(pct / 100 * (len(values) - 1)))
+    return values[idx]
+
+
+def timeit(func, count):
+    """Calls func(i) count times and returns the elapsed seconds."""
+    start = time.time()
+    for i in range(count):
+        func(i)
+    return time.time() - start
+
+
+def rss_kb():
+    """Returns the resident set size of this process in KiB.
+
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def packet_in_buf(data, in_port=1, buffer_id=ofproto_v1_3.OFP_NO_BUFFER,
+                  reason=ofproto_v1_3.OFPR_NO_MATCH, xid=0):
+    """Encodes an OpenFlow 1.3 Packet-In message carrying data."""
+    match_buf = bytearray()
+    ofproto_v1_3_parser.OFPMatch(in_port=in_port).serialize(match_buf, 0)
+    buf = bytearray(ofproto_v1_3.OFP_PACKET_IN_SIZE -
+                    ofproto_v1_3.OFP_MATCH_SIZE)
+    struct.pack_into(ofproto_v1_3.OFP_PACKET_IN_PACK_STR, buf,
+                     ofproto_v1_3.OFP_HEADER_SIZE,
+                     buffer_id, len(data), reason, 0, 0)
+    buf += match_buf + b'\x00' * 2 + data
+    struct.pack_into(ofproto_v1_3.OFP_HEADER_PACK_STR, buf, 0,
+                     ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_PACKET_IN,
+                     len(buf), xid)
+    return bytes(buf)
@@ -0,0 +1,337 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Convergence and throughput benchmark of BGPSpeaker with fake peers.
+
+A BGPSpeaker listening on the loopback address is connected to N fake
+eBGP peers, which run as greenthreads in the same process and speak BGP
+over TCP from 127.0.0.2, 127.0.0.3 and so on.  The first --sources
+peers announce a route feed, split between them, and then withdraw it.
+The feed is either synthetic or taken from the IPv4 unicast RIB records
+of an MRT TABLE_DUMP_V2 file.
+
+For both phases the benchmark reports the time until the speaker has
+selected the best paths of the whole feed and until every fake peer has
+received it (time-to-converge), the Update messages per second received
+and sent by the speaker, and the RSS growth of the process.  The fake
+peers share the CPU with the speaker, so the numbers include the cost
+of encoding and parsing the messages on their side.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_bgp_convergence \\
+        [--peers N] [--sources N] [--prefixes N] [--attrs N] [--mrt FILE]
+
+Only one speaker can run per process, hence one scenario per run.
+"""
+
+from __future__ import division
+
+from ryu.lib import hub
+hub.patch()
+
+import argparse  # noqa: E402
+import logging  # noqa: E402
+import os  # noqa: E402
+import socket  # noqa: E402
+import struct  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+from ryu.lib import mrtlib  # noqa: E402
+from ryu.lib.packet import bgp  # noqa: E402
+from ryu.services.protocols.bgp import mrt  # noqa: E402
+from ryu.services.protocols.bgp.bgpspeaker import BGPSpeaker  # noqa
+from ryu.services.protocols.bgp.peer import pack_updates  # noqa: E402
+from ryu.services.protocols.bgp.speaker import BGP_MIN_MSG_LEN  # noqa
+from ryu.tests.benchmark import base  # noqa: E402
+
+
+LOCAL_AS = 64512
+PEER_AS = 65001
+HOLD_TIME = 90
+
+# Path attributes of the MRT feed which are sent as they are.
+_MRT_ATTRS = (
+    bgp.BGP_ATTR_TYPE_ORIGIN,
+    bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC,
+    bgp.BGP_ATTR_TYPE_ATOMIC_AGGREGATE,
+    bgp.BGP_ATTR_TYPE_COMMUNITIES,
+    bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES,
+)
+
+
+def synthetic_feed(prefixes, attrs):
+    """Returns a feed of `prefixes` /24 prefixes sharing `attrs` AS paths.
+
+    The feed is a list of (nlri, as_path, path attributes other than
+    AS_PATH and NEXT_HOP).
+    """
+    origin = bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP)
+    feed = []
+    for i in range(prefixes):
+        nlri = bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            1 + (i >> 16) % 223, (i >> 8) & 0xff, i & 0xff))
+        as_path = [65100 + i % attrs, 65200 + i % attrs]
+        feed.append((nlri, as_path, [origin]))
+    return feed
+
+
+def mrt_feed(filename, limit=None):
+    """Returns the feed of the best (first) entry of each IPv4 unicast
+    prefix of a TABLE_DUMP_V2 file, see synthetic_feed()."""
+    feed = []
+    with mrt.open_file(filename) as f:
+        records = mrtlib.iter_records(
+            f, types=[mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2])
+        for record in records:
+            message = record.message
+            if not isinstance(message,
+                              mrtlib.TableDump2RibIPv4UnicastMrtMessage):
+                continue
+            as_path = []
+            attrs = []
+            for attr in message.rib_entries[0].bgp_attributes:
+                if attr.type == bgp.BGP_ATTR_TYPE_AS_PATH:
+                    # AS_SETs are flattened, they do not matter here.
+                    for seg in attr.path_seg_list:
+                        as_path.extend(seg)
+                elif attr.type in _MRT_ATTRS:
+                    attrs.append(attr)
+            feed.append((message.prefix, as_path, attrs))
+            if limit and len(feed) >= limit:
+                break
+    return feed
+
+
+class FakePeer(object):
+    """eBGP peer of the speaker connecting from its own loopback address.
+
+    Announces its part of the feed and keeps the set of the prefixes
+    received from the speaker.
+    """
+
+    def __init__(self, index, port):
+        self.address = '127.0.0.%d' % (index + 2)
+        self.asn = PEER_AS + index
+        self.port = port
+        self.feed = []
+        self.prefixes = set()
+        self.updates_received = 0
+        self.established = hub.Event()
+        self._socket = None
+
+    def connect(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind((self.address, 0))
+        self._socket.connect(('127.0.0.1', self.port))
+        opt_param = [
+            bgp.BGPOptParamCapabilityMultiprotocol(afi=1, safi=1),
+            bgp.BGPOptParamCapabilityFourOctetAsNumber(self.asn),
+        ]
+        self._send([bgp.BGPOpen(my_as=bgp.AS_TRANS, hold_time=HOLD_TIME,
+                                bgp_identifier=self.address,
+                                opt_param=opt_param)])
+        hub.spawn(self._recv_loop)
+        hub.spawn(self._keepalive_loop)
+
+    def close(self):
+        self._socket.close()
+
+    def _send(self, msgs):
+        self._socket.sendall(b''.join(bytes(m.serialize()) for m in msgs))
+
+    def _recv_msgs(self):
+        buf = bytearray()
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except socket.error:
+                return
+            if not data:
+                return
+            buf += data
+            while len(buf) >= BGP_MIN_MSG_LEN:
+                (length,) = struct.unpack_from('!H', buf, 16)
+                if len(buf) < length:
+                    break
+                msg, _, _ = bgp.BGPMessage.parser(bytes(buf[:length]))
+                del buf[:length]
+                yield msg
+
+    def _recv_loop(self):
+        for msg in self._recv_msgs():
+            if msg.type == bgp.BGP_MSG_OPEN:
+                self._send([bgp.BGPKeepAlive()])
+            elif msg.type == bgp.BGP_MSG_KEEPALIVE:
+                self.established.set()
+            elif msg.type == bgp.BGP_MSG_UPDATE:
+                self.updates_received += 1
+                for nlri in msg.nlri:
+                    self.prefixes.add(nlri.prefix)
+                for nlri in msg.withdrawn_routes:
+                    self.prefixes.discard(nlri.prefix)
+
+    def _keepalive_loop(self):
+        while True:
+            hub.sleep(HOLD_TIME // 3)
+            self._send([bgp.BGPKeepAlive()])
+
+    def build_updates(self, withdraw=False):
+        """Returns the packed Update messages of the feed of this peer."""
+        if withdraw:
+            return pack_updates([bgp.BGPUpdate(withdrawn_routes=[nlri])
+                                 for nlri, _, _ in self.feed])
+        next_hop = bgp.BGPPathAttributeNextHop(self.address)
+        updates = []
+        for nlri, as_path, attrs in self.feed:
+            as_path = bgp.BGPPathAttributeAsPath(
+                [[self.asn] + as_path], as_pack_str='!I')
+            updates.append(bgp.BGPUpdate(
+                path_attributes=[as_path, next_hop] + attrs, nlri=[nlri]))
+        return pack_updates(updates)
+
+    def send_updates(self, updates, burst):
+        for i in range(0, len(updates), burst):
+            self._send(updates[i:i + burst])
+            hub.sleep(0)
+
+
+class _BestPathCounter(object):
+    def __init__(self):
+        self.learned = 0
+        self.withdrawn = 0
+
+    def __call__(self, event):
+        if event.is_withdraw:
+            self.withdrawn += 1
+        else:
+            self.learned += 1
+
+
+def _wait(cond, timeout):
+    start = time.time()
+    while not cond():
+        if time.time() - start > timeout:
+            raise RuntimeError('Not converged in %d seconds' % timeout)
+        hub.sleep(0.01)
+    return time.time()
+
+
+def run_phase(name, speaker_cond, peers, sources, expected, burst,
+              timeout, withdraw=False):
+    """Sends the Update messages of the sources and waits until the
+    speaker satisfies speaker_cond and each peer has the expected number
+    of prefixes."""
+    prefixes = sum(len(p.feed) for p in sources)
+    updates = [p.build_updates(withdraw) for p in sources]
+    updates_in = sum(len(u) for u in updates)
+    received = sum(p.updates_received for p in peers)
+    rss = base.rss_kb()
+
+    start = time.time()
+    threads = [hub.spawn(p.send_updates, u, burst)
+               for p, u in zip(sources, updates)]
+    hub.joinall(threads)
+    learned = _wait(speaker_cond, timeout)
+    converged = _wait(
+        lambda: all(len(p.prefixes) == n for p, n in zip(peers, expected)),
+        timeout)
+
+    updates_out = sum(p.updates_received for p in peers) - received
+    learn_secs = learned - start
+    converge_secs = converged - start
+    return {
+        'phase': name,
+        'updates_in': updates_in,
+        'updates_out': updates_out,
+        'learn_secs': learn_secs,
+        'converge_secs': converge_secs,
+        'prefixes_per_sec': prefixes / converge_secs if converge_secs else 0,
+        'updates_in_per_sec': updates_in / learn_secs if learn_secs else 0,
+        'updates_out_per_sec':
+            updates_out / converge_secs if converge_secs else 0,
+        'rss_growth_kb': base.rss_kb() - rss,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ryu.tests.benchmark.bench_bgp_convergence')
+    parser.add_argument('--peers', type=int, default=4,
+                        help='number of fake peers')
+    parser.add_argument('--sources', type=int, default=1,
+                        help='number of fake peers announcing the feed')
+    parser.add_argument('--prefixes', type=int, default=100000,
+                        help='number of prefixes of the synthetic feed, '
+                        'or maximum number of prefixes of the MRT feed')
+    parser.add_argument('--attrs', type=int, default=100,
+                        help='number of path attribute sets of the '
+                        'synthetic feed')
+    parser.add_argument('--mrt', help='MRT TABLE_DUMP_V2 file of the feed')
+    parser.add_argument('--burst', type=int, default=100,
+                        help='number of Update messages sent at once')
+    parser.add_argument('--port', type=int, default=11179)
+    parser.add_argument('--timeout', type=int, default=600)
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.mrt:
+        feed = mrt_feed(args.mrt, args.prefixes)
+    else:
+        feed = synthetic_feed(args.prefixes, args.attrs)
+
+    counter = _BestPathCounter()
+    rss = base.rss_kb()
+    speaker = BGPSpeaker(as_number=LOCAL_AS, router_id='127.0.0.1',
+                         bgp_server_port=args.port,
+                         best_path_change_handler=counter)
+    peers = [FakePeer(i, args.port) for i in range(args.peers)]
+    sources = peers[:args.sources]
+    for i, p in enumerate(sources):
+        p.feed = feed[i::len(sources)]
+    for p in peers:
+        speaker.neighbor_add(p.address, p.asn, connect_mode='passive')
+        p.connect()
+    for p in peers:
+        p.established.wait(args.timeout)
+
+    results = {
+        'feed': os.path.basename(args.mrt) if args.mrt else 'synthetic',
+        'prefixes': len(feed),
+        'peers': args.peers,
+        'sources': args.sources,
+    }
+    announce = run_phase(
+        'announce', lambda: counter.learned >= len(feed), peers, sources,
+        [len(feed) - len(p.feed) for p in peers], args.burst, args.timeout)
+    announce['rss_kb'] = base.rss_kb() - rss
+    announce.update(results)
+    base.report('bgp_convergence', announce)
+
+    withdraw = run_phase(
+        'withdraw', lambda: counter.withdrawn >= len(feed), peers, sources,
+        [0] * len(peers), args.burst, args.timeout, withdraw=True)
+    withdraw.update(results)
+    base.report('bgp_convergence', withdraw)
+
+    for p in peers:
+        p.close()
+    speaker.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Receive path benchmark of BgpProtocol which replays an MRT dump.
+
+The BGP messages of the BGP4MP records in the MRT file are serialized
+into a single byte stream, which is handed to
+BgpProtocol.data_received() in chunks of the given sizes, in the same
+way as BgpProtocol._recv_loop() does.  The parsed messages are counted
+but not processed by any peer.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_bgp_recv \\
+        [--mrt FILE] [--repeat N] [--chunk SIZE ...]
+
+Without --mrt, the update dump in ryu/tests/packet_data/mrt is used.
+Files ending with .bz2 or .gz are decompressed on the fly.
+"""
+
+from __future__ import division
+
+import argparse
+import bz2
+import gzip
+import os
+import sys
+import time
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from ryu.lib import mrtlib
+from ryu.services.protocols.bgp import speaker
+from ryu.tests.benchmark import base
+
+
+DEFAULT_MRT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '../packet_data/mrt/updates.20161101.0000.bz2')
+
+DEFAULT_CHUNKS = [speaker.BGP_MIN_MSG_LEN, 4096, speaker.BGP_RECV_BUFF_SIZE]
+
+
+def _open(path):
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(path, 'rb')
+    elif path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def read_stream(path):
+    """Returns the BGP messages in the MRT file as a byte stream."""
+    bufs = []
+    for record in mrtlib.Reader(_open(path)):
+        bgp_message = getattr(record.message, 'bgp_message', None)
+        if bgp_message is not None:
+            bufs.append(bytes(bgp_message.serialize()))
+    return b''.join(bufs), len(bufs)
+
+
+@mock.patch.object(
+    speaker.BgpProtocol, '__init__', mock.MagicMock(return_value=None))
+def create_protocol():
+    protocol = speaker.BgpProtocol(None, None)
+    protocol._recv_buff = bytearray()
+    protocol.received = 0
+
+    def _handle_msg(msg):
+        protocol.received += 1
+
+    protocol._handle_msg = _handle_msg
+    return protocol
+
+
+def replay(stream, chunk_size, repeat=1):
+    """Feeds stream in chunk_size bytes repeat times."""
+    protocol = create_protocol()
+    view = memoryview(stream)
+    length = len(stream)
+
+    start = time.time()
+    for _ in range(repeat):
+        for i in range(0, length, chunk_size):
+            protocol.data_received(view[i:i + chunk_size])
+    elapsed = time.time() - start
+
+    return elapsed, protocol.received
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ryu.tests.benchmark.bench_bgp_recv')
+    parser.add_argument('--mrt', default=DEFAULT_MRT,
+                        help='MRT file to replay')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='number of times the messages are replayed')
+    parser.add_argument('--chunk', type=int, action='append',
+                        help='size of the received chunks')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    stream, count = read_stream(args.mrt)
+    for chunk_size in args.chunk or DEFAULT_CHUNKS:
+        elapsed, received = replay(stream, chunk_size, args.repeat)
+        base.report('bgp_recv', {
+            'mrt': os.path.basename(args.mrt),
+            'chunk': chunk_size,
+            'msgs': received,
+            'bytes': len(stream) * args.repeat,
+            'secs': elapsed,
+            'msgs_per_sec': received / elapsed if elapsed else 0,
+            'mbytes_per_sec':
+                len(stream) * args.repeat / elapsed / 1e6 if elapsed else 0,
+        })
+
+
+if __name__ == '__main__':
+    main()
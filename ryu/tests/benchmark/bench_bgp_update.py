@@ -0,0 +1,193 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Convergence benchmark for the outgoing BGP Update messages of a Peer.
+
+A full table of IPv4 paths, sharing a small number of path attribute
+sets, is sent by Peer._send_outgoing_routes() to a fake peer, which
+is the other end of a socket pair and parses the received messages.
+The benchmark measures the time until the fake peer has received all
+the prefixes, with and without packing several prefixes per Update
+message.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_bgp_update [prefixes] [attrs]
+"""
+
+from __future__ import division
+
+from collections import OrderedDict
+import socket
+import sys
+import threading
+import time
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import constants as const
+from ryu.services.protocols.bgp import core_manager
+from ryu.services.protocols.bgp import peer
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.model import OutgoingRoute
+from ryu.services.protocols.bgp.rtconf.common import CommonConf
+from ryu.services.protocols.bgp.rtconf.neighbors import NeighborConf
+from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
+from ryu.services.protocols.bgp.speaker import BGP_MIN_MSG_LEN
+from ryu.tests.benchmark import base
+
+
+class _TableManager(object):
+    def remember_sent_route(self, sent_route):
+        pass
+
+
+class _CoreService(object):
+    table_manager = _TableManager()
+
+
+class FakeProtocol(object):
+    """Stands for BgpProtocol of an established session."""
+
+    def __init__(self, sock):
+        self._socket = sock
+
+    def send(self, msg):
+        self._socket.sendall(msg.serialize())
+
+    @staticmethod
+    def is_four_octet_as_number_cap_valid():
+        return True
+
+    @staticmethod
+    def is_mbgp_cap_valid(route_family):
+        return True
+
+
+class FakePeer(threading.Thread):
+    """Receives and parses Update messages until count prefixes arrive."""
+
+    def __init__(self, sock, count):
+        super(FakePeer, self).__init__()
+        self.daemon = True
+        self._socket = sock
+        self.count = count
+        self.prefixes = 0
+        self.msgs = 0
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            self._recv()
+        finally:
+            self.done.set()
+
+    def _recv(self):
+        buf = b''
+        while self.prefixes < self.count:
+            data = self._socket.recv(65536)
+            if not data:
+                break
+            buf += data
+            while len(buf) >= BGP_MIN_MSG_LEN:
+                msg_len = int.from_bytes(buf[16:18], 'big')
+                if len(buf) < msg_len:
+                    break
+                msg, _, _ = bgp.BGPMessage.parser(buf[:msg_len])
+                buf = buf[msg_len:]
+                self.msgs += 1
+                self.prefixes += len(msg.nlri)
+
+
+def create_peer(sock):
+    common_conf = CommonConf(local_as=65000, router_id='10.0.0.1')
+    # NeighborConf refers to the global configuration of the running
+    # core manager, which is not started here.
+    with mock.patch.object(core_manager._CoreManager, 'common_conf',
+                           new_callable=mock.PropertyMock,
+                           return_value=common_conf):
+        neigh_conf = NeighborConf(ip_address='10.0.0.2', remote_as=65001)
+    p = peer.Peer(common_conf, neigh_conf, _CoreService(), BgpSignalBus(),
+                  None)
+    p._host_bind_ip = '10.0.0.1'
+    p._protocol = FakeProtocol(sock)
+    p.state.bgp_state = const.BGP_FSM_ESTABLISHED
+    return p
+
+
+def create_routes(count, attrs_count):
+    pattrs_list = []
+    for i in range(attrs_count):
+        pattrs = OrderedDict()
+        pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+            bgp.BGP_ATTR_ORIGIN_IGP)
+        pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+            [[65100, 65200 + i]])
+        pattrs_list.append(pattrs)
+
+    routes = []
+    for i in range(count):
+        nlri = bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            1 + (i >> 16) % 223, (i >> 8) & 0xff, i & 0xff))
+        path = Ipv4Path(None, nlri, 0,
+                        pattrs=pattrs_list[i % attrs_count],
+                        nexthop='192.168.0.1')
+        routes.append(OutgoingRoute(path))
+    return routes
+
+
+def bench_send(count, attrs_count, packing):
+    sock, peer_sock = socket.socketpair()
+    p = create_peer(sock)
+    routes = create_routes(count, attrs_count)
+    fake_peer = FakePeer(peer_sock, count)
+    fake_peer.start()
+
+    start = time.time()
+    if packing:
+        for i in range(0, count, peer.MAX_ROUTES_PER_PACKING):
+            p._send_outgoing_routes(
+                routes[i:i + peer.MAX_ROUTES_PER_PACKING])
+    else:
+        for route in routes:
+            p._send_outgoing_route(route)
+    fake_peer.done.wait()
+    elapsed = time.time() - start
+
+    sock.close()
+    peer_sock.close()
+    base.report('bgp_update', {'prefixes': count,
+                               'attrs': attrs_count,
+                               'packing': packing,
+                               'msgs': fake_peer.msgs,
+                               'received': fake_peer.prefixes,
+                               'secs': elapsed,
+                               'prefixes_per_sec': count / elapsed})
+
+
+def main(args=None):
+    args = sys.argv[1:] if args is None else args
+    count = int(args[0]) if args else 100000
+    attrs_count = int(args[1]) if len(args) > 1 else 100
+    bench_send(count, attrs_count, packing=False)
+    bench_send(count, attrs_count, packing=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+BMP export benchmark of BMPClient with ryu.app.bmpstation as collector.
+
+Route changes of fake peers are fed to BMPClient.on_adj_rib_in_changed()
+in bursts, in the same way as the BGP core does, while a BMPStation
+listening on the loopback address receives and logs the BMP messages
+(into os.devnull).  The benchmark reports the time spent by the core to
+hand the changes over, the time until the collector has received all the
+sent messages, and the counters of the BMP queue.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_bmp \\
+        [--changes N] [--prefixes N] [--queue-size N] [--batch SIZE ...]
+"""
+
+from __future__ import division
+
+import argparse
+import os
+import sys
+import time
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from ryu.lib import hub
+hub.patch()
+
+from collections import OrderedDict  # noqa: E402
+
+from ryu.lib.packet import bgp  # noqa: E402
+from ryu.services.protocols.bgp import bmp  # noqa: E402
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path  # noqa
+from ryu.services.protocols.bgp.model import ReceivedRoute  # noqa: E402
+from ryu.tests.benchmark import base  # noqa: E402
+
+
+DEFAULT_BATCHES = [1, bmp.BMP_BATCH_SIZE]
+
+
+class CountingFile(object):
+    """Stands for the output file of BMPStation and counts the messages."""
+
+    def __init__(self):
+        self.count = 0
+
+    def write(self, buf):
+        self.count += 1
+
+    def flush(self):
+        pass
+
+
+class FakePeer(object):
+    version_num = 1
+
+    def __init__(self, i):
+        self.ip_address = '10.0.%d.%d' % (i >> 8 & 0xff, i & 0xff)
+        self._neigh_conf = mock.MagicMock(remote_as=65001 + i)
+        self.protocol = mock.MagicMock(_remotename=(self.ip_address, 179))
+        self.protocol.recv_open_msg.bgp_identifier = self.ip_address
+
+    @staticmethod
+    def is_mpbgp_cap_valid(route_family):
+        return False
+
+
+def start_station(port):
+    os.environ['RYU_BMP_SERVER_HOST'] = '127.0.0.1'
+    os.environ['RYU_BMP_SERVER_PORT'] = str(port)
+    os.environ['RYU_BMP_OUTPUT_FILE'] = os.devnull
+    os.environ['RYU_BMP_FAILED_DUMP'] = os.devnull
+    # Imported here since it requires the configuration of ryu-manager.
+    from ryu.app import bmpstation
+    station = bmpstation.BMPStation()
+    station.output_fd = CountingFile()
+    hub.spawn(hub.StreamServer(('127.0.0.1', port),
+                               station.loop).serve_forever)
+    return station
+
+
+def create_routes(peers, prefixes, changes):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [[65001, 65002]])
+    routes = []
+    for i in range(changes):
+        peer = peers[i % len(peers)]
+        j = i // len(peers) % prefixes
+        nlri = bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            1 + (j >> 16) % 223, (j >> 8) & 0xff, j & 0xff))
+        path = Ipv4Path(peer, nlri, 1, pattrs=pattrs,
+                        nexthop=peer.ip_address)
+        routes.append((peer, ReceivedRoute(path, peer)))
+    return routes
+
+
+def bench_export(station, port, routes, queue_size, batch_size, burst):
+    core_service = mock.MagicMock()
+    core_service.peer_manager.iterpeers = []
+    client = bmp.BMPClient(core_service, '127.0.0.1', port,
+                           queue_size=queue_size, batch_size=batch_size)
+    thread = hub.spawn(client.start)
+    while client._sender is None:
+        hub.sleep(0.01)
+    # The initiation message
+    while station.output_fd.count < 1:
+        hub.sleep(0.01)
+    station.output_fd.count = 0
+    initial_sent = client.counters[bmp.BMP_SENT]
+
+    start = time.time()
+    core_secs = 0
+    for i in range(0, len(routes), burst):
+        t = time.time()
+        for peer, route in routes[i:i + burst]:
+            client.on_adj_rib_in_changed(
+                {'peer': peer, 'received_route': route})
+        core_secs += time.time() - t
+        # Lets the other threads run between the bursts.
+        hub.sleep(0)
+    while client._queue or station.output_fd.count < (
+            client.counters[bmp.BMP_SENT] - initial_sent):
+        hub.sleep(0.001)
+    elapsed = time.time() - start
+
+    stats = client.get_stats()
+    client.stop()
+    hub.joinall([thread])
+    base.report('bmp_export', {
+        'changes': len(routes),
+        'queue_size': queue_size,
+        'batch': batch_size,
+        'queued': stats[bmp.BMP_QUEUED],
+        'coalesced': stats[bmp.BMP_COALESCED],
+        'dropped': stats[bmp.BMP_DROPPED],
+        'sent': stats[bmp.BMP_SENT],
+        'writes': stats[bmp.BMP_WRITES],
+        'received': station.output_fd.count,
+        'core_usec_per_change': core_secs / len(routes) * 1e6,
+        'secs': elapsed,
+        'msgs_per_sec': station.output_fd.count / elapsed,
+    })
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ryu.tests.benchmark.bench_bmp')
+    parser.add_argument('--changes', type=int, default=100000,
+                        help='number of route changes')
+    parser.add_argument('--prefixes', type=int, default=20000,
+                        help='number of prefixes per peer')
+    parser.add_argument('--peers', type=int, default=4)
+    parser.add_argument('--burst', type=int, default=1000,
+                        help='number of route changes per burst')
+    parser.add_argument('--queue-size', type=int,
+                        default=bmp.BMP_QUEUE_SIZE)
+    parser.add_argument('--batch', type=int, action='append',
+                        help='number of messages per socket write')
+    parser.add_argument('--port', type=int, default=11019)
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    station = start_station(args.port)
+    peers = [FakePeer(i) for i in range(args.peers)]
+    routes = create_routes(peers, args.prefixes, args.changes)
+    for batch_size in args.batch or DEFAULT_BATCHES:
+        bench_export(station, args.port, routes, args.queue_size,
+                     batch_size, args.burst)
+
+
+if __name__ == '__main__':
+    main()
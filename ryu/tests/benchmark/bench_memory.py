@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memory and allocation benchmark for the objects created on the hot paths.
+
+Measures the memory retained and the number of allocated blocks per
+parsed Packet-In (OFPPacketIn + ethernet/arp headers) and per Link stored
+in ryu.topology.switches.LinkState.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_memory [count]
+
+Requires Python 3 (tracemalloc).
+"""
+
+from __future__ import division
+
+import gc
+import sys
+import tracemalloc
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.topology import switches
+from ryu.tests.benchmark import base
+
+
+class _OFPPort(object):
+    def __init__(self, port_no):
+        self.port_no = port_no
+        self.hw_addr = '00:00:00:00:00:%02x' % (port_no & 0xff)
+        self.name = b'eth%d' % port_no
+        self.config = 0
+        self.state = 0
+
+
+def _measure(func, count):
+    gc.collect()
+    tracemalloc.start()
+    snap1 = tracemalloc.take_snapshot()
+    keep = [func(i) for i in range(count)]
+    snap2 = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snap2.compare_to(snap1, 'filename')
+    size = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    del keep
+    return size / count, blocks / count
+
+
+def bench_packet_in(count):
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(ethertype=0x0806))
+    pkt.add_protocol(arp.arp_ip(arp.ARP_REQUEST,
+                                '00:00:00:00:00:01', '10.0.0.1',
+                                '00:00:00:00:00:00', '10.0.0.2'))
+    pkt.serialize()
+    buf = base.packet_in_buf(bytes(pkt.data))
+
+    def _parse(i):
+        msg = ofproto_v1_3_parser.OFPPacketIn.parser(
+            None, ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_PACKET_IN,
+            len(buf), i, buf)
+        return msg, packet.Packet(msg.data)
+
+    size, blocks = _measure(_parse, count)
+    elapsed = base.timeit(_parse, count)
+    base.report('packet_in', {'count': count,
+                              'bytes_per_msg': size,
+                              'blocks_per_msg': blocks,
+                              'msgs_per_sec': count / elapsed})
+
+
+def bench_link_state(count):
+    links = switches.LinkState()
+    ports = [switches.Port(dpid, ofproto_v1_3, _OFPPort(1))
+             for dpid in range(count + 1)]
+
+    def _add(i):
+        links.update_link(ports[i], ports[i + 1])
+
+    size, blocks = _measure(_add, count)
+    base.report('link_state', {'count': count,
+                               'bytes_per_link': size,
+                               'blocks_per_link': blocks})
+
+
+def main(args=None):
+    args = sys.argv[1:] if args is None else args
+    count = int(args[0]) if args else 10000
+    bench_packet_in(count)
+    bench_link_state(count)
+
+
+if __name__ == '__main__':
+    main()
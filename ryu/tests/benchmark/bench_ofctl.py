@@ -0,0 +1,123 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Flow entry conversion benchmark of ryu.lib.ofctl_v1_3.mod_flow_entry().
+
+A rule set like the ones of the REST applications, in which the flow
+entries of the same match and actions differ only in their cookies and
+priorities, is converted to flow mods and serialized, with and without
+the cache of the converted match and actions.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_ofctl \\
+        [--rules N] [--distinct N] [--cache-size N ...]
+"""
+
+from __future__ import division
+
+import argparse
+import sys
+import time
+
+from ryu.lib import ofctl_utils
+from ryu.lib import ofctl_v1_3
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.tests.benchmark import base
+
+
+DEFAULT_CACHE_SIZES = [0, ofctl_v1_3.MATCH_CACHE_SIZE]
+
+
+class FakeDatapath(object):
+    """Serializes the sent messages without sending them."""
+
+    ofproto = ofproto_v1_3
+    ofproto_parser = ofproto_v1_3_parser
+
+    def __init__(self):
+        self.id = 1
+        self.xid = 0
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def send_msg(self, msg):
+        msg.serialize()
+
+
+def create_rules(count, distinct):
+    rules = []
+    for i in range(count):
+        j = i % distinct
+        match = {'in_port': j % 48 + 1,
+                 'dl_type': 2048,
+                 'nw_src': '10.%d.%d.0/24' % ((j >> 8) & 0xff, j & 0xff),
+                 'nw_dst': '192.168.0.%d' % (j % 254 + 1),
+                 'nw_proto': 6,
+                 'tp_dst': 80 + j % 16}
+        actions = [{'type': 'SET_FIELD', 'field': 'ip_dscp',
+                    'value': j % 64},
+                   {'type': 'OUTPUT', 'port': j % 48 + 1},
+                   {'type': 'GOTO_TABLE', 'table_id': 1}]
+        rules.append({'cookie': i, 'priority': i % 65535 + 1,
+                      'match': match, 'actions': actions})
+    return rules
+
+
+def bench_mod_flow_entry(rules, distinct, cache_size):
+    dp = FakeDatapath()
+    cmd = ofproto_v1_3.OFPFC_ADD
+    ofctl_v1_3._match_cache = ofctl_utils.LRUCache(cache_size)
+    ofctl_v1_3._actions_cache = ofctl_utils.LRUCache(cache_size)
+
+    start = time.time()
+    for rule in rules:
+        ofctl_v1_3.mod_flow_entry(dp, rule, cmd)
+    elapsed = time.time() - start
+
+    base.report('ofctl_mod_flow_entry', {
+        'rules': len(rules),
+        'distinct': distinct,
+        'cache_size': cache_size,
+        'match_hits': ofctl_v1_3._match_cache.hits,
+        'actions_hits': ofctl_v1_3._actions_cache.hits,
+        'secs': elapsed,
+        'rules_per_sec': len(rules) / elapsed,
+    })
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ryu.tests.benchmark.bench_ofctl')
+    parser.add_argument('--rules', type=int, default=50000,
+                        help='number of flow entries')
+    parser.add_argument('--distinct', type=int, default=100,
+                        help='number of distinct match and actions')
+    parser.add_argument('--cache-size', type=int, action='append',
+                        help='size of the match and actions caches')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    rules = create_rules(args.rules, args.distinct)
+    for cache_size in args.cache_size or DEFAULT_CACHE_SIZES:
+        bench_mod_flow_entry(rules, args.distinct, cache_size)
+
+
+if __name__ == '__main__':
+    main()
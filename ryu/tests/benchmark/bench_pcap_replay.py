@@ -0,0 +1,274 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Packet-In throughput benchmark which replays a PCAP file.
+
+Every frame in the PCAP file is wrapped into an OpenFlow 1.3 Packet-In
+message and handed to the Packet-In handlers of the given applications,
+in the same way as Datapath._recv_loop() does, on a fake datapath which
+only captures the messages sent to the switch.  No switch and no
+network connection are required.
+
+The applications are loaded with AppManager, but they are not started;
+the handlers are invoked synchronously so that the latency of each
+Packet-In can be measured.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_pcap_replay \\
+        [--pcap FILE] [--repeat N] [APP ...]
+
+The default application is ryu.app.simple_switch_13.  Without --pcap,
+ARP and IPv4 frames between 64 hosts are generated.  The source MAC
+addresses are mapped to switch ports in the order they appear in the
+frames, so that learning switches see a consistent topology.
+
+The results are reported per application set: packets/sec, p50/p99 of
+the handler latency in microseconds, and the number of FlowMod and
+PacketOut messages emitted by the applications.
+"""
+
+from __future__ import division
+
+import argparse
+import logging
+import struct
+import sys
+import time
+
+from ryu import cfg
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import ofp_event
+from ryu.controller.handler import CONFIG_DISPATCHER
+from ryu.controller.handler import MAIN_DISPATCHER
+from ryu.lib import pcaplib
+from ryu.lib.packet import arp
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.tests.benchmark import base
+
+
+DEFAULT_APPS = ['ryu.app.simple_switch_13']
+
+
+class FakeDatapath(controller.Datapath):
+    """
+    Datapath without socket.
+
+    The messages sent by the applications are kept in ``sent`` as
+    serialized buffers and counted per OpenFlow message type.
+    """
+
+    def __init__(self, dpid, version=ofproto_v1_3.OFP_VERSION):
+        # Datapath.__init__() requires a socket, skip it.
+        ofproto_protocol.ProtocolDesc.__init__(self, version)
+        self.socket = None
+        self.address = ('127.0.0.1', 6653)
+        self.is_active = True
+        self.send_q = None
+        self.unreplied_echo_requests = []
+        self.xid = 0
+        self.id = dpid
+        self.ports = {}
+        self._ports = None
+        self.flow_format = None
+        self.ofp_brick = None
+        self.state = MAIN_DISPATCHER
+        self.sent = []
+        self.counts = {}
+
+    def set_state(self, state):
+        self.state = state
+
+    def send(self, buf):
+        msg_type = struct.unpack_from('!B', buf, 1)[0]
+        self.counts[msg_type] = self.counts.get(msg_type, 0) + 1
+        self.sent.append(buf)
+        return True
+
+    def clear(self):
+        del self.sent[:]
+        self.counts.clear()
+
+
+def generate_frames(hosts=64):
+    """Returns ARP requests, ARP replies and IPv4 frames between hosts."""
+    def _mac(i):
+        return '00:00:00:00:%02x:%02x' % (i >> 8 & 0xff, i & 0xff)
+
+    def _ip(i):
+        return '10.0.%d.%d' % (i >> 8 & 0xff, i & 0xff)
+
+    def _serialize(*protocols):
+        pkt = packet.Packet()
+        for p in protocols:
+            pkt.add_protocol(p)
+        pkt.serialize()
+        return bytes(pkt.data)
+
+    frames = []
+    for i in range(1, hosts + 1):
+        j = i % hosts + 1
+        frames.append(_serialize(
+            ethernet.ethernet(dst='ff:ff:ff:ff:ff:ff', src=_mac(i),
+                              ethertype=ether_types.ETH_TYPE_ARP),
+            arp.arp_ip(arp.ARP_REQUEST, _mac(i), _ip(i),
+                       '00:00:00:00:00:00', _ip(j))))
+        frames.append(_serialize(
+            ethernet.ethernet(dst=_mac(i), src=_mac(j),
+                              ethertype=ether_types.ETH_TYPE_ARP),
+            arp.arp_ip(arp.ARP_REPLY, _mac(j), _ip(j), _mac(i), _ip(i))))
+    for i in range(1, hosts + 1):
+        j = i % hosts + 1
+        frames.append(_serialize(
+            ethernet.ethernet(dst=_mac(j), src=_mac(i)),
+            ipv4.ipv4(src=_ip(i), dst=_ip(j), proto=17),
+            b'\x00' * 32))
+    return frames
+
+
+def read_frames(path):
+    """Returns the frames in the PCAP file."""
+    return [buf for _ts, buf in pcaplib.Reader(open(path, 'rb'))]
+
+
+def packet_in_bufs(frames):
+    """
+    Wraps frames into Packet-In messages.
+
+    The in_port is assigned per source MAC address.
+    """
+    ports = {}
+    bufs = []
+    for xid, frame in enumerate(frames):
+        src = frame[6:12]
+        in_port = ports.setdefault(src, len(ports) + 1)
+        bufs.append(base.packet_in_buf(frame, in_port=in_port, xid=xid))
+    return bufs
+
+
+def load_apps(app_lists):
+    """Instantiates the applications without starting them."""
+    app_mgr = app_manager.AppManager.get_instance()
+    app_mgr.load_apps(app_lists)
+    # The applications may register CLI options when they are imported.
+    cfg.CONF(args=[], project='ryu')
+    contexts = app_mgr.create_contexts()
+    for cls in app_mgr.applications_cls.values():
+        app_mgr.instantiate(cls, **contexts)
+    return app_mgr
+
+
+def _handlers(app_mgr, ev_cls, state):
+    handlers = []
+    for app in app_mgr.applications.values():
+        for handler in app.event_handlers.get(ev_cls, []):
+            callers = getattr(handler, 'callers', {})
+            if ev_cls in callers and callers[ev_cls].dispatchers and \
+                    state not in callers[ev_cls].dispatchers:
+                continue
+            handlers.append(handler)
+    return handlers
+
+
+def _connect(app_mgr, dp):
+    # Let the applications install their initial flows.
+    features = ofproto_v1_3_parser.OFPSwitchFeatures(
+        dp, datapath_id=dp.id, n_buffers=0, n_tables=254, auxiliary_id=0,
+        capabilities=0)
+    ev = ofp_event.ofp_msg_to_ev(features)
+    for handler in _handlers(app_mgr, ev.__class__, CONFIG_DISPATCHER):
+        handler(ev)
+
+
+def replay(app_mgr, dp, bufs, repeat=1):
+    """Dispatches bufs to the Packet-In handlers repeat times."""
+    handlers = _handlers(app_mgr, ofp_event.EventOFPPacketIn,
+                         MAIN_DISPATCHER)
+    version = dp.ofproto.OFP_VERSION
+    msg_type = dp.ofproto.OFPT_PACKET_IN
+    latencies = []
+    errors = 0
+
+    start = time.time()
+    for _ in range(repeat):
+        for buf in bufs:
+            t = time.time()
+            msg = ofproto_parser.msg(dp, version, msg_type, len(buf), 0, buf)
+            ev = ofp_event.EventOFPPacketIn(msg)
+            for handler in handlers:
+                try:
+                    handler(ev)
+                except Exception:
+                    errors += 1
+            latencies.append(time.time() - t)
+    elapsed = time.time() - start
+
+    return elapsed, latencies, errors
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ryu.tests.benchmark.bench_pcap_replay')
+    parser.add_argument('--pcap', help='PCAP file to replay')
+    parser.add_argument('--hosts', type=int, default=64,
+                        help='number of hosts for generated frames')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='number of times the frames are replayed')
+    parser.add_argument('--dpid', type=int, default=1)
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('apps', nargs='*', default=DEFAULT_APPS)
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+
+    if args.pcap:
+        frames = read_frames(args.pcap)
+    else:
+        frames = generate_frames(args.hosts)
+    bufs = packet_in_bufs(frames)
+
+    app_mgr = load_apps(args.apps)
+    try:
+        dp = FakeDatapath(args.dpid)
+        _connect(app_mgr, dp)
+        dp.clear()
+
+        elapsed, latencies, errors = replay(app_mgr, dp, bufs, args.repeat)
+        ofp = dp.ofproto
+        base.report('pcap_replay', {
+            'apps': args.apps,
+            'packets': len(latencies),
+            'errors': errors,
+            'pkts_per_sec': len(latencies) / elapsed if elapsed else 0,
+            'p50_usec': base.percentile(latencies, 50) * 1e6,
+            'p99_usec': base.percentile(latencies, 99) * 1e6,
+            'flow_mods': dp.counts.get(ofp.OFPT_FLOW_MOD, 0),
+            'packet_outs': dp.counts.get(ofp.OFPT_PACKET_OUT, 0),
+        })
+    finally:
+        app_mgr.close()
+
+
+if __name__ == '__main__':
+    main()
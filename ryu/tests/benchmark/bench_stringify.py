@@ -0,0 +1,85 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JSON serialization benchmark for ryu.lib.stringify.StringifyMixin.
+
+Measures to_jsondict()/from_jsondict() and json.dumps() of an
+OFPFlowStatsReply carrying a large number of flow entries.
+
+Usage::
+
+    $ python -m ryu.tests.benchmark.bench_stringify [flows]
+"""
+
+from __future__ import division
+
+import json
+import sys
+import time
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.tests.benchmark import base
+
+
+def flow_stats_reply(flows):
+    parser = ofproto_v1_3_parser
+    body = []
+    for i in range(flows):
+        match = parser.OFPMatch(in_port=i % 48 + 1, eth_type=0x0800,
+                                ipv4_dst='10.%d.%d.%d' % (
+                                    (i >> 16) & 0xff, (i >> 8) & 0xff,
+                                    i & 0xff))
+        actions = [parser.OFPActionOutput(i % 48 + 1)]
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, actions)]
+        body.append(parser.OFPFlowStats(
+            table_id=0, duration_sec=i, duration_nsec=0, priority=100,
+            idle_timeout=0, hard_timeout=0, flags=0, cookie=i,
+            packet_count=i, byte_count=i * 64, match=match,
+            instructions=inst, length=0))
+    return parser.OFPFlowStatsReply(None, body=body, flags=0)
+
+
+def main(args=None):
+    args = sys.argv[1:] if args is None else args
+    flows = int(args[0]) if args else 10000
+    msg = flow_stats_reply(flows)
+
+    start = time.time()
+    jsondict = msg.to_jsondict()
+    to_jsondict = time.time() - start
+
+    start = time.time()
+    json.dumps(jsondict)
+    dumps = time.time() - start
+
+    start = time.time()
+    ofproto_v1_3_parser.OFPFlowStatsReply.from_jsondict(
+        jsondict['OFPFlowStatsReply'], datapath=None)
+    from_jsondict = time.time() - start
+
+    base.report('flow_stats_jsondict', {
+        'flows': flows,
+        'to_jsondict_sec': to_jsondict,
+        'json_dumps_sec': dumps,
+        'from_jsondict_sec': from_jsondict,
+        'flows_per_sec': flows / to_jsondict,
+    })
+
+
+if __name__ == '__main__':
+    main()
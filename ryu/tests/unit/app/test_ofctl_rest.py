@@ -26,11 +26,15 @@ try:
 except ImportError:
     from unittest import mock  # Python 3
 from nose.tools import eq_
+from nose.tools import ok_
 
 from ryu.app import ofctl_rest
 from ryu.app.wsgi import Request
 from ryu.app.wsgi import WSGIApplication
 from ryu.controller.dpset import DPSet
+from ryu.lib import ofctl_utils
+from ryu.lib import ofctl_v1_3
+from ryu.ofproto import ofproto_parser
 from ryu.ofproto import ofproto_protocol
 from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import ofproto_v1_2
@@ -91,6 +95,129 @@ class Test_ofctl_rest(unittest.TestCase):
             res = req.get_response(wsgi)
         eq_(res.status, '200 OK')
 
+    def _test_flow_stats_stream(self, stream, incomplete=False):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        dpset = DPSet()
+        dpset._register(dp)
+        wsgi = WSGIApplication()
+        contexts = {
+            'dpset': dpset,
+            'wsgi': wsgi,
+        }
+        ofctl_rest.RestStatsApi(**contexts)
+
+        this_dir = os.path.dirname(sys.modules[__name__].__file__)
+        reply_path = os.path.join(
+            this_dir, '../ofproto/json/of13',
+            '4-12-ofp_flow_stats_reply.packet.json')
+        reply = ofproto_parser.ofp_msg_from_jsondict(
+            dp, json.load(open(reply_path)))
+
+        req = Request.blank('/stats/flow/1?stream=' + stream)
+        req.method = 'GET'
+
+        def _send_stats_request_iter(dp, stats, waiters, logger=None):
+            yield reply
+            yield reply
+            if incomplete:
+                raise ofctl_utils.StatsRequestIncomplete(dpid=dp.id)
+
+        with mock.patch('ryu.lib.ofctl_utils.send_stats_request_iter',
+                        side_effect=_send_stats_request_iter):
+            res = req.get_response(wsgi)
+            eq_(res.status, '200 OK')
+            # The body is generated while the replies are iterated.
+            body = res.body.decode('utf-8')
+        return res, body, ofctl_v1_3._flow_stats_to_dict(reply, -1, True)
+
+    def test_flow_stats_stream_json(self):
+        res, body, flows = self._test_flow_stats_stream('json')
+        eq_(res.content_type, 'application/json')
+        eq_(json.loads(body),
+            json.loads(json.dumps({'1': flows + flows})))
+
+    def test_flow_stats_stream_ndjson(self):
+        res, body, flows = self._test_flow_stats_stream('ndjson')
+        eq_(res.content_type, 'application/x-ndjson')
+        lines = body.splitlines()
+        eq_([json.loads(line) for line in lines],
+            json.loads(json.dumps(flows + flows)))
+
+    def test_flow_stats_stream_json_incomplete(self):
+        res, body, flows = self._test_flow_stats_stream('json', True)
+        eq_(json.loads(body),
+            json.loads(json.dumps({'1': flows + flows,
+                                   'incomplete': True})))
+
+    def test_flow_stats_stream_ndjson_incomplete(self):
+        res, body, flows = self._test_flow_stats_stream('ndjson', True)
+        lines = [json.loads(line) for line in body.splitlines()]
+        eq_(lines[:-1], json.loads(json.dumps(flows + flows)))
+        ok_(lines[-1]['incomplete'])
+        ok_('error' in lines[-1])
+
+    def test_flow_stats_delta(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        dp.set_xid = mock.MagicMock()
+        dpset = DPSet()
+        dpset._register(dp)
+        wsgi = WSGIApplication()
+        contexts = {
+            'dpset': dpset,
+            'wsgi': wsgi,
+        }
+        ofctl_rest.RestStatsApi(**contexts)
+
+        this_dir = os.path.dirname(sys.modules[__name__].__file__)
+        reply_path = os.path.join(
+            this_dir, '../ofproto/json/of13',
+            '4-12-ofp_flow_stats_reply.packet.json')
+        reply = ofproto_parser.ofp_msg_from_jsondict(
+            dp, json.load(open(reply_path)))
+        requests = []
+        timeouts = []
+
+        def _send_stats_request(dp, stats, waiters, msgs, logger=None):
+            requests.append(stats)
+            if timeouts:
+                # Timed out before the replies of the second table.
+                return stats.table_id == 0
+            msgs.append(reply)
+            return True
+
+        def _get(body):
+            req = Request.blank('/stats/flowdelta/1')
+            req.body = json.dumps(body).encode('utf-8')
+            req.method = 'POST'
+            with mock.patch('ryu.lib.ofctl_utils.send_stats_request',
+                            side_effect=_send_stats_request):
+                res = req.get_response(wsgi)
+            eq_(res.status, '200 OK')
+            return json.loads(res.body.decode('utf-8'))['1']
+
+        body = {'table_id': [0, 1], 'cookie': 1, 'cookie_mask': 1, 'top': 1}
+        delta = _get(body)
+        eq_([0, 1], [stats.table_id for stats in requests])
+        eq_(len(reply.body), len(delta['added']))
+        eq_(1, len(delta['top']))
+
+        # Compared with the previous sample of the same filter
+        delta = _get(body)
+        eq_([], delta['added'])
+        eq_([], delta['removed'])
+        eq_([], delta['changed'])
+        ok_('incomplete' not in delta)
+
+        # The partial replies do not replace the previous sample.
+        timeouts.append(True)
+        delta = _get(body)
+        ok_(delta['incomplete'])
+        eq_([], delta['removed'])
+        timeouts.pop()
+        delta = _get(body)
+        eq_([], delta['added'])
+        eq_([], delta['removed'])
+
 
 def _add_tests():
     _ofp_vers = {
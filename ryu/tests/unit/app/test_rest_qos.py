@@ -0,0 +1,141 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.app import rest_qos
+from ryu.app.wsgi import Request
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _policy():
+    return {'queue': {'type': 'linux-htb', 'max_rate': '1000000',
+                      'queues': [{'max_rate': '500000'},
+                                 {'min_rate': '800000'}]},
+            'meters': [{'meter_id': 1, 'flags': 'KBPS',
+                        'bands': [{'type': 'DROP', 'rate': 1000}]}],
+            'rules': [{'match': {'nw_dst': '10.0.0.1'},
+                       'actions': {'meter': 1}},
+                      {'match': {'nw_dst': '10.0.0.2'},
+                       'actions': {'queue': 1}}]}
+
+
+def _qos(dp_id):
+    dp = mock.MagicMock(id=dp_id, ofproto=ofproto_v1_3,
+                        ofproto_parser=ofproto_v1_3_parser)
+    qos = rest_qos.QoS(dp, None)
+    qos.ovs_bridge = mock.MagicMock()
+    qos.ovs_bridge.get_port_name_list.return_value = ['s1-eth1', 's1-eth2']
+    return qos
+
+
+class Test_QoS(unittest.TestCase):
+    """
+    Test case for the QoS policy of ryu.app.rest_qos.QoS
+    """
+
+    def setUp(self):
+        self.qos = _qos(1)
+
+    def test_to_policy(self):
+        queue, meters, meter_mods, flow_mods, rules = self.qos.to_policy(
+            _policy(), rest_qos.VLANID_NONE)
+
+        eq_('linux-htb', queue[1])
+        eq_([{'max-rate': '500000'}, {'min-rate': '800000'}], queue[3])
+        eq_(1, len(meter_mods))
+        eq_(1, meter_mods[0].meter_id)
+        eq_(2, len(flow_mods))
+        eq_(2, len(rules))
+        # Nothing is sent while converting.
+        eq_(0, self.qos.dp.send_msg.call_count)
+        eq_(0, self.qos.ovs_bridge.set_qos_ports.call_count)
+
+    @raises(ValueError)
+    def test_to_policy_invalid_rule(self):
+        policy = _policy()
+        policy['rules'].append({'actions': {'queue': 1}})
+        self.qos.to_policy(policy, rest_qos.VLANID_NONE)
+
+    @mock.patch('ryu.lib.ofctl_utils.send_msgs_with_barrier')
+    def test_apply_policy(self, mock_send):
+        error = ofproto_v1_3_parser.OFPErrorMsg(
+            self.qos.dp, type_=ofproto_v1_3.OFPET_FLOW_MOD_FAILED, code=0)
+        mock_send.side_effect = [[None], [None, error]]
+        policy = self.qos.to_policy(_policy(), rest_qos.VLANID_NONE)
+
+        msg = self.qos.apply_policy(policy, {})
+
+        result = msg[rest_qos.REST_COMMAND_RESULT]
+        eq_('success', result['queue']['result'])
+        # All the ports are set in a single transaction.
+        self.qos.ovs_bridge.set_qos_ports.assert_called_once_with(
+            ['s1-eth1', 's1-eth2'], type='linux-htb', max_rate='1000000',
+            queues=[{'max-rate': '500000'}, {'min-rate': '800000'}])
+        # The meter mods are sent with their own barrier before the flow
+        # mods.
+        eq_(2, mock_send.call_count)
+        meter_msgs = mock_send.call_args_list[0][0][1]
+        eq_([ofproto_v1_3_parser.OFPMeterMod], [type(m) for m in meter_msgs])
+        flow_msgs = mock_send.call_args_list[1][0][1]
+        eq_([ofproto_v1_3_parser.OFPFlowMod] * 2, [type(m) for m in flow_msgs])
+        eq_(['success'], [m['result'] for m in result['meters']])
+        eq_(['success', 'failure'], [m['result'] for m in result['rules']])
+        for key in ('ovsdb', 'openflow', 'total'):
+            ok_(key in result['timing'])
+
+    @mock.patch('ryu.lib.ofctl_utils.send_msgs_with_barrier')
+    def test_set_policy(self, mock_send):
+        ofs_list = rest_qos.QoSOfsList()
+        ofs_list[1] = _qos(1)
+        ofs_list[2] = _qos(2)
+
+        def _send_msgs_with_barrier(dp, msgs, waiters):
+            hub.sleep(0.1)
+            return [None] * len(msgs)
+        mock_send.side_effect = _send_msgs_with_barrier
+
+        req = Request.blank('/qos/policy/all')
+        req.method = 'POST'
+        req.body = json.dumps(_policy()).encode('utf-8')
+        controller = rest_qos.QoSController(
+            req, None, {'dpset': None, 'waiters': {}})
+        with mock.patch.object(rest_qos.QoSController, '_OFS_LIST',
+                               ofs_list):
+            res = controller.set_policy(req, rest_qos.REST_ALL)
+
+        eq_('200 OK', res.status)
+        body = json.loads(res.body.decode('utf-8'))
+        eq_(['0000000000000001', '0000000000000002'],
+            [msg['switch_id'] for msg in body['qos']])
+        timing = body['timing']
+        eq_(2, timing['switches'])
+        # The switches are provisioned concurrently.
+        ok_(timing['elapsed'] < timing['sum'])
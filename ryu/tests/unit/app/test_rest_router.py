@@ -0,0 +1,253 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.app import rest_router
+from ryu.lib import hub
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_AddressData(unittest.TestCase):
+    """
+    Test case for ryu.app.rest_router.AddressData
+    """
+
+    def setUp(self):
+        self.address_data = rest_router.AddressData()
+        self.addr1 = self.address_data.add('10.0.0.1/8')
+        self.addr2 = self.address_data.add('192.168.1.1/24')
+
+    def test_get_data(self):
+        eq_(self.addr1, self.address_data.get_data(ip='10.1.2.3'))
+        eq_(self.addr2, self.address_data.get_data(ip='192.168.1.100'))
+        eq_(None, self.address_data.get_data(ip='192.168.2.1'))
+        eq_(self.addr2,
+            self.address_data.get_data(addr_id=self.addr2.address_id))
+        eq_(None, self.address_data.get_data(addr_id=100))
+
+    @raises(rest_router.CommandFailure)
+    def test_add_overlap_covered(self):
+        self.address_data.add('10.1.0.1/16')
+
+    @raises(rest_router.CommandFailure)
+    def test_add_overlap_covering(self):
+        self.address_data.add('192.168.0.1/16')
+
+    def test_delete(self):
+        self.address_data.delete(self.addr1.address_id)
+
+        eq_(None, self.address_data.get_data(ip='10.1.2.3'))
+        eq_(None, self.address_data.get_data(addr_id=self.addr1.address_id))
+        eq_(['192.168.1.0/24'], list(self.address_data.keys()))
+        # The deleted network can be added again.
+        self.address_data.add('10.1.0.1/16')
+
+
+class Test_RoutingTable(unittest.TestCase):
+    """
+    Test case for ryu.app.rest_router.RoutingTable
+    """
+
+    def setUp(self):
+        self.routing_tbl = rest_router.RoutingTable()
+        self.route8 = self.routing_tbl.add('10.0.0.0/8', '192.168.0.1')
+        self.route16 = self.routing_tbl.add('10.1.0.0/16', '192.168.0.2')
+        self.route24 = self.routing_tbl.add('10.1.1.0/24', '192.168.0.1')
+
+    def test_longest_match(self):
+        eq_(self.route24, self.routing_tbl.get_data(dst_ip='10.1.1.1'))
+        eq_(self.route16, self.routing_tbl.get_data(dst_ip='10.1.2.1'))
+        eq_(self.route8, self.routing_tbl.get_data(dst_ip='10.2.0.1'))
+        eq_(None, self.routing_tbl.get_data(dst_ip='172.16.0.1'))
+
+    def test_default_route(self):
+        default = self.routing_tbl.add(rest_router.DEFAULT_ROUTE,
+                                       '192.168.0.3')
+
+        eq_(default, self.routing_tbl.get_data(dst_ip='172.16.0.1'))
+        eq_(self.route8, self.routing_tbl.get_data(dst_ip='10.2.0.1'))
+        ok_(rest_router.DEFAULT_ROUTE in self.routing_tbl)
+
+    @raises(rest_router.CommandFailure)
+    def test_add_overlap(self):
+        self.routing_tbl.add('10.1.0.0/16', '192.168.0.3')
+
+    def test_delete(self):
+        self.routing_tbl.delete(self.route16.route_id)
+
+        eq_(self.route8, self.routing_tbl.get_data(dst_ip='10.1.2.1'))
+        eq_(['10.0.0.0/8', '10.1.1.0/24'], sorted(self.routing_tbl.keys()))
+        # Deleting an unknown route is ignored.
+        self.routing_tbl.delete(self.route16.route_id)
+
+    def test_gateway_mac(self):
+        mac = '00:00:00:00:00:01'
+        self.routing_tbl.set_gateway_mac(self.route8, mac)
+        self.routing_tbl.set_gateway_mac(self.route24, mac)
+
+        eq_(self.route8, self.routing_tbl.get_data(gw_mac=mac))
+        self.routing_tbl.delete(self.route8.route_id)
+        eq_(self.route24, self.routing_tbl.get_data(gw_mac=mac))
+        self.routing_tbl.set_gateway_mac(self.route24, '00:00:00:00:00:02')
+        eq_(None, self.routing_tbl.get_data(gw_mac=mac))
+        eq_(self.route24,
+            self.routing_tbl.get_data(gw_mac='00:00:00:00:00:02'))
+
+
+class Test_SuspendPacketList(unittest.TestCase):
+    """
+    Test case for ryu.app.rest_router.SuspendPacketList
+    """
+
+    def setUp(self):
+        self.timeouts = []
+        self.packet_buffer = rest_router.SuspendPacketList(
+            self.timeouts.append)
+
+    def _add(self, dst_ip, data=None):
+        header_list = {rest_router.IPV4: mock.MagicMock(dst=dst_ip)}
+        return self.packet_buffer.add(1, header_list, data)
+
+    def test_pop(self):
+        pkt1 = self._add('10.0.0.1')
+        pkt2 = self._add('10.0.0.2')
+        pkt3 = self._add('10.0.0.1')
+
+        eq_(3, len(self.packet_buffer))
+        eq_([pkt1, pkt3], self.packet_buffer.get_data('10.0.0.1'))
+        eq_([pkt1, pkt3], self.packet_buffer.pop('10.0.0.1'))
+        eq_([], self.packet_buffer.pop('10.0.0.1'))
+        eq_([pkt2], self.packet_buffer.get_data('10.0.0.2'))
+        eq_(1, len(self.packet_buffer))
+
+    def test_delete_address(self):
+        address_data = rest_router.AddressData()
+        address = address_data.add('10.0.0.254/24')
+        self._add('10.0.0.1')
+        self._add('10.0.0.2')
+        pkt = self._add('10.0.1.1')
+
+        self.packet_buffer.delete(del_addr=address)
+
+        eq_(1, len(self.packet_buffer))
+        eq_([pkt], self.packet_buffer.get_data('10.0.1.1'))
+        self.packet_buffer.delete(pkt=pkt)
+        self.packet_buffer.delete(pkt=pkt)
+        eq_(0, len(self.packet_buffer))
+
+    def test_max_per_destination(self):
+        pkts = [self._add('10.0.0.1', data=i) for i in
+                range(rest_router.MAX_SUSPENDPACKETS_PER_DST + 2)]
+
+        eq_(rest_router.MAX_SUSPENDPACKETS_PER_DST, len(self.packet_buffer))
+        eq_(pkts[2:], self.packet_buffer.get_data('10.0.0.1'))
+
+    @mock.patch('ryu.app.rest_router.hub.spawn')
+    def test_timeout(self, mock_spawn):
+        now = time.time()
+        with mock.patch('ryu.app.rest_router.time.time', return_value=now):
+            pkt1 = self._add('10.0.0.1')
+            self._add('10.0.0.2')
+        with mock.patch('ryu.app.rest_router.time.time',
+                        return_value=now + 1):
+            pkt3 = self._add('10.0.0.3')
+        # A single timer thread is started.
+        eq_(1, mock_spawn.call_count)
+        self.packet_buffer.pop('10.0.0.2')
+
+        with mock.patch('ryu.app.rest_router.time.time',
+                        return_value=now + rest_router.ARP_REPLY_TIMER):
+            with mock.patch('ryu.app.rest_router.hub.sleep') as mock_sleep:
+                mock_sleep.side_effect = lambda _: self.packet_buffer.pop(
+                    '10.0.0.3')
+                self.packet_buffer.wait_arp_reply_timer()
+
+        eq_([pkt1], self.timeouts)
+        eq_(1, mock_sleep.call_count)
+        ok_(pkt3.deleted)
+        eq_(0, len(self.packet_buffer))
+        eq_(None, self.packet_buffer._timer)
+
+
+class Test_RouterController(unittest.TestCase):
+    """
+    Test case for ryu.app.rest_router.RouterController
+    """
+
+    def setUp(self):
+        self.routers = {}
+        for dpid in (1, 2, 3):
+            self.routers[dpid] = mock.MagicMock(
+                dpid_str='%016x' % dpid)
+            self.routers[dpid].get_data.return_value = {'dpid': dpid}
+        self.controller = rest_router.RouterController(
+            mock.MagicMock(), None, {'waiters': {}})
+
+    def test_access_router_all(self):
+        def _get_data(vlan_id, param, waiters):
+            hub.sleep(1)
+        self.routers[2].get_data.side_effect = _get_data
+
+        with mock.patch.object(rest_router.RouterController,
+                               '_ROUTER_LIST', self.routers):
+            with mock.patch('ryu.lib.fanout.DEFAULT_TIMEOUT', 0.05):
+                msgs = self.controller._access_router(
+                    rest_router.REST_ALL, rest_router.VLANID_NONE,
+                    'get_data', mock.MagicMock(body=None))
+
+        eq_({'dpid': 1}, msgs[0])
+        eq_('%016x' % 2, msgs[1][rest_router.REST_SWITCHID])
+        eq_(rest_router.REST_NG, msgs[1][rest_router.REST_RESULT])
+        eq_({'dpid': 3}, msgs[2])
+
+    def _set_data(self):
+        with mock.patch.object(rest_router.RouterController,
+                               '_ROUTER_LIST', self.routers):
+            return self.controller._access_router(
+                rest_router.REST_ALL, rest_router.VLANID_NONE,
+                'set_data', mock.MagicMock(body=None))
+
+    def test_access_router_error(self):
+        self.routers[2].set_data.side_effect = ValueError('Invalid')
+        self.routers[1].set_data.return_value = {'dpid': 1}
+        self.routers[3].set_data.return_value = {'dpid': 3}
+
+        msgs = self._set_data()
+
+        # The other routers have been updated.
+        eq_({'dpid': 1}, msgs[0])
+        eq_(rest_router.REST_NG, msgs[1][rest_router.REST_RESULT])
+        eq_('Invalid', msgs[1][rest_router.REST_DETAILS])
+        eq_({'dpid': 3}, msgs[2])
+
+    @raises(ValueError)
+    def test_access_router_error_all(self):
+        for router in self.routers.values():
+            router.set_data.side_effect = ValueError('Invalid')
+
+        self._set_data()
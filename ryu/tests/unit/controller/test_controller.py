@@ -31,6 +31,7 @@ import random
 from ryu.base import app_manager  # To suppress cyclic import
 from ryu.controller import controller
 from ryu.controller import handler
+from ryu.ofproto import ofproto_v1_3
 from ryu.ofproto import ofproto_v1_3_parser
 from ryu.ofproto import ofproto_v1_2_parser
 from ryu.ofproto import ofproto_v1_0_parser
@@ -80,6 +81,24 @@ class Test_Datapath(unittest.TestCase):
     def test_ports_accessibility_v10(self):
         self._test_ports_accessibility(ofproto_v1_0_parser, 0)
 
+    def test_send_msgs(self):
+        with mock.patch('ryu.controller.controller.Datapath.set_state'):
+            dp = controller.Datapath(mock.Mock(), mock.Mock())
+        dp.ofproto = ofproto_v1_3
+        dp.ofproto_parser = ofproto_v1_3_parser
+        dp.send = mock.Mock()
+        msgs = [ofproto_v1_3_parser.OFPFlowMod(dp, priority=i)
+                for i in range(3)]
+        msgs.append(ofproto_v1_3_parser.OFPBarrierRequest(dp))
+
+        dp.send_msgs(msgs)
+
+        # Sent at once, in the order of msgs with their own xids.
+        self.assertEqual(1, dp.send.call_count)
+        buf = dp.send.call_args[0][0]
+        self.assertEqual(b''.join(bytes(msg.buf) for msg in msgs), buf)
+        self.assertEqual(4, len(set(msg.xid for msg in msgs)))
+
     @mock.patch("ryu.base.app_manager", spec=app_manager)
     def test_recv_loop(self, app_manager_mock):
         # Prepare test data
@@ -0,0 +1,190 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.controller import flow_mirror
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_FlowTable(unittest.TestCase):
+    """
+    Test case for ryu.controller.flow_mirror.FlowTable
+    """
+
+    def setUp(self):
+        self.dp = mock.MagicMock(id=1, ofproto=ofproto_v1_3,
+                                 ofproto_parser=ofproto_v1_3_parser)
+        self.table = flow_mirror.FlowTable(self.dp)
+
+    def _flow_mod(self, command, cookie=0, cookie_mask=0, priority=1,
+                  match=None, table_id=0, out_port=1):
+        parser = ofproto_v1_3_parser
+        actions = [parser.OFPActionOutput(out_port)]
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, actions)]
+        return parser.OFPFlowMod(
+            self.dp, cookie=cookie, cookie_mask=cookie_mask,
+            table_id=table_id, command=command, priority=priority,
+            match=match or parser.OFPMatch(), instructions=inst)
+
+    def _add(self, **kwargs):
+        self.table.apply(self._flow_mod(ofproto_v1_3.OFPFC_ADD, **kwargs))
+
+    def test_match_key(self):
+        parser = ofproto_v1_3_parser
+        match1 = parser.OFPMatch(eth_type=0x0800, ipv4_dst='10.0.0.1')
+        match2 = parser.OFPMatch(ipv4_dst='10.0.0.1', eth_type=0x0800)
+        match3 = parser.OFPMatch(eth_type=0x0800, ipv4_dst='10.0.0.2')
+
+        eq_(flow_mirror.match_key(match1), flow_mirror.match_key(match2))
+        ok_(flow_mirror.match_key(match1) != flow_mirror.match_key(match3))
+
+    def test_add_and_get(self):
+        match = ofproto_v1_3_parser.OFPMatch(in_port=1)
+        self._add(cookie=1, match=match)
+        self._add(cookie=2, match=ofproto_v1_3_parser.OFPMatch(in_port=1))
+        self._add(cookie=3, priority=2)
+
+        eq_(2, len(self.table))
+        entry = self.table.get(0, 1, ofproto_v1_3_parser.OFPMatch(in_port=1))
+        eq_(2, entry.cookie)
+        eq_([3], [e.cookie for e in self.table.get_flows(priority=2)])
+        eq_([], self.table.get_flows(cookie=1, cookie_mask=0xffff))
+
+    def test_get_flows_cookie_mask(self):
+        for i, cookie in enumerate([0x100000001, 0x100000002, 0x200000001]):
+            self._add(cookie=cookie, priority=i)
+
+        eq_([0x100000001, 0x100000002],
+            sorted(e.cookie for e in self.table.get_flows(
+                cookie=0x100000000, cookie_mask=0xffffffff00000000)))
+        eq_([0x200000001],
+            [e.cookie for e in self.table.get_flows(
+                cookie=0x200000001, cookie_mask=flow_mirror.UINT64_MAX)])
+        eq_(3, len(self.table.get_flows()))
+
+    def test_delete(self):
+        parser = ofproto_v1_3_parser
+        for i, cookie in enumerate([0x100000001, 0x100000002, 0x200000001]):
+            self._add(cookie=cookie, priority=i,
+                      match=parser.OFPMatch(in_port=i))
+        self.table.dirty = False
+
+        # Non-strict delete with an empty match is applied locally.
+        self.table.apply(self._flow_mod(
+            ofproto_v1_3.OFPFC_DELETE, cookie=0x100000000,
+            cookie_mask=0xffffffff00000000, table_id=ofproto_v1_3.OFPTT_ALL))
+        eq_([0x200000001], [e.cookie for e in self.table.get_flows()])
+
+        self.table.apply(self._flow_mod(
+            ofproto_v1_3.OFPFC_DELETE_STRICT, priority=2,
+            match=parser.OFPMatch(in_port=2)))
+        eq_(0, len(self.table))
+        ok_(not self.table.dirty)
+
+    def test_delete_with_match(self):
+        self._add(match=ofproto_v1_3_parser.OFPMatch(in_port=1))
+        self.table.dirty = False
+
+        self.table.apply(self._flow_mod(
+            ofproto_v1_3.OFPFC_DELETE,
+            match=ofproto_v1_3_parser.OFPMatch(in_port=1)))
+        # Left to the reconciliation.
+        ok_(self.table.dirty)
+
+    def test_modify_strict(self):
+        self._add(cookie=1, out_port=1)
+
+        self.table.apply(self._flow_mod(ofproto_v1_3.OFPFC_MODIFY_STRICT,
+                                        out_port=2))
+
+        entry = self.table.get_flows()[0]
+        eq_(1, entry.cookie)
+        eq_(2, entry.instructions[0].actions[0].port)
+
+    def test_sync(self):
+        parser = ofproto_v1_3_parser
+        self._add(cookie=1, match=parser.OFPMatch(in_port=1))
+        self.table.begin_sync()
+        # Sent after the flow stats request.
+        self._add(cookie=2, match=parser.OFPMatch(in_port=2))
+        self.table.apply(self._flow_mod(
+            ofproto_v1_3.OFPFC_DELETE_STRICT,
+            match=parser.OFPMatch(in_port=1)))
+        stats = [flow_mirror.FlowEntry(0, 1, parser.OFPMatch(in_port=i),
+                                       i, []) for i in (1, 3)]
+
+        ok_(self.table.end_sync(stats))
+
+        eq_([2, 3], sorted(e.cookie for e in self.table.get_flows()))
+        ok_(not self.table.dirty)
+
+    def test_sync_invalidated(self):
+        self.table.begin_sync()
+        self.table.invalidate()
+
+        ok_(not self.table.end_sync([]))
+        ok_(self.table.dirty)
+
+
+class Test_FlowMirror(unittest.TestCase):
+    """
+    Test case for ryu.controller.flow_mirror.FlowMirror
+    """
+
+    def setUp(self):
+        # Not to instantiate RyuApp, which may have been reloaded by the
+        # other tests.
+        self.mirror = mock.MagicMock(spec=flow_mirror.FlowMirror,
+                                     interval=flow_mirror.RECONCILE_INTERVAL,
+                                     is_active=True, tables={})
+        self.mirror._sync_event = hub.Event()
+        self.mirror._sync_event.set()
+
+    def test_reconcile_error(self):
+        for i in (1, 2):
+            dp = mock.MagicMock(id=i, ofproto=ofproto_v1_3,
+                                ofproto_parser=ofproto_v1_3_parser)
+            self.mirror.tables[i] = flow_mirror.FlowTable(dp)
+        reconciled = []
+
+        def _reconcile(dp):
+            reconciled.append(dp.id)
+            self.mirror.tables[dp.id].begin_sync()
+            if dp.id == 1:
+                raise ValueError()
+            self.mirror.is_active = False
+        self.mirror.reconcile.side_effect = _reconcile
+
+        flow_mirror.FlowMirror._reconcile_loop(self.mirror)
+
+        # The error on a switch does not stop the others.
+        eq_([1, 2], reconciled)
+        ok_(self.mirror.tables[1].dirty)
+        ok_(self.mirror.tables[1]._touched is None)
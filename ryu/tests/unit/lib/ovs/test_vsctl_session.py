@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.ovs import vsctl
+
+
+LOG = logging.getLogger(__name__)
+
+REMOTE = 'tcp:127.0.0.1:6640'
+
+
+def _idl(remote, schema_helper):
+    idl_ = mock.MagicMock(change_seqno=0)
+    idl_._session.get_seqno.return_value = 1
+    return idl_
+
+
+@mock.patch('ovs.db.idl.SchemaHelper', mock.MagicMock())
+@mock.patch('ovs.db.idl.Idl')
+@mock.patch.object(vsctl.VSCtl, '_do_vsctl')
+@mock.patch.object(vsctl.VSCtl, '_rpc_get_schema_json')
+class Test_VSCtl_persistent(unittest.TestCase):
+    """
+    Test case for the persistent IDL session of ryu.lib.ovs.vsctl.VSCtl
+    """
+
+    def tearDown(self):
+        vsctl.close_sessions()
+
+    @staticmethod
+    def _run(vsctl_):
+        vsctl_.run_command([vsctl.VSCtlCommand('init', [])])
+
+    def test_persistent(self, mock_schema, mock_do_vsctl, mock_idl):
+        mock_idl.side_effect = _idl
+        mock_do_vsctl.return_value = True
+
+        self._run(vsctl.VSCtl(REMOTE, persistent=True))
+        self._run(vsctl.VSCtl(REMOTE, persistent=True))
+
+        # The connection and the schema are shared by the instances.
+        eq_(1, mock_idl.call_count)
+        eq_(1, mock_schema.call_count)
+        eq_(2, mock_do_vsctl.call_count)
+        idl_ = mock_do_vsctl.call_args_list[0][0][0]
+        ok_(idl_ is mock_do_vsctl.call_args_list[1][0][0])
+        eq_(0, idl_.close.call_count)
+
+    def test_reconnect(self, mock_schema, mock_do_vsctl, mock_idl):
+        mock_idl.side_effect = _idl
+        mock_do_vsctl.return_value = True
+        vsctl_ = vsctl.VSCtl(REMOTE, persistent=True)
+
+        self._run(vsctl_)
+        idl_ = mock_do_vsctl.call_args[0][0]
+        # Reconnected while idle
+        idl_._session.get_seqno.return_value = 3
+        self._run(vsctl_)
+
+        eq_(2, mock_idl.call_count)
+        eq_(2, mock_schema.call_count)
+        eq_(1, idl_.close.call_count)
+        ok_(idl_ is not mock_do_vsctl.call_args[0][0])
+
+    def test_error(self, mock_schema, mock_do_vsctl, mock_idl):
+        mock_idl.side_effect = _idl
+        vsctl_ = vsctl.VSCtl(REMOTE, persistent=True)
+
+        mock_do_vsctl.side_effect = ValueError()
+        self.assertRaises(ValueError, self._run, vsctl_)
+        mock_do_vsctl.side_effect = None
+        mock_do_vsctl.return_value = True
+        self._run(vsctl_)
+
+        # The session is discarded on error.
+        eq_(2, mock_idl.call_count)
+        eq_(1, mock_do_vsctl.call_args_list[0][0][0].close.call_count)
+
+    def test_not_persistent(self, mock_schema, mock_do_vsctl, mock_idl):
+        mock_idl.side_effect = _idl
+        mock_do_vsctl.return_value = True
+        vsctl_ = vsctl.VSCtl(REMOTE)
+
+        self._run(vsctl_)
+        self._run(vsctl_)
+
+        eq_(2, mock_idl.call_count)
+        eq_(1, mock_schema.call_count)
+        for args, _kwargs in mock_do_vsctl.call_args_list:
+            eq_(1, args[0].close.call_count)
+        eq_({}, vsctl._sessions)
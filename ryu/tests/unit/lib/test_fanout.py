@@ -0,0 +1,116 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib import fanout
+from ryu.lib import hub
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_fan_out(unittest.TestCase):
+    """
+    Test case for ryu.lib.fanout.fan_out()
+    """
+
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+
+    def _sleep(self, secs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            hub.sleep(secs)
+        finally:
+            self.running -= 1
+        return secs
+
+    def test_concurrent(self):
+        start = time.time()
+        results = fanout.fan_out(self._sleep, [0.05, 0.01, 0.03, 0.02])
+
+        ok_(time.time() - start < 0.1)
+        eq_(4, self.max_running)
+        # In the order of the items
+        eq_([0.05, 0.01, 0.03, 0.02], [r.value for r in results])
+        eq_([0.05, 0.01, 0.03, 0.02], [r.item for r in results])
+        eq_([None] * 4, [r.error for r in results])
+
+    def test_concurrency(self):
+        results = fanout.fan_out(self._sleep, [0.01] * 5, concurrency=2)
+
+        eq_(2, self.max_running)
+        eq_([0.01] * 5, [r.value for r in results])
+
+    def test_timeout(self):
+        finished = []
+
+        def _func(secs):
+            hub.sleep(secs)
+            finished.append(secs)
+            return secs
+
+        start = time.time()
+        results = fanout.fan_out(_func, [0.01, 0.2, 0.02], timeout=0.05)
+
+        ok_(time.time() - start < 0.15)
+        eq_([0.01, None, 0.02], [r.value for r in results])
+        ok_(isinstance(results[1].error, fanout.FanOutTimeout))
+        # The timed out call is not killed but runs to completion.
+        eq_([0.01, 0.02], finished)
+        hub.sleep(0.2)
+        eq_([0.01, 0.02, 0.2], finished)
+
+    def test_error(self):
+        def _func(item):
+            if item == 2:
+                raise ValueError('invalid')
+            return item
+
+        results = fanout.fan_out(_func, [1, 2, 3])
+
+        eq_([1, None, 3], [r.value for r in results])
+        ok_(isinstance(results[1].error, ValueError))
+
+    def test_raise_if_all_failed(self):
+        error = ValueError('invalid')
+        timeout = fanout.FanOutTimeout(timeout=1)
+
+        def _results(*errors):
+            return [fanout.FanOutResult(i, None, e)
+                    for i, e in enumerate(errors)]
+
+        with self.assertRaises(ValueError) as cm:
+            fanout.raise_if_all_failed(_results(error, ValueError()))
+        ok_(cm.exception is error)
+        # Done on some of the items
+        fanout.raise_if_all_failed(_results(error, None))
+        fanout.raise_if_all_failed(_results(error, timeout))
+        fanout.raise_if_all_failed([])
+
+    def test_single(self):
+        results = fanout.fan_out(lambda item: hub.getcurrent(), [1])
+
+        # Processed in the calling thread
+        eq_(hub.getcurrent(), results[0].value)
+        eq_([], fanout.fan_out(lambda item: item, []))
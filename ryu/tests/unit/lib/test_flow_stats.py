@@ -0,0 +1,137 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib import flow_stats
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _stats(in_port, packet_count, byte_count, table_id=0, priority=1):
+    return ofproto_v1_3_parser.OFPFlowStats(
+        table_id=table_id, priority=priority,
+        match=ofproto_v1_3_parser.OFPMatch(in_port=in_port),
+        packet_count=packet_count, byte_count=byte_count)
+
+
+class Test_FlowStatsMonitor(unittest.TestCase):
+    """
+    Test case for ryu.lib.flow_stats.FlowStatsMonitor
+    """
+
+    def setUp(self):
+        self.dp = mock.MagicMock(id=1, ofproto=ofproto_v1_3,
+                                 ofproto_parser=ofproto_v1_3_parser)
+        self.xid = 0
+        self.dp.set_xid.side_effect = self._set_xid
+
+    def _set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def _reply(self, xid, body, more=False):
+        flags = ofproto_v1_3.OFPMPF_REPLY_MORE if more else 0
+        msg = ofproto_v1_3_parser.OFPFlowStatsReply(
+            self.dp, body=body, flags=flags)
+        msg.xid = xid
+        return msg
+
+    def test_stats_requests(self):
+        monitor = flow_stats.FlowStatsMonitor(
+            tables=[0, 1], cookies=[(0x10, 0xff)])
+
+        reqs = monitor.stats_requests(self.dp)
+
+        eq_([0, 1], [req.table_id for req in reqs])
+        for req in reqs:
+            eq_(0x10, req.cookie)
+            eq_(0xff, req.cookie_mask)
+
+        reqs = flow_stats.FlowStatsMonitor().stats_requests(self.dp)
+        eq_(1, len(reqs))
+        eq_(ofproto_v1_3.OFPTT_ALL, reqs[0].table_id)
+        eq_(0, reqs[0].cookie_mask)
+
+    def test_update(self):
+        monitor = flow_stats.FlowStatsMonitor(top_k=2)
+        delta = monitor.update(1, [_stats(1, 10, 1000), _stats(2, 0, 0),
+                                   _stats(3, 1, 100)])
+        eq_(3, len(delta.added))
+        eq_([], delta.removed)
+        eq_([], delta.changed)
+        eq_([(1, 1000), (3, 100)],
+            [(c.stats.match['in_port'], c.byte_count) for c in delta.top])
+
+        delta = monitor.update(1, [_stats(1, 10, 1000), _stats(2, 5, 500),
+                                   _stats(4, 1, 50)])
+        eq_([4], [s.match['in_port'] for s in delta.added])
+        removed = _stats(3, 1, 100)
+        eq_([flow_stats.flow_key(removed)], delta.removed)
+        eq_([(2, 5, 500)],
+            [(c.stats.match['in_port'], c.packet_count, c.byte_count)
+             for c in delta.changed])
+        eq_([2, 4], [c.stats.match['in_port'] for c in delta.top])
+
+        # The counters of the replaced flow entry are reset.
+        delta = monitor.update(1, [_stats(1, 2, 200)])
+        eq_([(1, 2, 200)],
+            [(c.stats.match['in_port'], c.packet_count, c.byte_count)
+             for c in delta.changed])
+        eq_(2, len(delta.removed))
+
+    def test_key(self):
+        monitor = flow_stats.FlowStatsMonitor()
+        monitor.update(1, [_stats(1, 1, 100)])
+
+        # Different table or priority is another flow entry.
+        delta = monitor.update(1, [_stats(1, 1, 100),
+                                   _stats(1, 1, 100, table_id=1),
+                                   _stats(1, 1, 100, priority=2),
+                                   _stats(1, 1, 100)])
+        eq_(2, len(delta.added))
+        eq_([], delta.changed)
+
+    def test_reply(self):
+        monitor = flow_stats.FlowStatsMonitor(tables=[0, 1])
+        reqs = monitor.stats_requests(self.dp)
+
+        eq_(None, monitor.reply(self._reply(
+            reqs[0].xid, [_stats(1, 1, 100)], more=True)))
+        # Not a reply to the requests
+        eq_(None, monitor.reply(self._reply(100, [_stats(9, 1, 100)])))
+        eq_(None, monitor.reply(self._reply(
+            reqs[0].xid, [_stats(2, 1, 100)])))
+        delta = monitor.reply(self._reply(
+            reqs[1].xid, [_stats(3, 1, 100, table_id=1)]))
+
+        ok_(delta is not None)
+        eq_([1, 2, 3], [s.match['in_port'] for s in delta.added])
+        eq_({}, monitor._pending)
+
+        monitor.forget(self.dp.id)
+        eq_({}, monitor._samples)
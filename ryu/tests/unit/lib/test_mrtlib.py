@@ -20,6 +20,7 @@ import io
 import logging
 import os
 import sys
+import tempfile
 import unittest
 
 try:
@@ -91,6 +92,45 @@ class TestMrtlib(unittest.TestCase):
 
             eq_(True, mrt_writer._f.closed)
 
+    def test_iter_records(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'rib.20161101.0000_pick.bz2')
+        input_buf = bz2.BZ2File(input_file, 'rb').read()
+        expected = [
+            str(r) for r in mrtlib.Reader(bz2.BZ2File(input_file, 'rb'))]
+
+        # Compressed file, which is read sequentially.
+        eq_(expected, [str(r) for r in mrtlib.iter_records(
+            bz2.BZ2File(input_file, 'rb'))])
+
+        # Plain file, which is mapped into memory.
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(input_buf)
+            f.flush()
+            with open(f.name, 'rb') as plain_file:
+                ok_(mrtlib._mmap(plain_file) is not None)
+                eq_(expected, [str(r) for r in mrtlib.iter_records(
+                    plain_file)])
+
+    def test_iter_records_types(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2')
+        input_buf = bz2.BZ2File(input_file, 'rb').read()
+        types = [mrtlib.MrtRecord.TYPE_BGP4MP]
+        expected = [
+            str(r) for r in mrtlib.Reader(bz2.BZ2File(input_file, 'rb'))
+            if r.type in types]
+
+        ok_(expected)
+        eq_(expected, [str(r) for r in mrtlib.iter_records(
+            io.BytesIO(input_buf), types=types)])
+
+    def test_iter_records_truncated(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2')
+        input_buf = bz2.BZ2File(input_file, 'rb').read()
+        count = len(list(mrtlib.iter_records(io.BytesIO(input_buf))))
+
+        eq_(count - 1, len(list(mrtlib.iter_records(
+            io.BytesIO(input_buf[:-1])))))
+
 
 class TestMrtlibMrtRecord(unittest.TestCase):
     """
@@ -563,6 +603,30 @@ class TestMrtlibTableDump2MrtRecord(unittest.TestCase):
 
         eq_(buf, output)
 
+    def test_parse_rib_generic_vpnv4(self):
+        nlri = bgp.LabelledVPNIPAddrPrefix(
+            24, '10.0.0.0', labels=[100], route_dist='65000:100')
+        rib_entry = mrtlib.MrtRibEntry(
+            peer_index=1,
+            originated_time=0x11111111,
+            bgp_attributes=[bgp.BGPPathAttributeOrigin(0)])
+        message = mrtlib.TableDump2RibGenericMrtMessage(
+            seq_num=1,
+            afi=bgp.RF_IPv4_VPN.afi,
+            safi=bgp.RF_IPv4_VPN.safi,
+            nlri=nlri,
+            rib_entries=[rib_entry])
+        record = mrtlib.TableDump2MrtRecord(
+            message=message,
+            timestamp=0x11111111)
+
+        (record, rest) = mrtlib.MrtRecord.parse(record.serialize())
+
+        ok_(isinstance(record.message.nlri, bgp.LabelledVPNIPAddrPrefix))
+        eq_('65000:100:10.0.0.0/24', record.message.nlri.formatted_nlri_str)
+        eq_(1, record.message.rib_entries[0].peer_index)
+        eq_(b'', rest)
+
 
 class TestMrtlibMrtPeer(unittest.TestCase):
     """
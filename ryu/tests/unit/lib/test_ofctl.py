@@ -636,6 +636,32 @@ def _add_tests():
             test_lib.add_method(Test_ofctl, name, f)
 
 
+class Test_ofctl_iter_flow_stats(unittest.TestCase):
+
+    def test_iter_flow_stats(self):
+        this_dir = os.path.dirname(sys.modules[__name__].__file__)
+        parser_json_dir = os.path.join(this_dir, '../ofproto/json/of13')
+        reply_json = '4-12-ofp_flow_stats_reply.packet.json'
+
+        dp = DummyDatapath(0x04)
+        waiters = {}
+        reply = ofproto_parser.ofp_msg_from_jsondict(
+            dp, json.load(open(os.path.join(parser_json_dir, reply_json))))
+        dp.set_reply(reply, waiters)
+
+        replies = ofctl_v1_3.iter_flow_stats(dp, waiters)
+        # The request is sent lazily.
+        eq_(None, dp.request_msg)
+        flows = []
+        for f in replies:
+            flows.extend(f)
+        eq_({}, waiters[dp.id])
+
+        expected = ofctl_v1_3.get_flow_stats(dp, waiters)
+        eq_(json.dumps(expected, sort_keys=True),
+            json.dumps(ofctl_v1_3.wrap_dpid_dict(dp, flows), sort_keys=True))
+
+
 _add_tests()
 
 if __name__ == "__main__":
@@ -13,11 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gc
 import logging
+import time
 import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
 
+from ryu.lib import hub
 from ryu.lib import ofctl_utils
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
 
 
 LOG = logging.getLogger(__name__)
@@ -140,3 +148,290 @@ class Test_ofctl_utils(unittest.TestCase):
             'ALL',
             self.util.ofp_queue_to_user(ofproto_v1_3.OFPQ_ALL)
         )
+
+    def test_to_cache_key(self):
+        self.assertEqual(
+            ofctl_utils.to_cache_key({'a': 1, 'b': ['x', {'c': 2}]}),
+            ofctl_utils.to_cache_key({'b': ['x', {'c': 2}], 'a': 1}))
+        self.assertNotEqual(ofctl_utils.to_cache_key({'a': 1}),
+                            ofctl_utils.to_cache_key({'a': '1'}))
+        self.assertNotEqual(ofctl_utils.to_cache_key([['a', 1]]),
+                            ofctl_utils.to_cache_key({'a': 1}))
+        self.assertEqual(None, ofctl_utils.to_cache_key({'a': set()}))
+
+    def test_lru_cache(self):
+        cache = ofctl_utils.LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(1, cache.get('a'))
+        cache['c'] = 3
+
+        # 'b' is the least recently used.
+        self.assertEqual(None, cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(2, len(cache))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+
+
+class Test_send_msgs_with_barrier(unittest.TestCase):
+
+    def setUp(self):
+        self.waiters = {}
+        self.dp = mock.MagicMock(id=1, ofproto=ofproto_v1_3,
+                                 ofproto_parser=ofproto_v1_3_parser)
+        self.xid = 0
+        self.dp.set_xid.side_effect = self._set_xid
+
+    def _set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def _flow_mods(self, count):
+        return [ofproto_v1_3_parser.OFPFlowMod(self.dp, priority=i)
+                for i in range(count)]
+
+    def test_errors(self):
+        flow_mods = self._flow_mods(3)
+        error = ofproto_v1_3_parser.OFPErrorMsg(
+            self.dp, type_=ofproto_v1_3.OFPET_FLOW_MOD_FAILED, code=0)
+
+        def _send_msgs(msgs):
+            # Replied in the same way as the handlers of the applications.
+            waiters_per_dp = self.waiters[self.dp.id]
+            waiters_per_dp[msgs[1].xid][1].append(error)
+            lock, replies = waiters_per_dp.pop(msgs[-1].xid)
+            replies.append(msgs[-1])
+            lock.set()
+        self.dp.send_msgs.side_effect = _send_msgs
+
+        errors = ofctl_utils.send_msgs_with_barrier(
+            self.dp, flow_mods, self.waiters)
+
+        self.assertEqual([None, error, None], errors)
+        sent = self.dp.send_msgs.call_args[0][0]
+        self.assertEqual(flow_mods, sent[:3])
+        self.assertTrue(
+            isinstance(sent[3], ofproto_v1_3_parser.OFPBarrierRequest))
+        self.assertEqual({}, self.waiters[self.dp.id])
+
+    @mock.patch('ryu.lib.ofctl_utils.DEFAULT_TIMEOUT', 0.01)
+    def test_no_barrier_reply(self):
+        errors = ofctl_utils.send_msgs_with_barrier(
+            self.dp, self._flow_mods(2), self.waiters)
+
+        self.assertEqual(None, errors)
+        self.assertEqual({}, self.waiters[self.dp.id])
+
+
+class Test_send_stats_request(unittest.TestCase):
+
+    def setUp(self):
+        self.waiters = {}
+        self.dp = mock.MagicMock(id=1, ofproto=ofproto_v1_3,
+                                 ofproto_parser=ofproto_v1_3_parser)
+        self.xid = 0
+        self.dp.set_xid.side_effect = self._set_xid
+        self.sent = []
+        self.dp.send_msg.side_effect = self.sent.append
+        ofctl_utils._stats_latency.clear()
+        ofctl_utils._barrier_dps.clear()
+
+    def tearDown(self):
+        ofctl_utils._stats_latency.clear()
+        ofctl_utils._barrier_dps.clear()
+
+    def _set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def _stats(self):
+        return ofproto_v1_3_parser.OFPFlowStatsRequest(self.dp)
+
+    def _reply(self, xid, more=False):
+        # Replied in the same way as the handlers of the applications.
+        flags = ofproto_v1_3.OFPMPF_REPLY_MORE if more else 0
+        msg = ofproto_v1_3_parser.OFPFlowStatsReply(self.dp, flags=flags)
+        msg.xid = xid
+        waiters_per_dp = self.waiters[self.dp.id]
+        lock, msgs = waiters_per_dp[xid]
+        msgs.append(msg)
+        if not more:
+            del waiters_per_dp[xid]
+            lock.set()
+        return msg
+
+    def _barrier_reply(self, xid):
+        msg = ofproto_v1_3_parser.OFPBarrierReply(self.dp)
+        msg.xid = xid
+        lock, msgs = self.waiters[self.dp.id].pop(xid)
+        msgs.append(msg)
+        lock.set()
+
+    def _latency(self):
+        return ofctl_utils.get_stats_latency(self.dp.id)[self.dp.id]
+
+    def test_last_reply(self):
+        stats = self._stats()
+        replies = []
+
+        def _replies():
+            hub.sleep(0.01)
+            replies.append(self._reply(stats.xid, more=True))
+            hub.sleep(0.01)
+            replies.append(self._reply(stats.xid))
+        hub.spawn(_replies)
+
+        msgs = []
+        self.assertTrue(ofctl_utils.send_stats_request(
+            self.dp, stats, self.waiters, msgs))
+
+        self.assertEqual(replies, msgs)
+        self.assertEqual([stats], self.sent)
+        self.assertEqual({}, self.waiters[self.dp.id])
+        latency = self._latency()
+        self.assertEqual(1, latency['requests'])
+        self.assertEqual(0, latency['timeouts'])
+        # Returns on the last reply without waiting for DEFAULT_TIMEOUT.
+        self.assertTrue(latency['max'] < ofctl_utils.DEFAULT_TIMEOUT)
+
+    @mock.patch('ryu.lib.ofctl_utils.DEFAULT_TIMEOUT', 0.05)
+    def test_deadline(self):
+        stats = self._stats()
+
+        def _replies():
+            # Never sends the last reply.
+            while stats.xid in self.waiters[self.dp.id]:
+                self._reply(stats.xid, more=True)
+                hub.sleep(0.01)
+        hub.spawn(_replies)
+
+        msgs = []
+        self.assertFalse(ofctl_utils.send_stats_request(
+            self.dp, stats, self.waiters, msgs, timeout=0.1))
+
+        self.assertTrue(msgs)
+        self.assertEqual({}, self.waiters[self.dp.id])
+        latency = self._latency()
+        self.assertEqual(1, latency['timeouts'])
+        self.assertTrue(latency['max'] < 0.1 + 0.05)
+        self.assertTrue(self.dp in ofctl_utils._barrier_dps)
+
+    def test_barrier(self):
+        # The previous request to the switch timed out.
+        ofctl_utils._barrier_dps.add(self.dp)
+        stats = self._stats()
+
+        def _replies():
+            # The switch sends no stats reply, e.g. because of an error.
+            hub.sleep(0.01)
+            self._barrier_reply(self.sent[1].xid)
+        hub.spawn(_replies)
+
+        msgs = []
+        ofctl_utils.send_stats_request(self.dp, stats, self.waiters, msgs)
+
+        self.assertEqual([], msgs)
+        self.assertEqual(stats, self.sent[0])
+        self.assertTrue(
+            isinstance(self.sent[1], ofproto_v1_3_parser.OFPBarrierRequest))
+        self.assertEqual({}, self.waiters[self.dp.id])
+        self.assertEqual(0, self._latency()['timeouts'])
+        self.assertTrue(self.dp in ofctl_utils._barrier_dps)
+
+    def test_barrier_not_needed(self):
+        ofctl_utils._barrier_dps.add(self.dp)
+        stats = self._stats()
+
+        def _replies():
+            hub.sleep(0.01)
+            self._reply(stats.xid)
+        hub.spawn(_replies)
+
+        msgs = []
+        ofctl_utils.send_stats_request(self.dp, stats, self.waiters, msgs)
+
+        # Completed by the last reply before the barrier reply.
+        self.assertEqual(1, len(msgs))
+        self.assertEqual({}, self.waiters[self.dp.id])
+        self.assertFalse(self.dp in ofctl_utils._barrier_dps)
+
+    @mock.patch('ryu.lib.ofctl_utils.DEFAULT_TIMEOUT', 0.05)
+    def test_deadline_iter(self):
+        stats = self._stats()
+        replies = []
+
+        def _replies():
+            hub.sleep(0.01)
+            replies.append(self._reply(stats.xid, more=True))
+        hub.spawn(_replies)
+
+        msgs = []
+        with self.assertRaises(ofctl_utils.StatsRequestIncomplete):
+            for msg in ofctl_utils.send_stats_request_iter(
+                    self.dp, stats, self.waiters):
+                msgs.append(msg)
+
+        # The replies received so far are yielded before the error.
+        self.assertEqual(replies, msgs)
+        self.assertEqual({}, self.waiters[self.dp.id])
+        self.assertEqual(1, self._latency()['timeouts'])
+
+    def test_barrier_iter(self):
+        ofctl_utils._barrier_dps.add(self.dp)
+        stats = self._stats()
+        replies = []
+
+        def _replies():
+            hub.sleep(0.01)
+            replies.append(self._reply(stats.xid, more=True))
+            self._barrier_reply(self.sent[1].xid)
+        hub.spawn(_replies)
+
+        msgs = list(ofctl_utils.send_stats_request_iter(
+            self.dp, stats, self.waiters))
+
+        # The barrier reply is not yielded.
+        self.assertEqual(replies, msgs)
+        self.assertEqual({}, self.waiters[self.dp.id])
+        latency = self._latency()
+        self.assertEqual(0, latency['timeouts'])
+        self.assertTrue(latency['max'] < ofctl_utils.DEFAULT_TIMEOUT)
+
+    def test_cancel(self):
+        ofctl_utils._barrier_dps.add(self.dp)
+        stats = self._stats()
+
+        def _cancel():
+            hub.sleep(0.01)
+            self._reply(stats.xid, more=True)
+            ofctl_utils.cancel_stats_requests(self.waiters, self.dp)
+        hub.spawn(_cancel)
+
+        msgs = []
+        start = time.time()
+        self.assertFalse(ofctl_utils.send_stats_request(
+            self.dp, stats, self.waiters, msgs))
+
+        self.assertTrue(time.time() - start < ofctl_utils.DEFAULT_TIMEOUT)
+        # The replies received so far are returned.
+        self.assertEqual(1, len(msgs))
+        self.assertEqual({}, self.waiters[self.dp.id])
+        # The switch is forgotten.
+        self.assertEqual({}, ofctl_utils.get_stats_latency(self.dp.id))
+        self.assertFalse(self.dp in ofctl_utils._barrier_dps)
+
+    def test_disconnected(self):
+        dp = mock.MagicMock(id=2)
+        ofctl_utils._stats_latency[dp] = ofctl_utils.StatsLatency()
+        ofctl_utils._barrier_dps.add(dp)
+        self.assertEqual([2], list(ofctl_utils.get_stats_latency()))
+
+        # The switch is forgotten with the Datapath instance, even if the
+        # application does not cancel the requests.
+        del dp
+        gc.collect()
+        self.assertEqual({}, ofctl_utils.get_stats_latency())
+        self.assertEqual(0, len(ofctl_utils._barrier_dps))
@@ -52,3 +52,32 @@ class Test_ofctl_v1_3(unittest.TestCase):
         act = insts.actions[0]
         ok_(isinstance(act, OFPActionPopMpls))
         eq_(act.ethertype, 0x0800)
+
+    def test_to_match_cache(self):
+        dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+
+        attrs = {'dl_type': 2048, 'nw_src': '10.0.0.0/24', 'tp_dst': 80,
+                 'nw_proto': 6}
+        match1 = ofctl_v1_3.to_match(dp, dict(attrs))
+        match2 = ofctl_v1_3.to_match(dp, dict(attrs))
+        ok_(match1 is not match2)
+        eq_(match1.to_jsondict(), match2.to_jsondict())
+        eq_(('10.0.0.0', '255.255.255.0'), match2['ipv4_src'])
+        eq_(80, match2['tcp_dst'])
+
+        # Not mixed up with the attributes of the other types.
+        attrs['tp_dst'] = '80'
+        eq_(80, ofctl_v1_3.to_match(dp, attrs)['tcp_dst'])
+        attrs['tp_dst'] = 80.0
+        assert_raises(ValueError, ofctl_v1_3.to_match, dp, attrs)
+
+    def test_to_actions_cache(self):
+        dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+
+        acts = [{'type': 'OUTPUT', 'port': 1},
+                {'type': 'GOTO_TABLE', 'table_id': 1}]
+        result1 = ofctl_v1_3.to_actions(dp, acts)
+        result1.append(None)
+        result2 = ofctl_v1_3.to_actions(dp, acts)
+        eq_(2, len(result2))
+        eq_(1, result2[1].actions[0].port)
@@ -19,6 +19,7 @@ import logging
 import os
 import struct
 import sys
+import tempfile
 import unittest
 
 try:
@@ -27,6 +28,7 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 from nose.tools import raises
 
 from ryu.utils import binary_str
@@ -228,3 +230,105 @@ class Test_pcaplib_Writer(unittest.TestCase):
         expected_buf = b'hoge'  # b'hogehoge'[:snaplen]
         eq_(expected_buf, f.buf)
         eq_(snaplen, len(f.buf))
+
+    @staticmethod
+    def test_with_buf_size():
+        f = DummyFile()
+        w = pcaplib.Writer(f, buf_size=80)
+        w.write_pkt(b'test_data_1', ts=(0x1234 + (0x5678 / 1e6)))
+        w.write_pkt(b'test_data_2', ts=(0x2345 + (0x6789 / 1e6)))
+        eq_(b'', f.buf)
+        # The buffered data exceeds buf_size.
+        w.write_pkt(b'test_data_3', ts=0)
+        eq_(pcaplib.PcapFileHdr.FILE_HDR_SIZE +
+            (pcaplib.PcapPktHdr.PKT_HDR_SIZE + 11) * 3, len(f.buf))
+        w.write_pkt(b'test_data_4', ts=0)
+        w.close()
+        eq_(pcaplib.PcapFileHdr.FILE_HDR_SIZE +
+            (pcaplib.PcapPktHdr.PKT_HDR_SIZE + 11) * 4, len(f.buf))
+
+    def test_del(self):
+        fd, file_name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with open(file_name, 'wb') as f:
+                w = pcaplib.Writer(f, buf_size=4096)
+                w.write_pkt(b'test_data_1', ts=0)
+                # Writes the buffered data, but does not close the file.
+                w.__del__()
+                ok_(not f.closed)
+            eq_(pcaplib.PcapFileHdr.FILE_HDR_SIZE +
+                pcaplib.PcapPktHdr.PKT_HDR_SIZE + 11,
+                os.path.getsize(file_name))
+
+            with open(file_name, 'wb') as f:
+                w = pcaplib.Writer(f, buf_size=4096)
+            # The file has been closed by the caller.
+            w.__del__()
+        finally:
+            os.remove(file_name)
+
+
+class Test_pcaplib_MmapReader(unittest.TestCase):
+    """
+    Test case for pcaplib.MmapReader class
+    """
+
+    expected_outputs = Test_pcaplib_Reader.expected_outputs
+
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def _read(self, file_name):
+        with pcaplib.MmapReader(open(file_name, 'rb')) as reader:
+            return [(ts, bytes(buf)) for ts, buf in reader]
+
+    def _write(self, writer_cls, **kwargs):
+        w = writer_cls(open(self.file_name, 'wb'), buf_size=4096, **kwargs)
+        for ts, buf in self.expected_outputs:
+            w.write_pkt(buf, ts=ts)
+        w.close()
+
+    def test_with_big_endian(self):
+        eq_(self.expected_outputs,
+            self._read(os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap')))
+
+    def test_with_little_endian(self):
+        eq_(self.expected_outputs,
+            self._read(os.path.join(PCAP_PACKET_DATA_DIR,
+                                    'little_endian.pcap')))
+
+    def test_zero_copy(self):
+        reader = pcaplib.MmapReader(
+            open(os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap'),
+                 'rb'))
+        for _ts, buf in reader:
+            ok_(isinstance(buf, memoryview))
+            buf.release()
+        reader.close()
+
+    def test_batches(self):
+        self._write(pcaplib.Writer)
+        with pcaplib.MmapReader(open(self.file_name, 'rb')) as reader:
+            eq_([1, 1], [len(b) for b in reader.batches(1)])
+            eq_([2], [len(b) for b in reader.batches(3)])
+
+    def test_nanosecond(self):
+        self._write(pcaplib.Writer, nanosecond=True)
+        hdr, _ = pcaplib.PcapFileHdr.parser(open(self.file_name, 'rb').read())
+        ok_(hdr.nanosecond)
+        eq_(self.expected_outputs, self._read(self.file_name))
+        eq_(self.expected_outputs,
+            list(pcaplib.Reader(open(self.file_name, 'rb'))))
+
+    def test_pcapng(self):
+        self._write(pcaplib.PcapngWriter)
+        eq_(self.expected_outputs, self._read(self.file_name))
+
+    def test_pcapng_nanosecond(self):
+        self._write(pcaplib.PcapngWriter, nanosecond=True)
+        eq_(self.expected_outputs, self._read(self.file_name))
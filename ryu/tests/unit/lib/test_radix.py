@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib import ip
+from ryu.lib.radix import RadixTree
+
+LOG = logging.getLogger(__name__)
+
+
+def _p(prefix):
+    addr, length = prefix.split('/')
+    return ip.text_to_int(addr), int(length)
+
+
+class Test_RadixTree(unittest.TestCase):
+    """
+    Test case for ryu.lib.radix.RadixTree
+    """
+
+    def setUp(self):
+        self.tree = RadixTree(32)
+        for prefix in ['0.0.0.0/0', '10.0.0.0/8', '10.1.0.0/16',
+                       '10.1.1.0/24', '10.2.0.0/16', '192.168.0.0/24']:
+            self.tree.insert(*_p(prefix), value=prefix)
+
+    def _longest_match(self, addr):
+        match = self.tree.longest_match(ip.ipv4_to_int(addr))
+        return match[2] if match else None
+
+    def test_len(self):
+        eq_(6, len(self.tree))
+
+        self.tree.insert(*_p('10.0.0.0/8'), value='replaced')
+        eq_(6, len(self.tree))
+        eq_('replaced', self.tree.get(*_p('10.0.0.0/8')))
+
+    def test_get(self):
+        eq_('10.1.0.0/16', self.tree.get(*_p('10.1.0.0/16')))
+        eq_(None, self.tree.get(*_p('10.1.0.0/17')))
+        ok_(_p('10.1.1.0/24') in self.tree)
+        ok_(_p('10.1.0.0/15') not in self.tree)
+
+    def test_host_bits_ignored(self):
+        eq_('10.1.0.0/16', self.tree.get(*_p('10.1.2.3/16')))
+
+    def test_longest_match(self):
+        eq_('10.1.1.0/24', self._longest_match('10.1.1.1'))
+        eq_('10.1.0.0/16', self._longest_match('10.1.2.1'))
+        eq_('10.0.0.0/8', self._longest_match('10.3.0.1'))
+        eq_('0.0.0.0/0', self._longest_match('172.16.0.1'))
+
+        match = self.tree.longest_match(*_p('10.1.0.0/15'))
+        eq_(_p('10.0.0.0/8') + ('10.0.0.0/8',), match)
+
+    def test_longest_match_no_default(self):
+        self.tree.delete(*_p('0.0.0.0/0'))
+
+        eq_(None, self._longest_match('172.16.0.1'))
+        eq_('192.168.0.0/24', self._longest_match('192.168.0.1'))
+
+    def test_subtree(self):
+        eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.1.0/24', '10.2.0.0/16'],
+            [v for _, _, v in self.tree.subtree(*_p('10.0.0.0/8'))])
+        eq_(['10.1.0.0/16', '10.1.1.0/24', '10.2.0.0/16'],
+            [v for _, _, v in self.tree.subtree(*_p('10.0.0.0/14'))])
+        eq_([], list(self.tree.subtree(*_p('172.16.0.0/12'))))
+
+    def test_items(self):
+        eq_(['0.0.0.0/0', '10.0.0.0/8', '10.1.0.0/16', '10.1.1.0/24',
+             '10.2.0.0/16', '192.168.0.0/24'],
+            list(self.tree.values()))
+
+    def test_delete(self):
+        eq_('10.1.0.0/16', self.tree.delete(*_p('10.1.0.0/16')))
+
+        eq_(5, len(self.tree))
+        eq_(None, self.tree.get(*_p('10.1.0.0/16')))
+        eq_('10.1.1.0/24', self._longest_match('10.1.1.1'))
+        eq_('10.0.0.0/8', self._longest_match('10.1.2.1'))
+
+    @raises(KeyError)
+    def test_delete_not_found(self):
+        self.tree.delete(*_p('10.1.0.0/17'))
+
+    @raises(ValueError)
+    def test_invalid_length(self):
+        self.tree.insert(0, 33, None)
+
+    def test_random(self):
+        width = 16
+        tree = RadixTree(width)
+        prefixes = {}
+
+        def mask(length):
+            return ((1 << length) - 1) << (width - length)
+
+        rand = random.Random(0)
+        for _ in range(2000):
+            length = rand.randint(0, width)
+            prefix = rand.getrandbits(width) & mask(length)
+            if rand.random() < 0.6:
+                tree.insert(prefix, length, (prefix, length))
+                prefixes[(prefix, length)] = True
+            elif prefixes:
+                key = rand.choice(sorted(prefixes))
+                eq_(key, tree.delete(*key))
+                del prefixes[key]
+
+            addr = rand.getrandbits(width)
+            matches = [k for k in prefixes if addr & mask(k[1]) == k[0]]
+            expected = max(matches, key=lambda k: k[1]) if matches else None
+            match = tree.longest_match(addr)
+            eq_(expected, match[2] if match else None)
+        eq_(sorted(prefixes), list(tree))
@@ -20,6 +20,7 @@ import base64
 import six
 import unittest
 from nose.tools import eq_
+from nose.tools import ok_
 
 from ryu.lib import stringify
 
@@ -32,6 +33,27 @@ class C1(stringify.StringifyMixin):
         self.c = c
 
 
+class C2(stringify.StringifyMixin):
+    __slots__ = ('a', '_b', 'c')
+
+    def __init__(self, a, c):
+        self.a = a
+        self._b = 'B'
+        self.c = c
+
+
+class C3(stringify.StringifyMixin):
+    _TYPE = {
+        'ascii': [
+            'a',
+        ]
+    }
+
+    def __init__(self, a, c):
+        self.a = a
+        self.c = c
+
+
 class Test_stringify(unittest.TestCase):
     """ Test case for ryu.lib.stringify
     """
@@ -73,3 +95,43 @@ class Test_stringify(unittest.TestCase):
         eq_(c.__class__, c2.__class__)
         eq_(c.__dict__, c2.__dict__)
         eq_(j, c.to_jsondict(encode_string=my_encode))
+
+    def test_jsondict_slots(self):
+        j = {'C2': {'a': 'aaa', 'c': 'ccc'}}
+        c = C2(a='aaa', c='ccc')
+        ok_(not hasattr(c, '__dict__'))
+        eq_(j, c.to_jsondict(encode_string=lambda x: x))
+        c2 = C2.from_jsondict(j['C2'], decode_string=lambda x: x)
+        eq_(c.__class__, c2.__class__)
+        eq_((c.a, c._b, c.c), (c2.a, c2._b, c2.c))
+        eq_("C2(a='aaa',c='ccc')", str(c))
+
+    def test_str_unset_slot(self):
+        c = C2(a=1, c=2)
+        del c.c
+        eq_('C2(a=1)', str(c))
+
+    def test_types_cache(self):
+        eq_(None, C1._get_type('a'))
+        eq_(stringify.AsciiStringType, C3._get_type('a'))
+        eq_(None, C3._get_type('c'))
+        eq_({'C3': {'a': 'x', 'c': 'eQ=='}},
+            C3(a='x', c=b'y').to_jsondict())
+
+        # _TYPE extended at runtime
+        C3._TYPE['ascii'].append('c')
+        try:
+            eq_(stringify.AsciiStringType, C3._get_type('c'))
+            eq_({'C3': {'a': 'x', 'c': 'y'}},
+                C3(a='x', c='y').to_jsondict())
+        finally:
+            C3._TYPE['ascii'].remove('c')
+
+        # Renamed with the same total length
+        C3._TYPE['ascii'][0] = 'c'
+        try:
+            eq_(None, C3._get_type('a'))
+            eq_(stringify.AsciiStringType, C3._get_type('c'))
+        finally:
+            C3._TYPE['ascii'][0] = 'a'
+        eq_(stringify.AsciiStringType, C3._get_type('a'))
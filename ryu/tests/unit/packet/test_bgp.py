@@ -428,6 +428,31 @@ class Test_bgp(unittest.TestCase):
         eq_(str(action), str(msg))
         eq_(rest, b'')
 
+    def test_prefix_key(self):
+        eq_((0x0a010200, 24), bgp.IPAddrPrefix(24, '10.1.2.0').key)
+        # Host bits are ignored as serialize() does.
+        eq_(bgp.IPAddrPrefix(24, '10.1.2.0').key,
+            bgp.IPAddrPrefix(24, '10.1.2.3').key)
+        eq_((0x20010db8 << 96, 32), bgp.IP6AddrPrefix(32, '2001:db8::').key)
+
+        nlri1 = bgp.LabelledVPNIPAddrPrefix(
+            24, '10.1.2.0', labels=[100], route_dist='65000:100')
+        nlri2 = bgp.LabelledVPNIPAddrPrefix(
+            24, '10.1.2.0', labels=[200], route_dist='65000:100')
+        nlri3 = bgp.LabelledVPNIPAddrPrefix(
+            24, '10.1.2.0', labels=[100], route_dist='65000:200')
+        eq_((0x0a010200, 24), nlri1.key[1:])
+        eq_(nlri1.key, nlri2.key)
+        ok_(nlri1.key != nlri3.key)
+        nlri = bgp.LabelledVPNIP6AddrPrefix(
+            64, '2001:db8:1::', labels=[100], route_dist='65000:100')
+        eq_((0x20010db80001 << 80, 64), nlri.key[1:])
+
+        # Parsed prefixes have the same keys.
+        for nlri in (bgp.IPAddrPrefix(24, '10.1.2.0'), nlri1):
+            parsed, _ = nlri.__class__.parser(nlri.serialize())
+            eq_(nlri.key, parsed.key)
+
     def test_json1(self):
         opt_param = [bgp.BGPOptParamCapabilityUnknown(cap_code=200,
                                                       cap_value=b'hoge'),
@@ -0,0 +1,220 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from copy import copy
+import gc
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.services.protocols.bgp.info_base.base import PathAttrCache
+from ryu.services.protocols.bgp.info_base.base import PathAttrs
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Table
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Table
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _pattrs(as_path, med=None):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [as_path])
+    if med is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(med)
+    return pattrs
+
+
+def _path(addr, pattrs):
+    return Ipv4Path(None, bgp.IPAddrPrefix(24, addr), 0,
+                    pattrs=pattrs, nexthop='192.168.0.1')
+
+
+class Test_PathAttrCache(unittest.TestCase):
+    """
+    Test case for ryu.services.protocols.bgp.info_base.base.PathAttrCache
+    """
+
+    def test_intern(self):
+        cache = PathAttrCache()
+        pattrs1 = cache.intern(_pattrs([65001, 65002]))
+        pattrs2 = cache.intern(_pattrs([65001, 65002]))
+        pattrs3 = cache.intern(_pattrs([65001, 65002], med=10))
+
+        ok_(isinstance(pattrs1, PathAttrs))
+        ok_(pattrs1 is pattrs2)
+        ok_(pattrs1 is not pattrs3)
+        eq_(2, len(cache))
+        # Identical path attributes are shared between the sets.
+        ok_(pattrs1[bgp.BGP_ATTR_TYPE_AS_PATH] is
+            pattrs3[bgp.BGP_ATTR_TYPE_AS_PATH])
+        # Interning an interned set returns itself.
+        ok_(cache.intern(pattrs1) is pattrs1)
+
+    def test_intern_keeps_attributes(self):
+        pattrs = _pattrs([65001])
+        interned = PathAttrCache().intern(pattrs)
+
+        eq_(str(pattrs), str(OrderedDict(interned)))
+
+    def test_release(self):
+        cache = PathAttrCache()
+        pattrs = cache.intern(_pattrs([65001]))
+        eq_(1, len(cache))
+
+        del pattrs
+        gc.collect()
+        eq_(0, len(cache))
+
+    @raises(TypeError)
+    def test_read_only(self):
+        pattrs = PathAttrCache().intern(_pattrs([65001]))
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(10)
+
+    def test_copy(self):
+        pattrs = PathAttrCache().intern(_pattrs([65001]))
+        copied = copy(pattrs)
+
+        ok_(not isinstance(copied, PathAttrs))
+        copied[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(10)
+        eq_(2, len(pattrs))
+
+
+class Test_Path(unittest.TestCase):
+    """
+    Test case for path attributes of
+    ryu.services.protocols.bgp.info_base.base.Path
+    """
+
+    def test_shared_pathattrs(self):
+        path1 = _path('10.0.0.0', _pattrs([65001]))
+        path2 = _path('10.0.1.0', _pattrs([65001]))
+        path3 = _path('10.0.2.0', _pattrs([65002]))
+
+        ok_(path1.pathattr_set is path2.pathattr_set)
+        ok_(path1.pathattr_set is not path3.pathattr_set)
+        ok_(path1.clone().pathattr_set is path1.pathattr_set)
+
+    def test_pathattr_map_is_copy(self):
+        path = _path('10.0.0.0', _pattrs([65001]))
+        pattrs = path.pathattr_map
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(10)
+
+        eq_(None, path.get_pattr(bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC))
+
+    def test_withdraw(self):
+        path = Ipv4Path(None, bgp.IPAddrPrefix(24, '10.0.0.0'), 0,
+                        is_withdraw=True)
+
+        eq_(OrderedDict(), path.pathattr_map)
+
+    def test_compute_best_path(self):
+        path1 = _path('10.0.0.0', _pattrs([65001], med=20))
+        path2 = _path('10.0.0.0', _pattrs([65001], med=10))
+        path3 = _path('10.0.0.0', _pattrs([65001], med=20))
+
+        best_path, reason = processor.compute_best_path(65000, path1, path2)
+        ok_(best_path is path2)
+        eq_(processor.BPR_MED, reason)
+
+        # The attribute based steps are skipped for the same path
+        # attributes.
+        _, reason = processor.compute_best_path(65000, path1, path3)
+        ok_(reason not in (processor.BPR_LOCAL_PREF, processor.BPR_ASPATH,
+                           processor.BPR_ORIGIN, processor.BPR_MED))
+
+
+class Test_Table(unittest.TestCase):
+    """
+    Test case for the prefix index of
+    ryu.services.protocols.bgp.info_base.base.Table
+    """
+
+    def _vpn_path(self, route_dist, prefix):
+        addr, length = prefix.split('/')
+        nlri = bgp.LabelledVPNIPAddrPrefix(
+            int(length), addr, route_dist=route_dist, labels=[100])
+        return Vpnv4Path(None, nlri, 0, pattrs=_pattrs([65001]),
+                         nexthop='192.168.0.1')
+
+    def setUp(self):
+        self.table = Ipv4Table(mock.MagicMock(), mock.MagicMock())
+        for prefix in ['10.0.0.0/8', '10.1.0.0/16', '10.1.1.0/24',
+                       '10.2.0.0/16']:
+            addr, length = prefix.split('/')
+            self.table.insert(Ipv4Path(
+                None, bgp.IPAddrPrefix(int(length), addr), 0,
+                pattrs=_pattrs([65001]), nexthop='192.168.0.1'))
+
+    def test_longest_match(self):
+        eq_(['10.1.1.0/24'],
+            [d.nlri_str for d in self.table.longest_match('10.1.1.1')])
+        eq_(['10.1.0.0/16'],
+            [d.nlri_str for d in self.table.longest_match('10.1.0.0/23')])
+        eq_([], self.table.longest_match('172.16.0.1'))
+
+    def test_more_specifics(self):
+        eq_(['10.1.0.0/16', '10.1.1.0/24'],
+            [d.nlri_str for d in self.table.more_specifics('10.1.0.0/16')])
+
+    def test_delete_dest(self):
+        dest = self.table.longest_match('10.1.1.1')[0]
+        self.table.delete_dest(dest)
+
+        eq_(['10.1.0.0/16'],
+            [d.nlri_str for d in self.table.longest_match('10.1.1.1')])
+
+    def test_get_dest(self):
+        # Destinations are looked up by the compact key of the prefix.
+        dest = self.table._get_dest(bgp.IPAddrPrefix(16, '10.1.2.3'))
+        eq_('10.1.0.0/16', dest.nlri_str)
+        eq_(None, self.table._get_dest(bgp.IPAddrPrefix(17, '10.1.0.0')))
+
+    @raises(ValueError)
+    def test_invalid_prefix(self):
+        self.table.longest_match('2001:db8::1')
+
+    def test_vpn(self):
+        table = Vpnv4Table(mock.MagicMock(), mock.MagicMock())
+        table.insert(self._vpn_path('65000:100', '10.0.0.0/8'))
+        table.insert(self._vpn_path('65000:100', '10.1.0.0/16'))
+        table.insert(self._vpn_path('65000:200', '10.0.0.0/8'))
+
+        eq_(['65000:100:10.1.0.0/16', '65000:200:10.0.0.0/8'],
+            [d.nlri_str for d in table.longest_match('10.1.1.1')])
+        eq_(['65000:200:10.0.0.0/8'],
+            [d.nlri_str for d in table.longest_match(
+                '10.1.1.1', route_dist='65000:200')])
+        eq_(['65000:100:10.0.0.0/8', '65000:100:10.1.0.0/16'],
+            [d.nlri_str for d in table.more_specifics(
+                '10.0.0.0/8', route_dist='65000:100')])
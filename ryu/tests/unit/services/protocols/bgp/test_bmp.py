@@ -0,0 +1,193 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import errno
+import logging
+import socket
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.lib.packet import bmp as bmp_pkt
+from ryu.services.protocols.bgp import bmp
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.model import ReceivedRoute
+
+
+LOG = logging.getLogger(__name__)
+
+
+class _Peer(object):
+    version_num = 1
+
+    def __init__(self, ip_address):
+        self.ip_address = ip_address
+
+
+def _msg(value):
+    return bmp_pkt.BMPInitiation(
+        [{'type': bmp_pkt.BMP_INIT_TYPE_STRING, 'value': value}])
+
+
+def _route(peer, addr, nexthop='192.168.0.1'):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    path = Ipv4Path(peer, bgp.IPAddrPrefix(24, addr), 1,
+                    pattrs=pattrs, nexthop=nexthop)
+    return ReceivedRoute(path, peer)
+
+
+class Test_BMPClient(unittest.TestCase):
+    """
+    Test case for ryu.services.protocols.bgp.bmp.BMPClient
+    """
+
+    def setUp(self):
+        self.client = bmp.BMPClient(mock.MagicMock(), '127.0.0.1', 11019,
+                                    queue_size=3, batch_size=2)
+        self.client._socket = mock.MagicMock()
+        self.client._construct_route_monitoring = (
+            lambda peer, route: _msg(u'%s %s %s' % (
+                peer.ip_address, route.path.nlri.formatted_nlri_str,
+                route.path.nexthop)))
+        self.client._construct_peer_up_notification = (
+            lambda peer: _msg(u'up %s' % peer.ip_address))
+        self.peer1 = _Peer('10.0.0.1')
+        self.peer2 = _Peer('10.0.0.2')
+
+    def _changed(self, peer, route):
+        self.client.on_adj_rib_in_changed(
+            {'peer': peer, 'received_route': route})
+
+    def _queued(self):
+        msgs = []
+        while self.client._queue:
+            msgs.extend(self.client._dequeue())
+        return [msg.info[0]['value'] for msg in msgs]
+
+    def test_coalesce(self):
+        self._changed(self.peer1, _route(self.peer1, '10.1.0.0'))
+        self._changed(self.peer2, _route(self.peer2, '10.1.0.0'))
+        self._changed(self.peer1,
+                      _route(self.peer1, '10.1.0.0', '192.168.0.2'))
+
+        eq_([u'10.0.0.1 10.1.0.0/24 192.168.0.2',
+             u'10.0.0.2 10.1.0.0/24 192.168.0.1'], self._queued())
+        eq_(1, self.client.counters[bmp.BMP_COALESCED])
+        eq_(3, self.client.counters[bmp.BMP_QUEUED])
+
+    def test_no_coalesce_across_peer_up(self):
+        self._changed(self.peer1, _route(self.peer1, '10.1.0.0'))
+        self.client.on_adj_up({'peer': self.peer1})
+        self._changed(self.peer1, _route(self.peer1, '10.1.0.0'))
+
+        eq_([u'10.0.0.1 10.1.0.0/24 192.168.0.1',
+             u'up 10.0.0.1',
+             u'10.0.0.1 10.1.0.0/24 192.168.0.1'], self._queued())
+        eq_(0, self.client.counters[bmp.BMP_COALESCED])
+
+    def test_drop(self):
+        for i in range(5):
+            self._changed(self.peer1, _route(self.peer1, '10.%d.0.0' % i))
+        # Changes of the queued prefixes are still coalesced.
+        self._changed(self.peer1, _route(self.peer1, '10.0.0.0'))
+
+        eq_(3, len(self.client._queue))
+        stats = self.client.get_stats()
+        eq_(2, stats[bmp.BMP_DROPPED])
+        eq_(1, stats[bmp.BMP_COALESCED])
+        eq_({'10.0.0.1': 2}, stats['dropped_by_peer'])
+        eq_(3, stats['queue_len'])
+
+    def test_construct_on_send(self):
+        construct = mock.MagicMock(
+            side_effect=self.client._construct_route_monitoring)
+        self.client._construct_route_monitoring = construct
+        for i in range(5):
+            self._changed(self.peer1, _route(self.peer1, '10.%d.0.0' % i))
+        self._changed(self.peer1, _route(self.peer1, '10.0.0.0'))
+
+        # Neither the coalesced nor the dropped changes are built.
+        eq_(0, construct.call_count)
+        eq_(3, len(self._queued()))
+        eq_(3, construct.call_count)
+
+    def test_not_connected(self):
+        self.client._socket = None
+        self._changed(self.peer1, _route(self.peer1, '10.1.0.0'))
+
+        eq_(0, len(self.client._queue))
+        eq_(0, self.client.counters[bmp.BMP_QUEUED])
+
+    def test_send_batch(self):
+        for i in range(3):
+            self._changed(self.peer1, _route(self.peer1, '10.%d.0.0' % i))
+
+        while self.client._queue:
+            self.client._send(self.client._dequeue())
+
+        sendall = self.client._socket.sendall
+        eq_(2, sendall.call_count)
+        eq_(3, self.client.counters[bmp.BMP_SENT])
+        eq_(2, self.client.counters[bmp.BMP_WRITES])
+        # The first write contains two messages.
+        buf = sendall.call_args_list[0][0][0]
+        msg, rest = bmp_pkt.BMPMessage.parser(buf)
+        eq_(u'10.0.0.1 10.0.0.0/24 192.168.0.1', msg.info[0]['value'])
+        msg, rest = bmp_pkt.BMPMessage.parser(rest)
+        eq_(u'10.0.0.1 10.1.0.0/24 192.168.0.1', msg.info[0]['value'])
+        ok_(not rest)
+
+    def _connect(self, recv):
+        # Connects to the bmpstation whose socket calls recv() on receiving.
+        connected = []
+
+        def _connect_tcp(peer_addr, conn_handler):
+            connected.append(peer_addr)
+            if len(connected) > 1:
+                self.client.stop()
+                return
+            sock = mock.MagicMock()
+            sock.recv.side_effect = recv
+            conn_handler(sock)
+
+        self.client._socket = None
+        self.client._connect_retry_time = 0
+        self.client._connect_tcp = _connect_tcp
+        self.client.start()
+        return connected
+
+    def test_reconnect_on_reset(self):
+        def _recv(bufsize):
+            raise socket.error(errno.ECONNRESET, 'Connection reset by peer')
+
+        eq_(2, len(self._connect(_recv)))
+        ok_(not self.client.started)
+
+    def test_no_reconnect_on_stop(self):
+        def _recv(bufsize):
+            self.client.stop()
+            raise IOError(errno.EBADF, 'Bad file descriptor')
+
+        eq_(1, len(self._connect(_recv)))
+        ok_(not self.client.started)
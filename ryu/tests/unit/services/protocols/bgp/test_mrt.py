@@ -0,0 +1,218 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import io
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib import mrtlib
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import mrt
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.info_base.vrf4 import Vrf4Table
+
+
+LOG = logging.getLogger(__name__)
+
+
+class _Peer(object):
+    def __init__(self, ip_address, remote_as, version_num=1):
+        self.ip_address = ip_address
+        self.remote_as = remote_as
+        self.version_num = version_num
+
+    @staticmethod
+    def in_established():
+        return False
+
+
+def _pattrs(as_path):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [as_path])
+    return pattrs
+
+
+def _table(paths):
+    dests = OrderedDict()
+    for path in paths:
+        dest = dests.setdefault(path.nlri.formatted_nlri_str,
+                                mock.MagicMock(nlri=path.nlri,
+                                               known_path_list=[]))
+        dest.known_path_list.append(path)
+    table = mock.MagicMock()
+    table.values.return_value = list(dests.values())
+    return table
+
+
+def _core_service(peers, tables=None, vrf_tables=None):
+    core_service = mock.MagicMock(router_id='10.0.0.1', asn=65000)
+    core_service.peer_manager.iterpeers = peers
+    core_service.peer_manager.get_by_addr.side_effect = dict(
+        (p.ip_address, p) for p in peers).get
+    tm = core_service.table_manager
+    tm.get_global_table_by_route_family.side_effect = (
+        lambda rf: (tables or {}).get(rf, _table([])))
+    tm.get_vrf_tables.return_value = vrf_tables or {}
+    return core_service
+
+
+class Test_Mrt(unittest.TestCase):
+    """
+    Test case for ryu.services.protocols.bgp.mrt
+    """
+
+    def setUp(self):
+        self.peer1 = _Peer('192.168.0.2', 65001)
+        self.peer2 = _Peer('2001:db8::2', 4200000002)
+        self.paths = {
+            bgp.RF_IPv4_UC: [
+                Ipv4Path(self.peer1, bgp.IPAddrPrefix(24, '10.1.0.0'), 1,
+                         pattrs=_pattrs([65001]), nexthop='192.168.0.2'),
+                Ipv4Path(self.peer2, bgp.IPAddrPrefix(24, '10.1.0.0'), 1,
+                         pattrs=_pattrs([4200000002, 65003]),
+                         nexthop='192.168.0.3'),
+                Ipv4Path(self.peer1, bgp.IPAddrPrefix(16, '10.2.0.0'), 1,
+                         pattrs=_pattrs([65001]), nexthop='192.168.0.2'),
+                # Local paths are dumped but not loaded.
+                Ipv4Path(None, bgp.IPAddrPrefix(24, '10.3.0.0'), 0,
+                         pattrs=_pattrs([]), nexthop='0.0.0.0'),
+            ],
+            bgp.RF_IPv6_UC: [
+                Ipv6Path(self.peer2, bgp.IP6AddrPrefix(48, '2001:db8:1::'),
+                         1, pattrs=_pattrs([4200000002]),
+                         nexthop='2001:db8::2'),
+            ],
+            bgp.RF_IPv4_VPN: [
+                Vpnv4Path(self.peer1,
+                          bgp.LabelledVPNIPAddrPrefix(
+                              24, '10.4.0.0', labels=[100],
+                              route_dist='65000:100'),
+                          1, pattrs=_pattrs([65001]),
+                          nexthop='192.168.0.2'),
+            ],
+        }
+        self.core_service = _core_service(
+            [self.peer1, self.peer2],
+            dict((rf, _table(paths)) for rf, paths in self.paths.items()))
+
+    def _dump(self, vrf_tables=None):
+        self.core_service.table_manager.get_vrf_tables.return_value = (
+            vrf_tables or {})
+        f = io.BytesIO()
+        entries = mrt.RibDumper(self.core_service, f).dump()
+        return entries, f.getvalue()
+
+    def test_dump(self):
+        entries, buf = self._dump()
+
+        eq_(6, entries)
+        records = list(mrtlib.Reader(io.BytesIO(buf)))
+        peer_index_table = records[0].message
+        ok_(isinstance(peer_index_table,
+                       mrtlib.TableDump2PeerIndexTableMrtMessage))
+        eq_('', peer_index_table.view_name)
+        eq_(['0.0.0.0', '192.168.0.2', '2001:db8::2'],
+            [p.ip_addr for p in peer_index_table.peer_entries])
+        eq_([65000, 65001, 4200000002],
+            [p.as_num for p in peer_index_table.peer_entries])
+
+        messages = [r.message for r in records[1:]]
+        eq_([0, 1, 2, 3, 4], [m.seq_num for m in messages])
+        eq_(['10.1.0.0/24', '10.2.0.0/16', '10.3.0.0/24'],
+            [m.prefix.formatted_nlri_str for m in messages[:3]])
+        eq_([1, 2], [e.peer_index for e in messages[0].rib_entries])
+        eq_([0], [e.peer_index for e in messages[2].rib_entries])
+        eq_('2001:db8:1::/48', messages[3].prefix.formatted_nlri_str)
+        eq_((bgp.RF_IPv4_VPN.afi, bgp.RF_IPv4_VPN.safi),
+            (messages[4].afi, messages[4].safi))
+        eq_('65000:100:10.4.0.0/24', messages[4].nlri.formatted_nlri_str)
+
+    def test_dump_vrf(self):
+        vrf_path = Ipv4Path(None, bgp.IPAddrPrefix(24, '10.5.0.0'), 0,
+                            pattrs=_pattrs([]), nexthop='0.0.0.0')
+        vrf_table = _table([vrf_path])
+        vrf_table.ROUTE_FAMILY = Vrf4Table.ROUTE_FAMILY
+        _, buf = self._dump(
+            vrf_tables={('65000:100', 'ipv4'): vrf_table})
+
+        records = list(mrtlib.Reader(io.BytesIO(buf)))
+        eq_('65000:100', records[-2].message.view_name)
+        eq_(0, records[-1].message.seq_num)
+        eq_('10.5.0.0/24', records[-1].message.prefix.formatted_nlri_str)
+
+    def test_load(self):
+        _, buf = self._dump()
+        peer1 = _Peer('192.168.0.2', 65001, version_num=1)
+        peer2 = _Peer('2001:db8::2', 4200000002, version_num=3)
+        core_service = _core_service([peer1, peer2])
+
+        peers = mrt.load_rib(core_service, io.BytesIO(buf))
+
+        eq_(set([peer1, peer2]), peers)
+        learn_path = core_service.table_manager.learn_path
+        paths = [c[0][0] for c in learn_path.call_args_list]
+        eq_(5, len(paths))
+        # Loaded paths are older than their peer.
+        eq_([peer1, peer2, peer1, peer2, peer1],
+            [p.source for p in paths])
+        eq_([0, 2, 0, 2, 0], [p.source_version_num for p in paths])
+        for path in paths:
+            expected = [
+                p for p in self.paths[path.route_family]
+                if p.source and p.source.ip_address ==
+                path.source.ip_address and
+                p.nlri.formatted_nlri_str == path.nlri.formatted_nlri_str][0]
+            eq_(expected.nexthop, path.nexthop)
+            eq_(expected.get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH).path_seg_list,
+                path.get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH).path_seg_list)
+            ok_(not path.is_withdraw)
+
+    def test_load_unknown_peer(self):
+        _, buf = self._dump()
+        peer1 = _Peer('192.168.0.2', 65001)
+        core_service = _core_service([peer1])
+
+        peers = mrt.load_rib(core_service, io.BytesIO(buf))
+
+        eq_(set([peer1]), peers)
+        learn_path = core_service.table_manager.learn_path
+        eq_(3, learn_path.call_count)
+
+    def test_load_skips_vrf_view(self):
+        vrf_path = Ipv4Path(self.peer1, bgp.IPAddrPrefix(24, '10.5.0.0'), 1,
+                            pattrs=_pattrs([65001]), nexthop='192.168.0.2')
+        vrf_table = _table([vrf_path])
+        vrf_table.ROUTE_FAMILY = Vrf4Table.ROUTE_FAMILY
+        _, buf = self._dump(
+            vrf_tables={('65000:100', 'ipv4'): vrf_table})
+        core_service = _core_service([_Peer('192.168.0.2', 65001)])
+
+        mrt.load_rib(core_service, io.BytesIO(buf))
+
+        learn_path = core_service.table_manager.learn_path
+        eq_(3, learn_path.call_count)
@@ -21,8 +21,12 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 
+from ryu.lib.packet import afi
 from ryu.lib.packet import bgp
+from ryu.lib.packet import safi
+from ryu.services.protocols.bgp import constants as const
 from ryu.services.protocols.bgp import peer
 
 
@@ -373,3 +377,258 @@ class Test_Peer(unittest.TestCase):
         self._test_extract_and_reconstruct_as_path(
             path_attributes, ex_as_path_value,
             ex_aggregator_as_number, ex_aggregator_addr)
+
+
+class Test_pack_updates(unittest.TestCase):
+    """
+    Test case for peer.pack_updates
+    """
+
+    @staticmethod
+    def _attrs(as_path):
+        return [
+            bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGPPathAttributeAsPath([as_path]),
+        ]
+
+    @staticmethod
+    def _prefixes(update):
+        for attr in update.path_attributes:
+            if attr.type == bgp.BGP_ATTR_TYPE_MP_REACH_NLRI:
+                return [n.prefix for n in attr.nlri]
+            if attr.type == bgp.BGP_ATTR_TYPE_MP_UNREACH_NLRI:
+                return [n.prefix for n in attr.withdrawn_routes]
+        return [n.prefix for n in update.nlri + update.withdrawn_routes]
+
+    def test_pack_ipv4(self):
+        attrs1 = self._attrs([65001])
+        attrs2 = self._attrs([65002])
+        updates = [
+            bgp.BGPUpdate(
+                path_attributes=[bgp.BGPPathAttributeNextHop('10.0.0.1')] +
+                (attrs1 if i % 2 else attrs2),
+                nlri=[bgp.BGPNLRI(24, '10.%d.0.0' % i)])
+            for i in range(10)]
+        updates.append(bgp.BGPUpdate(
+            withdrawn_routes=[bgp.BGPNLRI(24, '20.0.0.0')]))
+        updates.append(bgp.BGPUpdate(
+            withdrawn_routes=[bgp.BGPNLRI(24, '20.0.1.0')]))
+
+        packed = peer.pack_updates(updates)
+
+        eq_(3, len(packed))
+        eq_(['10.%d.0.0/24' % i for i in range(0, 10, 2)],
+            self._prefixes(packed[0]))
+        eq_(['10.%d.0.0/24' % i for i in range(1, 10, 2)],
+            self._prefixes(packed[1]))
+        eq_(['20.0.0.0/24', '20.0.1.0/24'], self._prefixes(packed[2]))
+        # Packed messages can be parsed again.
+        for update in packed:
+            msg, _, rest = bgp.BGPMessage.parser(update.serialize())
+            eq_(self._prefixes(update), self._prefixes(msg))
+            eq_(b'', rest)
+
+    def test_pack_ipv6(self):
+        attrs = self._attrs([65001])
+
+        def _mp_reach(prefix, next_hop='2001:db8::1'):
+            return bgp.BGPPathAttributeMpReachNLRI(
+                afi.IP6, safi.UNICAST, next_hop,
+                [bgp.IP6AddrPrefix(64, prefix)])
+
+        updates = [
+            bgp.BGPUpdate(path_attributes=[_mp_reach('2001:db8:1::')] + attrs),
+            bgp.BGPUpdate(path_attributes=[_mp_reach('2001:db8:2::')] + attrs),
+            bgp.BGPUpdate(path_attributes=[
+                _mp_reach('2001:db8:3::', '2001:db8::2')] + attrs),
+            bgp.BGPUpdate(path_attributes=[
+                bgp.BGPPathAttributeMpUnreachNLRI(
+                    afi.IP6, safi.UNICAST,
+                    [bgp.IP6AddrPrefix(64, '2001:db8:4::')])]),
+        ]
+
+        packed = peer.pack_updates(updates)
+
+        eq_(3, len(packed))
+        eq_(['2001:db8:1::/64', '2001:db8:2::/64'], self._prefixes(packed[0]))
+        eq_(['2001:db8:3::/64'], self._prefixes(packed[1]))
+        eq_(['2001:db8:4::/64'], self._prefixes(packed[2]))
+
+    def test_pack_max_msg_len(self):
+        attrs = [bgp.BGPPathAttributeNextHop('10.0.0.1')] + self._attrs([1])
+        updates = [
+            bgp.BGPUpdate(path_attributes=attrs,
+                          nlri=[bgp.BGPNLRI(32, '10.0.%d.%d' % (i >> 8,
+                                                                i & 0xff))])
+            for i in range(2000)]
+
+        packed = peer.pack_updates(updates)
+
+        ok_(len(packed) > 1)
+        eq_(2000, sum(len(u.nlri) for u in packed))
+        for update in packed:
+            ok_(len(update.serialize()) <= peer.BGP_MAX_MSG_LEN)
+
+    def test_pack_end_of_rib(self):
+        eor = bgp.BGPUpdate(path_attributes=[
+            bgp.BGPPathAttributeMpUnreachNLRI(afi.IP6, safi.UNICAST, [])])
+
+        eq_([eor], peer.pack_updates([eor]))
+
+
+class Test_AdjRibOut(unittest.TestCase):
+    """
+    Test case for the Adj-RIB-out diff of peer.Peer on policy updates
+    """
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def setUp(self):
+        self.peer = peer.Peer()
+        self.peer._common_conf = mock.MagicMock(local_as=65000,
+                                                local_pref=100)
+        self.peer._neigh_conf = mock.MagicMock(
+            remote_as=65000, is_route_server_client=False,
+            is_route_reflector_client=False)
+        self.peer._signal_bus = mock.MagicMock()
+        self.peer._core_service = mock.MagicMock()
+        self.peer._protocol = mock.MagicMock()
+        self.peer.state = mock.MagicMock()
+        self.peer.version_num = 1
+        self.peer._out_filters = []
+        self.peer._attribute_maps = {}
+        self.peer._adj_rib_out = {}
+        self.peer.enque_outgoing_msg = mock.MagicMock()
+        self.peer._construct_update = self._construct_update
+
+    @staticmethod
+    def _construct_update(outgoing_route):
+        path = outgoing_route.path
+        if path.is_withdraw:
+            return bgp.BGPUpdate(withdrawn_routes=[path.nlri])
+        return bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeNextHop(path.nexthop),
+                path.get_pattr(bgp.BGP_ATTR_TYPE_ORIGIN),
+                path.get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH)],
+            nlri=[path.nlri])
+
+    def _path(self, prefix, is_withdraw=False):
+        pattrs = {
+            bgp.BGP_ATTR_TYPE_ORIGIN: bgp.BGPPathAttributeOrigin(
+                bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGP_ATTR_TYPE_AS_PATH: bgp.BGPPathAttributeAsPath([[]]),
+        }
+        addr, length = prefix.split('/')
+        return peer.Ipv4Path(None, bgp.IPAddrPrefix(int(length), addr), 1,
+                             pattrs=pattrs, nexthop='192.168.0.1',
+                             is_withdraw=is_withdraw)
+
+    def _sent(self, prefix, filtered=False, is_withdraw=False):
+        path = self._path(prefix, is_withdraw)
+        self.peer._adj_rib_out[peer.adj_rib_key(path.nlri)] = peer.SentRoute(
+            path, self.peer, filtered)
+        return path
+
+    def _enqueued(self):
+        return [c[0][0].path.nlri.formatted_nlri_str
+                for c in self.peer.enque_outgoing_msg.call_args_list]
+
+    def test_out_filter(self):
+        self._sent('10.1.0.0/24')
+        self._sent('10.2.0.0/24')
+        self._sent('10.3.0.0/24', filtered=True)
+        self._sent('10.4.0.0/24', filtered=True)
+        self._sent('10.5.0.0/24', filtered=True, is_withdraw=True)
+
+        self.peer.out_filters = [
+            peer.PrefixFilter('10.1.0.0/24', peer.PrefixFilter.POLICY_DENY),
+            peer.PrefixFilter('10.4.0.0/24', peer.PrefixFilter.POLICY_DENY),
+        ]
+
+        # Only the newly blocked and the newly permitted routes.
+        eq_(['10.1.0.0/24', '10.3.0.0/24'], self._enqueued())
+
+    def test_attribute_maps(self):
+        self._sent('10.1.0.0/24')
+        self._sent('10.2.0.0/24')
+        self._sent('10.3.0.0/24', is_withdraw=True)
+        attribute_maps = {
+            const.ATTR_MAPS_LABEL_KEY: const.ATTR_MAPS_LABEL_DEFAULT,
+            const.ATTR_MAPS_VALUE: [peer.AttributeMap(
+                [peer.PrefixFilter('10.2.0.0/16',
+                                   peer.PrefixFilter.POLICY_PERMIT,
+                                   ge=24)],
+                peer.AttributeMap.ATTR_LOCAL_PREF, 200)],
+        }
+
+        self.peer.attribute_maps = attribute_maps
+        eq_(['10.2.0.0/24'], self._enqueued())
+
+        # Setting the same attribute maps again changes nothing.
+        self.peer.enque_outgoing_msg.reset_mock()
+        self.peer.attribute_maps = attribute_maps
+        eq_([], self._enqueued())
+
+    def test_attribute_maps_ebgp(self):
+        self.peer._neigh_conf.remote_as = 65001
+        self._sent('10.2.0.0/24')
+
+        self.peer.attribute_maps = {
+            const.ATTR_MAPS_LABEL_KEY: const.ATTR_MAPS_LABEL_DEFAULT,
+            const.ATTR_MAPS_VALUE: [peer.AttributeMap(
+                [peer.PrefixFilter('10.2.0.0/24',
+                                   peer.PrefixFilter.POLICY_PERMIT)],
+                peer.AttributeMap.ATTR_LOCAL_PREF, 200)],
+        }
+
+        # LOCAL_PREF is not sent to eBGP peers.
+        eq_([], self._enqueued())
+
+    def test_construct_update_soo(self):
+        self.peer._neigh_conf.is_next_hop_self = False
+        self.peer._neigh_conf.soo_list = ['65000:1']
+        extcomm = bgp.BGPPathAttributeExtendedCommunities(
+            communities=[bgp.BGPTwoOctetAsSpecificExtendedCommunity(
+                subtype=2, as_number=65000, local_administrator=100)])
+        path1 = self._path('10.1.0.0/24')
+        pattrs = path1.pathattr_map
+        pattrs[bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES] = extcomm
+        path1 = peer.Ipv4Path(None, path1.nlri, 1, pattrs=pattrs,
+                              nexthop='192.168.0.1')
+        path2 = peer.Ipv4Path(None, bgp.IPAddrPrefix(24, '10.2.0.0'), 1,
+                              pattrs=pattrs, nexthop='192.168.0.1')
+        # The paths share the interned path attributes.
+        ok_(path1.pathattr_set is path2.pathattr_set)
+
+        for _ in range(2):
+            for path in (path1, path2):
+                update = peer.Peer._construct_update(
+                    self.peer, peer.OutgoingRoute(path))
+                sent = [a for a in update.path_attributes
+                        if a.type == bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES]
+                eq_(2, len(sent[0].communities))
+
+        # The stored path attributes are unchanged.
+        for path in (path1, path2):
+            stored = path.get_pattr(bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES)
+            eq_(1, len(stored.communities))
+
+    def test_send_blocked_withdraws_advertised(self):
+        path1 = self._sent('10.1.0.0/24')
+        path2 = self._sent('10.2.0.0/24', filtered=True)
+        self.peer._out_filters = [
+            peer.PrefixFilter('10.0.0.0/8', peer.PrefixFilter.POLICY_DENY,
+                              ge=24)]
+
+        self.peer._send_outgoing_routes(
+            [peer.OutgoingRoute(path1), peer.OutgoingRoute(path2)])
+
+        eq_(1, self.peer._protocol.send.call_count)
+        update = self.peer._protocol.send.call_args[0][0]
+        eq_(['10.1.0.0/24'], [n.prefix for n in update.withdrawn_routes])
+        eq_([], update.nlri)
+        # The blocked path is kept to be advertised again when permitted.
+        sent_route = self.peer.adj_rib_out['10.1.0.0/24']
+        ok_(sent_route.filtered)
+        ok_(sent_route.path is path1)
@@ -0,0 +1,167 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import logging
+import random
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+
+
+LOG = logging.getLogger(__name__)
+
+LOCAL_AS = 65000
+LOCAL_ID = '10.0.0.1'
+
+
+def _peer(remote_as, router_id):
+    peer = mock.MagicMock()
+    peer.remote_as = remote_as
+    peer.version_num = 1
+    peer.protocol.recv_open_msg.bgp_identifier = router_id
+    peer.protocol.sent_open_msg.bgp_identifier = LOCAL_ID
+    return peer
+
+
+def _path(source, as_path_len=1, origin=bgp.BGP_ATTR_ORIGIN_IGP,
+          local_pref=None, med=None, originator_id=None, cluster_list=None):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(origin)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [list(range(65100, 65100 + as_path_len))])
+    if local_pref is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_LOCAL_PREF] = \
+            bgp.BGPPathAttributeLocalPref(local_pref)
+    if med is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(med)
+    if originator_id is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_ORIGINATOR_ID] = \
+            bgp.BGPPathAttributeOriginatorId(originator_id)
+    if cluster_list is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_CLUSTER_LIST] = \
+            bgp.BGPPathAttributeClusterList(cluster_list)
+    return Ipv4Path(source, bgp.IPAddrPrefix(24, '10.0.0.0'), 1,
+                    pattrs=pattrs, nexthop='192.168.0.1')
+
+
+class Test_select_best_path(unittest.TestCase):
+    """
+    Test case for ryu.services.protocols.bgp.processor.select_best_path
+    """
+
+    def test_only_path(self):
+        path = _path(None)
+        eq_((path, processor.BPR_ONLY_PATH),
+            processor.select_best_path(LOCAL_AS, [path]))
+
+    def test_local_pref(self):
+        ebgp = _peer(65001, '10.0.0.2')
+        paths = [_path(ebgp, local_pref=100), _path(ebgp, local_pref=200)]
+
+        best_path, reason = processor.select_best_path(LOCAL_AS, paths)
+        ok_(best_path is paths[1])
+        eq_(processor.BPR_LOCAL_PREF, reason)
+
+    def test_router_id(self):
+        paths = [_path(_peer(LOCAL_AS, '10.0.0.3')),
+                 _path(_peer(LOCAL_AS, '10.0.0.2'))]
+
+        best_path, reason = processor.select_best_path(LOCAL_AS, paths)
+        ok_(best_path is paths[1])
+        eq_(processor.BPR_ROUTER_ID, reason)
+
+    def test_tie(self):
+        ebgp = _peer(65001, '10.0.0.2')
+        paths = [_path(ebgp), _path(ebgp)]
+
+        best_path, reason = processor.select_best_path(LOCAL_AS, paths)
+        ok_(best_path is paths[0])
+        eq_(processor.BPR_UNKNOWN, reason)
+
+    def test_same_as_pairwise(self):
+        rand = random.Random(0)
+        peers = [None,
+                 _peer(65001, '10.0.0.2'), _peer(65002, '10.0.0.3'),
+                 _peer(LOCAL_AS, '10.0.0.4'), _peer(LOCAL_AS, '10.0.0.5')]
+        origins = [bgp.BGP_ATTR_ORIGIN_IGP, bgp.BGP_ATTR_ORIGIN_EGP,
+                   bgp.BGP_ATTR_ORIGIN_INCOMPLETE]
+
+        for _ in range(500):
+            # Some of the paths have LOCAL_PREF, which is compared by the
+            # pairwise computation.
+            local_pref_ratio = rand.choice([0, 0.5, 1])
+            paths = []
+            for _ in range(rand.randint(2, 6)):
+                paths.append(_path(
+                    rand.choice(peers),
+                    as_path_len=rand.randint(1, 3),
+                    origin=rand.choice(origins),
+                    local_pref=(rand.choice([100, 200])
+                                if rand.random() < local_pref_ratio
+                                else None),
+                    med=rand.choice([None, 0, 10]),
+                    originator_id=rand.choice([None, '10.0.0.6']),
+                    cluster_list=rand.choice([None, ['10.0.0.7']])))
+
+            eq_(processor._select_best_path_pairwise(LOCAL_AS, paths),
+                processor.select_best_path(LOCAL_AS, paths))
+
+
+class Test_BgpProcessor(unittest.TestCase):
+    """
+    Test case for ryu.services.protocols.bgp.processor.BgpProcessor
+    """
+
+    def test_adjust_work_units(self):
+        bgp_processor = processor.BgpProcessor(mock.MagicMock())
+        eq_(processor.BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE,
+            bgp_processor.work_units_per_cycle)
+
+        # Cheap destinations make the cycles bigger.
+        for _ in range(20):
+            bgp_processor._adjust_work_units(
+                bgp_processor.work_units_per_cycle, 0.001)
+        eq_(processor.BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE_ADAPTIVE,
+            bgp_processor.work_units_per_cycle)
+
+        # Expensive destinations make the cycles smaller.
+        for _ in range(20):
+            bgp_processor._adjust_work_units(
+                bgp_processor.work_units_per_cycle, 10)
+        eq_(processor.BgpProcessor.MIN_DEST_PROCESSED_PER_CYCLE,
+            bgp_processor.work_units_per_cycle)
+
+    def test_fixed_work_units(self):
+        bgp_processor = processor.BgpProcessor(mock.MagicMock(),
+                                               work_units_per_cycle=50)
+        dest = mock.MagicMock(route_family=bgp.RF_IPv4_UC)
+        bgp_processor._dest_queue = mock.MagicMock()
+        bgp_processor._dest_queue.is_empty.return_value = False
+        bgp_processor._dest_queue.pop_first.return_value = dest
+
+        bgp_processor._process_dest()
+        eq_(50, dest.process.call_count)
+        eq_(50, bgp_processor.work_units_per_cycle)
@@ -0,0 +1,96 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import logging
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_BgpProtocol(unittest.TestCase):
+    """
+    Test case for speaker.BgpProtocol
+    """
+
+    @mock.patch.object(
+        speaker.BgpProtocol, '__init__', mock.MagicMock(return_value=None))
+    def _create_protocol(self):
+        protocol = speaker.BgpProtocol(None, None)
+        protocol._recv_buff = bytearray()
+        protocol.received = []
+        protocol._handle_msg = protocol.received.append
+        return protocol
+
+    def _msgs(self):
+        return [
+            bgp.BGPKeepAlive(),
+            bgp.BGPUpdate(withdrawn_routes=[bgp.BGPNLRI(24, '10.0.0.0')]),
+            bgp.BGPUpdate(
+                path_attributes=[
+                    bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                    bgp.BGPPathAttributeAsPath([[65001]]),
+                    bgp.BGPPathAttributeNextHop('192.168.0.1')],
+                nlri=[bgp.BGPNLRI(24, '10.0.1.0')]),
+            bgp.BGPKeepAlive(),
+        ]
+
+    def _test_data_received(self, chunk_size):
+        protocol = self._create_protocol()
+        msgs = self._msgs()
+        stream = b''.join(bytes(msg.serialize()) for msg in msgs)
+
+        for i in range(0, len(stream), chunk_size):
+            protocol.data_received(stream[i:i + chunk_size])
+
+        eq_([bytes(msg.serialize()) for msg in msgs],
+            [bytes(msg.serialize()) for msg in protocol.received])
+        eq_(bytearray(), protocol._recv_buff)
+
+    def test_data_received_at_once(self):
+        self._test_data_received(4096)
+
+    def test_data_received_per_byte(self):
+        self._test_data_received(1)
+
+    def test_data_received_per_header(self):
+        self._test_data_received(speaker.BGP_MIN_MSG_LEN)
+
+    def test_data_received_partial(self):
+        protocol = self._create_protocol()
+        buf = bytes(bgp.BGPKeepAlive().serialize())
+
+        protocol.data_received(memoryview(buf + buf[:10]))
+
+        eq_(1, len(protocol.received))
+        eq_(bytearray(buf[:10]), protocol._recv_buff)
+
+    @raises(bgp.NotSync)
+    def test_data_received_invalid_marker(self):
+        protocol = self._create_protocol()
+        protocol._socket = mock.MagicMock()
+        protocol.send_notification = mock.MagicMock()
+
+        protocol.data_received(b'\x00' * speaker.BGP_MIN_MSG_LEN)
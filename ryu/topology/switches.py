@@ -59,6 +59,9 @@ CONF.register_cli_opts([
 
 class Port(object):
     # This is data class passed by EventPortXXX
+    __slots__ = ('dpid', '_ofproto', '_config', '_state',
+                 'port_no', 'hw_addr', 'name')
+
     def __init__(self, dpid, ofproto, ofpport):
         super(Port, self).__init__()
 
@@ -137,6 +140,8 @@ class Switch(object):
 
 class Link(object):
     # This is data class passed by EventLinkXXX
+    __slots__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         super(Link, self).__init__()
         self.src = src
@@ -163,6 +168,8 @@ class Link(object):
 
 class Host(object):
     # This is data class passed by EventHostXXX
+    __slots__ = ('port', 'mac', 'ipv4', 'ipv6')
+
     def __init__(self, mac, port):
         super(Host, self).__init__()
         self.port = port